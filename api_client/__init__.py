@@ -0,0 +1,35 @@
+"""
+Shared Python client for the Simon Price PT backend API.
+
+Used by the test, verification and load scripts instead of each one
+re-declaring BASE_URL, logging in by hand and opening a new connection per
+request. Both variants keep a pooled keep-alive connection, log in lazily
+and renew the admin access token through /api/admin/refresh.
+
+    from api_client import ApiClient
+
+    with ApiClient() as api:
+        packages = api.get_packages().data['packages']
+        clients = api.get_clients()          # logs in on first use
+
+    async with AsyncApiClient() as api:
+        response = await api.get_policy('privacy-policy')
+"""
+
+from api_client.async_client import AsyncApiClient
+from api_client.config import ADMIN_EMAIL, ADMIN_PASSWORD, get_backend_url
+from api_client.namespace import TestNamespace, current_namespace
+from api_client.response import ApiError, ApiResponse
+from api_client.sync_client import ApiClient
+
+__all__ = [
+    "ADMIN_EMAIL",
+    "ADMIN_PASSWORD",
+    "ApiClient",
+    "ApiError",
+    "ApiResponse",
+    "AsyncApiClient",
+    "TestNamespace",
+    "current_namespace",
+    "get_backend_url",
+]
@@ -0,0 +1,73 @@
+"""
+Asyncio client built on a pooled httpx.AsyncClient
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+import httpx
+
+from api_client.config import ADMIN_EMAIL, ADMIN_PASSWORD, get_backend_url
+from api_client.response import ApiResponse, parse_body
+from api_client.routes import ApiRoutes, Flow, _Exclusive
+
+
+class AsyncApiClient(ApiRoutes):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        admin_email: str = ADMIN_EMAIL,
+        admin_password: str = ADMIN_PASSWORD,
+        timeout: float = 15.0,
+        pool_size: int = 10,
+    ):
+        super().__init__(admin_email, admin_password)
+        self.base_url = (base_url or get_backend_url()).rstrip('/')
+        self.http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        # Held while an exclusive step (login or token renewal) runs
+        self._auth_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> 'AsyncApiClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.http.aclose()
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    async def _run(self, flow: Flow) -> Any:
+        reply = None
+        try:
+            while True:
+                step = flow.send(reply)
+                if isinstance(step, _Exclusive):
+                    async with self._auth_lock:
+                        reply = await self._run(step.flow)
+                else:
+                    reply = await self._send(step.method, step.path, token=step.token, **step.kwargs)
+        except StopIteration as done:
+            return done.value
+
+    async def _send(self, method: str, path: str, token: Optional[str] = None, headers=None, **kwargs) -> ApiResponse:
+        headers = dict(headers or {})
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        started = time.perf_counter()
+        response = await self.http.request(method, path, headers=headers, **kwargs)
+        return ApiResponse(
+            status_code=response.status_code,
+            data=parse_body(response.text),
+            text=response.text,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            headers=response.headers,
+        )
@@ -0,0 +1,22 @@
+"""
+Backend location and default admin credentials
+"""
+
+import os
+
+ADMIN_EMAIL = os.environ.get('API_ADMIN_EMAIL', 'simon.price@simonprice-pt.co.uk')
+ADMIN_PASSWORD = os.environ.get('API_ADMIN_PASSWORD', 'Qwerty1234!!!')
+
+
+def get_backend_url():
+    """Resolve the backend URL: REACT_APP_BACKEND_URL, then /app/frontend/.env, then localhost"""
+    if os.environ.get('REACT_APP_BACKEND_URL'):
+        return os.environ['REACT_APP_BACKEND_URL'].rstrip('/')
+    try:
+        with open('/app/frontend/.env', 'r') as f:
+            for line in f:
+                if line.startswith('REACT_APP_BACKEND_URL='):
+                    return line.split('=', 1)[1].strip().rstrip('/')
+    except FileNotFoundError:
+        pass
+    return 'http://localhost:8001'
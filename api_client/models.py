@@ -0,0 +1,112 @@
+"""
+Typed shapes of the request and response bodies used by the wrappers.
+
+These mirror the Express validators and controller responses; fields the
+backend treats as optional are marked total=False.
+"""
+
+from typing import Any, Dict, List, Literal, TypedDict
+
+PolicyType = Literal['cancellation-policy', 'terms-of-service', 'privacy-policy', 'cookie-policy']
+
+
+class TokenPair(TypedDict, total=False):
+    success: bool
+    accessToken: str
+    refreshToken: str
+    user: Dict[str, Any]
+
+
+class ContactForm(TypedDict, total=False):
+    name: str
+    email: str
+    phone: str
+    goals: str
+    experience: str
+    message: str
+
+
+class TdeeSubmission(TypedDict, total=False):
+    email: str
+    joinMailingList: bool
+    results: Dict[str, Any]
+    userInfo: Dict[str, Any]
+
+
+class PaymentLinkRequest(TypedDict, total=False):
+    name: str
+    email: str
+    telephone: str
+    price: float
+    billingDay: int
+    packageId: str
+
+
+class PurchaseRequest(TypedDict, total=False):
+    packageId: str
+    paymentMethodId: str
+    clientInfo: Dict[str, Any]
+    parqResponses: List[Dict[str, Any]]
+    healthResponses: List[Dict[str, Any]]
+    hasDoctorApproval: bool
+
+
+class Package(TypedDict, total=False):
+    id: str
+    name: str
+    price: float
+    description: str
+    features: List[str]
+    is_popular: bool
+
+
+class PackageList(TypedDict, total=False):
+    success: bool
+    packages: List[Package]
+
+
+class Question(TypedDict, total=False):
+    id: str
+    question: str
+    order: int
+    type: str
+
+
+class QuestionList(TypedDict, total=False):
+    success: bool
+    questions: List[Question]
+
+
+class PolicyItem(TypedDict, total=False):
+    id: str
+    text: str
+    order: int
+
+
+class PolicySection(TypedDict, total=False):
+    id: str
+    title: str
+    order: int
+    items: List[PolicyItem]
+
+
+class Policy(TypedDict, total=False):
+    success: bool
+    sections: List[PolicySection]
+
+
+class BlogPost(TypedDict, total=False):
+    id: str
+    slug: str
+    title: str
+    content: str
+    excerpt: str
+    status: str
+    category: str
+    tags: List[str]
+
+
+class BlogPostList(TypedDict, total=False):
+    success: bool
+    posts: List[BlogPost]
+    pagination: Dict[str, Any]
@@ -0,0 +1,74 @@
+"""
+Per-worker test data namespaces.
+
+Tests that create data must not share fixed identities such as
+test.contact@example.com once they run in parallel. A TestNamespace tags
+every email, slug and title with the test run and the worker that created
+it, so concurrent workers never collide and leftovers can be traced back
+to the run that made them.
+
+Under pytest-xdist the run id and worker name come from the variables the
+plugin sets on each worker process. When a script is run directly, the run
+id is random and the worker is named after the process id.
+"""
+
+import os
+import re
+import uuid
+from typing import Optional
+
+TAG_PREFIX = 'tns'
+
+
+class TestNamespace:
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, run_id: Optional[str] = None, worker: Optional[str] = None):
+        self.run_id = run_id or os.environ.get('PYTEST_XDIST_TESTRUNUID') or uuid.uuid4().hex
+        self.worker = worker or os.environ.get('PYTEST_XDIST_WORKER') or f"p{os.getpid()}"
+        self._counter = 0
+
+    @property
+    def tag(self) -> str:
+        """Short marker shared by every identity this worker creates, e.g. 'tns-3f2a9c1b-gw2'"""
+        return f"{TAG_PREFIX}-{self.run_id[:8]}-{self.worker}"
+
+    @property
+    def run_tag(self) -> str:
+        """Marker shared by every worker in the run, for cleaning up after the whole session"""
+        return f"{TAG_PREFIX}-{self.run_id[:8]}-"
+
+    def _next(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    def email(self, local_part: str = 'test') -> str:
+        """'test.contact' -> 'test.contact.tns-3f2a9c1b-gw2.1@example.com'"""
+        return f"{local_part}.{self.tag}.{self._next()}@example.com"
+
+    def slug(self, base: str = 'test') -> str:
+        """URL-safe slug for blog posts, categories and packages"""
+        base = re.sub(r'[^a-z0-9]+', '-', base.lower()).strip('-')
+        return f"{base}-{self.tag}-{self._next()}"
+
+    def title(self, text: str) -> str:
+        """Tag a human-readable name, such as a policy section or package title"""
+        return f"{text} [{self.tag}]"
+
+    def owns(self, value: Optional[str]) -> bool:
+        """True if value was produced by this worker"""
+        return bool(value) and self.tag in value
+
+    def __repr__(self) -> str:
+        return f"TestNamespace({self.tag!r})"
+
+
+_current: Optional[TestNamespace] = None
+
+
+def current_namespace() -> TestNamespace:
+    """The namespace for this process, created on first use"""
+    global _current
+    if _current is None:
+        _current = TestNamespace()
+    return _current
@@ -0,0 +1,82 @@
+"""
+Response wrapper shared by the sync and async clients
+"""
+
+import base64
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Generic, Mapping, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class ApiError(Exception):
+    """Raised by ApiResponse.raise_for_status() and when authentication cannot be obtained"""
+
+    def __init__(self, message: str, response: Optional['ApiResponse'] = None):
+        super().__init__(message)
+        self.response = response
+
+
+@dataclass
+class ApiResponse(Generic[T]):
+    status_code: int
+    data: T
+    text: str
+    elapsed_ms: float
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def json(self) -> T:
+        """Parsed body, so call sites written against requests keep working"""
+        return self.data
+
+    def raise_for_status(self) -> 'ApiResponse[T]':
+        if not self.ok:
+            raise ApiError(f"HTTP {self.status_code}: {self.text[:200]}", self)
+        return self
+
+
+def parse_body(text: str) -> Any:
+    try:
+        return json.loads(text) if text else None
+    except ValueError:
+        return None
+
+
+class AdminTokens:
+    """Admin access/refresh token pair and the access token's expiry"""
+
+    # Renew this many seconds before the access token actually expires
+    REFRESH_MARGIN = 30
+
+    def __init__(self):
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+
+    def update(self, data: Mapping[str, Any]):
+        self.access_token = data.get('accessToken') or self.access_token
+        self.refresh_token = data.get('refreshToken') or self.refresh_token
+        self.expires_at = jwt_expiry(self.access_token)
+
+    def clear(self):
+        self.access_token = self.refresh_token = self.expires_at = None
+
+    @property
+    def expiring(self) -> bool:
+        return self.expires_at is not None and time.time() > self.expires_at - self.REFRESH_MARGIN
+
+
+def jwt_expiry(token: Optional[str]) -> Optional[float]:
+    """Read the exp claim without verifying the signature"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
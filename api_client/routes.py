@@ -0,0 +1,397 @@
+"""
+Typed wrappers for the backend routes, and the authentication shared by
+both clients.
+
+The mixins only describe requests; they call self.request(). ApiRoutes
+writes request(), login() and token renewal once, as generators that yield
+each HTTP call they need (_Send) and receive its ApiResponse. A client only
+supplies the transport: _send() and _run(), which drives such a generator
+with blocking calls in ApiClient and with awaits in AsyncApiClient. So the
+same wrapper returns an ApiResponse from ApiClient and an awaitable of one
+from AsyncApiClient.
+
+auth='admin' sends the admin bearer token (logging in or refreshing first
+when needed); auth='client' sends the token from client_login().
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Generator, List, NamedTuple, Optional
+
+from api_client.models import (
+    BlogPostList,
+    ContactForm,
+    PackageList,
+    PaymentLinkRequest,
+    Policy,
+    PolicyType,
+    PurchaseRequest,
+    QuestionList,
+    TdeeSubmission,
+)
+from api_client.models import TokenPair
+from api_client.response import AdminTokens, ApiError, ApiResponse
+
+
+def _admin_policy_path(policy_type: PolicyType) -> str:
+    # The cancellation policy predates the generic policy routes
+    if policy_type == 'cancellation-policy':
+        return '/api/admin/cancellation-policy'
+    return f'/api/admin/policies/{policy_type}'
+
+
+class PublicRoutes:
+    def health(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/health')
+
+    def submit_contact(self, form: ContactForm) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/contact', json=form)
+
+    def submit_client_contact(self, form: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/client-contact', json=form)
+
+    def submit_tdee_results(self, submission: TdeeSubmission) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/tdee-results', json=submission)
+
+    def subscribe_newsletter(self, email: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/newsletter/subscribe', json={"email": email})
+
+    def unsubscribe(self, email: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/unsubscribe', json={"email": email})
+
+    def purchase(self, purchase: PurchaseRequest) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/public/purchase', json=purchase)
+
+
+class PackageRoutes:
+    def get_packages(self) -> ApiResponse[PackageList]:
+        return self.request('GET', '/api/public/packages')
+
+    def get_parq_questions(self, package_id: Optional[str] = None) -> ApiResponse[QuestionList]:
+        params = {"packageId": package_id} if package_id else None
+        return self.request('GET', '/api/public/parq-questions', params=params)
+
+    def get_health_questions(self, package_id: Optional[str] = None) -> ApiResponse[QuestionList]:
+        params = {"packageId": package_id} if package_id else None
+        return self.request('GET', '/api/public/health-questions', params=params)
+
+    def admin_get_packages(self) -> ApiResponse[PackageList]:
+        return self.request('GET', '/api/admin/packages', auth='admin')
+
+    def admin_create_package(self, package: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/packages', auth='admin', json=package)
+
+    def admin_update_package(self, package_id: str, changes: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', f'/api/admin/packages/{package_id}', auth='admin', json=changes)
+
+    def admin_delete_package(self, package_id: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'/api/admin/packages/{package_id}', auth='admin')
+
+    def admin_get_parq_questions(self) -> ApiResponse[QuestionList]:
+        return self.request('GET', '/api/admin/parq-questions', auth='admin')
+
+    def admin_create_parq_question(self, question: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/parq-questions', auth='admin', json=question)
+
+    def admin_update_parq_question(self, question_id: str, changes: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', f'/api/admin/parq-questions/{question_id}', auth='admin', json=changes)
+
+    def admin_delete_parq_question(self, question_id: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'/api/admin/parq-questions/{question_id}', auth='admin')
+
+    def admin_get_health_questions(self) -> ApiResponse[QuestionList]:
+        return self.request('GET', '/api/admin/health-questions', auth='admin')
+
+    def admin_create_health_question(self, question: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/health-questions', auth='admin', json=question)
+
+    def admin_update_health_question(self, question_id: str, changes: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', f'/api/admin/health-questions/{question_id}', auth='admin', json=changes)
+
+    def admin_delete_health_question(self, question_id: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'/api/admin/health-questions/{question_id}', auth='admin')
+
+
+class PolicyRoutes:
+    def get_public_policy(self, policy_type: PolicyType) -> ApiResponse[Policy]:
+        return self.request('GET', f'/api/{policy_type}')
+
+    def get_policy(self, policy_type: PolicyType) -> ApiResponse[Policy]:
+        return self.request('GET', _admin_policy_path(policy_type), auth='admin')
+
+    def create_policy_section(self, policy_type: PolicyType, title: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', f'{_admin_policy_path(policy_type)}/sections', auth='admin', json={"title": title})
+
+    def update_policy_section(
+        self, policy_type: PolicyType, section_id: str, changes: Dict[str, Any]
+    ) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'PUT', f'{_admin_policy_path(policy_type)}/sections/{section_id}', auth='admin', json=changes
+        )
+
+    def delete_policy_section(self, policy_type: PolicyType, section_id: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'{_admin_policy_path(policy_type)}/sections/{section_id}', auth='admin')
+
+    def reorder_policy_sections(self, policy_type: PolicyType, section_ids: List[str]) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'PUT', f'{_admin_policy_path(policy_type)}/sections/reorder', auth='admin',
+            json={"sectionIds": section_ids},
+        )
+
+    def add_policy_item(self, policy_type: PolicyType, section_id: str, text: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'POST', f'{_admin_policy_path(policy_type)}/sections/{section_id}/items', auth='admin',
+            json={"text": text},
+        )
+
+    def update_policy_item(
+        self, policy_type: PolicyType, section_id: str, item_id: str, text: str
+    ) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'PUT', f'{_admin_policy_path(policy_type)}/sections/{section_id}/items/{item_id}', auth='admin',
+            json={"text": text},
+        )
+
+    def delete_policy_item(self, policy_type: PolicyType, section_id: str, item_id: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'DELETE', f'{_admin_policy_path(policy_type)}/sections/{section_id}/items/{item_id}', auth='admin'
+        )
+
+
+class AdminRoutes:
+    def forgot_password(self, email: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/forgot-password', json={"email": email})
+
+    def change_password(self, current_password: str, new_password: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'POST', '/api/admin/change-password', auth='admin',
+            json={"currentPassword": current_password, "newPassword": new_password},
+        )
+
+    def get_users(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/admin/users', auth='admin')
+
+    def create_user(self, email: str, password: str, name: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'POST', '/api/admin/users', auth='admin', json={"email": email, "password": password, "name": name}
+        )
+
+    def delete_user(self, user_id: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'/api/admin/users/{user_id}', auth='admin')
+
+    def get_emails(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/admin/emails', auth='admin')
+
+    def create_payment_link(self, link: PaymentLinkRequest) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/create-payment-link', auth='admin', json=link)
+
+    def resend_payment_link(self, email: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/resend-payment-link', auth='admin', json={"email": email})
+
+    def get_clients(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/admin/clients', auth='admin')
+
+    def get_client(self, email: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', f'/api/admin/clients/{email}', auth='admin')
+
+    def update_client(self, email: str, changes: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', f'/api/admin/clients/{email}', auth='admin', json=changes)
+
+    def get_client_users(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/admin/client-users', auth='admin')
+
+    def update_client_user_status(self, email: str, status: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', f'/api/admin/client-users/{email}/status', auth='admin', json={"status": status})
+
+    def fetch_stripe_customers(self, **filters: Any) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/import-customers/fetch', auth='admin', json=filters)
+
+    def normalize_client_data(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/admin/normalize-data', auth='admin')
+
+
+class ClientRoutes:
+    def validate_token(self, token: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/client/validate-token', json={"token": token})
+
+    def create_setup_intent(self, **body: Any) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/client/create-setup-intent', json=body)
+
+    def complete_onboarding(self, onboarding: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/client/complete-onboarding', json=onboarding)
+
+    def create_client_password(self, token: str, password: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/client/create-password', json={"token": token, "password": password})
+
+    def client_forgot_password(self, email: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/client/forgot-password', json={"email": email})
+
+    def get_profile(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/client/profile', auth='client')
+
+    def update_profile(self, changes: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', '/api/client/profile', auth='client', json=changes)
+
+
+class BlogRoutes:
+    def get_posts(
+        self,
+        page: int = 1,
+        limit: int = 12,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> ApiResponse[BlogPostList]:
+        params = {"page": page, "limit": limit, "category": category, "tag": tag, "search": search}
+        return self.request('GET', '/api/blog/posts', params={k: v for k, v in params.items() if v is not None})
+
+    def get_post(self, slug: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', f'/api/blog/posts/{slug}')
+
+    def get_categories(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/blog/categories')
+
+    def get_tags(self) -> ApiResponse[Dict[str, Any]]:
+        return self.request('GET', '/api/blog/tags')
+
+    def admin_get_posts(
+        self,
+        page: int = 1,
+        limit: int = 20,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> ApiResponse[BlogPostList]:
+        params = {"page": page, "limit": limit, "status": status, "category": category, "search": search}
+        return self.request(
+            'GET', '/api/blog/admin/posts', auth='admin',
+            params={k: v for k, v in params.items() if v is not None},
+        )
+
+    def admin_create_post(self, post: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('POST', '/api/blog/admin/posts', auth='admin', json=post)
+
+    def admin_update_post(self, slug: str, changes: Dict[str, Any]) -> ApiResponse[Dict[str, Any]]:
+        return self.request('PUT', f'/api/blog/admin/posts/{slug}', auth='admin', json=changes)
+
+    def admin_delete_post(self, slug: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'/api/blog/admin/posts/{slug}', auth='admin')
+
+    def admin_create_category(self, name: str, description: str = '') -> ApiResponse[Dict[str, Any]]:
+        return self.request(
+            'POST', '/api/blog/admin/categories', auth='admin', json={"name": name, "description": description}
+        )
+
+    def admin_delete_category(self, slug: str) -> ApiResponse[Dict[str, Any]]:
+        return self.request('DELETE', f'/api/blog/admin/categories/{slug}', auth='admin')
+
+
+class _Send(NamedTuple):
+    """One HTTP call a flow needs; the client answers it with an ApiResponse"""
+    method: str
+    path: str
+    token: Optional[str]
+    kwargs: Dict[str, Any]
+
+
+class _Exclusive(NamedTuple):
+    """A nested flow that concurrent callers must not run at the same time"""
+    flow: Generator
+
+
+Flow = Generator[Any, ApiResponse, Any]
+
+
+class ApiRoutes(PublicRoutes, PackageRoutes, PolicyRoutes, AdminRoutes, ClientRoutes, BlogRoutes, ABC):
+    """Every route group plus authentication; the concrete clients supply the transport"""
+
+    def __init__(self, admin_email: str, admin_password: str):
+        self.admin_email = admin_email
+        self.admin_password = admin_password
+        self.tokens = AdminTokens()
+        self.client_token: Optional[str] = None
+
+    @abstractmethod
+    def _send(self, method: str, path: str, token: Optional[str] = None, headers=None, **kwargs: Any) -> Any:
+        """Send one HTTP request and return (or, async, resolve to) its ApiResponse"""
+
+    @abstractmethod
+    def _run(self, flow: Flow) -> Any:
+        """Drive a flow to completion, answering each _Send with _send() and its return value"""
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+
+    def login(self, email: Optional[str] = None, password: Optional[str] = None) -> ApiResponse[TokenPair]:
+        """POST /api/admin/login and keep the returned tokens for later admin calls"""
+        return self._run(self._login(email, password))
+
+    def refresh(self) -> ApiResponse[TokenPair]:
+        """POST /api/admin/refresh with the stored refresh token"""
+        return self._run(self._refresh())
+
+    def client_login(self, email: str, password: str) -> ApiResponse[TokenPair]:
+        """POST /api/client/login; the token is used for auth='client' calls"""
+        return self._run(self._client_login(email, password))
+
+    def request(self, method: str, path: str, *, auth: Optional[str] = None, **kwargs: Any) -> ApiResponse:
+        """
+        Send a request. auth='admin' attaches the admin token and retries once
+        with a renewed token on 401; auth='client' attaches the client token.
+        """
+        return self._run(self._request(method, path, auth, kwargs))
+
+    def _login(self, email: Optional[str], password: Optional[str]) -> Flow:
+        response = yield _Send('POST', '/api/admin/login', None, {"json": {
+            "email": email or self.admin_email,
+            "password": password or self.admin_password,
+        }})
+        if response.status_code == 200:
+            self.tokens.update(response.data)
+        return response
+
+    def _refresh(self) -> Flow:
+        body = {"refreshToken": self.tokens.refresh_token}
+        response = yield _Send('POST', '/api/admin/refresh', None, {"json": body})
+        if response.status_code == 200:
+            self.tokens.update(response.data)
+        return response
+
+    def _client_login(self, email: str, password: str) -> Flow:
+        response = yield _Send('POST', '/api/client/login', None, {"json": {"email": email, "password": password}})
+        if response.status_code == 200:
+            self.client_token = response.data.get('accessToken')
+        return response
+
+    def _ensure_admin_token(self, rejected: Optional[str] = None) -> Flow:
+        """
+        Make sure a usable admin token is stored. `rejected` is a token the
+        server just refused; it is only renewed if no other caller has
+        replaced it in the meantime.
+        """
+        token = self.tokens.access_token
+        if token and token != rejected and not self.tokens.expiring:
+            return
+        if self.tokens.refresh_token and (yield from self._refresh()).status_code == 200:
+            return
+        self.tokens.clear()
+        response = yield from self._login(None, None)
+        if response.status_code != 200:
+            raise ApiError(f"Admin login failed: HTTP {response.status_code}", response)
+
+    def _request(self, method: str, path: str, auth: Optional[str], kwargs: Dict[str, Any]) -> Flow:
+        if auth == 'admin':
+            # Concurrent callers share one login/refresh instead of stampeding the endpoint
+            yield _Exclusive(self._ensure_admin_token())
+            token = self.tokens.access_token
+            response = yield _Send(method, path, token, kwargs)
+            if response.status_code == 401:
+                yield _Exclusive(self._ensure_admin_token(rejected=token))
+                response = yield _Send(method, path, self.tokens.access_token, kwargs)
+            return response
+        if auth == 'client':
+            if not self.client_token:
+                raise ApiError("Call client_login() before client routes")
+            return (yield _Send(method, path, self.client_token, kwargs))
+        return (yield _Send(method, path, None, kwargs))
+
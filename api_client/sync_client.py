@@ -0,0 +1,79 @@
+"""
+Blocking client built on a pooled requests.Session
+"""
+
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_client.config import ADMIN_EMAIL, ADMIN_PASSWORD, get_backend_url
+from api_client.response import ApiResponse, parse_body
+from api_client.routes import ApiRoutes, Flow, _Exclusive
+
+
+class ApiClient(ApiRoutes):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        admin_email: str = ADMIN_EMAIL,
+        admin_password: str = ADMIN_PASSWORD,
+        timeout: float = 15.0,
+        pool_size: int = 10,
+    ):
+        super().__init__(admin_email, admin_password)
+        self.base_url = (base_url or get_backend_url()).rstrip('/')
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self) -> 'ApiClient':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    @property
+    def access_token(self) -> str:
+        """A valid admin access token, logging in or refreshing as needed"""
+        self._run(self._ensure_admin_token())
+        return self.tokens.access_token
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def _run(self, flow: Flow) -> Any:
+        reply = None
+        try:
+            while True:
+                step = flow.send(reply)
+                if isinstance(step, _Exclusive):
+                    # Calls are made one at a time, so no lock is needed
+                    reply = self._run(step.flow)
+                else:
+                    reply = self._send(step.method, step.path, token=step.token, **step.kwargs)
+        except StopIteration as done:
+            return done.value
+
+    def _send(self, method: str, path: str, token: Optional[str] = None, headers=None, **kwargs) -> ApiResponse:
+        headers = dict(headers or {})
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        response = self.session.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+        return ApiResponse(
+            status_code=response.status_code,
+            data=parse_body(response.text),
+            text=response.text,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            headers=response.headers,
+        )
@@ -5,11 +5,17 @@
 
 const { ConfidentialClientApplication } = require('@azure/msal-node');
 
+const GRAPH_SCOPE = 'https://graph.microsoft.com/.default';
+// Refresh a cached stand-in token this long before it expires
+const TOKEN_EXPIRY_MARGIN_MS = 60 * 1000;
+
 class EmailConfig {
   constructor(config) {
     this.emailConfig = config.email;
     this.graphClient = null;
     this.clientApp = null;
+    this.tokenUrl = null;
+    this.cachedToken = null;
   }
 
   /**
@@ -22,6 +28,15 @@ class EmailConfig {
       return null;
     }
 
+    if (this.emailConfig.authorityBase) {
+      // MSAL only accepts https authorities, so tokens from an alternative
+      // authority (the local stand-in) are requested directly
+      const authorityBase = this.emailConfig.authorityBase.replace(/\/+$/, '');
+      this.tokenUrl = `${authorityBase}/${this.emailConfig.tenantId}/oauth2/v2.0/token`;
+      console.log(`✅ Microsoft Graph configured (token authority: ${authorityBase})`);
+      return this;
+    }
+
     try {
       // Create MSAL confidential client app
       this.clientApp = new ConfidentialClientApplication({
@@ -48,17 +63,15 @@ class EmailConfig {
    * @returns {Promise<Object>} Authenticated Graph client
    */
   async createGraphClient() {
-    if (!this.clientApp) {
+    if (!this.clientApp && !this.tokenUrl) {
       throw new Error('Email not configured');
     }
 
     try {
       // Get access token using client credentials
-      const clientCredentialRequest = {
-        scopes: ['https://graph.microsoft.com/.default']
-      };
-
-      const response = await this.clientApp.acquireTokenByClientCredential(clientCredentialRequest);
+      const response = this.tokenUrl
+        ? await this._acquireTokenFromAuthority()
+        : await this.clientApp.acquireTokenByClientCredential({ scopes: [GRAPH_SCOPE] });
       
       if (!response || !response.accessToken) {
         throw new Error('Failed to acquire access token');
@@ -67,19 +80,61 @@ class EmailConfig {
       // Create Graph client with access token (v3.x syntax)
       const { Client } = require('@microsoft/microsoft-graph-client');
       
-      const client = Client.init({
+      const options = {
         authProvider: (done) => {
           done(null, response.accessToken);
         }
-      });
-      
-      return client;
+      };
+
+      if (this.emailConfig.graphApiBase) {
+        options.baseUrl = this.emailConfig.graphApiBase;
+        // The Graph client only attaches the token for https Graph hosts
+        options.fetchOptions = {
+          headers: { Authorization: `Bearer ${response.accessToken}` }
+        };
+      }
+
+      return Client.init(options);
     } catch (error) {
       console.error('❌ Graph client creation failed:', error.message);
       throw error;
     }
   }
 
+  /**
+   * Client credentials grant against GRAPH_AUTHORITY_BASE. The token is
+   * cached like MSAL's token cache so each email costs one Graph call.
+   * @private
+   * @returns {Promise<Object>} Object with accessToken
+   */
+  async _acquireTokenFromAuthority() {
+    if (this.cachedToken && this.cachedToken.expiresAt - TOKEN_EXPIRY_MARGIN_MS > Date.now()) {
+      return this.cachedToken;
+    }
+
+    const response = await fetch(this.tokenUrl, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
+      body: new URLSearchParams({
+        grant_type: 'client_credentials',
+        client_id: this.emailConfig.clientId,
+        client_secret: this.emailConfig.clientSecret,
+        scope: GRAPH_SCOPE
+      })
+    });
+    const body = await response.json().catch(() => ({}));
+
+    if (!response.ok) {
+      throw new Error(body.error_description || `Token request failed with status ${response.status}`);
+    }
+
+    this.cachedToken = {
+      accessToken: body.access_token,
+      expiresAt: Date.now() + body.expires_in * 1000
+    };
+    return this.cachedToken;
+  }
+
   /**
    * Check if email is properly configured
    * @private
@@ -122,6 +122,21 @@ class EnvironmentConfig {
         value: process.env.STRIPE_WEBHOOK_SECRET,
         description: 'Stripe webhook endpoint secret',
         validator: (val) => !val || val.startsWith('whsec_')
+      },
+      'STRIPE_API_BASE': {
+        value: process.env.STRIPE_API_BASE,
+        description: 'Alternative Stripe API origin, e.g. the local stand-in (python -m standins stripe)',
+        validator: (val) => !val || /^https?:\/\/[^\s]+$/.test(val)
+      },
+      'GRAPH_API_BASE': {
+        value: process.env.GRAPH_API_BASE,
+        description: 'Alternative Microsoft Graph origin, e.g. the local stand-in (python -m standins graph)',
+        validator: (val) => !val || /^https?:\/\/[^\s]+$/.test(val)
+      },
+      'GRAPH_AUTHORITY_BASE': {
+        value: process.env.GRAPH_AUTHORITY_BASE,
+        description: 'Alternative token authority origin used together with GRAPH_API_BASE',
+        validator: (val) => !val || /^https?:\/\/[^\s]+$/.test(val)
       }
     };
 
@@ -228,12 +243,15 @@ class EnvironmentConfig {
         to: process.env.EMAIL_TO,
         tenantId: process.env.TENANT_ID,
         clientId: process.env.CLIENT_ID,
-        clientSecret: process.env.CLIENT_SECRET
+        clientSecret: process.env.CLIENT_SECRET,
+        graphApiBase: process.env.GRAPH_API_BASE,
+        authorityBase: process.env.GRAPH_AUTHORITY_BASE
       },
       stripe: {
         secretKey: process.env.STRIPE_SECRET_KEY,
         publishableKey: process.env.STRIPE_PUBLISHABLE_KEY,
-        webhookSecret: process.env.STRIPE_WEBHOOK_SECRET
+        webhookSecret: process.env.STRIPE_WEBHOOK_SECRET,
+        apiBase: process.env.STRIPE_API_BASE
       },
       rateLimit: {
         windowMs: parseInt(process.env.RATE_LIMIT_WINDOW_MS) || 900000, // 15 minutes
@@ -8,6 +8,7 @@ class StripeConfig {
     this.secretKey = config.stripe.secretKey;
     this.publishableKey = config.stripe.publishableKey;
     this.webhookSecret = config.stripe.webhookSecret;
+    this.apiBase = config.stripe.apiBase;
     this.stripe = null;
   }
 
@@ -23,7 +24,7 @@ class StripeConfig {
 
     try {
       const Stripe = require('stripe');
-      this.stripe = Stripe(this.secretKey);
+      this.stripe = Stripe(this.secretKey, this.getClientOptions());
       
       const isTest = this.secretKey.startsWith('sk_test_');
       console.log(`✅ Stripe initialized (${isTest ? 'Test' : 'Live'} mode)`);
@@ -37,6 +38,24 @@ class StripeConfig {
     }
   }
 
+  /**
+   * SDK options that redirect API calls to STRIPE_API_BASE when it is set
+   * @returns {Object} Options for the Stripe constructor
+   */
+  getClientOptions() {
+    if (!this.apiBase) {
+      return {};
+    }
+
+    const url = new URL(this.apiBase);
+    console.log(`🔀 Stripe API calls redirected to ${url.origin}`);
+    return {
+      host: url.hostname,
+      port: url.port || (url.protocol === 'https:' ? 443 : 80),
+      protocol: url.protocol.replace(':', '')
+    };
+  }
+
   /**
    * Get Stripe instance
    * @returns {Object|null} Stripe instance
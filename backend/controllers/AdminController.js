@@ -1526,7 +1526,7 @@ class AdminController {
       const newOrder = maxOrderDoc.length > 0 ? (maxOrderDoc[0].order || 0) + 1 : 1;
 
       const section = {
-        id: `section-${Date.now()}`,
+        id: `section-${Date.now()}-${Math.round(Math.random() * 1E9)}`,
         title,
         order: newOrder,
         items: [],
@@ -1663,7 +1663,7 @@ class AdminController {
       const maxOrder = items.length > 0 ? Math.max(...items.map(i => i.order || 0)) : 0;
 
       const newItem = {
-        id: `item-${Date.now()}`,
+        id: `item-${Date.now()}-${Math.round(Math.random() * 1E9)}`,
         text,
         order: maxOrder + 1,
         created_at: new Date()
@@ -1868,7 +1868,7 @@ class AdminController {
       const newOrder = maxOrderDoc.length > 0 ? (maxOrderDoc[0].order || 0) + 1 : 1;
 
       const section = {
-        id: `section-${Date.now()}`,
+        id: `section-${Date.now()}-${Math.round(Math.random() * 1E9)}`,
         title,
         order: newOrder,
         items: [],
@@ -2032,7 +2032,7 @@ class AdminController {
       const maxOrder = items.length > 0 ? Math.max(...items.map(i => i.order || 0)) : 0;
 
       const newItem = {
-        id: `item-${Date.now()}`,
+        id: `item-${Date.now()}-${Math.round(Math.random() * 1E9)}`,
         text,
         order: maxOrder + 1
       };
@@ -237,7 +237,7 @@ class PackageController {
       const order = maxOrder.length > 0 ? maxOrder[0].order + 1 : 1;
 
       const questionData = {
-        id: `parq-${Date.now()}`,
+        id: `parq-${Date.now()}-${Math.round(Math.random() * 1E9)}`,
         question,
         order,
         requires_doctor_approval: requires_doctor_approval || false,
@@ -400,7 +400,7 @@ class PackageController {
       const order = maxOrder.length > 0 ? maxOrder[0].order + 1 : 1;
 
       const questionData = {
-        id: `health-${Date.now()}`,
+        id: `health-${Date.now()}-${Math.round(Math.random() * 1E9)}`,
         question,
         type: type || 'text',
         options: Array.isArray(options) ? options : [],
@@ -1,14 +1,35 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import Binary
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import asyncio
+import atexit
+import base64
+import contextvars
+import hashlib
+import heapq
+import httpx
+import json
 import logging
+import logging.handlers
+import math
+import queue
+import random
+import re
+import sys
+import time
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, List, Optional, Tuple
 import uuid
-from datetime import datetime
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
 
 
 ROOT_DIR = Path(__file__).parent
@@ -16,7 +37,8 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+client = AsyncIOMotorClient(mongo_url, minPoolSize=MONGO_MIN_POOL_SIZE)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -35,22 +57,813 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class BulkStatusResult(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    # Indexes of items refused by the rate limit; nothing was stored for them
+    rejected: List[int] = []
+
+class StaleClient(BaseModel):
+    client_name: str
+    last_seen: datetime
+    expected_interval_seconds: float
+    overdue_seconds: float
+
+class DistinctClients(BaseModel):
+    window_start: datetime
+    window_end: datetime
+    buckets: int
+    estimate: int
+
+
+# Stale-client detection
+STALE_DEFAULT_INTERVAL = float(os.environ.get('STALE_DEFAULT_INTERVAL_SECONDS', '60'))
+STALE_GRACE_FACTOR = float(os.environ.get('STALE_GRACE_FACTOR', '2'))
+STALE_SWEEP_SECONDS = float(os.environ.get('STALE_SWEEP_SECONDS', '5'))
+STALE_WEBHOOK_URL = os.environ.get('STALE_WEBHOOK_URL')
+# Transitions waiting for the webhook; further ones are dropped (and logged) when full
+STALE_WEBHOOK_QUEUE_SIZE = int(os.environ.get('STALE_WEBHOOK_QUEUE_SIZE', '1000'))
+# Heartbeats older than this are not loaded on startup
+STALE_LOAD_WINDOW = float(os.environ.get('STALE_LOAD_WINDOW_SECONDS', '86400'))
+# Clients stale for longer than this are forgotten
+STALE_EVICT_SECONDS = float(os.environ.get('STALE_EVICT_SECONDS', '86400'))
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Convert a naive UTC datetime (as stored by StatusCheck) to epoch seconds"""
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+class StaleClientTracker:
+    """
+    Tracks the last heartbeat of every client_name in a min-heap keyed by the
+    deadline of its next expected heartbeat.
+
+    Each heartbeat pushes a new heap entry (O(log n)); superseded entries are
+    discarded lazily when they reach the top. A periodic sweep moves clients
+    whose deadline has passed into the stale set, so listing them is O(k).
+    The expected interval per client is learned from observed gaps. Gaps
+    shorter than a tenth of the default interval come from batched ingest
+    (bulk posts, WebSocket batches) rather than the client's schedule and are
+    not learned from. Clients that stay stale for longer than the eviction
+    age are forgotten entirely.
+    """
+
+    def __init__(self, default_interval: float, grace_factor: float):
+        self.default_interval = default_interval
+        self.grace_factor = grace_factor
+        self.min_gap = default_interval / 10
+        self._heap = []
+        self._last_seen: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._stale: Dict[str, float] = {}
+
+    def record(self, client_name: str, seen_at: float) -> bool:
+        """Record a heartbeat. Returns True if the client was stale and has recovered."""
+        previous = self._last_seen.get(client_name)
+        if previous is not None and seen_at < previous:
+            return False
+
+        if previous is not None and seen_at - previous >= self.min_gap:
+            gap = seen_at - previous
+            interval = self._intervals.get(client_name)
+            # Exponentially weighted so one late heartbeat does not reset the baseline
+            self._intervals[client_name] = gap if interval is None else 0.8 * interval + 0.2 * gap
+
+        self._last_seen[client_name] = seen_at
+        deadline = seen_at + self.expected_interval(client_name) * self.grace_factor
+        self._deadlines[client_name] = deadline
+        heapq.heappush(self._heap, (deadline, client_name))
+
+        return self._stale.pop(client_name, None) is not None
+
+    def expected_interval(self, client_name: str) -> float:
+        return self._intervals.get(client_name, self.default_interval)
+
+    def sweep(self, now: float) -> List[str]:
+        """Move clients whose deadline has passed into the stale set. Returns newly stale clients."""
+        newly_stale = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, client_name = heapq.heappop(self._heap)
+            if self._deadlines.get(client_name) != deadline:
+                continue  # superseded by a later heartbeat
+            del self._deadlines[client_name]
+            self._stale[client_name] = deadline
+            newly_stale.append(client_name)
+        return newly_stale
+
+    def evict(self, now: float, max_stale_seconds: float) -> List[str]:
+        """Forget clients whose deadline passed more than max_stale_seconds ago"""
+        evicted = []
+        # The stale set is filled in (roughly) deadline order, so stop at the first recent entry
+        for client_name, deadline in list(self._stale.items()):
+            if now - deadline <= max_stale_seconds:
+                break
+            del self._stale[client_name]
+            self._last_seen.pop(client_name, None)
+            self._intervals.pop(client_name, None)
+            evicted.append(client_name)
+        return evicted
+
+    def stale_clients(self, now: float) -> List[StaleClient]:
+        return [
+            StaleClient(
+                client_name=client_name,
+                last_seen=datetime.utcfromtimestamp(self._last_seen[client_name]),
+                expected_interval_seconds=self.expected_interval(client_name),
+                overdue_seconds=max(0.0, now - deadline),
+            )
+            for client_name, deadline in self._stale.items()
+        ]
+
+
+stale_tracker = StaleClientTracker(STALE_DEFAULT_INTERVAL, STALE_GRACE_FACTOR)
+
+
+stale_notifications: asyncio.Queue = asyncio.Queue(STALE_WEBHOOK_QUEUE_SIZE)
+
+
+def notify_stale_transition(client_name: str, state: str):
+    """Log a stale/recovered transition and queue it for the optional webhook"""
+    logger.warning(f"Status client {client_name} is now {state}")
+    if not STALE_WEBHOOK_URL:
+        return
+    payload = {
+        "client_name": client_name,
+        "state": state,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    try:
+        stale_notifications.put_nowait(payload)
+    except asyncio.QueueFull:
+        logger.error(f"Stale-client webhook queue is full, dropping {state} for {client_name}")
+
+
+async def deliver_stale_notifications(http: httpx.AsyncClient):
+    """Post queued transitions to the webhook in order, so heartbeats never wait on it"""
+    async with http:
+        while True:
+            payload = await stale_notifications.get()
+            try:
+                await http.post(STALE_WEBHOOK_URL, json=payload)
+            except Exception as e:
+                logger.error(f"Stale-client webhook failed for {payload['client_name']}: {e}")
+            finally:
+                stale_notifications.task_done()
+
+
+async def load_last_heartbeats():
+    """
+    Seed the tracker with the latest heartbeat of every client seen within
+    STALE_LOAD_WINDOW. Clients already overdue were stale before the restart,
+    so they are marked stale without notifying again.
+    """
+    now = time.time()
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": datetime.utcfromtimestamp(now - STALE_LOAD_WINDOW)}}},
+        {"$group": {"_id": "$client_name", "last_seen": {"$max": "$timestamp"}}},
+    ]
+    async for row in db.status_checks.aggregate(pipeline):
+        if row["_id"] is not None and row["last_seen"] is not None:
+            stale_tracker.record(row["_id"], _epoch(row["last_seen"]))
+    stale_tracker.sweep(now)
+
+
+async def sweep_stale_clients():
+    """Background loop that promotes overdue clients to stale"""
+    while True:
+        now = time.time()
+        for client_name in stale_tracker.sweep(now):
+            notify_stale_transition(client_name, "stale")
+        stale_tracker.evict(now, STALE_EVICT_SECONDS)
+        await asyncio.sleep(STALE_SWEEP_SECONDS)
+
+
+# Distinct-client estimates
+HLL_PRECISION = 12
+HLL_BUCKET_SECONDS = int(os.environ.get('HLL_BUCKET_SECONDS', '3600'))
+HLL_FLUSH_SECONDS = float(os.environ.get('HLL_FLUSH_SECONDS', '30'))
+WINDOW_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+class HyperLogLog:
+    """
+    Fixed-size cardinality sketch. With precision 12 a sketch is 4 KiB and
+    estimates distinct counts with roughly 1.6% standard error. Sketches are
+    merged by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(self.registers)}")
+
+    def add(self, value: str):
+        # blake2b rather than hash() so sketches agree across processes
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        remainder_bits = 64 - self.precision
+        remainder = h & ((1 << remainder_bits) - 1)
+        rank = remainder_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return round(self.m * math.log(self.m / zeros))
+        return round(raw)
+
+
+class DistinctClientSketches:
+    """
+    Per-time-bucket HyperLogLog sketches of client_name. Heartbeats update an
+    in-memory sketch for their bucket; a background task merges pending
+    sketches into the status_client_sketches collection using an optimistic
+    version check so several workers can flush the same bucket.
+    """
+
+    def __init__(self, collection, bucket_seconds: int):
+        self.collection = collection
+        self.bucket_seconds = bucket_seconds
+        self._pending: Dict[int, HyperLogLog] = {}
+
+    def bucket_for(self, seen_at: float) -> int:
+        return int(seen_at // self.bucket_seconds) * self.bucket_seconds
+
+    def record(self, client_name: str, seen_at: float):
+        bucket = self.bucket_for(seen_at)
+        sketch = self._pending.get(bucket)
+        if sketch is None:
+            sketch = self._pending[bucket] = HyperLogLog()
+        sketch.add(client_name)
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        for bucket, sketch in pending.items():
+            # A failing bucket is kept for the next flush; the others are still tried
+            try:
+                if await self._merge_into_store(bucket, sketch):
+                    continue
+                logger.warning(f"Could not persist client sketch for bucket {bucket}, will retry")
+            except Exception as e:
+                logger.error(f"Client sketch flush failed for bucket {bucket}, will retry: {e}")
+            self._requeue(bucket, sketch)
+
+    def _requeue(self, bucket: int, sketch: HyperLogLog):
+        existing = self._pending.get(bucket)
+        if existing is not None:
+            sketch.merge(existing)
+        self._pending[bucket] = sketch
+
+    async def _merge_into_store(self, bucket: int, sketch: HyperLogLog) -> bool:
+        for _ in range(5):
+            doc = await self.collection.find_one({"_id": bucket})
+            if doc is None:
+                try:
+                    await self.collection.insert_one({
+                        "_id": bucket,
+                        "precision": sketch.precision,
+                        "registers": Binary(bytes(sketch.registers)),
+                        "version": 1,
+                    })
+                    return True
+                except DuplicateKeyError:
+                    continue
+
+            merged = HyperLogLog(doc["precision"], doc["registers"])
+            merged.merge(sketch)
+            result = await self.collection.update_one(
+                {"_id": bucket, "version": doc["version"]},
+                {"$set": {"registers": Binary(bytes(merged.registers))}, "$inc": {"version": 1}},
+            )
+            if result.modified_count:
+                return True
+        return False
+
+    async def estimate(self, start: float, end: float) -> DistinctClients:
+        """Estimate distinct clients in every bucket overlapping [start, end)"""
+        first_bucket = self.bucket_for(start)
+        combined = HyperLogLog()
+        buckets = set()
+
+        cursor = self.collection.find(
+            {"_id": {"$gte": first_bucket, "$lt": end}},
+            {"precision": 1, "registers": 1},
+        )
+        async for doc in cursor:
+            combined.merge(HyperLogLog(doc["precision"], doc["registers"]))
+            buckets.add(doc["_id"])
+
+        for bucket, sketch in self._pending.items():
+            if first_bucket <= bucket < end:
+                combined.merge(sketch)
+                buckets.add(bucket)
+
+        return DistinctClients(
+            window_start=datetime.utcfromtimestamp(first_bucket),
+            window_end=datetime.utcfromtimestamp(end),
+            buckets=len(buckets),
+            estimate=combined.estimate(),
+        )
+
+
+client_sketches = DistinctClientSketches(db.status_client_sketches, HLL_BUCKET_SECONDS)
+
+
+async def flush_client_sketches():
+    """Background loop that persists pending distinct-client sketches"""
+    while True:
+        await asyncio.sleep(HLL_FLUSH_SECONDS)
+        try:
+            await client_sketches.flush()
+        except Exception as e:
+            logger.error(f"Client sketch flush failed: {e}")
+
+
+def parse_window(window: str) -> float:
+    """Parse a window such as 90m, 24h or 7d into seconds"""
+    match = re.fullmatch(r'(\d+)([mhd])', window.strip())
+    if not match:
+        raise HTTPException(status_code=400, detail="window must look like 90m, 24h or 7d")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+# Status ingestion rate limiting
+RATE_LIMIT_PER_SECOND = float(os.environ.get('STATUS_RATE_LIMIT_PER_SECOND', '5'))
+RATE_LIMIT_BURST = float(os.environ.get('STATUS_RATE_LIMIT_BURST', '20'))
+# Per-client overrides, e.g. {"edge-agent": {"rate": 50, "burst": 100}}
+RATE_LIMIT_OVERRIDES = json.loads(os.environ.get('STATUS_RATE_LIMITS', '{}'))
+RATE_LIMIT_SHARED = os.environ.get('STATUS_RATE_LIMIT_SHARED', 'false').lower() == 'true'
+RATE_LIMIT_SHARED_WINDOW = int(os.environ.get('STATUS_RATE_LIMIT_SHARED_WINDOW_SECONDS', '10'))
+
+metrics: Counter = Counter()
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket per client_name. Buckets refill continuously at
+    the client's rate up to its burst size. client_name is chosen by the
+    caller, so buckets live in an LRU of at most MAX_BUCKETS entries; the
+    least recently used bucket is dropped first, and by then it has usually
+    refilled completely anyway.
+    """
+
+    MAX_BUCKETS = 10000
+
+    def __init__(self, rate: float, burst: float, overrides: Dict[str, Dict[str, float]],
+                 max_buckets: int = MAX_BUCKETS):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides
+        self.max_buckets = max_buckets
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+
+    def limits_for(self, client_name: str) -> Tuple[float, float]:
+        override = self.overrides.get(client_name, {})
+        return float(override.get('rate', self.rate)), float(override.get('burst', self.burst))
+
+    def acquire(self, client_name: str, now: float) -> float:
+        """Take one token. Returns 0 when allowed, otherwise seconds until a token is available."""
+        _, retry_after = self.acquire_up_to(client_name, 1, now)
+        return retry_after
+
+    def acquire_up_to(self, client_name: str, count: int, now: float) -> Tuple[int, float]:
+        """
+        Take as many of `count` tokens as the bucket holds. Returns how many
+        were granted and, when that is fewer than asked for, seconds until
+        the next token is available.
+        """
+        rate, burst = self.limits_for(client_name)
+        tokens, updated = self._buckets.get(client_name, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        granted = min(count, int(tokens))
+        tokens -= granted
+        self._store(client_name, tokens, now)
+        if granted == count:
+            return granted, 0.0
+        return granted, (1 - tokens) / rate if rate > 0 else float(RATE_LIMIT_SHARED_WINDOW)
+
+    def refund(self, client_name: str, count: int, now: float):
+        """Give back tokens taken by acquire_up_to for requests that were refused elsewhere"""
+        if count <= 0 or client_name not in self._buckets:
+            return
+        _, burst = self.limits_for(client_name)
+        tokens, updated = self._buckets[client_name]
+        self._store(client_name, min(burst, tokens + count), updated)
+
+    def _store(self, client_name: str, tokens: float, now: float):
+        self._buckets[client_name] = (tokens, now)
+        self._buckets.move_to_end(client_name)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+
+
+status_limiter = TokenBucketLimiter(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST, RATE_LIMIT_OVERRIDES)
+
+
+async def acquire_shared_quota(client_name: str, now: float, count: int = 1) -> Tuple[int, float]:
+    """
+    Cross-worker check: one atomic counter document per client per fixed
+    window, advanced by `count` in a single update. Returns how many were
+    granted and, when that is fewer than `count`, seconds until the window
+    resets. The part over the limit is taken back off the counter so it
+    does not use up quota.
+    """
+    rate, burst = status_limiter.limits_for(client_name)
+    window_start = int(now // RATE_LIMIT_SHARED_WINDOW) * RATE_LIMIT_SHARED_WINDOW
+    window_end = window_start + RATE_LIMIT_SHARED_WINDOW
+    counter_id = f"{client_name}:{window_start}"
+    counter = await db.status_rate_limits.find_one_and_update(
+        {"_id": counter_id},
+        {
+            "$inc": {"count": count},
+            "$setOnInsert": {"expires_at": datetime.utcfromtimestamp(window_end) + timedelta(minutes=1)},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    limit = int(rate * RATE_LIMIT_SHARED_WINDOW + burst)
+    over = min(count, counter["count"] - limit)
+    if over <= 0:
+        return count, 0.0
+    await db.status_rate_limits.update_one({"_id": counter_id}, {"$inc": {"count": -over}})
+    return count - over, window_end - now
+
+
+# WebSocket ingest batching
+WS_BATCH_SIZE = int(os.environ.get('STATUS_WS_BATCH_SIZE', '500'))
+WS_FLUSH_SECONDS = float(os.environ.get('STATUS_WS_FLUSH_MS', '50')) / 1000
+# Attempts at writing a batch before the connection is closed without acknowledging it
+WS_PERSIST_ATTEMPTS = 3
+
+
+def count_rate_limited(client_name: str, count: int = 1):
+    metrics['status_rate_limited_total'] += count
+    # Only configured clients get their own counter; anyone can make up a client_name
+    label = client_name if client_name in RATE_LIMIT_OVERRIDES else 'other'
+    metrics[f'status_rate_limited:{label}'] += count
+
+
+async def admit_status_checks(client_name: str, count: int = 1) -> Tuple[int, float]:
+    """
+    Spend rate limit for `count` status checks from one client in one step:
+    the local bucket first, then the shared quota when enabled. Returns how
+    many are admitted and, if not all of them, seconds until more are.
+    """
+    now = time.time()
+    granted, retry_after = status_limiter.acquire_up_to(client_name, count, now)
+    if granted and RATE_LIMIT_SHARED:
+        shared, shared_retry_after = await acquire_shared_quota(client_name, now, granted)
+        status_limiter.refund(client_name, granted - shared, now)
+        if shared < granted:
+            granted, retry_after = shared, max(retry_after, shared_retry_after)
+    return granted, retry_after
+
+
+async def status_rate_limit_delay(client_name: str) -> float:
+    """Seconds the client must wait, or 0; checks the shared quota too when enabled"""
+    _, retry_after = await admit_status_checks(client_name)
+    return retry_after
+
+
+async def enforce_status_rate_limit(client_name: str):
+    retry_after = await status_rate_limit_delay(client_name)
+    if retry_after:
+        count_rate_limited(client_name)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for {client_name}",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+async def record_heartbeat(status_obj: StatusCheck):
+    """Feed a persisted status check to the in-memory trackers"""
+    seen_at = _epoch(status_obj.timestamp)
+    client_sketches.record(status_obj.client_name, seen_at)
+    logger.debug("Status check %s recorded for %s", status_obj.id, status_obj.client_name)
+    if stale_tracker.record(status_obj.client_name, seen_at):
+        notify_stale_transition(status_obj.client_name, "recovered")
+
+
+async def persist_status_batch(batch: List[StatusCheck]) -> int:
+    """
+    Insert a batch with unordered insert_many. Checks whose id already
+    exists (an idempotent retry) are skipped rather than failing the batch.
+    Returns the number of newly inserted checks.
+    """
+    duplicates = set()
+    try:
+        await db.status_checks.insert_many([status_obj.dict() for status_obj in batch], ordered=False)
+    except BulkWriteError as e:
+        write_errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != 11000 for error in write_errors):
+            raise
+        duplicates = {error['index'] for error in write_errors}
+
+    for index, status_obj in enumerate(batch):
+        if index not in duplicates:
+            await record_heartbeat(status_obj)
+    return len(batch) - len(duplicates)
+
+
+def idempotent_id(idempotency_key: str, index: int = 0) -> str:
+    """Derive a stable StatusCheck id so a retried request maps onto the same documents"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"status-check:{idempotency_key}:{index}"))
+
+
+def encode_cursor(status_check: StatusCheck) -> str:
+    raw = json.dumps([status_check.timestamp.isoformat(), status_check.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Turn a listing cursor into a filter for checks after that position"""
+    try:
+        timestamp, status_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp = datetime.fromisoformat(timestamp)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"timestamp": {"$gt": timestamp}},
+        {"timestamp": timestamp, "id": {"$gt": status_id}},
+    ]}
+
+# Startup warmup
+warmup_state = {"ready": False, "duration_ms": None}
+# Attempts made before serving; after that warmup keeps retrying in the background
+WARMUP_STARTUP_ATTEMPTS = 3
+WARMUP_RETRY_CAP_SECONDS = float(os.environ.get('WARMUP_RETRY_CAP_SECONDS', '30'))
+
+
+async def warm_up():
+    """
+    Pay connection and serialization setup costs before serving traffic:
+    open MONGO_MIN_POOL_SIZE pooled connections (one concurrent ping each
+    forces a separate checkout), run a trivial query against status_checks,
+    and push sample models through validation and JSON encoding.
+    """
+    started = time.perf_counter()
+    await asyncio.gather(*(client.admin.command('ping') for _ in range(max(1, MONGO_MIN_POOL_SIZE))))
+    await db.status_checks.find_one({}, {"_id": 1})
+
+    sample = StatusCheck(**StatusCheckCreate(client_name='warmup').dict())
+    jsonable_encoder([sample])
+    jsonable_encoder(StaleClient(
+        client_name='warmup', last_seen=sample.timestamp,
+        expected_interval_seconds=1.0, overdue_seconds=0.0,
+    ))
+    jsonable_encoder(DistinctClients(
+        window_start=sample.timestamp, window_end=sample.timestamp, buckets=0, estimate=0,
+    ))
+
+    warmup_state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    warmup_state["ready"] = True
+    logger.info(f"Warmup finished in {warmup_state['duration_ms']} ms")
+
+
+async def retry_warm_up(first_attempt: int = 1, last_attempt: Optional[int] = None) -> bool:
+    """
+    Call warm_up until it succeeds, sleeping 1s, 2s, 4s... (capped at
+    WARMUP_RETRY_CAP_SECONDS) between attempts. Gives up after last_attempt
+    when one is given, without sleeping after it.
+    """
+    attempt = first_attempt
+    while True:
+        try:
+            await warm_up()
+            return True
+        except Exception as e:
+            logger.error(f"Warmup attempt {attempt} failed: {e}")
+        if last_attempt is not None and attempt >= last_attempt:
+            return False
+        await asyncio.sleep(min(WARMUP_RETRY_CAP_SECONDS, 2 ** (attempt - 1)))
+        attempt += 1
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
+@api_router.get("/ready")
+async def readiness():
+    return JSONResponse(status_code=200 if warmup_state["ready"] else 503, content=warmup_state)
+
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
+async def create_status_check(
+    input: StatusCheckCreate,
+    idempotency_key: Optional[str] = Header(None),
+):
+    await enforce_status_rate_limit(input.client_name)
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    if idempotency_key:
+        status_obj.id = idempotent_id(idempotency_key)
+    try:
+        _ = await db.status_checks.insert_one(status_obj.dict())
+    except DuplicateKeyError:
+        existing = await db.status_checks.find_one({"id": status_obj.id})
+        return StatusCheck(**existing)
+    await record_heartbeat(status_obj)
     return status_obj
 
+@api_router.post("/status/bulk", response_model=BulkStatusResult)
+async def create_status_checks_bulk(
+    inputs: List[StatusCheckCreate],
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+):
+    """
+    Store many status checks at once. Rate limits are spent once per
+    client_name for all of that client's items; items over the limit are
+    left out, listed by index in `rejected`, and Retry-After is set. If
+    nothing at all is admitted the request fails with 429 instead.
+    """
+    indexes_by_client: Dict[str, List[int]] = {}
+    for index, status_input in enumerate(inputs):
+        indexes_by_client.setdefault(status_input.client_name, []).append(index)
+
+    admitted: List[int] = []
+    rejected: List[int] = []
+    retry_after = 0.0
+    for client_name, indexes in indexes_by_client.items():
+        granted, client_retry_after = await admit_status_checks(client_name, len(indexes))
+        admitted.extend(indexes[:granted])
+        if granted < len(indexes):
+            rejected.extend(indexes[granted:])
+            retry_after = max(retry_after, client_retry_after)
+            count_rate_limited(client_name, len(indexes) - granted)
+
+    if rejected:
+        if not admitted:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded for {', '.join(indexes_by_client)}",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        response.headers["Retry-After"] = str(math.ceil(retry_after))
+
+    batch = []
+    for index in sorted(admitted):
+        status_obj = StatusCheck(**inputs[index].dict())
+        if idempotency_key:
+            # Keyed by position in the request, so a retry maps each item to the same id
+            status_obj.id = idempotent_id(idempotency_key, index)
+        batch.append(status_obj)
+    inserted = await persist_status_batch(batch) if batch else 0
+    return BulkStatusResult(received=len(inputs), inserted=inserted, duplicates=len(batch) - inserted,
+                            rejected=sorted(rejected))
+
+@api_router.websocket("/status/ws")
+async def ingest_status_stream(websocket: WebSocket):
+    """
+    Persistent ingest channel. Each text frame is a StatusCheckCreate object
+    or a list of them. Messages are numbered in arrival order and written
+    with insert_many once WS_BATCH_SIZE are pending (also part way through a
+    large frame) or WS_FLUSH_SECONDS have passed; after every write the
+    server sends {"ack": n}, meaning messages 1..n have been handled.
+    Messages that fail validation or rate limiting are reported individually
+    as {"rejected": seq, "reason": ...}. If a batch cannot be written after
+    WS_PERSIST_ATTEMPTS tries the connection is closed with code 1011, and a
+    binary frame closes it with 1003. Unacknowledged messages are never
+    stored, whether the connection is closed or dropped, so a client resends
+    everything after the last ack without creating duplicates.
+    """
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    received = 0
+    acked = 0
+    batch: List[StatusCheck] = []
+    flush_at = 0.0
+    written = True
+    close_code = None
+
+    async def flush() -> bool:
+        """Write and acknowledge the batch; False when it could not be written"""
+        nonlocal batch, acked
+        for attempt in range(WS_PERSIST_ATTEMPTS):
+            try:
+                if batch:
+                    await persist_status_batch(batch)
+                break
+            except Exception as e:
+                logger.error(f"WebSocket batch of {len(batch)} not written (attempt {attempt + 1}): {e}")
+                if attempt == WS_PERSIST_ATTEMPTS - 1:
+                    return False
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        batch = []
+        acked = received
+        await websocket.send_json({"ack": received})
+        return True
+
+    try:
+        while True:
+            timeout = max(0.0, flush_at - loop.time()) if batch else None
+            try:
+                frame = await asyncio.wait_for(websocket.receive(), timeout)
+            except asyncio.TimeoutError:
+                written = await flush()
+                if not written:
+                    close_code = 1011
+                    break
+                continue
+            if frame["type"] == "websocket.disconnect":
+                break
+            raw = frame.get("text")
+            if raw is None:
+                close_code = 1003  # unsupported data: only text frames carry messages
+                break
+
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                payload = None
+            messages = payload if isinstance(payload, list) else [payload]
+
+            for message in messages:
+                received += 1
+                try:
+                    status_input = StatusCheckCreate(**message)
+                except (TypeError, ValidationError):
+                    await websocket.send_json({"rejected": received, "reason": "invalid"})
+                    continue
+
+                retry_after = await status_rate_limit_delay(status_input.client_name)
+                if retry_after:
+                    count_rate_limited(status_input.client_name)
+                    await websocket.send_json({
+                        "rejected": received,
+                        "reason": "rate_limited",
+                        "retry_after": math.ceil(retry_after),
+                    })
+                    continue
+
+                if not batch:
+                    flush_at = loop.time() + WS_FLUSH_SECONDS
+                batch.append(StatusCheck(**status_input.dict()))
+                if len(batch) >= WS_BATCH_SIZE:
+                    written = await flush()
+                    if not written:
+                        close_code = 1011
+                        break
+            if not written:
+                break
+
+            if not batch and acked < received:
+                # Everything since the last write was rejected; still acknowledge it
+                acked = received
+                await websocket.send_json({"ack": received})
+    except WebSocketDisconnect:
+        close_code = None
+    if received > acked:
+        logger.info(f"WebSocket ingest ended with messages {acked + 1}..{received} unacknowledged; not stored")
+    if close_code is not None:
+        await websocket.close(code=close_code)
+
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=1000),
+):
+    """
+    Lists checks ordered by (timestamp, id). When the page is full the
+    X-Next-Cursor header carries the cursor for the following page.
+    """
+    query = decode_cursor(cursor) if cursor else {}
+    status_checks = await db.status_checks.find(query).sort(
+        [("timestamp", ASCENDING), ("id", ASCENDING)]
+    ).to_list(limit)
+    results = [StatusCheck(**status_check) for status_check in status_checks]
+    if len(results) == limit:
+        response.headers['X-Next-Cursor'] = encode_cursor(results[-1])
+    return results
+
+@api_router.get("/status/stale", response_model=List[StaleClient])
+async def get_stale_clients():
+    return stale_tracker.stale_clients(time.time())
+
+@api_router.get("/status/distinct", response_model=DistinctClients)
+async def get_distinct_clients(window: str = "24h"):
+    now = time.time()
+    return await client_sketches.estimate(now - parse_window(window), now)
+
+@api_router.get("/status/metrics")
+async def get_status_metrics():
+    return {"counters": dict(metrics)}
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -64,12 +877,162 @@ app.add_middleware(
 )
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Records are handed to a bounded queue on the event loop thread; formatting
+# and all stdout/file I/O happen on the QueueListener thread.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FILE = os.environ.get('LOG_FILE')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0.01'))
+
+correlation_id: contextvars.ContextVar[str] = contextvars.ContextVar('correlation_id', default='-')
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the request correlation id"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, 'correlation_id', '-'),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamps records with the correlation id while still on the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Passes only a fraction of DEBUG records; INFO and above always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks or writes on the caller's thread: the
+    message is merged with its args but otherwise left unformatted, and
+    records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+    formatter = JsonFormatter()
+    output_handlers = [logging.StreamHandler(sys.stdout)]
+    if LOG_FILE:
+        output_handlers.append(logging.FileHandler(LOG_FILE))
+    for handler in output_handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    queue_handler.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    # Route uvicorn's own loggers through the queue instead of their stream handlers
+    for name in ('uvicorn', 'uvicorn.error', 'uvicorn.access'):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, *output_handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+log_listener = configure_logging()
 logger = logging.getLogger(__name__)
 
+
+@app.middleware("http")
+async def assign_correlation_id(request: Request, call_next):
+    request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    token = correlation_id.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        correlation_id.reset(token)
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+stale_sweeper: Optional[asyncio.Task] = None
+stale_notifier: Optional[asyncio.Task] = None
+sketch_flusher: Optional[asyncio.Task] = None
+warmup_retrier: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_background_tasks():
+    global stale_sweeper, stale_notifier, sketch_flusher, warmup_retrier
+    # uvicorn only starts accepting connections once startup handlers finish;
+    # /api/ready stays 503 until a background retry succeeds
+    if not await retry_warm_up(last_attempt=WARMUP_STARTUP_ATTEMPTS):
+        warmup_retrier = asyncio.create_task(retry_warm_up(first_attempt=WARMUP_STARTUP_ATTEMPTS + 1))
+    try:
+        await db.status_checks.create_index("id", unique=True)
+        await db.status_checks.create_index([("timestamp", ASCENDING), ("id", ASCENDING)])
+    except Exception as e:
+        logger.error(f"Could not create status_checks indexes: {e}")
+    if RATE_LIMIT_SHARED:
+        try:
+            await db.status_rate_limits.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.error(f"Could not create status_rate_limits TTL index: {e}")
+    try:
+        await load_last_heartbeats()
+    except Exception as e:
+        logger.error(f"Could not load last heartbeats: {e}")
+    stale_sweeper = asyncio.create_task(sweep_stale_clients())
+    if STALE_WEBHOOK_URL:
+        stale_notifier = asyncio.create_task(deliver_stale_notifications(httpx.AsyncClient(timeout=5)))
+    sketch_flusher = asyncio.create_task(flush_client_sketches())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if stale_sweeper is not None:
+        stale_sweeper.cancel()
+    if stale_notifier is not None:
+        stale_notifier.cancel()
+    if sketch_flusher is not None:
+        sketch_flusher.cancel()
+    if warmup_retrier is not None:
+        warmup_retrier.cancel()
+    try:
+        await client_sketches.flush()
+    except Exception as e:
+        logger.error(f"Final client sketch flush failed: {e}")
     client.close()
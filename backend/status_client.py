@@ -0,0 +1,195 @@
+"""
+Async client for the status API served by server.py.
+
+Agents report heartbeats through a single pooled keep-alive connection.
+Calls to report() are micro-batched into POST /api/status/bulk; every batch
+carries an Idempotency-Key so a retried batch is never stored twice.
+Heartbeats that are given up on are counted in `dropped`.
+
+    async with StatusClient("http://localhost:8001") as status:
+        await status.report("edge-agent-1")
+        async for check in status.iter_status_checks():
+            print(check["client_name"], check["timestamp"])
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class StatusClientError(Exception):
+    """Raised when a request still fails after all retries"""
+
+
+class StatusClient:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        max_retries: int = 5,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 10.0,
+        timeout: float = 10.0,
+        max_connections: int = 10,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        # Heartbeats given up on: batches that failed after every retry or got an
+        # unreadable reply, and rate limited items that no longer fit the queue
+        self.dropped = 0
+
+    async def __aenter__(self) -> 'StatusClient':
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Flush anything still pending, then release pooled connections"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        try:
+            await self.flush()
+        finally:
+            await self._http.aclose()
+
+    async def report(self, client_name: str):
+        """
+        Queue a heartbeat for the next batch. Waits when max_pending is
+        reached, and sends the queued batches itself each time batch_size
+        heartbeats are waiting.
+        """
+        await self._pending.put({"client_name": client_name})
+        if self._pending.qsize() >= self.batch_size:
+            await self.flush()
+
+    async def send(self, client_name: str) -> Dict[str, Any]:
+        """Send a single heartbeat immediately and return the stored status check"""
+        response = await self._request(
+            "POST", "/api/status", json={"client_name": client_name},
+            idempotency_key=uuid.uuid4().hex,
+        )
+        return response.json()
+
+    async def flush(self):
+        """
+        Send every queued heartbeat, batch_size at a time. Items the server
+        rate limited are queued again for a later flush.
+        """
+        async with self._flush_lock:
+            while not self._pending.empty():
+                batch = []
+                while len(batch) < self.batch_size and not self._pending.empty():
+                    batch.append(self._pending.get_nowait())
+                try:
+                    response = await self._request(
+                        "POST", "/api/status/bulk", json=batch,
+                        idempotency_key=uuid.uuid4().hex,
+                    )
+                    rejected = response.json().get("rejected", [])
+                except Exception:
+                    self.dropped += len(batch)
+                    raise
+                if rejected:
+                    self._requeue([batch[index] for index in rejected])
+                    # Over the limit; the rest waits for the next flush
+                    return
+
+    def _requeue(self, items: List[Dict[str, Any]]):
+        for item in items:
+            try:
+                self._pending.put_nowait(item)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.error(f"Dropping rate limited heartbeat for {item['client_name']}: queue is full")
+
+    async def list_status_checks(
+        self, cursor: Optional[str] = None, limit: int = 1000
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of status checks and the cursor for the next page"""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = await self._request("GET", "/api/status", params=params)
+        return response.json(), response.headers.get('X-Next-Cursor')
+
+    async def iter_status_checks(self, page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over every status check, following X-Next-Cursor between pages"""
+        cursor = None
+        while True:
+            page, cursor = await self.list_status_checks(cursor, page_size)
+            for status_check in page:
+                yield status_check
+            if not cursor:
+                return
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # The failed batch is lost (and counted); the flusher keeps running
+                logger.error(f"Dropping status batch: {e!r}")
+
+    async def _request(
+        self, method: str, path: str, *, idempotency_key: Optional[str] = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request, retrying connection errors, 429 and 5xx responses with
+        full-jitter exponential backoff. Retry-After is honoured when present.
+        The same Idempotency-Key is sent on every attempt.
+        """
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await self._http.request(method, path, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                error = f"{method} {path} failed: {e}"
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+                error = f"{method} {path} returned {response.status_code}"
+                retry_after = response.headers.get('Retry-After')
+
+            if attempt == self.max_retries:
+                raise StatusClientError(error)
+
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            logger.warning(f"{error}; retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,27 @@
+"""
+Shared pytest configuration for the backend API tests
+
+The suites can run in parallel with pytest-xdist (see run_parallel.py).
+Anything a test creates should take its identity from the `namespace`
+fixture so that workers never share emails, slugs or titles.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Make the repository-level api_client package importable from backend/tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api_client.namespace import TestNamespace, current_namespace  # noqa: E402
+
+
+def pytest_report_header(config):
+    return f"test data namespace: {current_namespace().tag}"
+
+
+@pytest.fixture(scope="session")
+def namespace() -> TestNamespace:
+    """Unique, tagged identities for this worker"""
+    return current_namespace()
@@ -4,7 +4,7 @@ Refactored Backend API Testing Script for Simon Price PT Website
 Tests the SOLID architecture refactored backend with controllers, services, models, and routes
 """
 
-import requests
+import requests  # ApiClient transport errors surface as requests exceptions
 import json
 import sys
 from datetime import datetime
@@ -13,16 +13,21 @@ import os
 import jwt
 import time
 
-# Get backend URL from frontend .env
-def get_backend_url():
-    try:
-        with open('/app/frontend/.env', 'r') as f:
-            for line in f:
-                if line.startswith('REACT_APP_BACKEND_URL='):
-                    return line.split('=', 1)[1].strip()
-    except Exception as e:
-        print(f"Error reading frontend .env: {e}")
-        return None
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api_client import ApiClient  # noqa: E402
+from api_client.namespace import current_namespace  # noqa: E402
+
+# The same namespace the pytest `namespace` fixture hands out, so parallel runs
+# and workers never share these identities
+namespace = current_namespace()
+CONTACT_EMAIL = namespace.email('test.contact')
+NEWSLETTER_EMAIL = namespace.email('test.newsletter')
+TDEE_EMAIL = namespace.email('test.tdee')
+ADMIN_USER_EMAIL = namespace.email('test.admin')
+NEW_ADMIN_EMAIL = namespace.email('new.admin')
+TEST_CLIENT_EMAIL = namespace.email('testclient')
+CLIENT_EMAIL = namespace.email('test.client')
 
 # MongoDB connection for testing
 def get_mongo_connection():
@@ -42,25 +47,25 @@ def cleanup_test_data(db):
         try:
             # Clean up test emails
             test_emails = [
-                "test.contact@example.com",
-                "test.newsletter@example.com", 
-                "test.tdee@example.com"
+                CONTACT_EMAIL,
+                NEWSLETTER_EMAIL,
+                TDEE_EMAIL
             ]
             for email in test_emails:
                 db.mailing_list.delete_many({"email": email})
             
             # Clean up test admin users
             test_admin_emails = [
-                "test.admin@example.com",
-                "new.admin@example.com"
+                ADMIN_USER_EMAIL,
+                NEW_ADMIN_EMAIL
             ]
             for email in test_admin_emails:
                 db.admin_users.delete_many({"email": email})
             
             # Clean up test clients
             test_client_emails = [
-                "testclient@example.com",
-                "test.client@example.com"
+                TEST_CLIENT_EMAIL,
+                CLIENT_EMAIL
             ]
             for email in test_client_emails:
                 db.clients.delete_many({"email": email})
@@ -74,14 +79,14 @@ def cleanup_test_data(db):
 # PUBLIC ENDPOINTS TESTS (No Authentication Required)
 # ============================================================================
 
-def test_health_endpoint(base_url):
+def test_health_endpoint(api):
     """Test GET /api/health endpoint"""
     print("\n=== Testing Health Check Endpoint ===")
     try:
-        url = f"{base_url}/api/health"
+        url = "/api/health"
         print(f"Testing: GET {url}")
         
-        response = requests.get(url, timeout=10)
+        response = api.request('GET', url, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -103,13 +108,13 @@ def test_health_endpoint(base_url):
         print(f"❌ Health check endpoint error: {e}")
         return False
 
-def test_contact_form_endpoint(base_url, db):
+def test_contact_form_endpoint(api, db):
     """Test POST /api/contact endpoint"""
     print("\n=== Testing Contact Form Endpoint ===")
     
     form_data = {
         "name": "John Smith",
-        "email": "test.contact@example.com", 
+        "email": CONTACT_EMAIL,
         "phone": "+44 7123 456789",
         "goals": "weight-loss",
         "experience": "beginner",
@@ -117,11 +122,11 @@ def test_contact_form_endpoint(base_url, db):
     }
     
     try:
-        url = f"{base_url}/api/contact"
+        url = "/api/contact"
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(form_data, indent=2)}")
         
-        response = requests.post(url, json=form_data, timeout=15)
+        response = api.request('POST', url, json=form_data, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -150,20 +155,20 @@ def test_contact_form_endpoint(base_url, db):
         print(f"❌ Contact form error: {e}")
         return False
 
-def test_newsletter_subscription_endpoint(base_url, db):
+def test_newsletter_subscription_endpoint(api, db):
     """Test POST /api/newsletter/subscribe endpoint"""
     print("\n=== Testing Newsletter Subscription Endpoint ===")
     
     subscription_data = {
-        "email": "test.newsletter@example.com"
+        "email": NEWSLETTER_EMAIL
     }
     
     try:
-        url = f"{base_url}/api/newsletter/subscribe"
+        url = "/api/newsletter/subscribe"
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(subscription_data, indent=2)}")
         
-        response = requests.post(url, json=subscription_data, timeout=10)
+        response = api.request('POST', url, json=subscription_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -195,12 +200,12 @@ def test_newsletter_subscription_endpoint(base_url, db):
         print(f"❌ Newsletter subscription error: {e}")
         return False
 
-def test_tdee_results_endpoint(base_url, db):
+def test_tdee_results_endpoint(api, db):
     """Test POST /api/tdee-results endpoint"""
     print("\n=== Testing TDEE Results Endpoint ===")
     
     tdee_data = {
-        "email": "test.tdee@example.com",
+        "email": TDEE_EMAIL,
         "joinMailingList": True,
         "results": {
             "bmr": 1800,
@@ -223,11 +228,11 @@ def test_tdee_results_endpoint(base_url, db):
     }
     
     try:
-        url = f"{base_url}/api/tdee-results"
+        url = "/api/tdee-results"
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(tdee_data, indent=2)}")
         
-        response = requests.post(url, json=tdee_data, timeout=15)
+        response = api.request('POST', url, json=tdee_data, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -261,12 +266,12 @@ def test_tdee_results_endpoint(base_url, db):
 # ADMIN AUTHENTICATION TESTS
 # ============================================================================
 
-def test_admin_login_endpoint(base_url):
+def test_admin_login_endpoint(api):
     """Test POST /api/admin/login with correct and incorrect credentials"""
     print("\n=== Testing Admin Login Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/login"
+        url = "/api/admin/login"
         print(f"Testing: POST {url}")
         
         # Test with correct credentials from logs
@@ -276,7 +281,7 @@ def test_admin_login_endpoint(base_url):
         }
         
         print(f"Testing with correct credentials: {correct_credentials['email']}")
-        response = requests.post(url, json=correct_credentials, timeout=10)
+        response = api.request('POST', url, json=correct_credentials, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -309,7 +314,7 @@ def test_admin_login_endpoint(base_url):
                     }
                     
                     print(f"\nTesting with wrong password")
-                    response2 = requests.post(url, json=wrong_password, timeout=10)
+                    response2 = api.request('POST', url, json=wrong_password, timeout=10)
                     print(f"Status Code: {response2.status_code}")
                     
                     if response2.status_code == 401:
@@ -333,19 +338,19 @@ def test_admin_login_endpoint(base_url):
         print(f"❌ Admin login test error: {e}")
         return False
 
-def test_admin_refresh_endpoint(base_url, refresh_token):
+def test_admin_refresh_endpoint(api, refresh_token):
     """Test POST /api/admin/refresh with valid and invalid tokens"""
     print("\n=== Testing Admin Token Refresh Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/refresh"
+        url = "/api/admin/refresh"
         print(f"Testing: POST {url}")
         
         # Test with valid refresh token
         refresh_data = {"refreshToken": refresh_token}
         
         print("Testing with valid refresh token")
-        response = requests.post(url, json=refresh_data, timeout=10)
+        response = api.request('POST', url, json=refresh_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -361,7 +366,7 @@ def test_admin_refresh_endpoint(base_url, refresh_token):
                 invalid_refresh_data = {"refreshToken": "invalid.token.here"}
                 
                 print("\nTesting with invalid refresh token")
-                response2 = requests.post(url, json=invalid_refresh_data, timeout=10)
+                response2 = api.request('POST', url, json=invalid_refresh_data, timeout=10)
                 print(f"Status Code: {response2.status_code}")
                 
                 if response2.status_code == 403:
@@ -381,12 +386,12 @@ def test_admin_refresh_endpoint(base_url, refresh_token):
         print(f"❌ Token refresh test error: {e}")
         return False
 
-def test_admin_forgot_password_endpoint(base_url):
+def test_admin_forgot_password_endpoint(api):
     """Test POST /api/admin/forgot-password endpoint"""
     print("\n=== Testing Admin Forgot Password Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/forgot-password"
+        url = "/api/admin/forgot-password"
         print(f"Testing: POST {url}")
         
         forgot_password_data = {
@@ -394,7 +399,7 @@ def test_admin_forgot_password_endpoint(base_url):
         }
         
         print(f"Testing with admin email: {forgot_password_data['email']}")
-        response = requests.post(url, json=forgot_password_data, timeout=10)
+        response = api.request('POST', url, json=forgot_password_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -410,12 +415,12 @@ def test_admin_forgot_password_endpoint(base_url):
         print(f"❌ Forgot password test error: {e}")
         return False
 
-def test_admin_change_password_endpoint(base_url, access_token):
+def test_admin_change_password_endpoint(api, access_token):
     """Test POST /api/admin/change-password with JWT protection"""
     print("\n=== Testing Admin Change Password Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/change-password"
+        url = "/api/admin/change-password"
         print(f"Testing: POST {url}")
         
         # Test without JWT token (should return 401)
@@ -425,7 +430,7 @@ def test_admin_change_password_endpoint(base_url, access_token):
         }
         
         print("Testing without JWT token")
-        response = requests.post(url, json=change_data, timeout=10)
+        response = api.request('POST', url, json=change_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 401:
@@ -435,7 +440,7 @@ def test_admin_change_password_endpoint(base_url, access_token):
             headers = {"Authorization": f"Bearer {access_token}"}
             
             print("\nTesting with valid JWT token")
-            response2 = requests.post(url, json=change_data, headers=headers, timeout=10)
+            response2 = api.request('POST', url, json=change_data, headers=headers, timeout=10)
             print(f"Status Code: {response2.status_code}")
             print(f"Response: {response2.text}")
             
@@ -451,7 +456,7 @@ def test_admin_change_password_endpoint(base_url, access_token):
                     }
                     
                     print("\nRestoring original password for other tests")
-                    restore_response = requests.post(url, json=restore_data, headers=headers, timeout=10)
+                    restore_response = api.request('POST', url, json=restore_data, headers=headers, timeout=10)
                     if restore_response.status_code == 200:
                         print("✅ Password restored to original")
                         return True
@@ -476,17 +481,17 @@ def test_admin_change_password_endpoint(base_url, access_token):
 # ADMIN CLIENT MANAGEMENT TESTS
 # ============================================================================
 
-def test_admin_clients_endpoint(base_url, access_token):
+def test_admin_clients_endpoint(api, access_token):
     """Test GET /api/admin/clients endpoint"""
     print("\n=== Testing Admin Get Clients Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/clients"
+        url = "/api/admin/clients"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         print(f"Testing: GET {url}")
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api.request('GET', url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -511,17 +516,17 @@ def test_admin_clients_endpoint(base_url, access_token):
         print(f"❌ Get clients test error: {e}")
         return False
 
-def test_admin_client_users_endpoint(base_url, access_token):
+def test_admin_client_users_endpoint(api, access_token):
     """Test GET /api/admin/client-users endpoint"""
     print("\n=== Testing Admin Get Client Users Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/client-users"
+        url = "/api/admin/client-users"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         print(f"Testing: GET {url}")
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api.request('GET', url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -546,17 +551,17 @@ def test_admin_client_users_endpoint(base_url, access_token):
         print(f"❌ Get client users test error: {e}")
         return False
 
-def test_admin_users_endpoint(base_url, access_token, db):
+def test_admin_users_endpoint(api, access_token, db):
     """Test admin user management endpoints"""
     print("\n=== Testing Admin User Management Endpoints ===")
     
     try:
         # Test GET /api/admin/users (list all admins)
-        users_url = f"{base_url}/api/admin/users"
+        users_url = "/api/admin/users"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         print(f"Testing: GET {users_url}")
-        response = requests.get(users_url, headers=headers, timeout=10)
+        response = api.request('GET', users_url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -570,13 +575,13 @@ def test_admin_users_endpoint(base_url, access_token, db):
                 
                 # Test POST /api/admin/users (create new admin)
                 new_user_data = {
-                    "email": "test.admin@example.com",
+                    "email": ADMIN_USER_EMAIL,
                     "password": "TestPassword123!",
                     "name": "Test Admin User"
                 }
                 
                 print(f"\nTesting: POST {users_url} (create new admin)")
-                response2 = requests.post(users_url, json=new_user_data, headers=headers, timeout=10)
+                response2 = api.request('POST', users_url, json=new_user_data, headers=headers, timeout=10)
                 print(f"Status Code: {response2.status_code}")
                 print(f"Response: {response2.text}")
                 
@@ -590,10 +595,10 @@ def test_admin_users_endpoint(base_url, access_token, db):
                         print("✅ New admin user created successfully")
                         
                         # Test DELETE user
-                        delete_url = f"{base_url}/api/admin/users/{new_user_id}"
+                        delete_url = f"/api/admin/users/{new_user_id}"
                         
                         print(f"\nTesting: DELETE {delete_url}")
-                        response3 = requests.delete(delete_url, headers=headers, timeout=10)
+                        response3 = api.request('DELETE', delete_url, headers=headers, timeout=10)
                         print(f"Status Code: {response3.status_code}")
                         
                         if response3.status_code == 200:
@@ -623,17 +628,17 @@ def test_admin_users_endpoint(base_url, access_token, db):
 # STRIPE INTEGRATION TESTS
 # ============================================================================
 
-def test_admin_create_payment_link_endpoint(base_url, access_token):
+def test_admin_create_payment_link_endpoint(api, access_token):
     """Test POST /api/admin/create-payment-link endpoint"""
     print("\n=== Testing Admin Create Payment Link Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/create-payment-link"
+        url = "/api/admin/create-payment-link"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         payment_link_data = {
             "name": "Test Client",
-            "email": "testclient@example.com",
+            "email": TEST_CLIENT_EMAIL,
             "telephone": "07123456789",
             "price": 125,
             "billingDay": 1,
@@ -644,7 +649,7 @@ def test_admin_create_payment_link_endpoint(base_url, access_token):
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(payment_link_data, indent=2)}")
         
-        response = requests.post(url, json=payment_link_data, headers=headers, timeout=15)
+        response = api.request('POST', url, json=payment_link_data, headers=headers, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -677,12 +682,12 @@ def test_admin_create_payment_link_endpoint(base_url, access_token):
         print(f"❌ Create payment link test error: {e}")
         return False
 
-def test_admin_import_customers_endpoint(base_url, access_token):
+def test_admin_import_customers_endpoint(api, access_token):
     """Test POST /api/admin/import-customers/fetch endpoint"""
     print("\n=== Testing Admin Import Customers Endpoint ===")
     
     try:
-        url = f"{base_url}/api/admin/import-customers/fetch"
+        url = "/api/admin/import-customers/fetch"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         # Test with some sample Stripe customer IDs (these won't exist but will test the endpoint)
@@ -693,7 +698,7 @@ def test_admin_import_customers_endpoint(base_url, access_token):
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(import_data, indent=2)}")
         
-        response = requests.post(url, json=import_data, headers=headers, timeout=15)
+        response = api.request('POST', url, json=import_data, headers=headers, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -713,22 +718,22 @@ def test_admin_import_customers_endpoint(base_url, access_token):
 # CLIENT ENDPOINTS TESTS
 # ============================================================================
 
-def test_client_login_endpoint(base_url):
+def test_client_login_endpoint(api):
     """Test POST /api/client/login endpoint"""
     print("\n=== Testing Client Login Endpoint ===")
     
     try:
-        url = f"{base_url}/api/client/login"
+        url = "/api/client/login"
         print(f"Testing: POST {url}")
         
         # Test with non-existent client credentials
         client_credentials = {
-            "email": "test.client@example.com",
+            "email": CLIENT_EMAIL,
             "password": "TestPassword123!"
         }
         
         print(f"Testing with test client credentials: {client_credentials['email']}")
-        response = requests.post(url, json=client_credentials, timeout=10)
+        response = api.request('POST', url, json=client_credentials, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -747,20 +752,20 @@ def test_client_login_endpoint(base_url):
         print(f"❌ Client login test error: {e}")
         return False
 
-def test_client_forgot_password_endpoint(base_url):
+def test_client_forgot_password_endpoint(api):
     """Test POST /api/client/forgot-password endpoint"""
     print("\n=== Testing Client Forgot Password Endpoint ===")
     
     try:
-        url = f"{base_url}/api/client/forgot-password"
+        url = "/api/client/forgot-password"
         print(f"Testing: POST {url}")
         
         forgot_password_data = {
-            "email": "test.client@example.com"
+            "email": CLIENT_EMAIL
         }
         
         print(f"Testing with test client email: {forgot_password_data['email']}")
-        response = requests.post(url, json=forgot_password_data, timeout=10)
+        response = api.request('POST', url, json=forgot_password_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -787,13 +792,9 @@ def main():
     print("=" * 80)
     print(f"⏰ Test started at: {datetime.now()}")
     
-    # Get backend URL
-    base_url = get_backend_url()
-    if not base_url:
-        print("❌ Could not get backend URL from frontend .env")
-        sys.exit(1)
-    
-    print(f"🔗 Backend URL: {base_url}")
+    # Shared client: resolves the backend URL and keeps one pooled connection
+    api = ApiClient()
+    print(f"🔗 Backend URL: {api.base_url}")
     
     # Get MongoDB connection
     mongo_client, db = get_mongo_connection()
@@ -817,19 +818,19 @@ def main():
     print("=" * 60)
     
     # Test health endpoint
-    result = test_health_endpoint(base_url)
+    result = test_health_endpoint(api)
     test_results.append(("Health Check", result))
     
     # Test contact form
-    result = test_contact_form_endpoint(base_url, db)
+    result = test_contact_form_endpoint(api, db)
     test_results.append(("Contact Form", result))
     
     # Test newsletter subscription
-    result = test_newsletter_subscription_endpoint(base_url, db)
+    result = test_newsletter_subscription_endpoint(api, db)
     test_results.append(("Newsletter Subscription", result))
     
     # Test TDEE results
-    result = test_tdee_results_endpoint(base_url, db)
+    result = test_tdee_results_endpoint(api, db)
     test_results.append(("TDEE Results", result))
     
     # ========================================================================
@@ -841,13 +842,13 @@ def main():
     print("=" * 60)
     
     # Test admin login
-    login_result = test_admin_login_endpoint(base_url)
+    login_result = test_admin_login_endpoint(api)
     if login_result and isinstance(login_result, tuple):
         access_token, refresh_token = login_result
         test_results.append(("Admin Login", True))
         
         # Test token refresh
-        refresh_result = test_admin_refresh_endpoint(base_url, refresh_token)
+        refresh_result = test_admin_refresh_endpoint(api, refresh_token)
         if refresh_result:
             access_token = refresh_result  # Use new token
             test_results.append(("Admin Token Refresh", True))
@@ -855,11 +856,11 @@ def main():
             test_results.append(("Admin Token Refresh", False))
         
         # Test forgot password
-        result = test_admin_forgot_password_endpoint(base_url)
+        result = test_admin_forgot_password_endpoint(api)
         test_results.append(("Admin Forgot Password", result))
         
         # Test change password
-        result = test_admin_change_password_endpoint(base_url, access_token)
+        result = test_admin_change_password_endpoint(api, access_token)
         test_results.append(("Admin Change Password", result))
         
         # ====================================================================
@@ -871,15 +872,15 @@ def main():
         print("=" * 60)
         
         # Test get clients
-        result = test_admin_clients_endpoint(base_url, access_token)
+        result = test_admin_clients_endpoint(api, access_token)
         test_results.append(("Admin Get Clients", result))
         
         # Test get client users
-        result = test_admin_client_users_endpoint(base_url, access_token)
+        result = test_admin_client_users_endpoint(api, access_token)
         test_results.append(("Admin Get Client Users", result))
         
         # Test user management
-        result = test_admin_users_endpoint(base_url, access_token, db)
+        result = test_admin_users_endpoint(api, access_token, db)
         test_results.append(("Admin User Management", result))
         
         # ====================================================================
@@ -891,11 +892,11 @@ def main():
         print("=" * 60)
         
         # Test create payment link
-        result = test_admin_create_payment_link_endpoint(base_url, access_token)
+        result = test_admin_create_payment_link_endpoint(api, access_token)
         test_results.append(("Admin Create Payment Link", result))
         
         # Test import customers
-        result = test_admin_import_customers_endpoint(base_url, access_token)
+        result = test_admin_import_customers_endpoint(api, access_token)
         test_results.append(("Admin Import Customers", result))
         
     else:
@@ -911,11 +912,11 @@ def main():
     print("=" * 60)
     
     # Test client login
-    result = test_client_login_endpoint(base_url)
+    result = test_client_login_endpoint(api)
     test_results.append(("Client Login", result))
     
     # Test client forgot password
-    result = test_client_forgot_password_endpoint(base_url)
+    result = test_client_forgot_password_endpoint(api)
     test_results.append(("Client Forgot Password", result))
     
     # ========================================================================
@@ -952,6 +953,8 @@ def main():
     # Clean up test data
     cleanup_test_data(db)
     
+    api.close()
+    
     # Close MongoDB connection
     if mongo_client:
         mongo_client.close()
@@ -959,4 +962,10 @@ def main():
     print("=" * 80)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        # Drive the same flows concurrently, e.g. `load closed --users 50 --duration 120`
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+        from loadtest.__main__ import main as load_main
+        load_main(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
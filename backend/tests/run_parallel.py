@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Run the backend API test suites across several processes with pytest-xdist.
+
+    python backend/tests/run_parallel.py                 # one worker per CPU
+    python backend/tests/run_parallel.py -n 8 -k policy  # extra args go to pytest
+
+Tests are grouped by module and class (--dist loadscope) so class- and
+module-scoped fixtures, such as a created policy section or a logged-in
+client, are set up once per worker instead of once per test. Each worker
+tags the data it creates with its own namespace (see conftest.py).
+"""
+
+import argparse
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--workers", default="auto",
+                        help="Worker processes, or 'auto' for one per CPU (default: auto)")
+    args, pytest_args = parser.parse_known_args(argv)
+
+    try:
+        import xdist  # noqa: F401
+    except ImportError:
+        print("pytest-xdist is required for parallel runs: pip install -r backend/requirements.txt")
+        return 2
+
+    if not any(os.path.exists(arg.split("::")[0]) for arg in pytest_args):
+        pytest_args.append(TESTS_DIR)
+    return pytest.main(["-n", args.workers, "--dist", "loadscope", *pytest_args])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,20 +4,20 @@ Admin Content Management API Testing
 Tests for Packages, PARQ Questions, and Health Questions endpoints
 """
 
-import requests
-import json
+import os
 import sys
 from datetime import datetime
 
-# Configuration
-BASE_URL = "https://admin-refactor-6.preview.emergentagent.com/api"
-ADMIN_EMAIL = "simon.price@simonprice-pt.co.uk"
-ADMIN_PASSWORD = "Qwerty1234!!!"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api_client import ApiClient, current_namespace
 
 class ContentManagementTester:
-    def __init__(self):
-        self.base_url = BASE_URL
-        self.access_token = None
+    def __init__(self, api=None):
+        # Backend URL from REACT_APP_BACKEND_URL or the frontend .env
+        self.api = api or ApiClient()
+        # Tags the packages and questions created here, like the pytest `namespace` fixture
+        self.namespace = current_namespace()
         self.test_results = []
         self.created_items = {
             'packages': [],
@@ -45,19 +45,12 @@ class ContentManagementTester:
         print("\n🔐 AUTHENTICATING...")
         
         try:
-            response = requests.post(
-                f"{self.base_url}/admin/login",
-                json={
-                    "email": ADMIN_EMAIL,
-                    "password": ADMIN_PASSWORD
-                },
-                headers={"Content-Type": "application/json"}
-            )
+            # The client keeps the tokens and renews them on expiry or 401
+            response = self.api.login()
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and data.get('accessToken'):
-                    self.access_token = data['accessToken']
                     self.log_test("Admin Authentication", True, "Successfully authenticated")
                     return True
                 else:
@@ -71,23 +64,13 @@ class ContentManagementTester:
             self.log_test("Admin Authentication", False, f"Request failed: {str(e)}")
             return False
 
-    def get_auth_headers(self):
-        """Get authorization headers"""
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
-
     def test_packages_crud(self):
         """Test Package CRUD operations"""
         print("\n📦 TESTING PACKAGES...")
         
         # Test GET all packages
         try:
-            response = requests.get(
-                f"{self.base_url}/admin/packages",
-                headers=self.get_auth_headers()
-            )
+            response = self.api.admin_get_packages()
             
             if response.status_code == 200:
                 data = response.json()
@@ -102,18 +85,14 @@ class ContentManagementTester:
 
         # Test CREATE package
         test_package = {
-            "name": "Test Package",
+            "name": self.namespace.title("Test Package"),
             "price": 99,
             "description": "Test description for automated testing",
             "features": ["Feature 1", "Feature 2", "Automated Testing Feature"]
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/admin/packages",
-                json=test_package,
-                headers=self.get_auth_headers()
-            )
+            response = self.api.admin_create_package(test_package)
             
             if response.status_code == 200:
                 data = response.json()
@@ -126,17 +105,13 @@ class ContentManagementTester:
                         
                         # Test UPDATE package
                         update_data = {
-                            "name": "Updated Test Package",
+                            "name": self.namespace.title("Updated Test Package"),
                             "price": 149,
                             "description": "Updated description"
                         }
                         
                         try:
-                            update_response = requests.put(
-                                f"{self.base_url}/admin/packages/{package_id}",
-                                json=update_data,
-                                headers=self.get_auth_headers()
-                            )
+                            update_response = self.api.admin_update_package(package_id, update_data)
                             
                             if update_response.status_code == 200:
                                 update_result = update_response.json()
@@ -163,10 +138,7 @@ class ContentManagementTester:
         
         # Test GET all PARQ questions
         try:
-            response = requests.get(
-                f"{self.base_url}/admin/parq-questions",
-                headers=self.get_auth_headers()
-            )
+            response = self.api.admin_get_parq_questions()
             
             if response.status_code == 200:
                 data = response.json()
@@ -181,17 +153,15 @@ class ContentManagementTester:
 
         # Test CREATE PARQ question
         test_parq = {
-            "question": "Do you have any automated testing conditions that might affect your exercise routine?",
+            "question": self.namespace.title(
+                "Do you have any automated testing conditions that might affect your exercise routine?"
+            ),
             "order": 99,
             "requires_doctor_approval": True
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/admin/parq-questions",
-                json=test_parq,
-                headers=self.get_auth_headers()
-            )
+            response = self.api.admin_create_parq_question(test_parq)
             
             if response.status_code == 200:
                 data = response.json()
@@ -204,16 +174,14 @@ class ContentManagementTester:
                         
                         # Test UPDATE PARQ question
                         update_data = {
-                            "question": "Updated: Do you have any automated testing conditions that might affect your exercise routine?",
+                            "question": self.namespace.title(
+                                "Updated: Do you have any automated testing conditions that might affect your exercise routine?"
+                            ),
                             "active": True
                         }
                         
                         try:
-                            update_response = requests.put(
-                                f"{self.base_url}/admin/parq-questions/{question_id}",
-                                json=update_data,
-                                headers=self.get_auth_headers()
-                            )
+                            update_response = self.api.admin_update_parq_question(question_id, update_data)
                             
                             if update_response.status_code == 200:
                                 update_result = update_response.json()
@@ -240,10 +208,7 @@ class ContentManagementTester:
         
         # Test GET all health questions
         try:
-            response = requests.get(
-                f"{self.base_url}/admin/health-questions",
-                headers=self.get_auth_headers()
-            )
+            response = self.api.admin_get_health_questions()
             
             if response.status_code == 200:
                 data = response.json()
@@ -258,18 +223,16 @@ class ContentManagementTester:
 
         # Test CREATE health question
         test_health = {
-            "question": "What is your experience with automated testing in fitness applications?",
+            "question": self.namespace.title(
+                "What is your experience with automated testing in fitness applications?"
+            ),
             "type": "multiple-choice",
             "order": 99,
             "options": ["Beginner", "Intermediate", "Advanced", "Expert"]
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/admin/health-questions",
-                json=test_health,
-                headers=self.get_auth_headers()
-            )
+            response = self.api.admin_create_health_question(test_health)
             
             if response.status_code == 200:
                 data = response.json()
@@ -282,17 +245,15 @@ class ContentManagementTester:
                         
                         # Test UPDATE health question
                         update_data = {
-                            "question": "Updated: What is your experience with automated testing in fitness applications?",
+                            "question": self.namespace.title(
+                                "Updated: What is your experience with automated testing in fitness applications?"
+                            ),
                             "type": "multiple-choice",
                             "options": ["None", "Basic", "Intermediate", "Advanced", "Expert"]
                         }
                         
                         try:
-                            update_response = requests.put(
-                                f"{self.base_url}/admin/health-questions/{question_id}",
-                                json=update_data,
-                                headers=self.get_auth_headers()
-                            )
+                            update_response = self.api.admin_update_health_question(question_id, update_data)
                             
                             if update_response.status_code == 200:
                                 update_result = update_response.json()
@@ -320,10 +281,7 @@ class ContentManagementTester:
         # Delete test packages
         for package_id in self.created_items['packages']:
             try:
-                response = requests.delete(
-                    f"{self.base_url}/admin/packages/{package_id}",
-                    headers=self.get_auth_headers()
-                )
+                response = self.api.admin_delete_package(package_id)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -339,10 +297,7 @@ class ContentManagementTester:
         # Delete test PARQ questions
         for question_id in self.created_items['parq_questions']:
             try:
-                response = requests.delete(
-                    f"{self.base_url}/admin/parq-questions/{question_id}",
-                    headers=self.get_auth_headers()
-                )
+                response = self.api.admin_delete_parq_question(question_id)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -358,10 +313,7 @@ class ContentManagementTester:
         # Delete test health questions
         for question_id in self.created_items['health_questions']:
             try:
-                response = requests.delete(
-                    f"{self.base_url}/admin/health-questions/{question_id}",
-                    headers=self.get_auth_headers()
-                )
+                response = self.api.admin_delete_health_question(question_id)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -379,8 +331,8 @@ class ContentManagementTester:
         print("=" * 80)
         print("🧪 ADMIN CONTENT MANAGEMENT API TESTING")
         print("=" * 80)
-        print(f"🌐 Base URL: {self.base_url}")
-        print(f"👤 Admin Email: {ADMIN_EMAIL}")
+        print(f"🌐 Base URL: {self.api.base_url}")
+        print(f"👤 Admin Email: {self.api.admin_email}")
         print(f"🕐 Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         # Authenticate first
@@ -427,8 +379,8 @@ class ContentManagementTester:
 
 def main():
     """Main function"""
-    tester = ContentManagementTester()
-    success = tester.run_all_tests()
+    with ApiClient() as api:
+        success = ContentManagementTester(api).run_all_tests()
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
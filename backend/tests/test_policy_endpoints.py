@@ -4,9 +4,10 @@ Tests all 4 policy types: Cancellation, Terms of Service, Privacy, Cookie
 """
 
 import pytest
-import requests
 import os
 
+from api_client import ApiClient
+
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://admin-refactor-6.preview.emergentagent.com')
 
 # Admin credentials
@@ -14,66 +15,81 @@ ADMIN_EMAIL = "simon.price@simonprice-pt.co.uk"
 ADMIN_PASSWORD = "NewTest123!"
 
 
+POLICY_TYPES = ["cancellation-policy", "terms-of-service", "privacy-policy", "cookie-policy"]
+
+
+@pytest.fixture(scope="module")
+def api(namespace):
+    """Pooled API client without admin credentials applied"""
+    with ApiClient(BASE_URL, admin_email=ADMIN_EMAIL, admin_password=ADMIN_PASSWORD) as client:
+        yield client
+        remove_namespace_sections(client, namespace)
+
+
+def remove_namespace_sections(client, namespace):
+    """Delete sections this worker created that a failed test left behind"""
+    if client.tokens.access_token is None:
+        return
+    for policy_type in POLICY_TYPES:
+        response = client.get_policy(policy_type)
+        if response.status_code != 200:
+            continue
+        for section in response.json().get("sections", []):
+            if namespace.owns(section.get("title")):
+                client.delete_policy_section(policy_type, section["id"])
+
+
 @pytest.fixture(scope="module")
-def admin_token():
-    """Get admin authentication token"""
-    response = requests.post(
-        f"{BASE_URL}/api/admin/login",
-        json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
-    )
+def admin_api(api):
+    """API client logged in as admin; the token is renewed automatically"""
+    response = api.login()
     assert response.status_code == 200, f"Admin login failed: {response.text}"
     data = response.json()
     assert data.get("success") is True
     assert "accessToken" in data
-    return data["accessToken"]
-
-
-@pytest.fixture
-def auth_headers(admin_token):
-    """Return headers with auth token"""
-    return {"Authorization": f"Bearer {admin_token}"}
+    return api
 
 
 class TestPublicPolicyEndpoints:
     """Test public (unauthenticated) policy endpoints"""
     
-    def test_health_check(self):
+    def test_health_check(self, api):
         """Test API health endpoint"""
-        response = requests.get(f"{BASE_URL}/api/health")
+        response = api.health()
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
     
-    def test_public_cancellation_policy(self):
+    def test_public_cancellation_policy(self, api):
         """Test public cancellation policy endpoint"""
-        response = requests.get(f"{BASE_URL}/api/cancellation-policy")
+        response = api.get_public_policy("cancellation-policy")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
         assert "sections" in data
         assert isinstance(data["sections"], list)
     
-    def test_public_terms_of_service(self):
+    def test_public_terms_of_service(self, api):
         """Test public terms of service endpoint"""
-        response = requests.get(f"{BASE_URL}/api/terms-of-service")
+        response = api.get_public_policy("terms-of-service")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
         assert "sections" in data
         assert isinstance(data["sections"], list)
     
-    def test_public_privacy_policy(self):
+    def test_public_privacy_policy(self, api):
         """Test public privacy policy endpoint"""
-        response = requests.get(f"{BASE_URL}/api/privacy-policy")
+        response = api.get_public_policy("privacy-policy")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
         assert "sections" in data
         assert isinstance(data["sections"], list)
     
-    def test_public_cookie_policy(self):
+    def test_public_cookie_policy(self, api):
         """Test public cookie policy endpoint"""
-        response = requests.get(f"{BASE_URL}/api/cookie-policy")
+        response = api.get_public_policy("cookie-policy")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
@@ -84,45 +100,33 @@ class TestPublicPolicyEndpoints:
 class TestAdminPolicyEndpoints:
     """Test admin policy management endpoints"""
     
-    def test_admin_get_cancellation_policy(self, auth_headers):
+    def test_admin_get_cancellation_policy(self, admin_api):
         """Test admin get cancellation policy"""
-        response = requests.get(
-            f"{BASE_URL}/api/admin/cancellation-policy",
-            headers=auth_headers
-        )
+        response = admin_api.get_policy("cancellation-policy")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
         assert "sections" in data
     
-    def test_admin_get_terms_of_service(self, auth_headers):
+    def test_admin_get_terms_of_service(self, admin_api):
         """Test admin get terms of service"""
-        response = requests.get(
-            f"{BASE_URL}/api/admin/policies/terms-of-service",
-            headers=auth_headers
-        )
+        response = admin_api.get_policy("terms-of-service")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
         assert "sections" in data
     
-    def test_admin_get_privacy_policy(self, auth_headers):
+    def test_admin_get_privacy_policy(self, admin_api):
         """Test admin get privacy policy"""
-        response = requests.get(
-            f"{BASE_URL}/api/admin/policies/privacy-policy",
-            headers=auth_headers
-        )
+        response = admin_api.get_policy("privacy-policy")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
         assert "sections" in data
     
-    def test_admin_get_cookie_policy(self, auth_headers):
+    def test_admin_get_cookie_policy(self, admin_api):
         """Test admin get cookie policy"""
-        response = requests.get(
-            f"{BASE_URL}/api/admin/policies/cookie-policy",
-            headers=auth_headers
-        )
+        response = admin_api.get_policy("cookie-policy")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
@@ -133,14 +137,10 @@ class TestPolicyCRUDOperations:
     """Test CRUD operations for policy sections and items"""
     
     @pytest.fixture
-    def test_section_id(self, auth_headers):
+    def test_section_id(self, admin_api, namespace):
         """Create a test section and return its ID, cleanup after test"""
         # Create section
-        response = requests.post(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections",
-            headers=auth_headers,
-            json={"title": "TEST_Privacy Section"}
-        )
+        response = admin_api.create_policy_section("privacy-policy", namespace.title("TEST_Privacy Section"))
         assert response.status_code == 201
         data = response.json()
         section_id = data["section"]["id"]
@@ -148,109 +148,71 @@ class TestPolicyCRUDOperations:
         yield section_id
         
         # Cleanup - delete section
-        requests.delete(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{section_id}",
-            headers=auth_headers
-        )
+        admin_api.delete_policy_section("privacy-policy", section_id)
     
-    def test_create_policy_section(self, auth_headers):
+    def test_create_policy_section(self, admin_api, namespace):
         """Test creating a policy section"""
-        response = requests.post(
-            f"{BASE_URL}/api/admin/policies/cookie-policy/sections",
-            headers=auth_headers,
-            json={"title": "TEST_Cookie Section"}
-        )
+        response = admin_api.create_policy_section("cookie-policy", namespace.title("TEST_Cookie Section"))
         assert response.status_code == 201
         data = response.json()
         assert data.get("success") is True
         assert "section" in data
-        assert data["section"]["title"] == "TEST_Cookie Section"
+        assert data["section"]["title"] == namespace.title("TEST_Cookie Section")
         
         # Cleanup
         section_id = data["section"]["id"]
-        requests.delete(
-            f"{BASE_URL}/api/admin/policies/cookie-policy/sections/{section_id}",
-            headers=auth_headers
-        )
+        admin_api.delete_policy_section("cookie-policy", section_id)
     
-    def test_update_policy_section(self, auth_headers, test_section_id):
+    def test_update_policy_section(self, admin_api, namespace, test_section_id):
         """Test updating a policy section"""
-        response = requests.put(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{test_section_id}",
-            headers=auth_headers,
-            json={"title": "TEST_Updated Privacy Section"}
+        response = admin_api.update_policy_section(
+            "privacy-policy", test_section_id, {"title": namespace.title("TEST_Updated Privacy Section")}
         )
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
     
-    def test_add_item_to_section(self, auth_headers, test_section_id):
+    def test_add_item_to_section(self, admin_api, test_section_id):
         """Test adding an item to a policy section"""
-        response = requests.post(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{test_section_id}/items",
-            headers=auth_headers,
-            json={"text": "TEST_Privacy item text"}
-        )
+        response = admin_api.add_policy_item("privacy-policy", test_section_id, "TEST_Privacy item text")
         assert response.status_code == 201
         data = response.json()
         assert data.get("success") is True
         assert "item" in data
         assert data["item"]["text"] == "TEST_Privacy item text"
     
-    def test_update_item_in_section(self, auth_headers, test_section_id):
+    def test_update_item_in_section(self, admin_api, test_section_id):
         """Test updating an item in a policy section"""
         # First add an item
-        add_response = requests.post(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{test_section_id}/items",
-            headers=auth_headers,
-            json={"text": "TEST_Original text"}
-        )
+        add_response = admin_api.add_policy_item("privacy-policy", test_section_id, "TEST_Original text")
         item_id = add_response.json()["item"]["id"]
         
         # Update the item
-        response = requests.put(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{test_section_id}/items/{item_id}",
-            headers=auth_headers,
-            json={"text": "TEST_Updated text"}
-        )
+        response = admin_api.update_policy_item("privacy-policy", test_section_id, item_id, "TEST_Updated text")
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
     
-    def test_delete_item_from_section(self, auth_headers, test_section_id):
+    def test_delete_item_from_section(self, admin_api, test_section_id):
         """Test deleting an item from a policy section"""
         # First add an item
-        add_response = requests.post(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{test_section_id}/items",
-            headers=auth_headers,
-            json={"text": "TEST_Item to delete"}
-        )
+        add_response = admin_api.add_policy_item("privacy-policy", test_section_id, "TEST_Item to delete")
         item_id = add_response.json()["item"]["id"]
         
         # Delete the item
-        response = requests.delete(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections/{test_section_id}/items/{item_id}",
-            headers=auth_headers
-        )
+        response = admin_api.delete_policy_item("privacy-policy", test_section_id, item_id)
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
     
-    def test_delete_policy_section(self, auth_headers):
+    def test_delete_policy_section(self, admin_api, namespace):
         """Test deleting a policy section"""
         # Create a section to delete
-        create_response = requests.post(
-            f"{BASE_URL}/api/admin/policies/terms-of-service/sections",
-            headers=auth_headers,
-            json={"title": "TEST_Section to delete"}
-        )
+        create_response = admin_api.create_policy_section("terms-of-service", namespace.title("TEST_Section to delete"))
         section_id = create_response.json()["section"]["id"]
         
         # Delete the section
-        response = requests.delete(
-            f"{BASE_URL}/api/admin/policies/terms-of-service/sections/{section_id}",
-            headers=auth_headers
-        )
+        response = admin_api.delete_policy_section("terms-of-service", section_id)
         assert response.status_code == 200
         data = response.json()
         assert data.get("success") is True
@@ -260,48 +222,32 @@ class TestCancellationPolicyCRUD:
     """Test CRUD operations specifically for cancellation policy (uses different endpoint pattern)"""
     
     @pytest.fixture
-    def cancellation_section_id(self, auth_headers):
+    def cancellation_section_id(self, admin_api, namespace):
         """Create a test cancellation section and return its ID"""
-        response = requests.post(
-            f"{BASE_URL}/api/admin/cancellation-policy/sections",
-            headers=auth_headers,
-            json={"title": "TEST_Cancellation Section"}
-        )
+        response = admin_api.create_policy_section("cancellation-policy", namespace.title("TEST_Cancellation Section"))
         assert response.status_code == 201
         section_id = response.json()["section"]["id"]
         
         yield section_id
         
         # Cleanup
-        requests.delete(
-            f"{BASE_URL}/api/admin/cancellation-policy/sections/{section_id}",
-            headers=auth_headers
-        )
+        admin_api.delete_policy_section("cancellation-policy", section_id)
     
-    def test_create_cancellation_section(self, auth_headers):
+    def test_create_cancellation_section(self, admin_api, namespace):
         """Test creating a cancellation policy section"""
-        response = requests.post(
-            f"{BASE_URL}/api/admin/cancellation-policy/sections",
-            headers=auth_headers,
-            json={"title": "TEST_New Cancellation Section"}
-        )
+        response = admin_api.create_policy_section("cancellation-policy", namespace.title("TEST_New Cancellation Section"))
         assert response.status_code == 201
         data = response.json()
         assert data.get("success") is True
         
         # Cleanup
         section_id = data["section"]["id"]
-        requests.delete(
-            f"{BASE_URL}/api/admin/cancellation-policy/sections/{section_id}",
-            headers=auth_headers
-        )
+        admin_api.delete_policy_section("cancellation-policy", section_id)
     
-    def test_add_item_to_cancellation_section(self, auth_headers, cancellation_section_id):
+    def test_add_item_to_cancellation_section(self, admin_api, cancellation_section_id):
         """Test adding an item to cancellation policy section"""
-        response = requests.post(
-            f"{BASE_URL}/api/admin/cancellation-policy/sections/{cancellation_section_id}/items",
-            headers=auth_headers,
-            json={"text": "TEST_30 days notice required"}
+        response = admin_api.add_policy_item(
+            "cancellation-policy", cancellation_section_id, "TEST_30 days notice required"
         )
         assert response.status_code == 201
         data = response.json()
@@ -312,12 +258,9 @@ class TestCancellationPolicyCRUD:
 class TestInvalidPolicyType:
     """Test handling of invalid policy types"""
     
-    def test_invalid_policy_type_returns_error(self, auth_headers):
+    def test_invalid_policy_type_returns_error(self, admin_api):
         """Test that invalid policy type returns appropriate error"""
-        response = requests.get(
-            f"{BASE_URL}/api/admin/policies/invalid-policy",
-            headers=auth_headers
-        )
+        response = admin_api.get_policy("invalid-policy")
         assert response.status_code == 400
         data = response.json()
         assert data.get("success") is False
@@ -326,15 +269,15 @@ class TestInvalidPolicyType:
 class TestUnauthorizedAccess:
     """Test that admin endpoints require authentication"""
     
-    def test_admin_endpoint_requires_auth(self):
+    def test_admin_endpoint_requires_auth(self, api):
         """Test that admin policy endpoint requires authentication"""
-        response = requests.get(f"{BASE_URL}/api/admin/cancellation-policy")
+        response = api.request("GET", "/api/admin/cancellation-policy")
         assert response.status_code == 401
     
-    def test_create_section_requires_auth(self):
+    def test_create_section_requires_auth(self, api):
         """Test that creating section requires authentication"""
-        response = requests.post(
-            f"{BASE_URL}/api/admin/policies/privacy-policy/sections",
+        response = api.request(
+            "POST", "/api/admin/policies/privacy-policy/sections",
             json={"title": "Unauthorized Section"}
         )
         assert response.status_code == 401
@@ -4,24 +4,18 @@ Test script for Public Purchase Flow - Join Now Landing Page Feature
 Tests the new self-service purchase subscription endpoints.
 """
 
-import requests
 import json
 import os
+import sys
 from datetime import datetime
 
-# Get backend URL from frontend .env file
-def get_backend_url():
-    try:
-        with open('/app/frontend/.env', 'r') as f:
-            for line in f:
-                if line.startswith('REACT_APP_BACKEND_URL='):
-                    return line.split('=', 1)[1].strip()
-    except FileNotFoundError:
-        pass
-    return 'http://localhost:8001'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api_client import ApiClient
+from api_client.namespace import current_namespace
 
-BASE_URL = get_backend_url()
-API_BASE = f"{BASE_URL}/api"
+# Public routes only, so the shared client never logs in here
+api = ApiClient()
 
 def log_test(test_name, status, details=""):
     """Log test results with timestamp"""
@@ -34,7 +28,7 @@ def log_test(test_name, status, details=""):
 def test_get_packages():
     """Test GET /api/public/packages - Should return 2 packages"""
     try:
-        response = requests.get(f"{API_BASE}/public/packages", timeout=10)
+        response = api.request('GET', "/api/public/packages", timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -82,7 +76,7 @@ def test_get_packages():
 def test_get_parq_questions():
     """Test GET /api/public/parq-questions - Should return 5 default questions"""
     try:
-        response = requests.get(f"{API_BASE}/public/parq-questions", timeout=10)
+        response = api.request('GET', "/api/public/parq-questions", timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -113,7 +107,7 @@ def test_get_parq_questions():
 def test_get_health_questions():
     """Test GET /api/public/health-questions - Should return 3 default questions"""
     try:
-        response = requests.get(f"{API_BASE}/public/health-questions", timeout=10)
+        response = api.request('GET', "/api/public/health-questions", timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -144,7 +138,7 @@ def test_get_health_questions():
 def test_create_setup_intent():
     """Test POST /api/client/create-setup-intent - Expected to fail with Stripe API key error"""
     try:
-        response = requests.post(f"{API_BASE}/client/create-setup-intent", 
+        response = api.request('POST', "/api/client/create-setup-intent", 
                                json={}, timeout=10)
         
         # This should fail due to invalid Stripe API key in test environment
@@ -181,14 +175,14 @@ def test_purchase_validation():
             "packageId": "nutrition-only",
             "clientInfo": {
                 "name": "Test User",
-                "email": "test.purchase@example.com",
+                "email": current_namespace().email("test.purchase"),
                 "phone": "+44 7123 456789"
             },
             "parqResponses": [],
             "healthResponses": []
         }
         
-        response = requests.post(f"{API_BASE}/public/purchase", 
+        response = api.request('POST', "/api/public/purchase", 
                                json=payload, timeout=10)
         
         if response.status_code == 400:
@@ -215,7 +209,7 @@ def test_purchase_validation():
             "paymentMethodId": "pm_test_12345",
             "clientInfo": {
                 "name": "Test User",
-                "email": "test.purchase2@example.com",
+                "email": current_namespace().email("test.purchase2"),
                 "phone": "+44 7123 456789",
                 "age": "30",
                 "addressLine1": "123 Test Street",
@@ -233,7 +227,7 @@ def test_purchase_validation():
             "hasDoctorApproval": False
         }
         
-        response = requests.post(f"{API_BASE}/public/purchase", 
+        response = api.request('POST', "/api/public/purchase", 
                                json=payload, timeout=10)
         
         if response.status_code == 404:
@@ -259,7 +253,7 @@ def test_purchase_with_valid_data():
             "paymentMethodId": "pm_test_12345",
             "clientInfo": {
                 "name": "Test User",
-                "email": "test.purchase.valid@example.com",
+                "email": current_namespace().email("test.purchase.valid"),
                 "phone": "+44 7123 456789",
                 "age": "30",
                 "addressLine1": "123 Test Street",
@@ -277,7 +271,7 @@ def test_purchase_with_valid_data():
             "hasDoctorApproval": False
         }
         
-        response = requests.post(f"{API_BASE}/public/purchase", 
+        response = api.request('POST', "/api/public/purchase", 
                                json=payload, timeout=15)
         
         # This should fail due to Stripe API key issues
@@ -314,7 +308,7 @@ def test_duplicate_email():
             "paymentMethodId": "pm_test_12345",
             "clientInfo": {
                 "name": "Duplicate Test User",
-                "email": "duplicate.test@example.com",
+                "email": current_namespace().email("duplicate.test"),
                 "phone": "+44 7123 456789",
                 "age": "30",
                 "addressLine1": "123 Test Street",
@@ -333,14 +327,14 @@ def test_duplicate_email():
         }
         
         # Try the purchase twice to test duplicate handling
-        response1 = requests.post(f"{API_BASE}/public/purchase", 
+        response1 = api.request('POST', "/api/public/purchase", 
                                 json=payload, timeout=15)
         
         # Wait a moment and try again with same email
         import time
         time.sleep(1)
         
-        response2 = requests.post(f"{API_BASE}/public/purchase", 
+        response2 = api.request('POST', "/api/public/purchase", 
                                 json=payload, timeout=15)
         
         # Check if second request properly handles duplicate
@@ -374,8 +368,7 @@ def main():
     print("=" * 80)
     print("🧪 TESTING PUBLIC PURCHASE FLOW - JOIN NOW LANDING PAGE")
     print("=" * 80)
-    print(f"Backend URL: {BASE_URL}")
-    print(f"API Base: {API_BASE}")
+    print(f"Backend URL: {api.base_url}")
     print()
     
     # Track test results
@@ -3,36 +3,28 @@
 Quick verification test to check data persistence
 """
 
-import requests
-import json
+import os
+import sys
 
-BASE_URL = "https://admin-refactor-6.preview.emergentagent.com/api"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api_client import ApiClient
+
+BASE_URL = "https://admin-refactor-6.preview.emergentagent.com"
 ADMIN_EMAIL = "simon.price@simonprice-pt.co.uk"
 ADMIN_PASSWORD = "Qwerty1234!!!"
 
-def authenticate():
-    """Get access token"""
-    response = requests.post(
-        f"{BASE_URL}/admin/login",
-        json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
-    )
-    if response.status_code == 200:
-        return response.json().get('accessToken')
-    return None
-
 def verify_data_persistence():
     """Verify that data is properly stored and retrieved"""
-    token = authenticate()
-    if not token:
+    api = ApiClient(BASE_URL, admin_email=ADMIN_EMAIL, admin_password=ADMIN_PASSWORD)
+    if api.login().status_code != 200:
         print("❌ Authentication failed")
         return
     
-    headers = {"Authorization": f"Bearer {token}"}
-    
     print("🔍 VERIFYING DATA PERSISTENCE...")
     
     # Check packages
-    response = requests.get(f"{BASE_URL}/admin/packages", headers=headers)
+    response = api.admin_get_packages()
     if response.status_code == 200:
         data = response.json()
         packages = data.get('packages', [])
@@ -41,7 +33,7 @@ def verify_data_persistence():
             print(f"   • {pkg.get('name')} - £{pkg.get('price')} - {pkg.get('id')}")
     
     # Check PARQ questions
-    response = requests.get(f"{BASE_URL}/admin/parq-questions", headers=headers)
+    response = api.admin_get_parq_questions()
     if response.status_code == 200:
         data = response.json()
         questions = data.get('questions', [])
@@ -50,7 +42,7 @@ def verify_data_persistence():
             print(f"   • Order {q.get('order')}: {q.get('question')[:50]}...")
     
     # Check health questions
-    response = requests.get(f"{BASE_URL}/admin/health-questions", headers=headers)
+    response = api.admin_get_health_questions()
     if response.status_code == 200:
         data = response.json()
         questions = data.get('questions', [])
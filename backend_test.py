@@ -4,14 +4,14 @@ Backend Testing Suite for Simon Price PT Client Onboarding Flow
 Tests the complete client onboarding and subscription flow with Stripe integration
 """
 
-import requests
 import json
 import time
 import sys
 from datetime import datetime
 
+from api_client import ApiClient
+
 # Configuration
-BACKEND_URL = "https://admin-refactor-6.preview.emergentagent.com/api"
 TEST_EMAIL_BASE = "simon.price+test"
 TEST_DOMAIN = "@simonprice-pt.co.uk"
 
@@ -47,8 +47,9 @@ def print_info(message):
     print(f"{Colors.WHITE}ℹ️  {message}{Colors.END}")
 
 class ClientOnboardingTester:
-    def __init__(self):
-        self.admin_token = None
+    def __init__(self, api=None):
+        # Backend URL from REACT_APP_BACKEND_URL or the frontend .env
+        self.api = api or ApiClient()
         self.test_client_email = None
         self.payment_token = None
         self.client_secret = None
@@ -70,7 +71,7 @@ class ClientOnboardingTester:
         
         # First try to setup admin if needed
         try:
-            setup_response = requests.post(f"{BACKEND_URL}/admin/setup")
+            setup_response = self.api.request('POST', '/api/admin/setup')
             if setup_response.status_code == 201:
                 print_info("Admin user created successfully")
             elif setup_response.status_code == 400:
@@ -78,18 +79,11 @@ class ClientOnboardingTester:
         except Exception as e:
             print_warning(f"Admin setup check failed: {e}")
         
-        # Login as admin
-        login_data = {
-            "email": "simon.price@simonprice-pt.co.uk",
-            "password": "Qwerty1234!!!"
-        }
-        
+        # Login as admin; the client renews the token from here on
         try:
-            response = requests.post(f"{BACKEND_URL}/admin/login", json=login_data)
+            response = self.api.login()
             
             if response.status_code == 200:
-                data = response.json()
-                self.admin_token = data.get('accessToken')
                 print_success(f"Admin login successful")
                 self.add_result("Admin Authentication", True, "Login successful")
                 return True
@@ -107,7 +101,7 @@ class ClientOnboardingTester:
         """Test admin creates payment link with email alias"""
         print_test("Admin Creates Payment Link")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Create Payment Link", False, "No admin token")
             return False
@@ -124,14 +118,8 @@ class ClientOnboardingTester:
             "billingDay": 1
         }
         
-        headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            response = requests.post(f"{BACKEND_URL}/admin/create-payment-link", 
-                                   json=client_data, headers=headers)
+            response = self.api.create_payment_link(client_data)
             
             if response.status_code == 201:
                 data = response.json()
@@ -175,7 +163,7 @@ class ClientOnboardingTester:
         }
         
         try:
-            response = requests.post(f"{BACKEND_URL}/client/validate-token", json=token_data)
+            response = self.api.validate_token(token_data["token"])
             
             if response.status_code == 200:
                 data = response.json()
@@ -232,7 +220,7 @@ class ClientOnboardingTester:
         }
         
         try:
-            response = requests.post(f"{BACKEND_URL}/client/create-setup-intent", json=setup_data)
+            response = self.api.create_setup_intent(**setup_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -273,7 +261,7 @@ class ClientOnboardingTester:
         }
         
         try:
-            response = requests.post(f"{BACKEND_URL}/client/complete-onboarding", json=onboarding_data)
+            response = self.api.complete_onboarding(onboarding_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -298,7 +286,7 @@ class ClientOnboardingTester:
         """Test creating payment link with same base email but different alias"""
         print_test("Duplicate Email Handling (Different Alias)")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Duplicate Email Handling", False, "No admin token")
             return False
@@ -315,14 +303,8 @@ class ClientOnboardingTester:
             "billingDay": 15
         }
         
-        headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            response = requests.post(f"{BACKEND_URL}/admin/create-payment-link", 
-                                   json=client_data, headers=headers)
+            response = self.api.create_payment_link(client_data)
             
             if response.status_code == 201:
                 print_success(f"Different alias email accepted: {different_alias_email}")
@@ -344,7 +326,7 @@ class ClientOnboardingTester:
         """Test creating payment link with exact same email (should fail)"""
         print_test("Exact Duplicate Email (Should Fail)")
         
-        if not self.admin_token or not self.test_client_email:
+        if not self.api.tokens.access_token or not self.test_client_email:
             print_error("No admin token or test email available")
             self.add_result("Exact Duplicate Email", False, "Missing prerequisites")
             return False
@@ -357,14 +339,8 @@ class ClientOnboardingTester:
             "billingDay": 10
         }
         
-        headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            response = requests.post(f"{BACKEND_URL}/admin/create-payment-link", 
-                                   json=client_data, headers=headers)
+            response = self.api.create_payment_link(client_data)
             
             if response.status_code == 409:
                 print_success("Exact duplicate email correctly rejected with 409")
@@ -394,7 +370,7 @@ class ClientOnboardingTester:
         }
         
         try:
-            response = requests.post(f"{BACKEND_URL}/client/validate-token", json=invalid_token_data)
+            response = self.api.validate_token(invalid_token_data["token"])
             
             if response.status_code == 400:
                 print_success("Invalid token correctly rejected with 400")
@@ -415,19 +391,14 @@ class ClientOnboardingTester:
         """Verify client and clientUser records were created"""
         print_test("Database Records Verification")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Database Verification", False, "No admin token")
             return False
         
-        headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
-        }
-        
         try:
             # Check clients collection
-            clients_response = requests.get(f"{BACKEND_URL}/admin/clients", headers=headers)
+            clients_response = self.api.get_clients()
             
             if clients_response.status_code == 200:
                 clients_data = clients_response.json()
@@ -446,7 +417,7 @@ class ClientOnboardingTester:
                     print_info(f"Customer ID: {test_client.get('customer_id', 'N/A')}")
                     
                     # Check client users collection
-                    client_users_response = requests.get(f"{BACKEND_URL}/admin/client-users", headers=headers)
+                    client_users_response = self.api.get_client_users()
                     
                     if client_users_response.status_code == 200:
                         client_users_data = client_users_response.json()
@@ -491,7 +462,7 @@ class ClientOnboardingTester:
     def run_all_tests(self):
         """Run the complete test suite"""
         print_header("CLIENT ONBOARDING FLOW TESTING")
-        print_info(f"Backend URL: {BACKEND_URL}")
+        print_info(f"Backend URL: {self.api.base_url}")
         print_info(f"Test timestamp: {datetime.now().isoformat()}")
         
         # Test sequence
@@ -542,8 +513,8 @@ class ClientOnboardingTester:
 
 def main():
     """Main test execution"""
-    tester = ClientOnboardingTester()
-    passed, failed = tester.run_all_tests()
+    with ApiClient() as api:
+        passed, failed = ClientOnboardingTester(api).run_all_tests()
     
     # Exit with appropriate code
     sys.exit(0 if failed == 0 else 1)
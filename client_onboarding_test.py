@@ -4,14 +4,14 @@ Comprehensive Client Onboarding Flow Testing
 Tests what can be tested without valid Stripe API keys and documents issues
 """
 
-import requests
 import json
 import time
 import sys
 from datetime import datetime
 
+from api_client import ApiClient
+
 # Configuration
-BACKEND_URL = "https://admin-refactor-6.preview.emergentagent.com/api"
 TEST_EMAIL_BASE = "simon.price+test"
 TEST_DOMAIN = "@simonprice-pt.co.uk"
 
@@ -46,8 +46,9 @@ def print_info(message):
     print(f"{Colors.WHITE}ℹ️  {message}{Colors.END}")
 
 class ClientOnboardingTester:
-    def __init__(self):
-        self.admin_token = None
+    def __init__(self, api=None):
+        # Backend URL from REACT_APP_BACKEND_URL or the frontend .env
+        self.api = api or ApiClient()
         self.test_results = []
         self.critical_issues = []
         self.working_features = []
@@ -71,17 +72,11 @@ class ClientOnboardingTester:
         """Get admin JWT token for authenticated requests"""
         print_test("Admin Authentication")
         
-        login_data = {
-            "email": "simon.price@simonprice-pt.co.uk",
-            "password": "Qwerty1234!!!"
-        }
-        
         try:
-            response = requests.post(f"{BACKEND_URL}/admin/login", json=login_data)
+            # The client keeps the tokens and renews them from here on
+            response = self.api.login()
             
             if response.status_code == 200:
-                data = response.json()
-                self.admin_token = data.get('accessToken')
                 print_success(f"Admin login successful")
                 self.add_result("Admin Authentication", True, "Login successful")
                 return True
@@ -99,7 +94,7 @@ class ClientOnboardingTester:
         """Test payment link creation structure (expect Stripe API failure)"""
         print_test("Payment Link Creation Structure")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Payment Link Structure", False, "No admin token")
             return False
@@ -115,14 +110,8 @@ class ClientOnboardingTester:
             "billingDay": 1
         }
         
-        headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            response = requests.post(f"{BACKEND_URL}/admin/create-payment-link", 
-                                   json=client_data, headers=headers)
+            response = self.api.create_payment_link(client_data)
             
             print_info(f"Status Code: {response.status_code}")
             print_info(f"Response: {response.text}")
@@ -163,7 +152,7 @@ class ClientOnboardingTester:
         try:
             # Test with invalid token first
             invalid_token_data = {"token": "invalid.token.here"}
-            response = requests.post(f"{BACKEND_URL}/client/validate-token", json=invalid_token_data)
+            response = self.api.validate_token(invalid_token_data["token"])
             
             print_info(f"Invalid token test - Status: {response.status_code}")
             
@@ -188,7 +177,7 @@ class ClientOnboardingTester:
         setup_data = {"email": "test@example.com"}
         
         try:
-            response = requests.post(f"{BACKEND_URL}/client/create-setup-intent", json=setup_data)
+            response = self.api.create_setup_intent(**setup_data)
             
             print_info(f"Status Code: {response.status_code}")
             print_info(f"Response: {response.text}")
@@ -231,7 +220,7 @@ class ClientOnboardingTester:
         }
         
         try:
-            response = requests.post(f"{BACKEND_URL}/client/complete-onboarding", json=onboarding_data)
+            response = self.api.complete_onboarding(onboarding_data)
             
             print_info(f"Status Code: {response.status_code}")
             print_info(f"Response: {response.text}")
@@ -264,15 +253,13 @@ class ClientOnboardingTester:
         """Test admin clients listing endpoint"""
         print_test("Admin Clients Endpoint")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Admin Clients Endpoint", False, "No admin token")
             return False
         
-        headers = {"Authorization": f"Bearer {self.admin_token}"}
-        
         try:
-            response = requests.get(f"{BACKEND_URL}/admin/clients", headers=headers)
+            response = self.api.get_clients()
             
             print_info(f"Status Code: {response.status_code}")
             print_info(f"Response: {response.text}")
@@ -306,15 +293,13 @@ class ClientOnboardingTester:
         """Test admin client users listing endpoint"""
         print_test("Admin Client Users Endpoint")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Admin Client Users Endpoint", False, "No admin token")
             return False
         
-        headers = {"Authorization": f"Bearer {self.admin_token}"}
-        
         try:
-            response = requests.get(f"{BACKEND_URL}/admin/client-users", headers=headers)
+            response = self.api.get_client_users()
             
             print_info(f"Status Code: {response.status_code}")
             print_info(f"Response: {response.text}")
@@ -348,13 +333,11 @@ class ClientOnboardingTester:
         """Test email alias handling in payment link creation"""
         print_test("Email Alias Handling")
         
-        if not self.admin_token:
+        if not self.api.tokens.access_token:
             print_error("No admin token available")
             self.add_result("Email Alias Handling", False, "No admin token")
             return False
         
-        headers = {"Authorization": f"Bearer {self.admin_token}"}
-        
         # Test different email aliases
         timestamp = int(time.time())
         test_emails = [
@@ -374,8 +357,7 @@ class ClientOnboardingTester:
             }
             
             try:
-                response = requests.post(f"{BACKEND_URL}/admin/create-payment-link", 
-                                       json=client_data, headers=headers)
+                response = self.api.create_payment_link(client_data)
                 
                 print_info(f"Email {email} - Status: {response.status_code}")
                 
@@ -411,7 +393,7 @@ class ClientOnboardingTester:
     def run_all_tests(self):
         """Run the complete test suite"""
         print_header("CLIENT ONBOARDING FLOW TESTING")
-        print_info(f"Backend URL: {BACKEND_URL}")
+        print_info(f"Backend URL: {self.api.base_url}")
         print_info(f"Test timestamp: {datetime.now().isoformat()}")
         print_warning("Note: Stripe API key is invalid - testing structure and error handling")
         
@@ -471,8 +453,8 @@ class ClientOnboardingTester:
 
 def main():
     """Main test execution"""
-    tester = ClientOnboardingTester()
-    passed, failed = tester.run_all_tests()
+    with ApiClient() as api:
+        passed, failed = ClientOnboardingTester(api).run_all_tests()
     
     # Exit with appropriate code
     sys.exit(0 if failed == 0 else 1)
@@ -4,7 +4,6 @@ COMPREHENSIVE Backend API Testing Script for SOLID Refactored Simon Price PT Web
 Tests ALL critical flows after SOLID architecture refactoring
 """
 
-import requests
 import json
 import sys
 from datetime import datetime
@@ -13,16 +12,19 @@ import os
 import jwt
 import time
 
-# Get backend URL from frontend .env
-def get_backend_url():
-    try:
-        with open('/app/frontend/.env', 'r') as f:
-            for line in f:
-                if line.startswith('REACT_APP_BACKEND_URL='):
-                    return line.split('=', 1)[1].strip()
-    except Exception as e:
-        print(f"Error reading frontend .env: {e}")
-        return None
+from api_client import ApiClient
+from api_client.namespace import current_namespace
+
+# The same namespace the pytest `namespace` fixture hands out, so parallel runs
+# and workers never share these identities
+namespace = current_namespace()
+CONTACT_EMAIL = namespace.email('test.contact')
+NEWSLETTER_EMAIL = namespace.email('test.newsletter')
+TDEE_EMAIL = namespace.email('test.tdee')
+ADMIN_USER_EMAIL = namespace.email('test.admin')
+NEW_ADMIN_EMAIL = namespace.email('new.admin')
+TEST_CLIENT_EMAIL = namespace.email('testclient')
+CLIENT_EMAIL = namespace.email('test.client')
 
 # MongoDB connection for testing
 def get_mongo_connection():
@@ -42,10 +44,10 @@ def cleanup_test_data(db):
         try:
             # Clean up test emails
             test_emails = [
-                "test.contact@example.com",
-                "test.newsletter@example.com", 
-                "test.tdee@example.com",
-                "testclient@example.com"
+                CONTACT_EMAIL,
+                NEWSLETTER_EMAIL,
+                TDEE_EMAIL,
+                TEST_CLIENT_EMAIL
             ]
             for email in test_emails:
                 db.mailingList.delete_many({"email": email})
@@ -54,16 +56,16 @@ def cleanup_test_data(db):
             
             # Clean up test admin users
             test_admin_emails = [
-                "test.admin@example.com",
-                "new.admin@example.com"
+                ADMIN_USER_EMAIL,
+                NEW_ADMIN_EMAIL
             ]
             for email in test_admin_emails:
                 db.admin_users.delete_many({"email": email})
             
             # Clean up test clients
             test_client_emails = [
-                "testclient@example.com",
-                "test.client@example.com"
+                TEST_CLIENT_EMAIL,
+                CLIENT_EMAIL
             ]
             for email in test_client_emails:
                 db.clients.delete_many({"email": email})
@@ -77,11 +79,11 @@ def cleanup_test_data(db):
 # 1. ADMIN AUTHENTICATION & MANAGEMENT TESTS
 # ============================================================================
 
-def test_admin_login(base_url):
+def test_admin_login(api):
     """Test POST /api/admin/login with provided credentials"""
     print("\n=== Testing Admin Authentication ===")
     try:
-        url = f"{base_url}/api/admin/login"
+        url = "/api/admin/login"
         print(f"Testing: POST {url}")
         
         # Test with provided credentials
@@ -91,7 +93,7 @@ def test_admin_login(base_url):
         }
         
         print(f"Testing with credentials: {credentials['email']}")
-        response = requests.post(url, json=credentials, timeout=10)
+        response = api.request('POST', url, json=credentials, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -128,16 +130,16 @@ def test_admin_login(base_url):
         print(f"❌ Admin login test error: {e}")
         return False, False
 
-def test_admin_refresh(base_url, refresh_token):
+def test_admin_refresh(api, refresh_token):
     """Test POST /api/admin/refresh"""
     print("\n=== Testing Admin Token Refresh ===")
     try:
-        url = f"{base_url}/api/admin/refresh"
+        url = "/api/admin/refresh"
         print(f"Testing: POST {url}")
         
         refresh_data = {"refreshToken": refresh_token}
         
-        response = requests.post(url, json=refresh_data, timeout=10)
+        response = api.request('POST', url, json=refresh_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -157,15 +159,15 @@ def test_admin_refresh(base_url, refresh_token):
         print(f"❌ Token refresh test error: {e}")
         return False
 
-def test_admin_users(base_url, access_token):
+def test_admin_users(api, access_token):
     """Test GET /api/admin/users"""
     print("\n=== Testing Admin Users Management ===")
     try:
-        url = f"{base_url}/api/admin/users"
+        url = "/api/admin/users"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         print(f"Testing: GET {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api.request('GET', url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -194,15 +196,15 @@ def test_admin_users(base_url, access_token):
         print(f"❌ Admin users test error: {e}")
         return False
 
-def test_admin_clients(base_url, access_token):
+def test_admin_clients(api, access_token):
     """Test GET /api/admin/clients"""
     print("\n=== Testing Admin Clients Management ===")
     try:
-        url = f"{base_url}/api/admin/clients"
+        url = "/api/admin/clients"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         print(f"Testing: GET {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api.request('GET', url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -231,15 +233,15 @@ def test_admin_clients(base_url, access_token):
         print(f"❌ Admin clients test error: {e}")
         return False
 
-def test_admin_client_users(base_url, access_token):
+def test_admin_client_users(api, access_token):
     """Test GET /api/admin/client-users"""
     print("\n=== Testing Admin Client Users Management ===")
     try:
-        url = f"{base_url}/api/admin/client-users"
+        url = "/api/admin/client-users"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         print(f"Testing: GET {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api.request('GET', url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -272,11 +274,11 @@ def test_admin_client_users(base_url, access_token):
 # 2. CLIENT CREATION & PAYMENT LINKS TESTS
 # ============================================================================
 
-def test_admin_create_payment_link(base_url, access_token):
+def test_admin_create_payment_link(api, access_token):
     """Test POST /api/admin/create-payment-link"""
     print("\n=== Testing Admin Create Payment Link ===")
     try:
-        url = f"{base_url}/api/admin/create-payment-link"
+        url = "/api/admin/create-payment-link"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         # Test data from review request
@@ -289,7 +291,7 @@ def test_admin_create_payment_link(base_url, access_token):
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(payment_link_data, indent=2)}")
         
-        response = requests.post(url, json=payment_link_data, headers=headers, timeout=15)
+        response = api.request('POST', url, json=payment_link_data, headers=headers, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -338,18 +340,18 @@ def test_admin_create_payment_link(base_url, access_token):
         print(f"❌ Create payment link test error: {e}")
         return False
 
-def test_client_validate_token(base_url, token):
+def test_client_validate_token(api, token):
     """Test POST /api/client/validate-token"""
     print("\n=== Testing Client Token Validation ===")
     try:
-        url = f"{base_url}/api/client/validate-token"
+        url = "/api/client/validate-token"
         
         validate_data = {"token": token}
         
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(validate_data, indent=2)}")
         
-        response = requests.post(url, json=validate_data, timeout=10)
+        response = api.request('POST', url, json=validate_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -416,18 +418,18 @@ def test_client_validate_token(base_url, token):
 # 3. CLIENT ONBOARDING FLOW TESTS
 # ============================================================================
 
-def test_client_create_setup_intent(base_url):
+def test_client_create_setup_intent(api):
     """Test POST /api/client/create-setup-intent"""
     print("\n=== Testing Client Create Setup Intent ===")
     try:
-        url = f"{base_url}/api/client/create-setup-intent"
+        url = "/api/client/create-setup-intent"
         
         setup_data = {"email": "test@test.com"}
         
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(setup_data, indent=2)}")
         
-        response = requests.post(url, json=setup_data, timeout=10)
+        response = api.request('POST', url, json=setup_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -457,11 +459,11 @@ def test_client_create_setup_intent(base_url):
         print(f"❌ Create setup intent test error: {e}")
         return False
 
-def test_client_complete_onboarding(base_url):
+def test_client_complete_onboarding(api):
     """Test POST /api/client/complete-onboarding"""
     print("\n=== Testing Client Complete Onboarding ===")
     try:
-        url = f"{base_url}/api/client/complete-onboarding"
+        url = "/api/client/complete-onboarding"
         
         onboarding_data = {
             "email": "test@test.com",
@@ -472,7 +474,7 @@ def test_client_complete_onboarding(base_url):
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(onboarding_data, indent=2)}")
         
-        response = requests.post(url, json=onboarding_data, timeout=10)
+        response = api.request('POST', url, json=onboarding_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -500,11 +502,11 @@ def test_client_complete_onboarding(base_url):
         print(f"❌ Complete onboarding test error: {e}")
         return False
 
-def test_client_create_password(base_url):
+def test_client_create_password(api):
     """Test POST /api/client/create-password"""
     print("\n=== Testing Client Create Password ===")
     try:
-        url = f"{base_url}/api/client/create-password"
+        url = "/api/client/create-password"
         
         password_data = {
             "email": "test@test.com",
@@ -515,7 +517,7 @@ def test_client_create_password(base_url):
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps({k: v if k != 'password' and k != 'confirmPassword' else '***' for k, v in password_data.items()}, indent=2)}")
         
-        response = requests.post(url, json=password_data, timeout=10)
+        response = api.request('POST', url, json=password_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -547,14 +549,14 @@ def test_client_create_password(base_url):
 # 4. PUBLIC ENDPOINTS TESTS
 # ============================================================================
 
-def test_health_endpoint(base_url):
+def test_health_endpoint(api):
     """Test GET /api/health"""
     print("\n=== Testing Health Check Endpoint ===")
     try:
-        url = f"{base_url}/api/health"
+        url = "/api/health"
         print(f"Testing: GET {url}")
         
-        response = requests.get(url, timeout=10)
+        response = api.request('GET', url, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -585,15 +587,15 @@ def test_health_endpoint(base_url):
         print(f"❌ Health check test error: {e}")
         return False
 
-def test_contact_endpoint(base_url, db):
+def test_contact_endpoint(api, db):
     """Test POST /api/contact"""
     print("\n=== Testing Contact Form Endpoint ===")
     try:
-        url = f"{base_url}/api/contact"
+        url = "/api/contact"
         
         contact_data = {
             "name": "Test Contact User",
-            "email": "test.contact@example.com",
+            "email": CONTACT_EMAIL,
             "phone": "+44 7123 456789",
             "goals": "weight-loss",
             "experience": "beginner",
@@ -603,7 +605,7 @@ def test_contact_endpoint(base_url, db):
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(contact_data, indent=2)}")
         
-        response = requests.post(url, json=contact_data, timeout=15)
+        response = api.request('POST', url, json=contact_data, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -668,20 +670,20 @@ def test_contact_endpoint(base_url, db):
         print(f"❌ Contact form test error: {e}")
         return False
 
-def test_newsletter_subscribe(base_url, db):
+def test_newsletter_subscribe(api, db):
     """Test POST /api/newsletter/subscribe"""
     print("\n=== Testing Newsletter Subscription ===")
     try:
-        url = f"{base_url}/api/newsletter/subscribe"
+        url = "/api/newsletter/subscribe"
         
         newsletter_data = {
-            "email": "test.newsletter@example.com"
+            "email": NEWSLETTER_EMAIL
         }
         
         print(f"Testing: POST {url}")
         print(f"Data: {json.dumps(newsletter_data, indent=2)}")
         
-        response = requests.post(url, json=newsletter_data, timeout=10)
+        response = api.request('POST', url, json=newsletter_data, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -712,15 +714,15 @@ def test_newsletter_subscribe(base_url, db):
         print(f"❌ Newsletter subscription test error: {e}")
         return False
 
-def test_tdee_results_endpoint(base_url, db):
+def test_tdee_results_endpoint(api, db):
     """Test POST /api/tdee-results"""
     print("\n=== Testing TDEE Results Endpoint ===")
     try:
-        url = f"{base_url}/api/tdee-results"
+        url = "/api/tdee-results"
         
         # Test with nested structure (original format)
         tdee_data_nested = {
-            "email": "test.tdee@example.com",
+            "email": TDEE_EMAIL,
             "joinMailingList": True,
             "results": {
                 "bmr": 1800,
@@ -745,7 +747,7 @@ def test_tdee_results_endpoint(base_url, db):
         print(f"Testing: POST {url} (nested structure)")
         print(f"Data: {json.dumps(tdee_data_nested, indent=2)}")
         
-        response = requests.post(url, json=tdee_data_nested, timeout=15)
+        response = api.request('POST', url, json=tdee_data_nested, timeout=15)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text}")
         
@@ -762,14 +764,14 @@ def test_tdee_results_endpoint(base_url, db):
                 print("\n--- Testing with flat structure ---")
                 tdee_data_flat = {
                     "name": "Test User",
-                    "email": "test.tdee@example.com",
+                    "email": TDEE_EMAIL,
                     "tdee": 2200,
                     "goalCalories": 1700,
                     "joinMailingList": True
                 }
                 
                 print(f"Data: {json.dumps(tdee_data_flat, indent=2)}")
-                response2 = requests.post(url, json=tdee_data_flat, timeout=15)
+                response2 = api.request('POST', url, json=tdee_data_flat, timeout=15)
                 print(f"Status Code: {response2.status_code}")
                 print(f"Response: {response2.text}")
                 
@@ -811,31 +813,19 @@ def test_data_integrity_checks(db):
         return True
     
     try:
-        # Check for null subscription_status values
-        clients_with_null_status = list(db.clients.find({"subscription_status": None}))
-        if clients_with_null_status:
-            print(f"❌ Found {len(clients_with_null_status)} clients with null subscription_status")
+        # Counted server-side so this stays cheap on large collections
+        from integrity.checks import CHECKS, by_collection
+        from integrity.scanner import failures, scan
+
+        result = scan(db, by_collection(CHECKS)['clients'], workers=2, samples=3)
+        for check in result['checks']:
+            if check['count']:
+                print(f"❌ Found {check['count']} clients where {check['description']} "
+                      f"(e.g. {', '.join(check['sample_ids'])})")
+            else:
+                print(f"✅ No clients where {check['description']}")
+        if failures(result):
             return False
-        else:
-            print("✅ No clients with null subscription_status found")
-        
-        # Check for proper field mapping in existing data
-        clients = list(db.clients.find({}))
-        for client in clients:
-            # Check phone/telephone field mapping
-            if 'phone' in client and 'telephone' not in client:
-                print("❌ Client has 'phone' field but missing 'telephone' field")
-                return False
-            
-            # Check price/monthlyPrice field mapping
-            if 'monthlyPrice' in client and 'price' not in client:
-                print("❌ Client has 'monthlyPrice' field but missing 'price' field")
-                return False
-            
-            # Check billingDate/billingDay field mapping
-            if 'billingDate' in client and 'billingDay' not in client:
-                print("❌ Client has 'billingDate' field but missing 'billingDay' field")
-                return False
         
         print("✅ Data field mappings are correct")
         return True
@@ -854,13 +844,9 @@ def main():
     print("COMPREHENSIVE BACKEND TESTING - SOLID REFACTORED ARCHITECTURE")
     print("=" * 80)
     
-    # Get backend URL
-    base_url = get_backend_url()
-    if not base_url:
-        print("❌ Could not get backend URL from frontend .env")
-        sys.exit(1)
-    
-    print(f"Backend URL: {base_url}")
+    # Shared client: resolves the backend URL and keeps one pooled connection
+    api = ApiClient()
+    print(f"Backend URL: {api.base_url}")
     
     # Get MongoDB connection
     mongo_client, db = get_mongo_connection()
@@ -876,19 +862,19 @@ def main():
     print("1. ADMIN AUTHENTICATION & MANAGEMENT TESTS")
     print("=" * 60)
     
-    access_token, refresh_token = test_admin_login(base_url)
+    access_token, refresh_token = test_admin_login(api)
     test_results['admin_login'] = bool(access_token and refresh_token)
     
     if access_token and refresh_token:
-        new_access_token = test_admin_refresh(base_url, refresh_token)
+        new_access_token = test_admin_refresh(api, refresh_token)
         test_results['admin_refresh'] = bool(new_access_token)
         
         if new_access_token:
             access_token = new_access_token
         
-        test_results['admin_users'] = test_admin_users(base_url, access_token)
-        test_results['admin_clients'] = test_admin_clients(base_url, access_token)
-        test_results['admin_client_users'] = test_admin_client_users(base_url, access_token)
+        test_results['admin_users'] = test_admin_users(api, access_token)
+        test_results['admin_clients'] = test_admin_clients(api, access_token)
+        test_results['admin_client_users'] = test_admin_client_users(api, access_token)
     else:
         test_results['admin_refresh'] = False
         test_results['admin_users'] = False
@@ -901,11 +887,11 @@ def main():
     print("=" * 60)
     
     if access_token:
-        token = test_admin_create_payment_link(base_url, access_token)
+        token = test_admin_create_payment_link(api, access_token)
         test_results['create_payment_link'] = bool(token)
         
         if token:
-            test_results['validate_token'] = test_client_validate_token(base_url, token)
+            test_results['validate_token'] = test_client_validate_token(api, token)
         else:
             test_results['validate_token'] = False
     else:
@@ -917,19 +903,19 @@ def main():
     print("3. CLIENT ONBOARDING FLOW TESTS")
     print("=" * 60)
     
-    test_results['create_setup_intent'] = test_client_create_setup_intent(base_url)
-    test_results['complete_onboarding'] = test_client_complete_onboarding(base_url)
-    test_results['create_password'] = test_client_create_password(base_url)
+    test_results['create_setup_intent'] = test_client_create_setup_intent(api)
+    test_results['complete_onboarding'] = test_client_complete_onboarding(api)
+    test_results['create_password'] = test_client_create_password(api)
     
     # 4. Public Endpoints Tests
     print("\n" + "=" * 60)
     print("4. PUBLIC ENDPOINTS TESTS")
     print("=" * 60)
     
-    test_results['health_endpoint'] = test_health_endpoint(base_url)
-    test_results['contact_endpoint'] = test_contact_endpoint(base_url, db)
-    test_results['newsletter_subscribe'] = test_newsletter_subscribe(base_url, db)
-    test_results['tdee_results'] = test_tdee_results_endpoint(base_url, db)
+    test_results['health_endpoint'] = test_health_endpoint(api)
+    test_results['contact_endpoint'] = test_contact_endpoint(api, db)
+    test_results['newsletter_subscribe'] = test_newsletter_subscribe(api, db)
+    test_results['tdee_results'] = test_tdee_results_endpoint(api, db)
     
     # 5. Data Integrity Checks
     print("\n" + "=" * 60)
@@ -941,6 +927,8 @@ def main():
     # Clean up test data
     cleanup_test_data(db)
     
+    api.close()
+    
     # Close MongoDB connection
     if mongo_client:
         mongo_client.close()
@@ -974,4 +962,9 @@ def main():
         sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        # Drive the same flows concurrently, e.g. `load closed --users 50 --duration 120`
+        from loadtest.__main__ import main as load_main
+        load_main(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
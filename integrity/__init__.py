@@ -0,0 +1,6 @@
+"""
+Data-integrity checks for the backend's Mongo collections, evaluated inside
+Mongo so they scale to millions of documents:
+
+    python -m integrity --workers 8
+"""
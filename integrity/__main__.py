@@ -0,0 +1,67 @@
+"""
+Command line entry point: python -m integrity [options]
+"""
+
+import argparse
+import json
+import os
+
+from integrity.checks import CHECKS, CHECKS_BY_NAME
+from integrity.scanner import default_workers, failures, format_report, scan
+
+
+def check_list(value):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    collections = {check.collection for check in CHECKS}
+    unknown = [name for name in names if name not in CHECKS_BY_NAME and name not in collections]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"Unknown checks or collections: {', '.join(unknown)} (choose from {', '.join(CHECKS_BY_NAME)})"
+        )
+    return [check for check in CHECKS if check.name in names or check.collection in names]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m integrity', description=__doc__)
+    parser.add_argument('--mongo-url', default=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'),
+                        help='Mongo to scan (default: MONGO_URL)')
+    parser.add_argument('--db-name', default=os.environ.get('DB_NAME', 'simonprice_pt_db'),
+                        help='Database name (default: DB_NAME)')
+    parser.add_argument('--checks', type=check_list, default=CHECKS,
+                        help='Comma separated checks or collections to run (default: all)')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='Parallel aggregations (default: CPU count, at most 8)')
+    parser.add_argument('--partitions', type=int,
+                        help='_id ranges each collection is split into (default: --workers)')
+    parser.add_argument('--samples', type=int, default=5, help='Sample ids reported per failing check')
+    parser.add_argument('--list', action='store_true', help='List the checks and exit')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        for check in args.checks:
+            print(f"{check.collection + '.' + check.name:<48}{check.description}")
+        return
+
+    import pymongo
+
+    client = pymongo.MongoClient(args.mongo_url, serverSelectionTimeoutMS=5000, maxPoolSize=args.workers + 2)
+    try:
+        result = scan(client[args.db_name], args.checks, workers=args.workers, partitions=args.partitions,
+                      samples=args.samples)
+    finally:
+        client.close()
+    print(format_report(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Result written to {args.output}")
+    if failures(result):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
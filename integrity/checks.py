@@ -0,0 +1,63 @@
+"""
+Integrity checks as Mongo filters.
+
+Each check is a $match filter that selects the offending documents, so the
+whole check runs inside Mongo. The client checks are the ones
+test_data_integrity_checks in comprehensive_backend_test.py used to run in
+Python over every client.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set
+
+
+@dataclass(frozen=True)
+class Check:
+    name: str
+    collection: str
+    filter: dict
+    description: str
+
+
+CHECKS: List[Check] = [
+    Check('null_subscription_status', 'clients', {'subscription_status': None},
+          'subscription_status is null or missing'),
+    Check('phone_without_telephone', 'clients',
+          {'phone': {'$exists': True}, 'telephone': {'$exists': False}},
+          "has 'phone' but no 'telephone'"),
+    Check('monthly_price_without_price', 'clients',
+          {'monthlyPrice': {'$exists': True}, 'price': {'$exists': False}},
+          "has 'monthlyPrice' but no 'price'"),
+    Check('billing_date_without_billing_day', 'clients',
+          {'billingDate': {'$exists': True}, 'billingDay': {'$exists': False}},
+          "has 'billingDate' but no 'billingDay'"),
+    Check('active_without_password', 'client_users', {'status': 'active', 'password': None},
+          'active client user with no password'),
+    Check('missing_email', 'mailing_list', {'email': {'$in': [None, '']}},
+          'subscriber with no email'),
+    Check('published_without_publish_date', 'blog_posts', {'status': 'published', 'publish_date': None},
+          'published post with no publish_date, listed last'),
+    Check('scheduled_without_date', 'blog_posts', {'status': 'scheduled', 'scheduled_date': None},
+          'scheduled post with no scheduled_date'),
+]
+
+CHECKS_BY_NAME: Dict[str, Check] = {check.name: check for check in CHECKS}
+
+
+def filter_fields(query: dict) -> Set[str]:
+    """Top-level fields a filter reads, including inside $and/$or/$nor"""
+    fields: Set[str] = set()
+    for key, value in query.items():
+        if key in ('$and', '$or', '$nor'):
+            for clause in value:
+                fields |= filter_fields(clause)
+        elif not key.startswith('$'):
+            fields.add(key.split('.')[0])
+    return fields
+
+
+def by_collection(checks: Iterable[Check]) -> Dict[str, List[Check]]:
+    grouped: Dict[str, List[Check]] = {}
+    for check in checks:
+        grouped.setdefault(check.collection, []).append(check)
+    return grouped
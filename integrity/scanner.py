@@ -0,0 +1,144 @@
+"""
+Parallel, server-side evaluation of integrity checks.
+
+Every check on a collection shares one pass over it: a $project down to the
+fields the checks read, then a $facet with a $match and $count per check
+plus a $limit for sample ids. Only the counts and a few ids come back, so
+client memory does not grow with the collection. Large collections are cut
+into _id ranges, using split points from $sample, and the ranges of all
+collections are scanned by a thread pool at the same time.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from integrity.checks import Check, by_collection, filter_fields
+
+IdRange = Tuple[Optional[Any], Optional[Any]]
+# Sampled ids per partition when choosing split points
+SAMPLES_PER_PARTITION = 20
+DOCUMENTS = '_documents'
+
+
+def default_workers() -> int:
+    return min(os.cpu_count() or 1, 8)
+
+
+def facet_pipeline(checks: Sequence[Check], samples: int, id_range: IdRange = (None, None)) -> List[dict]:
+    stages: List[dict] = []
+    low, high = id_range
+    bounds = {**({'$gte': low} if low is not None else {}), **({'$lt': high} if high is not None else {})}
+    if bounds:
+        stages.append({'$match': {'_id': bounds}})
+    fields = set()
+    for check in checks:
+        fields |= filter_fields(check.filter)
+    # A projected field that is missing stays missing, so $exists and null checks still hold
+    stages.append({'$project': {field: 1 for field in sorted(fields)}})
+    facets: Dict[str, List[dict]] = {DOCUMENTS: [{'$count': 'count'}]}
+    for check in checks:
+        facets[check.name] = [{'$match': check.filter}, {'$count': 'count'}]
+        if samples:
+            facets[f"{check.name}__samples"] = [{'$match': check.filter}, {'$limit': samples}, {'$project': {'_id': 1}}]
+    stages.append({'$facet': facets})
+    return stages
+
+
+def partition_ranges(sample_ids: List[Any], partitions: int) -> List[IdRange]:
+    """_id ranges of roughly equal size from a random sample of ids"""
+    ids = sorted(set(sample_ids)) if len({type(i) for i in sample_ids}) == 1 else []
+    if partitions <= 1 or len(ids) < partitions:
+        return [(None, None)]
+    splits = [ids[len(ids) * part // partitions] for part in range(1, partitions)]
+    splits = sorted(set(splits))
+    return list(zip([None, *splits], [*splits, None]))
+
+
+def collection_ranges(db, collection: str, partitions: int) -> List[IdRange]:
+    if partitions <= 1:
+        return [(None, None)]
+    sample = db[collection].aggregate([
+        {'$sample': {'size': partitions * SAMPLES_PER_PARTITION}},
+        {'$project': {'_id': 1}},
+    ])
+    return partition_ranges([doc['_id'] for doc in sample], partitions)
+
+
+def scan_range(db, collection: str, checks: Sequence[Check], samples: int, id_range: IdRange) -> dict:
+    result = list(db[collection].aggregate(facet_pipeline(checks, samples, id_range), allowDiskUse=True))
+    return result[0] if result else {}
+
+
+def facet_count(facet: Dict[str, list], name: str) -> int:
+    rows = facet.get(name) or []
+    return rows[0]['count'] if rows else 0
+
+
+def merge(checks: Sequence[Check], facets: List[dict], samples: int) -> Tuple[int, Dict[str, dict]]:
+    """Documents scanned and per-check count and sample ids over all ranges of one collection"""
+    documents = sum(facet_count(facet, DOCUMENTS) for facet in facets)
+    merged = {}
+    for check in checks:
+        ids = [doc['_id'] for facet in facets for doc in facet.get(f"{check.name}__samples", [])]
+        merged[check.name] = {
+            'count': sum(facet_count(facet, check.name) for facet in facets),
+            'sample_ids': [str(i) for i in ids[:samples]],
+        }
+    return documents, merged
+
+
+def scan(db, checks: Sequence[Check], workers: int = 4, partitions: Optional[int] = None, samples: int = 5) -> dict:
+    """
+    Run `checks` against `db` (a pymongo Database). Each collection is split
+    into `partitions` _id ranges (default: `workers`); the result holds a
+    count and up to `samples` ids per check.
+    """
+    started = time.monotonic()
+    grouped = by_collection(checks)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        ranges = dict(zip(grouped, pool.map(
+            lambda name: collection_ranges(db, name, partitions or workers), grouped,
+        )))
+        futures = {
+            name: [pool.submit(scan_range, db, name, grouped[name], samples, id_range) for id_range in ranges[name]]
+            for name in grouped
+        }
+        facets = {name: [future.result() for future in pending] for name, pending in futures.items()}
+
+    collections = {}
+    results = {}
+    for name, group in grouped.items():
+        documents, merged = merge(group, facets[name], samples)
+        collections[name] = {'documents': documents, 'partitions': len(ranges[name])}
+        results.update(merged)
+    return {
+        'database': db.name,
+        'scanned_at': datetime.now(timezone.utc).isoformat(),
+        'seconds': round(time.monotonic() - started, 2),
+        'workers': workers,
+        'collections': collections,
+        'checks': [
+            {'name': check.name, 'collection': check.collection, 'description': check.description,
+             **results[check.name]}
+            for check in checks
+        ],
+    }
+
+
+def failures(result: dict) -> List[dict]:
+    return [check for check in result['checks'] if check['count']]
+
+
+def format_report(result: dict) -> str:
+    lines = [f"🔎 {result['database']}: {sum(c['documents'] for c in result['collections'].values()):,} "
+             f"documents in {result['seconds']}s"]
+    for check in result['checks']:
+        icon = '❌' if check['count'] else '✅'
+        line = f"{icon} {check['collection'] + '.' + check['name']:<48}{check['count']:>12,}  {check['description']}"
+        if check['sample_ids']:
+            line += f"  e.g. {', '.join(check['sample_ids'])}"
+        lines.append(line)
+    return '\n'.join(lines)
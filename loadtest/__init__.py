@@ -0,0 +1,9 @@
+"""
+Load generation harness for the Simon Price PT backend.
+
+Reuses the request flows exercised by comprehensive_backend_test.py and
+backend/tests/refactored_backend_test.py so the same paths that prove
+correctness can be driven concurrently to measure capacity.
+
+Run with: python -m loadtest --help
+"""
@@ -0,0 +1,459 @@
+"""
+Command line entry point: python -m loadtest <mode> [options]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+
+from loadtest import accesslog, authbench, benchmark, blogbench, racebench, replay, scaling
+from loadtest.config import get_backend_url
+from loadtest.flows import DEFAULT_FLOWS, FLOWS, PUBLIC_TARGETS, SOAK_FLOWS
+from loadtest.multiprocess import RUNNERS, run_distributed
+from loadtest.soak import find_backend_pid, run_soak
+from loadtest.stats import LoadStats, format_report
+from seeddata.generators import SeedContext, default_until
+from seeddata.seeder import default_workers, parse_count, parse_size, plan_counts, run_seed
+
+
+def name_list(choices):
+    def parse(value):
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(
+                f"Unknown names: {', '.join(unknown)} (choose from {', '.join(choices)})"
+            )
+        return names
+    return parse
+
+
+def size_list(value):
+    try:
+        return [parse_size(size) for size in value.split(',') if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected sizes such as 1k,10k,100k,1M, got {value!r}")
+
+
+def int_list(value):
+    try:
+        return [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected integers such as 1,2,4,8, got {value!r}")
+
+
+def collection_count(value):
+    try:
+        return parse_count(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def speed(value):
+    if value == 'max':
+        return None
+    try:
+        result = float(value)
+    except ValueError:
+        result = 0.0
+    if result <= 0:
+        raise argparse.ArgumentTypeError(f"Expected a positive multiple or 'max', got {value!r}")
+    return result
+
+
+def build_parser():
+    backend = argparse.ArgumentParser(add_help=False)
+    backend.add_argument('--base-url', default=get_backend_url(), help='Backend URL (default: REACT_APP_BACKEND_URL)')
+
+    process = argparse.ArgumentParser(add_help=False)
+    process.add_argument('--backend-pid', type=int, help='Backend process to sample from /proc')
+    process.add_argument('--backend-match', default='server.js',
+                         help='Find the backend pid by command line when --backend-pid is not given')
+
+    database = argparse.ArgumentParser(add_help=False)
+    database.add_argument('--db-name', default=os.environ.get('DB_NAME', 'simonprice_pt_db'),
+                          help='Database the backend uses (default: DB_NAME)')
+
+    seeded = argparse.ArgumentParser(add_help=False, parents=[database])
+    seeded.add_argument('--mongo-url', default=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'),
+                        help='Mongo the backend uses (default: MONGO_URL)')
+    seeded.add_argument('--seed', type=int, default=42, help='seeddata seed')
+
+    results = argparse.ArgumentParser(add_help=False)
+    results.add_argument('--output-dir', help='Where <mode>-<time>.json and .html are written '
+                                              '(default: test_reports/<mode>)')
+
+    common = argparse.ArgumentParser(add_help=False, parents=[backend])
+    common.add_argument('--output', help='Write the JSON report to this file')
+    common.add_argument('--timeout', type=float, default=15.0, help='Per-request timeout in seconds')
+    common.add_argument('--processes', type=int, default=1,
+                        help='Worker processes to split the load across (default: 1)')
+    common.add_argument('--save-benchmark', metavar='NAME',
+                        help='Also store the result under test_reports/benchmarks/NAME/ for `compare`')
+
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description=__doc__)
+    modes = parser.add_subparsers(dest='mode', required=True)
+
+    closed = modes.add_parser('closed', parents=[common],
+                              help='Fixed number of virtual users running flows back to back')
+    closed.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    closed.add_argument('--ramp-up', type=float, default=10.0, help='Seconds over which users are started')
+    closed.add_argument('--duration', type=float, default=60.0, help='Test length in seconds')
+    closed.add_argument('--flows', type=name_list(FLOWS), default=DEFAULT_FLOWS,
+                        help=f"Comma separated flows (default: {','.join(DEFAULT_FLOWS)})")
+
+    open_model = modes.add_parser('open', parents=[common],
+                                  help='Constant arrival rate against the public read endpoints')
+    open_model.add_argument('--rate', type=float, default=50.0, help='Requests per second')
+    open_model.add_argument('--duration', type=float, default=60.0, help='Test length in seconds')
+    open_model.add_argument('--max-in-flight', type=int, default=1000,
+                            help='Arrivals beyond this many outstanding requests are dropped')
+    open_model.add_argument('--targets', type=name_list(PUBLIC_TARGETS), default=list(PUBLIC_TARGETS),
+                            help=f"Comma separated targets (default: all of {','.join(PUBLIC_TARGETS)})")
+
+    soak = modes.add_parser('soak', parents=[common, process],
+                            help='Hours of steady load while sampling backend RSS, FDs and Mongo connections')
+    soak.add_argument('--users', type=int, default=5, help='Concurrent virtual users')
+    soak.add_argument('--duration', type=float, default=4 * 3600, help='Test length in seconds (default: 4h)')
+    soak.add_argument('--interval', type=float, default=30.0, help='Seconds between resource samples')
+    soak.add_argument('--warmup', type=float, default=300.0,
+                      help='Seconds of samples left out of the leak verdict')
+    soak.add_argument('--flows', type=name_list(FLOWS), default=SOAK_FLOWS,
+                      help=f"Comma separated flows (default: {','.join(SOAK_FLOWS)})")
+    soak.add_argument('--csv', default='soak_timeline.csv', help='Timeline CSV path')
+    soak.add_argument('--mongo-url', default=os.environ.get('MONGO_URL'),
+                      help='Mongo to query serverStatus on (default: MONGO_URL)')
+
+    scale = modes.add_parser('scaling', parents=[backend, seeded, process, results],
+                             help='Seed growing collections and chart the whole-collection admin endpoints')
+    scale.add_argument('--sizes', type=size_list, default=scaling.DEFAULT_SIZES,
+                       help='Comma separated collection sizes (default: 1k,10k,100k,1M)')
+    scale.add_argument('--endpoints', type=name_list(scaling.ENDPOINTS), default=list(scaling.ENDPOINTS),
+                       help=f"Comma separated endpoints (default: {','.join(scaling.ENDPOINTS)})")
+    scale.add_argument('--repeats', type=int, default=5, help='Measured calls per endpoint and size')
+    scale.add_argument('--max-latency-ms', type=float, default=1000.0,
+                       help='Median latency above which an endpoint counts as unusable (default: 1000)')
+    scale.add_argument('--timeout', type=float, default=120.0, help='Per-request timeout in seconds')
+    scale.add_argument('--workers', type=int, default=default_workers(), help='seeddata insert processes')
+
+    blog = modes.add_parser('blog', parents=[backend, seeded, results],
+                            help='Seed growing blog corpora and explain the listing and search queries')
+    blog.add_argument('--sizes', type=size_list, default=blogbench.DEFAULT_SIZES,
+                      help='Comma separated blog_posts sizes (default: 1k,10k,100k,500k)')
+    blog.add_argument('--shapes', type=name_list(blogbench.SHAPE_NAMES), default=blogbench.SHAPE_NAMES,
+                      help=f"Comma separated query shapes (default: {','.join(blogbench.SHAPE_NAMES)})")
+    blog.add_argument('--repeats', type=int, default=10, help='Measured calls per shape and size')
+    blog.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    blog.add_argument('--workers', type=int, default=default_workers(), help='seeddata insert processes')
+
+    auth = modes.add_parser('auth', parents=[backend, seeded, process, results],
+                            help='Measure login throughput per core and its effect on /api/health')
+    auth.add_argument('--levels', type=int_list, default=authbench.DEFAULT_LEVELS,
+                      help='Comma separated concurrent login workers (default: 1,2,4,8,16,32)')
+    auth.add_argument('--duration', type=float, default=30.0, help='Seconds per level (default: 30)')
+    auth.add_argument('--targets', type=name_list(authbench.TARGETS), default=['admin', 'client'],
+                      help=f"Comma separated login kinds to mix (choices: {','.join(authbench.TARGETS)}; "
+                           "default: admin,client)")
+    auth.add_argument('--probe-interval', type=float, default=0.05,
+                      help='Seconds between /api/health probes (default: 0.05)')
+    auth.add_argument('--max-health-ms', type=float, default=100.0,
+                      help='/api/health p95 that login load must stay under (default: 100)')
+    auth.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    auth.add_argument('--client-users', type=parse_size, default=1000,
+                      help='Seeded client users to log in as; topped up before the run (default: 1000)')
+
+    race = modes.add_parser('race', parents=[backend, database, results],
+                            help='Fire simultaneous purchases and payment links and count duplicates')
+    race.add_argument('--levels', type=int_list, default=racebench.DEFAULT_LEVELS,
+                      help='Comma separated simultaneous requests per burst (default: 10,100,500)')
+    race.add_argument('--scenarios', type=name_list(racebench.SCENARIOS), default=list(racebench.SCENARIOS),
+                      help=f"Comma separated scenarios (default: {','.join(racebench.SCENARIOS)})")
+    race.add_argument('--rounds', type=int, default=3, help='Bursts per scenario and level (default: 3)')
+    race.add_argument('--payment-method', default='pm_card_visa', help='paymentMethodId sent with purchases')
+    race.add_argument('--stripe-api-base', default=os.environ.get('STRIPE_API_BASE'),
+                      help='Stripe API to count customers in, e.g. the stand-in (default: STRIPE_API_BASE)')
+    race.add_argument('--stripe-key', default=os.environ.get('STRIPE_SECRET_KEY', 'sk_test_standin'),
+                      help='Secret key for --stripe-api-base (default: STRIPE_SECRET_KEY)')
+    race.add_argument('--mongo-url', default=os.environ.get('MONGO_URL'),
+                      help='Mongo to count clients in (default: MONGO_URL)')
+    race.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    race.add_argument('--fail-on-duplicates', action='store_true',
+                      help='Exit non-zero when any duplicate reached Stripe or the database')
+
+    capture = modes.add_parser('capture', help='Turn nginx access logs into an anonymised request trace')
+    capture.add_argument('logs', nargs='+', help='Access logs in the combined format (.gz is read too)')
+    capture.add_argument('--output', required=True, help='Trace file to write (JSON lines)')
+    capture.add_argument('--prefix', default='/api/', help='Only keep paths under this prefix (default: /api/)')
+
+    replay_mode = modes.add_parser('replay', parents=[common],
+                                   help='Replay a captured trace against seeded data, keeping its timing')
+    replay_mode.add_argument('trace', help='Trace written by `capture`')
+    replay_mode.add_argument('--speed', type=speed, default=1.0,
+                             help='Multiple of the logged rate, e.g. 1 or 10, or "max" (default: 1)')
+    replay_mode.add_argument('--max-in-flight', type=int, default=1000,
+                             help='Outstanding request limit; timed arrivals beyond it are dropped')
+    replay_mode.add_argument('--seed', type=int, default=42, help='seeddata seed the target was seeded with')
+    replay_mode.add_argument('--seed-total', type=parse_size, default=parse_size('100k'),
+                             help='seeddata --total the target was seeded with (default: 100k)')
+    replay_mode.add_argument('--seed-count', type=collection_count, action='append', default=[],
+                             metavar='COLLECTION=N',
+                             help='seeddata --count overrides the target was seeded with')
+
+    merge = modes.add_parser('merge', help='Combine the histograms of several saved JSON reports')
+    merge.add_argument('reports', nargs='+', help='JSON reports written with --output')
+    merge.add_argument('--output', help='Write the merged JSON report to this file')
+    merge.add_argument('--sequential', action='store_true',
+                       help='The runs happened one after another: add up their durations instead of '
+                            'treating them as concurrent load generators')
+
+    compare = modes.add_parser('compare', help='Fail if a saved benchmark regressed against its baseline')
+    compare.add_argument('result', help='Benchmark result written by --save-benchmark')
+    compare.add_argument('--baseline', help='Baseline to compare with (default: baseline.json beside the result)')
+    compare.add_argument('--max-p95-increase', type=float, default=0.2,
+                         help='Allowed relative p95 increase per endpoint (default: 0.2 = 20%%)')
+    compare.add_argument('--max-throughput-drop', type=float, default=0.2,
+                         help='Allowed relative throughput drop per endpoint (default: 0.2 = 20%%)')
+    compare.add_argument('--min-requests', type=int, default=20,
+                         help='Skip endpoints the baseline sampled fewer times than this, and fail endpoints '
+                              'the current run did (default: 20)')
+    compare.add_argument('--max-error-rate-increase', type=float, default=0.01,
+                         help='Allowed rise in error rate per endpoint, in absolute terms '
+                              '(default: 0.01 = one percentage point)')
+    compare.add_argument('--update-baseline', action='store_true',
+                         help='Make the result the new baseline when it passes')
+    return parser
+
+
+def merge_reports(paths, sequential=False):
+    """
+    Combine saved reports. By default they are taken to be concurrent load
+    generators, like --processes workers, so the wall time is the longest
+    run and throughput adds up; sequential runs add up their durations.
+    """
+    stats = LoadStats()
+    durations = []
+    for path in paths:
+        with open(path) as f:
+            report = json.load(f)
+        stats.merge(LoadStats.from_report(report['endpoints']))
+        durations.append(report['duration_s'])
+    duration = sum(durations) if sequential else max(durations, default=0.0)
+    return {"mode": "merged", "sources": paths, "sequential": sequential, "duration_s": duration,
+            "endpoints": stats.report(duration)}
+
+
+def emit(result, output):
+    print(format_report(result['endpoints']))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Report written to {output}")
+
+
+def write_results(output_dir, name, result, module):
+    """Write <name>-<time>.json and module's HTML chart of it, by default to module.REPORTS_DIR"""
+    output_dir = output_dir or module.REPORTS_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%dT%H%M%S')}")
+    benchmark.write_json(f"{stem}.json", result)
+    with open(f"{stem}.html", 'w') as f:
+        f.write(module.render_html(result))
+    print(f"Results written to {stem}.json and {stem}.html")
+
+
+def run_compare(args) -> int:
+    current = benchmark.load_result(args.result)
+    baseline_file = args.baseline or os.path.join(os.path.dirname(os.path.abspath(args.result)), 'baseline.json')
+    if not os.path.exists(baseline_file):
+        print(f"No baseline at {baseline_file}")
+        if args.update_baseline:
+            shutil.copyfile(args.result, baseline_file)
+            print(f"Baseline set from {args.result}")
+            return 0
+        return 1
+
+    comparison = benchmark.compare(
+        benchmark.load_result(baseline_file), current,
+        max_p95_increase=args.max_p95_increase,
+        max_throughput_drop=args.max_throughput_drop,
+        min_requests=args.min_requests,
+        max_error_rate_increase=args.max_error_rate_increase,
+    )
+    print(benchmark.format_comparison(comparison))
+    if comparison['regressions']:
+        print(f"❌ {len(comparison['regressions'])} endpoint(s) regressed against {baseline_file}")
+        return 1
+    print(f"✅ No regressions against {baseline_file}")
+    if args.update_baseline:
+        shutil.copyfile(args.result, baseline_file)
+        print(f"Baseline updated from {args.result}")
+    return 0
+
+
+def run_scaling_mode(args):
+    pid = args.backend_pid or find_backend_pid(args.backend_match)
+    if pid is None:
+        print(f"⚠️ No process matching '{args.backend_match}'; RSS growth will not be recorded")
+    result = asyncio.run(scaling.run_scaling(
+        base_url=args.base_url, mongo_url=args.mongo_url, db_name=args.db_name, sizes=args.sizes,
+        endpoint_names=args.endpoints, repeats=args.repeats, max_latency_ms=args.max_latency_ms,
+        backend_pid=pid, seed=args.seed, workers=args.workers, timeout=args.timeout,
+    ))
+    print(scaling.format_limits(result))
+    write_results(args.output_dir, 'scaling', result, scaling)
+
+
+def run_blog_mode(args):
+    result = asyncio.run(blogbench.run_blog_benchmark(
+        base_url=args.base_url, mongo_url=args.mongo_url, db_name=args.db_name, sizes=args.sizes,
+        shape_names=args.shapes, repeats=args.repeats, seed=args.seed, workers=args.workers, timeout=args.timeout,
+    ))
+    write_results(args.output_dir, 'blog', result, blogbench)
+
+
+def run_auth_mode(args):
+    client_emails = []
+    if any(target in authbench.CLIENT_TARGETS for target in args.targets):
+        ctx = SeedContext(seed=args.seed, until=default_until(),
+                          counts=plan_counts(0, {'clients': args.client_users}))
+        run_seed(args.mongo_url, args.db_name, ctx, ['clients', 'client_users'])
+        client_emails = authbench.seeded_client_logins(args.seed, args.client_users)
+    pid = args.backend_pid or find_backend_pid(args.backend_match)
+    if pid is None:
+        print(f"⚠️ No process matching '{args.backend_match}'; logins per core will not be reported")
+    result = asyncio.run(authbench.run_auth_benchmark(
+        base_url=args.base_url, levels=args.levels, duration=args.duration, targets=args.targets,
+        client_emails=client_emails, backend_pid=pid, probe_interval=args.probe_interval,
+        max_health_ms=args.max_health_ms, timeout=args.timeout,
+    ))
+    print(authbench.format_capacity(result))
+    write_results(args.output_dir, 'auth', result, authbench)
+
+
+def run_race_mode(args) -> int:
+    if not args.stripe_api_base:
+        print("⚠️ No --stripe-api-base; Stripe customers and subscriptions will not be counted")
+    result = asyncio.run(racebench.run_race(
+        base_url=args.base_url, levels=args.levels, scenario_names=args.scenarios, rounds=args.rounds,
+        payment_method=args.payment_method, stripe_api_base=args.stripe_api_base, stripe_key=args.stripe_key,
+        mongo_url=args.mongo_url, db_name=args.db_name, timeout=args.timeout,
+    ))
+    write_results(args.output_dir, 'race', result, racebench)
+    slipped = sum(racebench.slipped(row) for row in result['rows'])
+    if slipped:
+        print(f"❌ {slipped} duplicate customers, subscriptions or clients slipped through")
+    return 1 if slipped and args.fail_on_duplicates else 0
+
+
+def run_capture(args):
+    header, records = accesslog.build_trace(accesslog.read_lines(args.logs), prefix=args.prefix)
+    accesslog.write_trace(args.output, header, records)
+    print(f"{header['requests']} requests from {header['clients']} clients over {header['duration_s']:.0f}s "
+          f"written to {args.output}")
+    if header['unparsed_lines']:
+        print(f"⚠️ {header['unparsed_lines']} lines were not in the combined format and were skipped")
+
+
+def replay_options(args):
+    header, records = accesslog.read_trace(args.trace)
+    counts = plan_counts(args.seed_total, dict(args.seed_count))
+    ctx = SeedContext(seed=args.seed, until=default_until(), counts=counts)
+    return dict(
+        base_url=args.base_url, trace_path=args.trace, records=records, binder=replay.Binder(ctx),
+        speed=args.speed, max_in_flight=args.max_in_flight, timeout=args.timeout,
+    )
+
+
+def format_verdict(verdict):
+    lines = []
+    for field, row in verdict.items():
+        if row["status"] == "insufficient data":
+            lines.append(f"  {field:<18} insufficient data ({row['samples']} samples)")
+            continue
+        icon = "❌" if row["status"] == "leak suspected" else "✅"
+        lines.append(
+            f"{icon} {field:<18} {row['start']} → {row['end']} "
+            f"({row['relative_growth']:+.1%}, {row['slope_per_hour']:+}/h) {row['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.mode == 'compare':
+        status = run_compare(args)
+        if status:
+            raise SystemExit(status)
+        return
+    if args.mode == 'scaling':
+        run_scaling_mode(args)
+        return
+    if args.mode == 'blog':
+        run_blog_mode(args)
+        return
+    if args.mode == 'auth':
+        run_auth_mode(args)
+        return
+    if args.mode == 'capture':
+        run_capture(args)
+        return
+    if args.mode == 'race':
+        status = run_race_mode(args)
+        if status:
+            raise SystemExit(status)
+        return
+    if args.mode == 'closed':
+        options = dict(
+            base_url=args.base_url, users=args.users, ramp_up=args.ramp_up,
+            duration=args.duration, flow_names=args.flows, timeout=args.timeout,
+        )
+    elif args.mode == 'open':
+        options = dict(
+            base_url=args.base_url, rate=args.rate, duration=args.duration,
+            target_names=args.targets, max_in_flight=args.max_in_flight, timeout=args.timeout,
+        )
+
+    if args.mode == 'soak':
+        if args.processes > 1:
+            parser.error('soak runs in a single process')
+        pid = args.backend_pid or find_backend_pid(args.backend_match)
+        if pid is None:
+            print(f"⚠️ No process matching '{args.backend_match}'; RSS, FD and thread columns will be empty")
+        result = asyncio.run(run_soak(
+            base_url=args.base_url, users=args.users, duration=args.duration, interval=args.interval,
+            flow_names=args.flows, csv_path=args.csv, backend_pid=pid, mongo_url=args.mongo_url,
+            warmup=args.warmup, timeout=args.timeout,
+        ))
+        print(format_verdict(result['verdict']))
+        for error, count in result['failed_users'].items():
+            print(f"❌ {count} virtual user(s) stopped on {error}")
+        print(f"Timeline written to {args.csv}")
+    elif args.mode == 'merge':
+        result = merge_reports(args.reports, sequential=args.sequential)
+    elif args.mode == 'replay':
+        if args.processes > 1:
+            parser.error('replay runs in a single process')
+        result = asyncio.run(replay.run_replay(**replay_options(args)))
+    elif args.processes > 1:
+        result = run_distributed(args.mode, options, args.processes)
+        for index, error in result['worker_errors'].items():
+            print(f"❌ Worker {index} failed: {error}")
+    else:
+        result = asyncio.run(RUNNERS[args.mode](**options))
+
+    if result.get('dropped'):
+        print(f"⚠️ {result['dropped']} of {result['scheduled']} arrivals dropped at --max-in-flight")
+    emit(result, args.output)
+    if getattr(args, 'save_benchmark', None):
+        path = benchmark.save_result(benchmark.benchmark_result(result, args.save_benchmark))
+        print(f"Benchmark result written to {path}")
+    if args.mode == 'soak' and any(row['status'] == 'leak suspected' for row in result['verdict'].values()):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
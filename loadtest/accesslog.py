@@ -0,0 +1,254 @@
+"""
+nginx access logs to anonymised request traces.
+
+nginx.conf sets no log_format for the simonprice-pt.co.uk server, so its
+access log uses nginx's predefined "combined" format:
+
+    $remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent "$http_referer" "$http_user_agent"
+
+Each /api/ request becomes one trace record. The client address becomes a
+small integer, identifiers in the path and query become {kind:n}
+placeholders numbered in order of first appearance, and referer, user
+agent and user are dropped. The same slug or email therefore maps to the
+same placeholder throughout a trace, which keeps cache and hot-document
+behaviour without keeping the values. $time_local only has whole seconds,
+so requests logged in the same second are spread evenly across it.
+
+A trace file is JSON lines: a header object, then one record per request:
+
+    {"t": 12.25, "client": 4, "method": "GET", "path": "/api/blog/posts/{blog_slug:3}",
+     "query": {"page": "2"}, "status": 200, "bytes": 5120}
+"""
+
+import gzip
+import json
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+TRACE_VERSION = 1
+
+COMBINED = re.compile(
+    r'(?P<addr>\S+) \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] "(?P<request>[^"]*)" (?P<status>\d{3}) (?P<bytes>\d+|-)'
+)
+TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+
+# Express routes with path parameters, as mounted in backend/server.js, and
+# the kind of value each parameter holds. None keeps the value: policy types
+# are a fixed set, not identifiers.
+ROUTES = [
+    ('/api/blog/posts/:slug', {'slug': 'blog_slug'}),
+    ('/api/blog/admin/posts/:slug', {'slug': 'blog_slug'}),
+    ('/api/blog/admin/categories/:slug', {'slug': 'category_slug'}),
+    ('/api/blog/admin/tags/:slug', {'slug': 'tag_slug'}),
+    ('/api/blog/admin/images/:filename', {'filename': 'image'}),
+    ('/api/admin/users/:id', {'id': 'user_id'}),
+    ('/api/admin/clients/:email', {'email': 'client_email'}),
+    ('/api/admin/clients/:email/sync-status', {'email': 'client_email'}),
+    ('/api/admin/client/:id/cancel-subscription', {'id': 'client_id'}),
+    ('/api/admin/client-users/:email/status', {'email': 'client_email'}),
+    ('/api/admin/client-users/:email/resend-password-email', {'email': 'client_email'}),
+    ('/api/admin/cancellation-policy/sections/:sectionId', {'sectionId': 'section_id'}),
+    ('/api/admin/cancellation-policy/sections/:sectionId/items', {'sectionId': 'section_id'}),
+    ('/api/admin/cancellation-policy/sections/:sectionId/items/reorder', {'sectionId': 'section_id'}),
+    ('/api/admin/cancellation-policy/sections/:sectionId/items/:itemId',
+     {'sectionId': 'section_id', 'itemId': 'item_id'}),
+    ('/api/admin/policies/:policyType', {'policyType': None}),
+    ('/api/admin/policies/:policyType/sections', {'policyType': None}),
+    ('/api/admin/policies/:policyType/sections/reorder', {'policyType': None}),
+    ('/api/admin/policies/:policyType/sections/:sectionId', {'policyType': None, 'sectionId': 'section_id'}),
+    ('/api/admin/policies/:policyType/sections/:sectionId/items',
+     {'policyType': None, 'sectionId': 'section_id'}),
+    ('/api/admin/policies/:policyType/sections/:sectionId/items/reorder',
+     {'policyType': None, 'sectionId': 'section_id'}),
+    ('/api/admin/policies/:policyType/sections/:sectionId/items/:itemId',
+     {'policyType': None, 'sectionId': 'section_id', 'itemId': 'item_id'}),
+    ('/api/admin/packages/:id', {'id': 'package_id'}),
+    ('/api/admin/parq-questions/:id', {'id': 'question_id'}),
+    ('/api/admin/health-questions/:id', {'id': 'question_id'}),
+]
+
+# Query parameters whose values are kept; everything else is a placeholder
+KEPT_QUERY = {'page', 'limit', 'status', 'packageId'}
+QUERY_KINDS = {
+    'search': 'search',
+    'category': 'category_slug',
+    'tag': 'tag_slug',
+    'email': 'client_email',
+    'token': 'token',
+}
+
+# Path segments that look like identifiers on routes not listed above
+SEGMENT_KINDS = [
+    (re.compile(r'^[0-9a-f]{24}$', re.I), 'object_id'),
+    (re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.I), 'uuid'),
+    (re.compile(r'^[^@/]+@[^@/]+$'), 'email'),
+    (re.compile(r'^\d{4,}$'), 'number'),
+    (re.compile(r'^[A-Za-z0-9_-]{32,}$'), 'token'),
+]
+
+PLACEHOLDER = re.compile(r'\{(?P<kind>[a-z_]+):(?P<index>\d+)\}')
+
+
+def _compile(route: str, kinds: Dict[str, Optional[str]]):
+    pattern = re.sub(r':(\w+)', lambda m: f'(?P<{m.group(1)}>[^/]+)', route)
+    return re.compile(f'^{pattern}/?$'), route, kinds
+
+
+COMPILED_ROUTES = sorted((_compile(route, kinds) for route, kinds in ROUTES),
+                         key=lambda compiled: -compiled[1].count('/'))
+
+
+class Anonymiser:
+    """Numbers clients and identifier values in order of first appearance"""
+
+    def __init__(self):
+        self.clients: Dict[str, int] = {}
+        self.values: Dict[str, Dict[str, int]] = {}
+
+    def client(self, address: str) -> int:
+        return self.clients.setdefault(address, len(self.clients))
+
+    def placeholder(self, kind: str, value: str) -> str:
+        seen = self.values.setdefault(kind, {})
+        return f"{{{kind}:{seen.setdefault(value, len(seen))}}}"
+
+    def path(self, path: str) -> str:
+        path = unquote(path)
+        for pattern, route, kinds in COMPILED_ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+
+            def fill(m):
+                name = m.group(1)
+                kind = kinds.get(name)
+                return match.group(name) if kind is None else self.placeholder(kind, match.group(name))
+            return re.sub(r':(\w+)', fill, route)
+
+        segments = []
+        for segment in path.split('/'):
+            kind = next((kind for pattern, kind in SEGMENT_KINDS if pattern.match(segment)), None)
+            segments.append(self.placeholder(kind, segment) if kind else segment)
+        return '/'.join(segments)
+
+    def query(self, query: str) -> Dict[str, str]:
+        params = {}
+        for key, value in parse_qsl(query, keep_blank_values=True):
+            if key in KEPT_QUERY:
+                params[key] = value
+            else:
+                params[key] = self.placeholder(QUERY_KINDS.get(key, f"param_{key.lower()}"), value)
+        return params
+
+    def counts(self) -> Dict[str, int]:
+        return {kind: len(values) for kind, values in sorted(self.values.items())}
+
+
+def parse_line(line: str) -> Optional[dict]:
+    """Fields of one combined-format line, or None when it does not parse"""
+    match = COMBINED.match(line)
+    if not match:
+        return None
+    parts = match.group('request').split()
+    if len(parts) != 3:
+        return None
+    method, target, _protocol = parts
+    try:
+        when = datetime.strptime(match.group('time'), TIME_FORMAT)
+    except ValueError:
+        return None
+    size = match.group('bytes')
+    return {
+        'addr': match.group('addr'),
+        'time': when,
+        'method': method,
+        'target': target,
+        'status': int(match.group('status')),
+        'bytes': 0 if size == '-' else int(size),
+    }
+
+
+def read_lines(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            yield from f
+
+
+def spread_within_seconds(times: List[float]) -> List[float]:
+    """Whole-second timestamps to evenly spaced offsets within each second"""
+    per_second: Dict[float, int] = {}
+    for t in times:
+        per_second[t] = per_second.get(t, 0) + 1
+    seen: Dict[float, int] = {}
+    spread = []
+    for t in times:
+        position = seen.get(t, 0)
+        seen[t] = position + 1
+        spread.append(t + position / per_second[t])
+    return spread
+
+
+def build_trace(lines: Iterable[str], prefix: str = '/api/') -> Tuple[dict, List[dict]]:
+    """(header, records) for every parsable request under `prefix`, in time order"""
+    anonymiser = Anonymiser()
+    parsed = []
+    skipped = 0
+    for line in lines:
+        entry = parse_line(line)
+        if entry is None:
+            skipped += 1
+            continue
+        parts = urlsplit(entry['target'])
+        if not parts.path.startswith(prefix):
+            continue
+        parsed.append((entry, parts))
+    # Files may be concatenated out of order; the sort is stable within a second
+    parsed.sort(key=lambda item: item[0]['time'])
+
+    start = parsed[0][0]['time'] if parsed else None
+    offsets = spread_within_seconds([(entry['time'] - start).total_seconds() for entry, _ in parsed])
+    records = [
+        {
+            't': round(offset, 3),
+            'client': anonymiser.client(entry['addr']),
+            'method': entry['method'],
+            'path': anonymiser.path(parts.path),
+            'query': anonymiser.query(parts.query),
+            'status': entry['status'],
+            'bytes': entry['bytes'],
+        }
+        for offset, (entry, parts) in zip(offsets, parsed)
+    ]
+    header = {
+        'trace_version': TRACE_VERSION,
+        'start': start.isoformat() if start else None,
+        'requests': len(records),
+        'duration_s': records[-1]['t'] if records else 0.0,
+        'clients': len(anonymiser.clients),
+        'unparsed_lines': skipped,
+        'identifiers': anonymiser.counts(),
+    }
+    return header, records
+
+
+def write_trace(path: str, header: dict, records: List[dict]):
+    with open(path, 'w') as f:
+        f.write(json.dumps(header) + '\n')
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def read_trace(path: str) -> Tuple[dict, List[dict]]:
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get('trace_version') != TRACE_VERSION:
+            raise ValueError(f"{path} is not a version {TRACE_VERSION} request trace")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+def route_label(method: str, path: str) -> str:
+    """Stats label for a record: the path with placeholder numbers removed"""
+    return f"{method} {PLACEHOLDER.sub(lambda m: '{' + m.group('kind') + '}', path)}"
@@ -0,0 +1,249 @@
+"""
+CPU cost of logins.
+
+AuthService checks every admin and client login with bcryptjs at cost 10.
+bcryptjs is plain JavaScript, so each comparison runs on Node's single event
+loop, and every other request waits while it runs. changeAdminPassword,
+createClientPassword and resetClientPassword hash at the same cost, so what
+holds for logins holds for them too.
+
+The benchmark first measures GET /api/health alone, then runs each
+concurrency level in turn: that many workers log in back to back while a
+probe on its own connection keeps calling /api/health. The backend's CPU
+time is read from /proc, which turns logins per second into logins per
+CPU-second, i.e. per core. The health probe shows what the login load
+does to everything else on the same process.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.config import ADMIN_EMAIL, ADMIN_PASSWORD, REPORTS_ROOT
+from loadtest.flows import Session
+from loadtest.soak import ProcessSampler
+from loadtest.stats import LoadStats
+from loadtest.svgchart import html_page, html_table, line_chart
+from seeddata.generators import SEED_PASSWORD, SeedContext, client_user, default_until
+
+DEFAULT_LEVELS = [1, 2, 4, 8, 16, 32]
+REPORTS_DIR = os.path.join(REPORTS_ROOT, "auth")
+HEALTH = "GET /api/health"
+# target -> (path, stats label, expected statuses); a wrong password still costs a bcrypt compare
+TARGETS = {
+    "admin": ("/api/admin/login", "POST /api/admin/login", (200,)),
+    "client": ("/api/client/login", "POST /api/client/login", (200,)),
+    "client_wrong_password": ("/api/client/login", "POST /api/client/login (wrong password)", (401,)),
+}
+CLIENT_TARGETS = ("client", "client_wrong_password")
+
+
+def seeded_client_logins(seed: int, count: int) -> List[str]:
+    """Emails of the first `count` seeded client users that have SEED_PASSWORD"""
+    # Emails and passwords depend only on the seed and index, not on dates
+    ctx = SeedContext(seed=seed, until=default_until(), counts={})
+    users = (client_user(ctx, index) for index in range(count))
+    return [user['email'] for user in users if user['password']]
+
+
+def login_request(target: str, position: int, client_emails: List[str]) -> dict:
+    if target == "admin":
+        return {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    email = client_emails[position % len(client_emails)]
+    password = SEED_PASSWORD if target == "client" else SEED_PASSWORD + "-wrong"
+    return {"email": email, "password": password}
+
+
+async def login_worker(
+    index: int,
+    http: httpx.AsyncClient,
+    stats: LoadStats,
+    targets: List[str],
+    client_emails: List[str],
+    stop_at: float,
+):
+    session = Session(http, stats)
+    position = index
+    while time.monotonic() < stop_at:
+        target = targets[position % len(targets)]
+        path, label, expect = TARGETS[target]
+        await session.request("POST", path, expect=expect, label=label,
+                              json=login_request(target, position, client_emails))
+        position += 1
+
+
+async def health_probe(http: httpx.AsyncClient, stats: LoadStats, interval: float, stop_at: float):
+    session = Session(http, stats)
+    while time.monotonic() < stop_at:
+        started = time.monotonic()
+        await session.request("GET", "/api/health", expect=(200,))
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def summarize_level(
+    concurrency: int,
+    elapsed: float,
+    report: Dict[str, dict],
+    cpu_seconds: Optional[float],
+    baseline_health: Optional[dict] = None,
+) -> dict:
+    logins = {label: row for label, row in report.items() if label != HEALTH}
+    completed = sum(row["requests"] - row["errors"] for row in logins.values())
+    errors = sum(row["errors"] for row in logins.values())
+    health = report.get(HEALTH)
+    slowdown = None
+    if health and baseline_health and baseline_health["p95_ms"]:
+        slowdown = round(health["p95_ms"] / baseline_health["p95_ms"], 2)
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "logins": completed,
+        "login_errors": errors,
+        "logins_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+        "login_p50_ms": max((row["p50_ms"] for row in logins.values()), default=None),
+        "login_p95_ms": max((row["p95_ms"] for row in logins.values()), default=None),
+        "backend_cpu_s": round(cpu_seconds, 2) if cpu_seconds is not None else None,
+        "cores_used": round(cpu_seconds / elapsed, 2) if cpu_seconds is not None and elapsed else None,
+        "logins_per_core_s": round(completed / cpu_seconds, 2) if cpu_seconds else None,
+        "health_p50_ms": health["p50_ms"] if health else None,
+        "health_p95_ms": health["p95_ms"] if health else None,
+        "health_p99_ms": health["p99_ms"] if health else None,
+        "health_slowdown": slowdown,
+        "endpoints": report,
+    }
+
+
+async def run_level(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    targets: List[str],
+    client_emails: List[str],
+    sampler: Optional[ProcessSampler],
+    probe_interval: float,
+    timeout: float,
+) -> tuple:
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=max(concurrency, 1), max_keepalive_connections=max(concurrency, 1))
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http, \
+            httpx.AsyncClient(base_url=base_url, timeout=timeout) as probe:
+        cpu_before = sampler.cpu_seconds() if sampler else None
+        started = time.monotonic()
+        stop_at = started + duration
+        await asyncio.gather(
+            health_probe(probe, stats, probe_interval, stop_at),
+            *(login_worker(index, http, stats, targets, client_emails, stop_at) for index in range(concurrency)),
+        )
+        elapsed = time.monotonic() - started
+        cpu_after = sampler.cpu_seconds() if sampler else None
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return elapsed, stats.report(elapsed), cpu
+
+
+def capacity(levels: List[dict], max_health_ms: float) -> dict:
+    """Peak login rate, cost per login, and the highest rate that kept /api/health under the limit"""
+    loaded = [row for row in levels if row["concurrency"] > 0]
+    per_core = [row["logins_per_core_s"] for row in loaded if row["logins_per_core_s"]]
+    healthy = [row for row in loaded if row["health_p95_ms"] is not None and row["health_p95_ms"] <= max_health_ms]
+    best = max(healthy, key=lambda row: row["logins_per_s"], default=None)
+    return {
+        "peak_logins_per_s": max((row["logins_per_s"] for row in loaded), default=None),
+        "logins_per_core_s": max(per_core) if per_core else None,
+        "cpu_ms_per_login": round(1000 / max(per_core), 2) if per_core else None,
+        "max_health_p95_ms": max_health_ms,
+        "sustainable_logins_per_s": best["logins_per_s"] if best else None,
+        "sustainable_concurrency": best["concurrency"] if best else None,
+    }
+
+
+async def run_auth_benchmark(
+    base_url: str,
+    levels: List[int],
+    duration: float,
+    targets: List[str],
+    client_emails: List[str],
+    backend_pid: Optional[int] = None,
+    probe_interval: float = 0.05,
+    max_health_ms: float = 100.0,
+    timeout: float = 30.0,
+) -> dict:
+    if any(target in CLIENT_TARGETS for target in targets) and not client_emails:
+        raise ValueError("Client login targets need seeded client users with passwords")
+    sampler = ProcessSampler(backend_pid) if backend_pid else None
+    rows: List[dict] = []
+    baseline_health = None
+    for concurrency in [0, *sorted(levels)]:
+        print(f"🔐 {concurrency} concurrent login workers for {duration:.0f}s")
+        elapsed, report, cpu = await run_level(
+            base_url, concurrency, duration, targets, client_emails, sampler, probe_interval, timeout,
+        )
+        row = summarize_level(concurrency, elapsed, report, cpu, baseline_health)
+        if concurrency == 0:
+            baseline_health = report.get(HEALTH)
+        rows.append(row)
+        print(format_row(row))
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": base_url,
+        "targets": targets,
+        "duration_s": duration,
+        "backend_pid": backend_pid,
+        "levels": rows,
+        "capacity": capacity(rows, max_health_ms),
+    }
+
+
+def format_row(row: dict) -> str:
+    def value(field, suffix=""):
+        return f"{row[field]}{suffix}" if row[field] is not None else "-"
+
+    return (f"  c={row['concurrency']:<4} {value('logins_per_s'):>8} logins/s  "
+            f"p95 {value('login_p95_ms', ' ms'):>10}  cores {value('cores_used'):>5}  "
+            f"per core-s {value('logins_per_core_s'):>7}  health p95 {value('health_p95_ms', ' ms'):>10}"
+            f"  (x{value('health_slowdown')}){'  errors ' + str(row['login_errors']) if row['login_errors'] else ''}")
+
+
+def format_capacity(result: dict) -> str:
+    cap = result["capacity"]
+    lines = [
+        f"Peak logins/s:            {cap['peak_logins_per_s']}",
+        f"Logins per CPU-second:    {cap['logins_per_core_s'] or 'unknown (no backend pid)'}",
+        f"CPU per login:            {cap['cpu_ms_per_login'] or '-'} ms",
+        f"Logins/s with /api/health p95 <= {cap['max_health_p95_ms']:.0f} ms: "
+        f"{cap['sustainable_logins_per_s'] or 'none'}",
+    ]
+    return "\n".join(lines)
+
+
+def render_html(result: dict) -> str:
+    rows = [row for row in result["levels"] if row["concurrency"] > 0]
+
+    def series(field):
+        return [(row["concurrency"], row[field]) for row in rows if row[field] is not None]
+
+    charts = [
+        line_chart("Login throughput", {"logins/s": series("logins_per_s")}, "concurrent workers", "logins/s",
+                   log_x=True),
+        line_chart("Latency", {"login p95": series("login_p95_ms"), "/api/health p95": series("health_p95_ms")},
+                   "concurrent workers", "ms", log_x=True, log_y=True,
+                   threshold=result["capacity"]["max_health_p95_ms"]),
+        line_chart("Backend CPU", {"cores used": series("cores_used")}, "concurrent workers", "cores", log_x=True),
+    ]
+    table = html_table(
+        ["Workers", "Logins/s", "Login p50 ms", "Login p95 ms", "Errors", "Cores used", "Logins per core-s",
+         "Health p50 ms", "Health p95 ms", "Health slowdown"],
+        [
+            [row["concurrency"], row["logins_per_s"], row["login_p50_ms"] or "-", row["login_p95_ms"] or "-",
+             row["login_errors"], row["cores_used"] or "-", row["logins_per_core_s"] or "-",
+             row["health_p50_ms"] or "-", row["health_p95_ms"] or "-", row["health_slowdown"] or "-"]
+            for row in result["levels"]
+        ],
+        bad_rows=[bool(row["login_errors"]) for row in result["levels"]],
+    )
+    summary = "<pre>" + format_capacity(result) + "</pre>"
+    return html_page(f"Login CPU cost ({result['generated_at'][:10]})", [summary, *charts, table])
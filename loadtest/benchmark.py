@@ -0,0 +1,218 @@
+"""
+Benchmark results and the baseline regression gate.
+
+A benchmark result is a load report reduced to a stable schema: per-endpoint
+latency percentiles, throughput, payload bytes and error counts, plus a
+fingerprint of the machine and revision it ran on. Results live beside the
+functional reports:
+
+    test_reports/benchmarks/<name>/<timestamp>.json    every saved run
+    test_reports/benchmarks/<name>/baseline.json       the accepted reference
+
+compare() checks a result against the baseline and reports every endpoint
+whose p95 latency rose, throughput fell or error rate grew by more than
+allowed, and every endpoint that vanished or lost most of its samples.
+"""
+
+import json
+import os
+import platform
+import socket
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from loadtest.config import REPORTS_ROOT
+
+SCHEMA_VERSION = 1
+
+REPORTS_DIR = os.path.join(REPORTS_ROOT, 'benchmarks')
+
+# Fields copied from each endpoint of a load report
+ENDPOINT_FIELDS = (
+    "requests", "errors", "throughput_rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+    "payload_bytes", "mean_payload_bytes",
+)
+
+# Run settings that must match for two results to be comparable
+RUN_FIELDS = ("mode", "users", "ramp_up_s", "flows", "target_rate_rps", "targets", "trace", "speed")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_fingerprint(base_url: str) -> dict:
+    """Where the load was generated from and what it was aimed at"""
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "git_revision": git_revision(),
+        "base_url": base_url,
+    }
+
+
+def benchmark_result(report: dict, name: str) -> dict:
+    """Reduce a load report from `python -m loadtest` to the benchmark schema"""
+    endpoints = {
+        endpoint: {field: row.get(field, 0) for field in ENDPOINT_FIELDS}
+        for endpoint, row in report["endpoints"].items()
+    }
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "name": name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment_fingerprint(report.get("base_url", "")),
+        "run": {field: report[field] for field in RUN_FIELDS + ("duration_s", "processes") if field in report},
+        "endpoints": endpoints,
+    }
+
+
+def result_dir(name: str, reports_dir: str = REPORTS_DIR) -> str:
+    return os.path.join(reports_dir, name)
+
+
+def baseline_path(name: str, reports_dir: str = REPORTS_DIR) -> str:
+    return os.path.join(result_dir(name, reports_dir), "baseline.json")
+
+
+def save_result(result: dict, reports_dir: str = REPORTS_DIR) -> str:
+    """Write result as <timestamp>.json; never replaces an earlier result from the same second"""
+    directory = result_dir(result["name"], reports_dir)
+    os.makedirs(directory, exist_ok=True)
+    stamp = result["created_at"][:19].replace(":", "").replace("-", "")
+    suffix = 0
+    while True:
+        path = os.path.join(directory, f"{stamp}-{suffix}.json" if suffix else f"{stamp}.json")
+        try:
+            # Exclusive create, so two savers racing for one name cannot both win
+            with open(path, "x") as f:
+                json.dump(result, f, indent=2)
+                f.write("\n")
+            return path
+        except FileExistsError:
+            suffix += 1
+
+
+def load_result(path: str) -> dict:
+    with open(path) as f:
+        result = json.load(f)
+    if result.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark schema {result.get('schema_version')!r}")
+    return result
+
+
+def write_json(path: str, data: dict):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    max_p95_increase: float = 0.2,
+    max_throughput_drop: float = 0.2,
+    min_requests: int = 20,
+    max_error_rate_increase: float = 0.01,
+) -> dict:
+    """
+    Compare current with baseline endpoint by endpoint. Endpoints the
+    baseline measured fewer than min_requests times are skipped, since their
+    p95 is noise. An endpoint missing from the current run, or measured
+    fewer than min_requests times there, is a regression: whatever stopped
+    it being exercised would otherwise pass the gate. The error rate may
+    rise by at most max_error_rate_increase (absolute, 0.01 = one point).
+    Returns the per-endpoint rows, the regressions among them, and warnings
+    about anything that makes the comparison less trustworthy.
+    """
+    rows: List[dict] = []
+    regressions: List[dict] = []
+    warnings: List[str] = []
+
+    for field in RUN_FIELDS:
+        if baseline["run"].get(field) != current["run"].get(field):
+            warnings.append(
+                f"run setting '{field}' differs: baseline {baseline['run'].get(field)!r}, "
+                f"current {current['run'].get(field)!r}"
+            )
+    for field in ("hostname", "cpu_count", "base_url"):
+        if baseline["environment"].get(field) != current["environment"].get(field):
+            warnings.append(f"environment '{field}' differs from the baseline")
+
+    for endpoint, before in sorted(baseline["endpoints"].items()):
+        if before["requests"] < min_requests:
+            continue
+        after = current["endpoints"].get(endpoint)
+        if after is None:
+            after = dict.fromkeys(ENDPOINT_FIELDS, 0)
+        row = {
+            "endpoint": endpoint,
+            "requests_before": before["requests"],
+            "requests_after": after["requests"],
+            "p95_before": before["p95_ms"],
+            "p95_after": after["p95_ms"],
+            "p95_change": relative_change(before["p95_ms"], after["p95_ms"]),
+            "rps_before": before["throughput_rps"],
+            "rps_after": after["throughput_rps"],
+            "rps_change": relative_change(before["throughput_rps"], after["throughput_rps"]),
+            "error_rate_before": error_rate(before),
+            "error_rate_after": error_rate(after),
+            "failed": [],
+        }
+        if endpoint not in current["endpoints"]:
+            row["failed"].append("missing")
+        elif after["requests"] < min_requests:
+            row["failed"].append("samples")
+        elif row["p95_change"] > max_p95_increase:
+            row["failed"].append("p95")
+        if -row["rps_change"] > max_throughput_drop:
+            row["failed"].append("throughput")
+        if row["error_rate_after"] - row["error_rate_before"] > max_error_rate_increase:
+            row["failed"].append("errors")
+        rows.append(row)
+        if row["failed"]:
+            regressions.append(row)
+
+    for endpoint in sorted(set(current["endpoints"]) - set(baseline["endpoints"])):
+        warnings.append(f"{endpoint}: not in the baseline")
+
+    return {"rows": rows, "regressions": regressions, "warnings": warnings}
+
+
+def error_rate(row: dict) -> float:
+    return row["errors"] / row["requests"] if row["requests"] else 0.0
+
+
+def relative_change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before
+
+
+def format_comparison(comparison: Dict[str, list]) -> str:
+    header = (
+        f"{'Endpoint':<48} {'Reqs base':>9} {'Reqs now':>9} {'p95 base':>9} {'p95 now':>9} {'Δp95':>7} "
+        f"{'RPS base':>9} {'RPS now':>9} {'ΔRPS':>7} {'Err base':>8} {'Err now':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in comparison["rows"]:
+        marker = " ❌ " + ",".join(row["failed"]) if row["failed"] else ""
+        lines.append(
+            f"{row['endpoint']:<48} {row['requests_before']:>9} {row['requests_after']:>9} "
+            f"{row['p95_before']:>9} {row['p95_after']:>9} {row['p95_change']:>+7.0%} "
+            f"{row['rps_before']:>9} {row['rps_after']:>9} {row['rps_change']:>+7.0%} "
+            f"{row['error_rate_before']:>8.1%} {row['error_rate_after']:>8.1%}{marker}"
+        )
+    for warning in comparison["warnings"]:
+        lines.append(f"⚠️ {warning}")
+    return "\n".join(lines)
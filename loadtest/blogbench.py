@@ -0,0 +1,254 @@
+"""
+Blog listing and search benchmark across corpus sizes.
+
+BlogController.getPublicPosts and getAdminPosts page with skip/limit, count
+the whole match with countDocuments, and search with an unanchored,
+case-insensitive $regex on title, which no index can serve. For every
+corpus size the blog_posts collection is topped up with seeddata, then each
+query shape is timed over HTTP, and the same find and count are explained in
+Mongo to show how many keys and documents each one examines. Deep pages
+cost more because the skipped documents are still walked; searches cost
+more because every title is tested.
+"""
+
+import asyncio
+import os
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import pymongo
+
+from api_client.async_client import AsyncApiClient
+from api_client.response import ApiError
+from loadtest.config import REPORTS_ROOT
+from loadtest.scaling import count_documents, timed_call
+from loadtest.svgchart import format_number, html_page, html_table, line_chart
+from seeddata.generators import SeedContext, category_slug, default_until
+from seeddata.seeder import plan_counts, run_seed
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 500_000]
+REPORTS_DIR = os.path.join(REPORTS_ROOT, "blog")
+# Page parameter replaced by the last page reported by a first-page call
+LAST_PAGE = "last"
+PUBLIC_LIMIT = 12
+ADMIN_LIMIT = 20
+# A word seeddata puts in titles, and one it never does
+SEARCH_HIT = "protein"
+SEARCH_MISS = "zzz-no-such-title"
+
+
+@dataclass
+class QueryShape:
+    name: str
+    admin: bool
+    params: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def path(self) -> str:
+        return "/api/blog/admin/posts" if self.admin else "/api/blog/posts"
+
+
+SHAPES = [
+    QueryShape("public_page_1", False),
+    QueryShape("public_page_last", False, {"page": LAST_PAGE}),
+    QueryShape("public_search_hit", False, {"search": SEARCH_HIT}),
+    QueryShape("public_search_miss", False, {"search": SEARCH_MISS}),
+    QueryShape("public_category", False, {"category": category_slug(0)}),
+    QueryShape("public_category_last", False, {"category": category_slug(0), "page": LAST_PAGE}),
+    QueryShape("admin_page_1", True),
+    QueryShape("admin_page_last", True, {"page": LAST_PAGE}),
+    QueryShape("admin_search_hit", True, {"search": SEARCH_HIT}),
+]
+SHAPE_NAMES = [shape.name for shape in SHAPES]
+
+
+def blog_query(admin: bool, params: Dict[str, str], now: datetime) -> Tuple[dict, dict, int, int]:
+    """(filter, sort, skip, limit) exactly as BlogController builds them"""
+    limit = int(params.get("limit", ADMIN_LIMIT if admin else PUBLIC_LIMIT))
+    skip = (int(params.get("page", 1)) - 1) * limit
+    if admin:
+        query: Dict[str, Any] = {}
+        if params.get("status") and params["status"] != "all":
+            query["status"] = params["status"]
+        sort = {"created_at": -1}
+    else:
+        query = {
+            "status": "published",
+            "$or": [
+                {"scheduled_date": {"$exists": False}},
+                {"scheduled_date": None},
+                {"scheduled_date": {"$lte": now}},
+            ],
+        }
+        if params.get("tag"):
+            query["tags"] = {"$in": [params["tag"]]}
+        sort = {"publish_date": -1}
+    if params.get("category"):
+        query["category_slug"] = params["category"]
+    if params.get("search"):
+        query["title"] = {"$regex": params["search"], "$options": "i"}
+    return query, sort, skip, limit
+
+
+def plan_stages(plan: dict) -> str:
+    """Winning plan as a stage chain, e.g. LIMIT <- SKIP <- FETCH <- IXSCAN(status_1_publish_date_-1)"""
+    plan = plan.get("queryPlan", plan)
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        children = plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else [])
+        plan = children[0] if children else None
+    return " <- ".join(stages)
+
+
+def explain_summary(explained: dict) -> dict:
+    stats = explained.get("executionStats", {})
+    return {
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "mongo_ms": stats.get("executionTimeMillis"),
+        "plan": plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {})),
+    }
+
+
+def explain_shape(db, query: dict, sort: dict, skip: int, limit: int) -> Dict[str, dict]:
+    """
+    executionStats for the page query and for the count. countDocuments runs
+    as an aggregation; the equivalent count command examines the same
+    documents and explains more simply.
+    """
+    find = db.command("explain", {
+        "find": "blog_posts", "filter": query, "sort": sort, "skip": skip, "limit": limit,
+        "projection": {"_id": 0},
+    }, verbosity="executionStats")
+    count = db.command("explain", {"count": "blog_posts", "query": query}, verbosity="executionStats")
+    return {"find": explain_summary(find), "count": explain_summary(count)}
+
+
+def resolve_params(shape: QueryShape, total_pages: Optional[int]) -> Dict[str, str]:
+    params = dict(shape.params)
+    if params.get("page") == LAST_PAGE:
+        params["page"] = str(max(total_pages or 1, 1))
+    return params
+
+
+async def measure_shape(client: AsyncApiClient, db, shape: QueryShape, size: int, repeats: int) -> dict:
+    auth = "admin" if shape.admin else None
+    first_page = {key: value for key, value in shape.params.items() if key != "page"}
+    # Also warms the Mongo cache for this shape
+    probe = await timed_call(client, shape.path, None, params=first_page, auth=auth)
+    pagination = probe["pagination"] or {}
+    params = resolve_params(shape, pagination.get("totalPages"))
+
+    calls = [await timed_call(client, shape.path, None, params=params, auth=auth) for _ in range(repeats)]
+    ok = sorted(call["latency_ms"] for call in calls if not call["error"])
+    query, sort, skip, limit = blog_query(shape.admin, params, datetime.now(timezone.utc))
+    explained = await asyncio.to_thread(explain_shape, db, query, sort, skip, limit)
+    return {
+        "shape": shape.name,
+        "size": size,
+        "params": params,
+        "matched": pagination.get("totalPosts"),
+        "calls": len(calls),
+        "errors": sorted({call["error"] for call in calls if call["error"]}),
+        "p50_ms": round(statistics.median(ok), 1) if ok else None,
+        "p95_ms": round(ok[min(len(ok) - 1, int(len(ok) * 0.95))], 1) if ok else None,
+        "explain": explained,
+    }
+
+
+async def run_blog_benchmark(
+    base_url: str,
+    mongo_url: str,
+    db_name: str,
+    sizes: List[int],
+    shape_names: List[str],
+    repeats: int = 10,
+    seed: int = 42,
+    workers: int = 1,
+    timeout: float = 60.0,
+) -> dict:
+    shapes = [shape for shape in SHAPES if shape.name in shape_names]
+    until = default_until()
+    mongo = pymongo.MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db = mongo[db_name]
+    rows: List[dict] = []
+    try:
+        async with AsyncApiClient(base_url, timeout=timeout, pool_size=1) as client:
+            if any(shape.admin for shape in shapes):
+                login = await client.login()
+                if login.status_code != 200:
+                    raise ApiError(f"Admin login failed with HTTP {login.status_code}", login)
+            for size in sorted(sizes):
+                counts = plan_counts(0, {"blog_posts": size})
+                collections = ["blog_categories", "blog_tags", "blog_posts"]
+                print(f"🌱 Topping up blog_posts to {size:,} documents")
+                ctx = SeedContext(seed=seed, until=until, counts=counts)
+                await asyncio.to_thread(run_seed, mongo_url, db_name, ctx, collections, 1000, workers)
+                counted = await asyncio.to_thread(count_documents, mongo_url, db_name, ["blog_posts"])
+                documents = counted["blog_posts"]
+                for shape in shapes:
+                    row = await measure_shape(client, db, shape, size, repeats)
+                    row["documents"] = documents
+                    rows.append(row)
+                    print(format_row(row))
+    finally:
+        mongo.close()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": base_url,
+        "sizes": sorted(sizes),
+        "repeats": repeats,
+        "rows": rows,
+    }
+
+
+def format_row(row: dict) -> str:
+    find = row["explain"]["find"]
+    p50 = f"{row['p50_ms']:.0f} ms" if row["p50_ms"] is not None else "failed"
+    return (f"  {row['shape']:<22}{format_number(row['size']):>6}  p50 {p50:>9}  "
+            f"docs {find['docs_examined']:>9,}  keys {find['keys_examined']:>9,}  {find['plan']}")
+
+
+def render_html(result: dict) -> str:
+    rows = result["rows"]
+    shapes = list(dict.fromkeys(row["shape"] for row in rows))
+
+    def series(value):
+        return {
+            shape: [(row["size"], value(row)) for row in rows if row["shape"] == shape and value(row) is not None]
+            for shape in shapes
+        }
+
+    charts = [
+        line_chart("Median latency", series(lambda row: row["p50_ms"]), "posts", "ms", log_x=True, log_y=True),
+        line_chart("Documents examined by the page query",
+                   series(lambda row: row["explain"]["find"]["docs_examined"]), "posts", "documents",
+                   log_x=True, log_y=True),
+        line_chart("Documents examined by the count",
+                   series(lambda row: row["explain"]["count"]["docs_examined"]), "posts", "documents",
+                   log_x=True, log_y=True),
+    ]
+    table = html_table(
+        ["Shape", "Posts", "Params", "Matched", "p50 ms", "p95 ms", "Find docs/keys", "Find plan",
+         "Count docs/keys", "Count plan"],
+        [
+            [row["shape"], f"{row['documents']:,}", " ".join(f"{k}={v}" for k, v in row["params"].items()),
+             row["matched"] if row["matched"] is not None else "-",
+             row["p50_ms"] or "-", row["p95_ms"] or "-",
+             f"{row['explain']['find']['docs_examined']}/{row['explain']['find']['keys_examined']}",
+             row["explain"]["find"]["plan"],
+             f"{row['explain']['count']['docs_examined']}/{row['explain']['count']['keys_examined']}",
+             row["explain"]["count"]["plan"]]
+            for row in rows
+        ],
+        bad_rows=[bool(row["errors"]) for row in rows],
+    )
+    return html_page(f"Blog listing and search ({result['generated_at'][:10]})", [*charts, table])
@@ -0,0 +1,69 @@
+"""
+Closed-loop load: a fixed number of virtual users, each running flows
+back to back for the duration of the test.
+"""
+
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from loadtest.flows import FLOWS, Session
+from loadtest.stats import LoadStats
+
+
+async def virtual_user(
+    index: int,
+    http: httpx.AsyncClient,
+    stats: LoadStats,
+    flow_names: List[str],
+    start_delay: float,
+    stop_at: float,
+):
+    await asyncio.sleep(start_delay)
+    session = Session(http, stats)
+    # Offset each user's starting flow so the mix is even from the first second
+    position = index
+    while time.monotonic() < stop_at:
+        flow = FLOWS[flow_names[position % len(flow_names)]]
+        position += 1
+        await flow(session)
+
+
+async def run_closed_model(
+    base_url: str,
+    users: int,
+    ramp_up: float,
+    duration: float,
+    flow_names: List[str],
+    timeout: float = 15.0,
+) -> dict:
+    """
+    Start `users` virtual users spread evenly over `ramp_up` seconds and let
+    them run until `duration` seconds after the first one started.
+    """
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http:
+        started = time.monotonic()
+        stop_at = started + duration
+        await asyncio.gather(*(
+            virtual_user(
+                index, http, stats, flow_names,
+                start_delay=ramp_up * index / users,
+                stop_at=stop_at,
+            )
+            for index in range(users)
+        ))
+        elapsed = time.monotonic() - started
+
+    return {
+        "mode": "closed",
+        "base_url": base_url,
+        "users": users,
+        "ramp_up_s": ramp_up,
+        "duration_s": round(elapsed, 2),
+        "flows": flow_names,
+        "endpoints": stats.report(elapsed),
+    }
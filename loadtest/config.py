@@ -0,0 +1,11 @@
+"""
+Shared settings for the load harness
+"""
+
+import os
+
+from api_client.config import ADMIN_EMAIL, ADMIN_PASSWORD, get_backend_url  # noqa: F401
+
+# Every report and the trend store live under the repository's test_reports/,
+# wherever the harness is started from
+REPORTS_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_reports')
@@ -0,0 +1,328 @@
+"""
+Async versions of the request flows from comprehensive_backend_test.py and
+backend/tests/refactored_backend_test.py.
+
+Each flow takes a Session and issues the same requests, with the same
+payloads and accepted status codes, as the blocking test functions. Test
+identities are made unique per call so concurrent users do not collide.
+"""
+
+import itertools
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+import httpx
+
+from loadtest.config import ADMIN_EMAIL, ADMIN_PASSWORD
+from loadtest.stats import LoadStats
+
+_sequence = itertools.count(1)
+
+
+def unique_email(prefix: str) -> str:
+    return f"{prefix}.{os.getpid()}.{next(_sequence)}.{int(time.time() * 1000)}@example.com"
+
+
+class Session:
+    """
+    One virtual user's view of the backend: a shared pooled HTTP client, the
+    stats sink, and the admin token obtained on first use.
+    """
+
+    def __init__(self, http: httpx.AsyncClient, stats: LoadStats):
+        self.http = http
+        self.stats = stats
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        expect: Iterable[int] = (200, 201),
+        label: Optional[str] = None,
+        intended_start: Optional[float] = None,
+        json_reply: bool = False,
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        """
+        Send a request and record its latency under 'METHOD path'. When
+        intended_start (a time.perf_counter() value) is given, latency is
+        measured from that moment rather than from when the send happened.
+        With json_reply, a 2xx reply whose body is not JSON (an HTML page
+        from a proxy, an empty body) is recorded as an 'invalid_json' error
+        and None is returned, as for a failed send.
+        """
+        endpoint = label or f"{method} {path}"
+        started = time.perf_counter() if intended_start is None else intended_start
+        try:
+            response = await self.http.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(endpoint, (time.perf_counter() - started) * 1000, type(e).__name__, False)
+            return None
+        latency_ms = (time.perf_counter() - started) * 1000
+        status, ok = str(response.status_code), response.status_code in expect
+        if ok and json_reply and 200 <= response.status_code < 300:
+            try:
+                response.json()
+            except ValueError:
+                status, ok = "invalid_json", False
+        self.stats.record(endpoint, latency_ms, status, ok, len(response.content))
+        return None if status == "invalid_json" else response
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    async def ensure_admin(self) -> bool:
+        if self.access_token:
+            return True
+        return await admin_login(self)
+
+
+async def admin_login(session: Session) -> bool:
+    response = await session.request(
+        "POST", "/api/admin/login",
+        json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+        json_reply=True,
+    )
+    if response is None or response.status_code != 200:
+        return False
+    data = response.json()
+    session.access_token = data.get('accessToken')
+    session.refresh_token = data.get('refreshToken')
+    return bool(session.access_token)
+
+
+async def admin_auth_flow(session: Session):
+    """POST /api/admin/login followed by POST /api/admin/refresh"""
+    if not await admin_login(session) or not session.refresh_token:
+        return
+    response = await session.request(
+        "POST", "/api/admin/refresh", json={"refreshToken": session.refresh_token}, json_reply=True,
+    )
+    if response is not None and response.status_code == 200:
+        session.access_token = response.json().get('accessToken', session.access_token)
+
+
+async def admin_reads_flow(session: Session):
+    """GET the admin users, clients and client-users listings"""
+    if not await session.ensure_admin():
+        return
+    for path in ("/api/admin/users", "/api/admin/clients", "/api/admin/client-users"):
+        response = await session.request("GET", path, headers=session.auth_headers())
+        if response is not None and response.status_code == 401:
+            session.access_token = None
+            return
+
+
+def payment_link_payload(email: str) -> dict:
+    return {"name": "Load Test Client", "email": email, "telephone": "+441234567890"}
+
+
+async def payment_link_flow(session: Session):
+    """POST /api/admin/create-payment-link then validate the emailed token"""
+    if not await session.ensure_admin():
+        return
+    response = await session.request(
+        "POST", "/api/admin/create-payment-link",
+        # 500 is returned when only the onboarding email fails to send
+        expect=(200, 500),
+        headers=session.auth_headers(),
+        json=payment_link_payload(unique_email("load.paymentlink")),
+        json_reply=True,
+    )
+    if response is None or response.status_code != 200:
+        return
+    payment_link = response.json().get('paymentLink', '')
+    if 'token=' not in payment_link:
+        return
+    token = payment_link.split('token=')[1].split('&')[0]
+    await session.request("POST", "/api/client/validate-token", json={"token": token})
+
+
+def contact_payload() -> dict:
+    return {
+        "name": "Load Test Contact",
+        "email": unique_email("load.contact"),
+        "phone": "+44 7123 456789",
+        "goals": "weight-loss",
+        "experience": "beginner",
+        "message": "Load test message for contact form capacity testing",
+    }
+
+
+def newsletter_payload() -> dict:
+    return {"email": unique_email("load.newsletter")}
+
+
+def tdee_results_payload() -> dict:
+    """The nested payload format"""
+    return {
+        "email": unique_email("load.tdee"),
+        "joinMailingList": True,
+        "results": {
+            "bmr": 1800,
+            "tdee": 2200,
+            "goalCalories": 1700,
+            "macros": {"protein": 140, "carbs": 170, "fat": 60},
+        },
+        "userInfo": {
+            "age": 30,
+            "gender": "male",
+            "weight": "80kg",
+            "height": "180cm",
+            "activityLevel": "1.55",
+            "goal": "lose",
+        },
+    }
+
+
+async def contact_flow(session: Session):
+    """POST /api/contact (500 is accepted when Graph email delivery is not configured)"""
+    await session.request("POST", "/api/contact", expect=(200, 201, 500), json=contact_payload())
+
+
+async def newsletter_flow(session: Session):
+    """POST /api/newsletter/subscribe"""
+    await session.request("POST", "/api/newsletter/subscribe", json=newsletter_payload())
+
+
+async def tdee_results_flow(session: Session):
+    """POST /api/tdee-results with the nested payload format"""
+    await session.request("POST", "/api/tdee-results", expect=(200, 201, 500), json=tdee_results_payload())
+
+
+def purchase_payload(email: str, payment_method_id: str = "pm_test_12345") -> dict:
+    """The body backend/tests/test_public_purchase.py sends"""
+    return {
+        "packageId": "nutrition-only",
+        "paymentMethodId": payment_method_id,
+        "clientInfo": {
+            "name": "Load Test Purchaser",
+            "email": email,
+            "phone": "+44 7123 456789",
+            "age": "30",
+            "addressLine1": "123 Test Street",
+            "city": "London",
+            "postcode": "SW1A 1AA",
+            "country": "GB",
+            "goals": ["Lose weight"],
+        },
+        "parqResponses": [
+            {"questionId": "parq-1", "question": "Heart condition?", "answer": "no"}
+        ],
+        "healthResponses": [
+            {"questionId": "health-1", "question": "Current injuries?", "answer": "None"}
+        ],
+        "hasDoctorApproval": False,
+    }
+
+
+async def purchase_flow(session: Session):
+    """POST /api/public/purchase as in backend/tests/test_public_purchase.py"""
+    await session.request(
+        "POST", "/api/public/purchase",
+        # Stripe rejects the test payment method unless it is fully configured
+        expect=(201, 500, 520),
+        json=purchase_payload(unique_email("load.purchase")),
+    )
+
+
+async def onboarding_flow(session: Session):
+    """
+    Payment link, token validation, setup intent and onboarding completion,
+    as in backend_test.py
+    """
+    if not await session.ensure_admin():
+        return
+    email = unique_email("load.onboarding")
+    response = await session.request(
+        "POST", "/api/admin/create-payment-link",
+        expect=(200, 201, 500),
+        headers=session.auth_headers(),
+        json={"name": "Load Test Onboarding", "email": email, "phone": "+44 7700 900123",
+              "price": 125, "billingDay": 1},
+        json_reply=True,
+    )
+    if response is None or response.status_code == 401:
+        session.access_token = None
+        return
+    payment_link = response.json().get('paymentLink', '') if response.status_code in (200, 201) else ''
+    if 'token=' not in payment_link:
+        return
+    token = payment_link.split('token=')[1].split('&')[0]
+    await session.request("POST", "/api/client/validate-token", json={"token": token})
+    await session.request("POST", "/api/client/create-setup-intent", expect=(200, 500), json={"email": email})
+    await session.request(
+        "POST", "/api/client/complete-onboarding",
+        expect=(200, 400, 500),
+        json={"token": token, "paymentMethodId": "pm_card_visa"},
+    )
+
+
+IMPORT_BATCH = 5
+
+
+async def import_flow(session: Session):
+    """
+    POST /api/admin/import-customers/save with a batch of new customers. Each
+    one gets a password setup email and a payment method request, sent one
+    after another, so this flow is dominated by Graph latency.
+    """
+    if not await session.ensure_admin():
+        return
+    customers = [
+        {
+            "email": unique_email("load.import"),
+            "name": "Load Test Import",
+            "customer_id": f"cus_load{next(_sequence)}",
+            "status": "active",
+            "subscription_status": "active",
+            "hasPaymentMethod": False,
+        }
+        for _ in range(IMPORT_BATCH)
+    ]
+    response = await session.request(
+        "POST", "/api/admin/import-customers/save",
+        headers=session.auth_headers(),
+        json={"customers": customers},
+    )
+    if response is not None and response.status_code == 401:
+        session.access_token = None
+
+
+async def health_flow(session: Session):
+    """GET /api/health"""
+    await session.request("GET", "/api/health")
+
+
+Flow = Callable[[Session], Awaitable[None]]
+
+FLOWS: Dict[str, Flow] = {
+    "admin_auth": admin_auth_flow,
+    "admin_reads": admin_reads_flow,
+    "payment_link": payment_link_flow,
+    "contact": contact_flow,
+    "newsletter": newsletter_flow,
+    "tdee_results": tdee_results_flow,
+    "purchase": purchase_flow,
+    "onboarding": onboarding_flow,
+    "import": import_flow,
+    "health": health_flow,
+}
+
+# Public read endpoints exercised by backend/tests/test_join_now_purchase.py
+PUBLIC_TARGETS: Dict[str, str] = {
+    "packages": "/api/public/packages",
+    "parq_questions": "/api/public/parq-questions?packageId=pt-with-nutrition",
+    "health_questions": "/api/public/health-questions?packageId=pt-with-nutrition",
+    "cancellation_policy": "/api/cancellation-policy",
+    "terms_of_service": "/api/terms-of-service",
+    "privacy_policy": "/api/privacy-policy",
+    "cookie_policy": "/api/cookie-policy",
+}
+
+DEFAULT_FLOWS = ["admin_auth", "payment_link", "contact", "newsletter", "tdee_results"]
+
+SOAK_FLOWS = ["purchase", "onboarding"]
@@ -0,0 +1,103 @@
+"""
+HDR-style log-linear latency histogram.
+
+Values (integer microseconds) below `sub_bucket_count` are counted exactly.
+Above that, each power-of-two range is split into `sub_bucket_count / 2`
+linear sub-buckets, so every recorded value is kept to within
+1 / (sub_bucket_count / 2) relative error regardless of magnitude.
+With the default 2 significant digits that is under 1%.
+
+Counts are stored sparsely by bucket index, which makes histograms cheap to
+serialise to JSON and exact to merge across runs and processes.
+"""
+
+import math
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    def __init__(self, significant_digits: int = 2):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.significant_digits = significant_digits
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.min_value: Optional[int] = None
+        self.max_value = 0
+        self._sum = 0
+
+    def _index_for(self, value: int) -> int:
+        if value < self.sub_bucket_count:
+            return value
+        exponent = value.bit_length() - self.sub_bucket_bits
+        mantissa = value >> exponent
+        return self.sub_bucket_count + (exponent - 1) * self.sub_bucket_half + (mantissa - self.sub_bucket_half)
+
+    def _bounds_for(self, index: int):
+        """Lowest and highest value that map to a bucket index"""
+        if index < self.sub_bucket_count:
+            return index, index
+        offset = index - self.sub_bucket_count
+        exponent = offset // self.sub_bucket_half + 1
+        mantissa = offset % self.sub_bucket_half + self.sub_bucket_half
+        low = mantissa << exponent
+        return low, low + (1 << exponent) - 1
+
+    def record(self, value_us: float, count: int = 1):
+        value = max(0, int(value_us))
+        index = self._index_for(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self._sum += value * count
+        self.max_value = max(self.max_value, value)
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+
+    def merge(self, other: 'LatencyHistogram'):
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self._sum += other._sum
+        self.max_value = max(self.max_value, other.max_value)
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+
+    def value_at_percentile(self, pct: float) -> int:
+        """Highest equivalent value of the bucket holding the given percentile"""
+        if not self.total_count:
+            return 0
+        target = max(1, math.ceil(pct / 100 * self.total_count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._bounds_for(index)[1], self.max_value)
+        return self.max_value
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total_count if self.total_count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "significant_digits": self.significant_digits,
+            "total_count": self.total_count,
+            "min": self.min_value,
+            "max": self.max_value,
+            "sum": self._sum,
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        histogram = cls(data["significant_digits"])
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.total_count = data["total_count"]
+        histogram.min_value = data["min"]
+        histogram.max_value = data["max"]
+        histogram._sum = data["sum"]
+        return histogram
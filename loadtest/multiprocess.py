@@ -0,0 +1,114 @@
+"""
+Multi-process load driver.
+
+One Python process saturates a single core long before the backend behind
+nginx is saturated. The coordinator forks N worker processes, splits the
+target load between them, releases them together through a barrier, and
+merges their histograms and error counts into a single report.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import time
+from typing import Dict, List
+
+from loadtest.closed_model import run_closed_model
+from loadtest.open_model import run_open_model
+from loadtest.stats import LoadStats
+
+RUNNERS = {
+    "closed": run_closed_model,
+    "open": run_open_model,
+}
+
+
+def split_load(mode: str, options: dict, processes: int) -> List[dict]:
+    """Divide users (closed) or arrival rate (open) between worker processes"""
+    shares = []
+    for index in range(processes):
+        share = dict(options)
+        if mode == "closed":
+            users = options["users"] // processes + (1 if index < options["users"] % processes else 0)
+            if users == 0:
+                continue
+            share["users"] = users
+        else:
+            share["rate"] = options["rate"] / processes
+            # Interleave the workers' schedules instead of firing in lockstep
+            share["phase"] = index / options["rate"]
+        shares.append(share)
+    return shares
+
+
+def _worker(index: int, mode: str, options: dict, barrier, results):
+    try:
+        barrier.wait(timeout=60)
+        result = asyncio.run(RUNNERS[mode](**options))
+        results.put((index, result, None))
+    except Exception as e:
+        results.put((index, None, f"{type(e).__name__}: {e}"))
+
+
+def run_distributed(mode: str, options: dict, processes: int) -> dict:
+    shares = split_load(mode, options, processes)
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    barrier = context.Barrier(len(shares))
+    results = context.Queue()
+
+    workers = [
+        context.Process(target=_worker, args=(index, mode, share, barrier, results), daemon=True)
+        for index, share in enumerate(shares)
+    ]
+    started = time.time()
+    for worker in workers:
+        worker.start()
+
+    worker_results: Dict[int, dict] = {}
+    worker_errors: Dict[int, str] = {}
+    # Leave room for ramp-up, request timeouts and the barrier on top of the test itself
+    deadline = started + options["duration"] + options.get("ramp_up", 0) + options["timeout"] + 120
+    while len(worker_results) + len(worker_errors) < len(workers):
+        try:
+            index, result, error = results.get(timeout=max(1.0, deadline - time.time()))
+        except queue.Empty:
+            break
+        if error:
+            worker_errors[index] = error
+        else:
+            worker_results[index] = result
+    for index in range(len(workers)):
+        if index not in worker_results and index not in worker_errors:
+            worker_errors[index] = "no result before deadline"
+
+    for worker in workers:
+        worker.join(timeout=5)
+        if worker.is_alive():
+            worker.terminate()
+
+    stats = LoadStats()
+    for result in worker_results.values():
+        stats.merge(LoadStats.from_report(result["endpoints"]))
+    duration = max((result["duration_s"] for result in worker_results.values()), default=0.0)
+
+    merged = {
+        "mode": mode,
+        "base_url": options["base_url"],
+        "processes": len(workers),
+        "duration_s": duration,
+        "worker_errors": {str(index): error for index, error in sorted(worker_errors.items())},
+        "endpoints": stats.report(duration),
+    }
+    if mode == "closed":
+        merged.update(users=options["users"], ramp_up_s=options["ramp_up"], flows=options["flow_names"])
+    else:
+        merged.update(
+            target_rate_rps=options["rate"],
+            targets=options["target_names"],
+            scheduled=sum(result["scheduled"] for result in worker_results.values()),
+            dropped=sum(result["dropped"] for result in worker_results.values()),
+            max_scheduler_lag_ms=max(
+                (result["max_scheduler_lag_ms"] for result in worker_results.values()), default=0.0
+            ),
+        )
+    return merged
@@ -0,0 +1,83 @@
+"""
+Open-model load: requests are fired at a constant arrival rate no matter
+how long earlier requests take.
+
+A closed loop slows down when the server stalls and so under-reports the
+stall (coordinated omission). Here every request has an intended send time
+on a fixed schedule, and its latency is measured from that intended time,
+so any queueing delay caused by a stall is charged to the requests that
+should have been sent during it.
+"""
+
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from loadtest.flows import PUBLIC_TARGETS, Session
+from loadtest.stats import LoadStats
+
+
+async def run_open_model(
+    base_url: str,
+    rate: float,
+    duration: float,
+    target_names: List[str],
+    max_in_flight: int = 1000,
+    timeout: float = 15.0,
+    phase: float = 0.0,
+) -> dict:
+    """
+    Send `rate` requests per second for `duration` seconds, cycling through
+    the named PUBLIC_TARGETS. Arrivals that would exceed max_in_flight are
+    counted as dropped rather than delayed. `phase` shifts the schedule so
+    several processes sharing a rate can interleave their arrivals.
+    """
+    stats = LoadStats()
+    paths = [PUBLIC_TARGETS[name] for name in target_names]
+    interval = 1.0 / rate
+    total = int(rate * duration)
+    in_flight = set()
+    dropped = 0
+    max_lag = 0.0
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http:
+        session = Session(http, stats)
+        started = time.perf_counter()
+
+        for sequence in range(total):
+            intended = started + phase + sequence * interval
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+
+            if len(in_flight) >= max_in_flight:
+                dropped += 1
+                continue
+
+            path = paths[sequence % len(paths)]
+            task = asyncio.create_task(
+                session.request("GET", path, label=f"GET {path.split('?')[0]}", intended_start=intended)
+            )
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": "open",
+        "base_url": base_url,
+        "target_rate_rps": rate,
+        "duration_s": round(elapsed, 2),
+        "scheduled": total,
+        "dropped": dropped,
+        "max_scheduler_lag_ms": round(max_lag * 1000, 2),
+        "targets": target_names,
+        "endpoints": stats.report(elapsed),
+    }
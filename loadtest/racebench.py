@@ -0,0 +1,336 @@
+"""
+Concurrent duplicate-purchase race.
+
+PublicController.handlePurchase and AdminController.createPaymentLink both
+check for an existing client with findOne, then create the Stripe customer
+(and, for a purchase, attach the card and start the subscription), and only
+then insert the client. The unique index on clients.email stops a second
+client document, but only after Stripe has been called, so two requests for
+the same email that pass the findOne together each create a customer and a
+purchase each starts a subscription. backend/tests/test_public_purchase.py
+checks the sequential case only.
+
+Each scenario fires bursts of simultaneous requests, either all for one
+email or each for its own. Before every burst one GET /api/health per
+request runs concurrently, which leaves that many keep-alive connections
+open in the pool; the burst is released only then, so TCP handshakes don't
+spread it out.
+Afterwards the benchmark asks Stripe (or the stand-in) how many customers
+and subscriptions exist for each email, and Mongo how many clients and
+client users. Anything beyond one per email slipped through the check.
+"""
+
+import asyncio
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+import pymongo
+
+from api_client.response import ApiError
+from loadtest.config import REPORTS_ROOT
+from loadtest.flows import Session, admin_login, payment_link_payload, purchase_payload, unique_email
+from loadtest.stats import LoadStats
+from loadtest.svgchart import html_page, html_table, line_chart
+
+DEFAULT_LEVELS = [10, 100, 500]
+REPORTS_DIR = os.path.join(REPORTS_ROOT, "race")
+PURCHASE = "POST /api/public/purchase"
+PAYMENT_LINK = "POST /api/admin/create-payment-link"
+# scenario -> (request kinds, taken in turn, and whether a burst shares one email)
+SCENARIOS = {
+    "purchase_same": ((PURCHASE,), True),
+    "purchase_distinct": ((PURCHASE,), False),
+    "payment_link_same": ((PAYMENT_LINK,), True),
+    "payment_link_distinct": ((PAYMENT_LINK,), False),
+    "mixed_same": ((PURCHASE, PAYMENT_LINK), True),
+}
+# How the backend words a duplicate the unique index caught after Stripe was called
+INDEX_REJECTION = re.compile(r'E11000|already exists', re.I)
+AUDIT_CONCURRENCY = 20
+
+
+def classify(status: Optional[int], message: str) -> str:
+    if status is None:
+        return "transport_error"
+    if status == 201:
+        return "created"
+    if status == 409:
+        return "conflict"
+    if status == 500 and INDEX_REJECTION.search(message or ""):
+        return "index_rejected"
+    return f"http_{status}"
+
+
+async def fire(
+    http: httpx.AsyncClient,
+    stats: LoadStats,
+    label: str,
+    email: str,
+    admin_token: Optional[str],
+    payment_method: str,
+    go: asyncio.Event,
+) -> dict:
+    if label == PURCHASE:
+        path, body, headers = "/api/public/purchase", purchase_payload(email, payment_method), None
+    else:
+        path = "/api/admin/create-payment-link"
+        body, headers = payment_link_payload(email), {"Authorization": f"Bearer {admin_token}"}
+    await go.wait()
+    response = await Session(http, stats).request(
+        "POST", path, expect=(201, 409), label=label, json=body, headers=headers,
+    )
+    message = ""
+    if response is not None:
+        try:
+            message = response.json().get("message", "")
+        except ValueError:
+            message = response.text[:200]
+    status = response.status_code if response is not None else None
+    return {"label": label, "email": email, "status": status, "outcome": classify(status, message)}
+
+
+async def open_connections(http: httpx.AsyncClient, count: int):
+    """
+    Leave `count` open keep-alive connections in the pool. The requests run
+    concurrently, so each needs its own connection. This runs before every
+    burst because the backend closes idle connections after a few seconds,
+    and the audit between scenarios takes longer than that.
+    """
+    await asyncio.gather(*(http.get("/api/health") for _ in range(count)), return_exceptions=True)
+
+
+async def run_burst(
+    http: httpx.AsyncClient,
+    stats: LoadStats,
+    scenario: str,
+    concurrency: int,
+    admin_token: Optional[str],
+    payment_method: str,
+) -> tuple:
+    """(outcomes, wall seconds) for `concurrency` requests released at the same moment"""
+    kinds, same_email = SCENARIOS[scenario]
+    await open_connections(http, concurrency)
+    shared = unique_email(f"race.{scenario}")
+    go = asyncio.Event()
+    tasks = [
+        asyncio.create_task(fire(
+            http, stats, kinds[index % len(kinds)], shared if same_email else unique_email(f"race.{scenario}"),
+            admin_token, payment_method, go,
+        ))
+        for index in range(concurrency)
+    ]
+    # Let every task build its request and park on the event first
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    go.set()
+    outcomes = await asyncio.gather(*tasks)
+    return outcomes, time.perf_counter() - started
+
+
+class StripeAudit:
+    """Counts customers and subscriptions per email through the Stripe API"""
+
+    def __init__(self, api_base: str, api_key: str, timeout: float = 30.0):
+        self.http = httpx.AsyncClient(base_url=api_base, timeout=timeout,
+                                      headers={"Authorization": f"Bearer {api_key}"})
+
+    async def list_all(self, path: str, params: Dict[str, str]) -> List[dict]:
+        items: List[dict] = []
+        while True:
+            response = await self.http.get(path, params={**params, "limit": "100"})
+            response.raise_for_status()
+            page = response.json()
+            items.extend(page["data"])
+            if not page.get("has_more") or not page["data"]:
+                return items
+            params = {**params, "starting_after": page["data"][-1]["id"]}
+
+    async def counts(self, email: str) -> Dict[str, int]:
+        customers = await self.list_all("/v1/customers", {"email": email})
+        subscriptions = 0
+        for customer in customers:
+            subscriptions += len(await self.list_all(
+                "/v1/subscriptions", {"customer": customer["id"], "status": "all"},
+            ))
+        return {"stripe_customers": len(customers), "stripe_subscriptions": subscriptions}
+
+    async def close(self):
+        await self.http.aclose()
+
+
+def mongo_counts(mongo_url: str, db_name: str, emails: List[str]) -> Dict[str, Dict[str, int]]:
+    client = pymongo.MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        db = client[db_name]
+        counts = {email: {"clients": 0, "client_users": 0} for email in emails}
+        for collection in ("clients", "client_users"):
+            pipeline = [{"$match": {"email": {"$in": emails}}}, {"$group": {"_id": "$email", "n": {"$sum": 1}}}]
+            for row in db[collection].aggregate(pipeline):
+                counts[row["_id"]][collection] = row["n"]
+        return counts
+    finally:
+        client.close()
+
+
+async def audit(emails: List[str], stripe: Optional[StripeAudit], mongo_url: Optional[str], db_name: str) -> dict:
+    per_email: Dict[str, dict] = {email: {} for email in emails}
+    if stripe:
+        slots = asyncio.Semaphore(AUDIT_CONCURRENCY)
+
+        async def one(email):
+            async with slots:
+                per_email[email].update(await stripe.counts(email))
+        await asyncio.gather(*(one(email) for email in emails))
+    if mongo_url:
+        for email, counts in (await asyncio.to_thread(mongo_counts, mongo_url, db_name, emails)).items():
+            per_email[email].update(counts)
+    return per_email
+
+
+def extra(per_email: Dict[str, dict], field: str) -> Optional[int]:
+    """Documents beyond one per email, or None when the field was not audited"""
+    values = [counts[field] for counts in per_email.values() if field in counts]
+    return sum(max(0, value - 1) for value in values) if values else None
+
+
+def summarize(
+    scenario: str,
+    concurrency: int,
+    outcomes: List[dict],
+    burst_seconds: float,
+    per_email: Dict[str, dict],
+    report: Dict[str, dict],
+) -> dict:
+    tally: Dict[str, int] = {}
+    created_per_email: Dict[str, int] = {}
+    for outcome in outcomes:
+        tally[outcome["outcome"]] = tally.get(outcome["outcome"], 0) + 1
+        if outcome["outcome"] == "created":
+            created_per_email[outcome["email"]] = created_per_email.get(outcome["email"], 0) + 1
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(outcomes),
+        "emails": len(per_email),
+        "throughput_rps": round(len(outcomes) / burst_seconds, 2) if burst_seconds else 0.0,
+        "outcomes": dict(sorted(tally.items())),
+        "duplicate_successes": sum(max(0, n - 1) for n in created_per_email.values()),
+        "extra_stripe_customers": extra(per_email, "stripe_customers"),
+        "extra_stripe_subscriptions": extra(per_email, "stripe_subscriptions"),
+        "duplicate_clients": extra(per_email, "clients"),
+        "duplicate_client_users": extra(per_email, "client_users"),
+        "endpoints": report,
+    }
+
+
+async def run_race(
+    base_url: str,
+    levels: List[int],
+    scenario_names: List[str],
+    rounds: int = 3,
+    payment_method: str = "pm_card_visa",
+    stripe_api_base: Optional[str] = None,
+    stripe_key: str = "sk_test_standin",
+    mongo_url: Optional[str] = None,
+    db_name: str = "simonprice_pt_db",
+    timeout: float = 60.0,
+) -> dict:
+    stripe = StripeAudit(stripe_api_base, stripe_key) if stripe_api_base else None
+    rows: List[dict] = []
+    largest = max(levels)
+    limits = httpx.Limits(max_connections=largest, max_keepalive_connections=largest)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http:
+            session = Session(http, LoadStats())
+            if not await admin_login(session):
+                raise ApiError("Admin login failed", None)
+
+            for concurrency in sorted(levels):
+                for scenario in scenario_names:
+                    stats = LoadStats()
+                    outcomes: List[dict] = []
+                    seconds = 0.0
+                    for _ in range(rounds):
+                        burst, elapsed = await run_burst(
+                            http, stats, scenario, concurrency, session.access_token, payment_method,
+                        )
+                        outcomes.extend(burst)
+                        seconds += elapsed
+                    emails = sorted({outcome["email"] for outcome in outcomes})
+                    per_email = await audit(emails, stripe, mongo_url, db_name)
+                    row = summarize(scenario, concurrency, outcomes, seconds, per_email, stats.report(seconds))
+                    rows.append(row)
+                    print(format_row(row))
+    finally:
+        if stripe:
+            await stripe.close()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": base_url,
+        "rounds": rounds,
+        "stripe_audited": stripe is not None,
+        "mongo_audited": mongo_url is not None,
+        "rows": rows,
+    }
+
+
+def slipped(row: dict) -> int:
+    """Duplicates that reached Stripe or the database"""
+    fields = ("extra_stripe_customers", "extra_stripe_subscriptions", "duplicate_clients", "duplicate_client_users")
+    return sum(row[field] or 0 for field in fields)
+
+
+def format_row(row: dict) -> str:
+    p95 = max((endpoint["p95_ms"] for endpoint in row["endpoints"].values()), default=0.0)
+
+    def value(field):
+        return "-" if row[field] is None else row[field]
+
+    outcomes = ", ".join(f"{name} {count}" for name, count in row["outcomes"].items())
+    icon = "❌" if slipped(row) or row["duplicate_successes"] else "✅"
+    return (f"{icon} {row['scenario']:<22} x{row['concurrency']:<4} {row['throughput_rps']:>8} req/s  "
+            f"p95 {p95:>8} ms  customers +{value('extra_stripe_customers')}  "
+            f"subscriptions +{value('extra_stripe_subscriptions')}  clients +{value('duplicate_clients')}  "
+            f"[{outcomes}]")
+
+
+def render_html(result: dict) -> str:
+    rows = result["rows"]
+    scenarios = list(dict.fromkeys(row["scenario"] for row in rows))
+
+    def series(value):
+        return {
+            scenario: [(row["concurrency"], value(row)) for row in rows
+                       if row["scenario"] == scenario and value(row) is not None]
+            for scenario in scenarios
+        }
+
+    def p95(row):
+        return max((endpoint["p95_ms"] for endpoint in row["endpoints"].values()), default=None)
+
+    charts = [
+        line_chart("p95 latency", series(p95), "simultaneous requests", "ms", log_x=True, log_y=True),
+        line_chart("Throughput", series(lambda row: row["throughput_rps"]), "simultaneous requests", "req/s",
+                   log_x=True),
+        line_chart("Extra Stripe customers", series(lambda row: row["extra_stripe_customers"]),
+                   "simultaneous requests", "customers", log_x=True),
+    ]
+    table = html_table(
+        ["Scenario", "Concurrency", "Requests", "Emails", "req/s", "p95 ms", "Outcomes", "Duplicate 201s",
+         "Extra customers", "Extra subscriptions", "Duplicate clients", "Duplicate client users"],
+        [
+            [row["scenario"], row["concurrency"], row["requests"], row["emails"], row["throughput_rps"],
+             p95(row), ", ".join(f"{k} {v}" for k, v in row["outcomes"].items()), row["duplicate_successes"],
+             *("-" if row[field] is None else row[field] for field in (
+                 "extra_stripe_customers", "extra_stripe_subscriptions", "duplicate_clients",
+                 "duplicate_client_users"))]
+            for row in rows
+        ],
+        bad_rows=[bool(slipped(row) or row["duplicate_successes"]) for row in rows],
+    )
+    return html_page(f"Duplicate purchase race ({result['generated_at'][:10]})", [*charts, table])
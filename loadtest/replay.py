@@ -0,0 +1,234 @@
+"""
+Timed replay of an access-log trace.
+
+Placeholders in a trace (see loadtest.accesslog) are bound to documents
+that seeddata generates for the same --seed and sizes, so a replay against
+a seeded database finds the slugs, emails and sections it asks for. The
+n-th distinct blog slug in the trace becomes seeded post n (modulo the
+number of posts), the n-th client address logs in as the n-th seeded client
+user with a password, and so on. Kinds with no seeded counterpart get a
+stable synthetic value and will mostly miss.
+
+Access logs carry no request bodies. Logins and the public forms get valid
+payloads; other writes are sent with an empty JSON body and exercise
+routing and validation only.
+
+Each request is sent at its trace offset divided by the speed, measured
+from the intended send time as in the open model, so a slow backend
+cannot hide queueing by slowing the replay down. At "max" speed requests
+are sent as fast as --max-in-flight allows instead.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from loadtest.accesslog import PLACEHOLDER, route_label
+from loadtest.authbench import seeded_client_logins
+from loadtest.config import ADMIN_EMAIL, ADMIN_PASSWORD
+from loadtest.flows import Session, contact_payload, newsletter_payload, tdee_results_payload
+from loadtest.stats import LoadStats
+from seeddata.generators import (
+    SEED_PASSWORD,
+    WORDS,
+    SeedContext,
+    blog_post,
+    category_slug,
+    person,
+    tag_slug,
+)
+from seeddata.seeder import POLICY_SECTIONS
+
+ADMIN_PREFIXES = ("/api/admin/", "/api/blog/admin/")
+CLIENT_PREFIX = "/api/client/"
+
+
+class Binder:
+    """Seeded values for trace placeholders"""
+
+    def __init__(self, ctx: SeedContext):
+        self.ctx = ctx
+        self.counts = ctx.counts
+        self.client_logins = seeded_client_logins(ctx.seed, max(self.counts.get('client_users', 0), 1))
+        self.cache: Dict[str, str] = {}
+
+    def _modulo(self, collection: str, index: int) -> int:
+        return index % max(self.counts.get(collection, 0), 1)
+
+    def value(self, kind: str, index: int) -> str:
+        key = f"{kind}:{index}"
+        if key not in self.cache:
+            self.cache[key] = self._bind(kind, index)
+        return self.cache[key]
+
+    def _bind(self, kind: str, index: int) -> str:
+        if kind == 'blog_slug':
+            return blog_post(self.ctx, self._modulo('blog_posts', index))['slug']
+        if kind == 'category_slug':
+            return category_slug(self._modulo('blog_categories', index))
+        if kind == 'tag_slug':
+            return tag_slug(self._modulo('blog_tags', index))
+        if kind in ('client_email', 'email'):
+            return person(self.ctx, 'client', self._modulo('clients', index))[1]
+        if kind == 'client_id':
+            return f"cus_seed{self.ctx.seed}x{self._modulo('clients', index)}"
+        if kind == 'section_id':
+            return f"section-seed-{index % POLICY_SECTIONS}"
+        if kind == 'item_id':
+            # Every seeded section has at least two items
+            return f"item-seed-{index % POLICY_SECTIONS}-0"
+        if kind == 'image':
+            return f"seed-{index % 50}.jpg"
+        if kind == 'search':
+            return WORDS[index % len(WORDS)]
+        if kind == 'number':
+            return str(index + 1)
+        digest = hashlib.blake2b(f"{kind}:{index}".encode(), digest_size=16).hexdigest()
+        if kind == 'uuid':
+            return f"{digest[:8]}-{digest[8:12]}-{digest[12:16]}-{digest[16:20]}-{digest[20:]}"
+        if kind in ('object_id', 'user_id', 'package_id', 'question_id'):
+            return digest[:24]
+        return digest
+
+    def fill(self, text: str) -> str:
+        return PLACEHOLDER.sub(lambda m: self.value(m.group('kind'), int(m.group('index'))), text)
+
+    def client_login(self, client: int) -> dict:
+        return {"email": self.client_logins[client % len(self.client_logins)], "password": SEED_PASSWORD}
+
+
+# route label -> payload for a request from trace client n
+BODIES: Dict[str, Callable[[Binder, int], dict]] = {
+    "POST /api/admin/login": lambda binder, client: {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+    "POST /api/client/login": lambda binder, client: binder.client_login(client),
+    "POST /api/contact": lambda binder, client: contact_payload(),
+    "POST /api/newsletter/subscribe": lambda binder, client: newsletter_payload(),
+    "POST /api/tdee-results": lambda binder, client: tdee_results_payload(),
+}
+
+
+def expected_statuses(status: int) -> range:
+    """A replayed request counts as ok when its status is in the same class as the logged one"""
+    first = status - status % 100
+    return range(first, first + 100)
+
+
+def prepare(record: dict, binder: Binder) -> dict:
+    """Method, URL, body and stats label for one trace record"""
+    label = route_label(record["method"], record["path"])
+    request = {
+        "method": record["method"],
+        "path": binder.fill(record["path"]),
+        "params": {key: binder.fill(value) for key, value in record.get("query", {}).items()},
+        "label": label,
+        "expect": expected_statuses(record["status"]),
+    }
+    body = BODIES.get(label)
+    if body is not None:
+        request["json"] = body(binder, record["client"])
+    elif record["method"] in ("POST", "PUT", "PATCH"):
+        request["json"] = {}
+    return request
+
+
+def needs_auth(path: str) -> Optional[str]:
+    if path.startswith(ADMIN_PREFIXES) and not path.endswith(("/login", "/refresh")):
+        return "admin"
+    if path.startswith(CLIENT_PREFIX) and not path.endswith("/login"):
+        return "client"
+    return None
+
+
+async def log_in(http: httpx.AsyncClient, path: str, credentials: dict) -> Optional[str]:
+    try:
+        response = await http.post(path, json=credentials)
+    except httpx.HTTPError:
+        return None
+    return response.json().get("accessToken") if response.status_code == 200 else None
+
+
+async def run_replay(
+    base_url: str,
+    trace_path: str,
+    records: List[dict],
+    binder: Binder,
+    speed: Optional[float],
+    max_in_flight: int = 1000,
+    timeout: float = 15.0,
+) -> dict:
+    """
+    Replay `records` at `speed` times the logged rate, or as fast as
+    max_in_flight allows when speed is None. At a finite speed, arrivals
+    beyond max_in_flight outstanding requests are dropped, not delayed.
+    """
+    stats = LoadStats()
+    in_flight = set()
+    dropped = 0
+    max_lag = 0.0
+    slots = asyncio.Semaphore(max_in_flight)
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http:
+        # Log in before the clock starts so tokens do not distort the timing
+        admin_token = None
+        if any(needs_auth(record["path"]) == "admin" for record in records):
+            admin_token = await log_in(http, "/api/admin/login", BODIES["POST /api/admin/login"](binder, 0))
+        client_tokens: Dict[int, Optional[str]] = {}
+        for client in sorted({record["client"] for record in records if needs_auth(record["path"]) == "client"}):
+            client_tokens[client] = await log_in(http, "/api/client/login", binder.client_login(client))
+
+        session = Session(http, stats)
+
+        async def send(request: dict, token: Optional[str], intended: Optional[float]):
+            try:
+                headers = {"Authorization": f"Bearer {token}"} if token else None
+                await session.request(
+                    request["method"], request["path"], expect=request["expect"], label=request["label"],
+                    intended_start=intended, params=request["params"] or None, json=request.get("json"),
+                    headers=headers,
+                )
+            finally:
+                if speed is None:
+                    slots.release()
+
+        started = time.perf_counter()
+        for record in records:
+            request = prepare(record, binder)
+            auth = needs_auth(record["path"])
+            token = admin_token if auth == "admin" else client_tokens.get(record["client"]) if auth else None
+            intended = None
+            if speed is None:
+                await slots.acquire()
+            else:
+                intended = started + record["t"] / speed
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+                if len(in_flight) >= max_in_flight:
+                    dropped += 1
+                    continue
+            task = asyncio.create_task(send(request, token, intended))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": "replay",
+        "base_url": base_url,
+        "trace": trace_path,
+        "speed": speed if speed is not None else "max",
+        "trace_duration_s": records[-1]["t"] if records else 0.0,
+        "duration_s": round(elapsed, 2),
+        "scheduled": len(records),
+        "dropped": dropped,
+        "max_scheduler_lag_ms": round(max_lag * 1000, 2),
+        "endpoints": stats.report(elapsed),
+    }
@@ -0,0 +1,235 @@
+"""
+Scaling curve for the admin endpoints that return a whole collection.
+
+AdminController.getClients, getClientUsers, getEmails and getUsers each run
+find({}).toArray() and serialise the result, so latency, response size and
+backend memory grow with the collection; getClientUsers also issues one
+findOne per user. For every size in the plan the collections are topped up
+with seeddata, then each endpoint is called a few times while the backend's
+RSS is polled from /proc. An endpoint becomes unusable at the first size
+where its median latency passes the limit or a call fails, and is not
+called at larger sizes.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+import pymongo
+
+from api_client.async_client import AsyncApiClient
+from api_client.response import ApiError
+from loadtest.config import REPORTS_ROOT
+from loadtest.soak import ProcessSampler
+from loadtest.svgchart import format_number, html_page, html_table, line_chart
+from seeddata.generators import SeedContext, default_until
+from seeddata.seeder import plan_counts, run_seed
+
+# endpoint -> (path, collections it reads; the first sets the size)
+ENDPOINTS = {
+    "clients": ("/api/admin/clients", ("clients",)),
+    "client_users": ("/api/admin/client-users", ("client_users", "clients")),
+    "emails": ("/api/admin/emails", ("mailing_list",)),
+    "users": ("/api/admin/users", ("users",)),
+}
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+RSS_POLL_S = 0.01
+REPORTS_DIR = os.path.join(REPORTS_ROOT, "scaling")
+
+
+async def timed_call(
+    client: AsyncApiClient,
+    path: str,
+    sampler: Optional[ProcessSampler],
+    params: Optional[Dict[str, str]] = None,
+    auth: Optional[str] = "admin",
+) -> dict:
+    """One GET with the backend's RSS polled until the response has arrived"""
+    before = sampler.rss_mb() if sampler else None
+    peak = before
+    done = asyncio.Event()
+
+    async def watch():
+        nonlocal peak
+        while not done.is_set():
+            rss = sampler.rss_mb()
+            if rss is not None and (peak is None or rss > peak):
+                peak = rss
+            try:
+                await asyncio.wait_for(done.wait(), RSS_POLL_S)
+            except asyncio.TimeoutError:
+                pass
+
+    watcher = asyncio.create_task(watch()) if sampler else None
+    started = time.perf_counter()
+    try:
+        response = await client.request("GET", path, auth=auth, params=params)
+        error = None if response.ok else f"HTTP {response.status_code}"
+        size = len(response.text.encode())
+    except httpx.HTTPError as e:
+        response, error, size = None, type(e).__name__, None
+    finally:
+        done.set()
+        if watcher:
+            await watcher
+    return {
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "bytes": size,
+        "error": error,
+        "rss_before_mb": before,
+        "rss_growth_mb": round(peak - before, 1) if before is not None and peak is not None else None,
+        # Paginated endpoints report their totals here
+        "pagination": response.data.get("pagination") if not error and isinstance(response.data, dict) else None,
+    }
+
+
+def summarize(endpoint: str, size: int, documents: Optional[int], calls: List[dict], max_latency_ms: float) -> dict:
+    ok = [call for call in calls if not call["error"]]
+    latencies = [call["latency_ms"] for call in ok]
+    growth = [call["rss_growth_mb"] for call in calls if call["rss_growth_mb"] is not None]
+    p50 = statistics.median(latencies) if latencies else None
+    errors = sorted({call["error"] for call in calls if call["error"]})
+    return {
+        "endpoint": endpoint,
+        "size": size,
+        "documents": documents,
+        "calls": len(calls),
+        "errors": errors,
+        "p50_ms": round(p50, 1) if p50 is not None else None,
+        "max_ms": round(max(latencies), 1) if latencies else None,
+        "response_bytes": int(statistics.median([call["bytes"] for call in ok])) if ok else None,
+        "rss_before_mb": calls[0]["rss_before_mb"] if calls else None,
+        "rss_growth_mb": max(growth) if growth else None,
+        "usable": not errors and p50 is not None and p50 <= max_latency_ms,
+    }
+
+
+def count_documents(mongo_url: str, db_name: str, collections) -> Dict[str, int]:
+    client = pymongo.MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        return {name: client[db_name][name].estimated_document_count() for name in collections}
+    finally:
+        client.close()
+
+
+async def run_scaling(
+    base_url: str,
+    mongo_url: str,
+    db_name: str,
+    sizes: List[int],
+    endpoint_names: List[str],
+    repeats: int = 5,
+    max_latency_ms: float = 1000.0,
+    backend_pid: Optional[int] = None,
+    seed: int = 42,
+    workers: int = 1,
+    timeout: float = 120.0,
+) -> dict:
+    sampler = ProcessSampler(backend_pid) if backend_pid else None
+    until = default_until()
+    active = list(endpoint_names)
+    rows: List[dict] = []
+
+    async with AsyncApiClient(base_url, timeout=timeout, pool_size=1) as client:
+        login = await client.login()
+        if login.status_code != 200:
+            raise ApiError(f"Admin login failed with HTTP {login.status_code}", login)
+        for size in sorted(sizes):
+            if not active:
+                break
+            collections = sorted({name for endpoint in active for name in ENDPOINTS[endpoint][1]})
+            ctx = SeedContext(seed=seed, until=until, counts=plan_counts(0, {name: size for name in collections}))
+            print(f"🌱 Topping up {', '.join(collections)} to {size:,} documents")
+            # Seeding is CPU and IO heavy; keep it off the event loop
+            await asyncio.to_thread(run_seed, mongo_url, db_name, ctx, collections, 1000, workers)
+            counts = await asyncio.to_thread(count_documents, mongo_url, db_name, collections)
+
+            for endpoint in list(active):
+                path, reads = ENDPOINTS[endpoint]
+                # First call warms the Mongo cache and the JIT and is not recorded
+                await timed_call(client, path, None)
+                calls = [await timed_call(client, path, sampler) for _ in range(repeats)]
+                row = summarize(endpoint, size, counts.get(reads[0]), calls, max_latency_ms)
+                rows.append(row)
+                print(format_row(row))
+                if not row["usable"]:
+                    active.remove(endpoint)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": base_url,
+        "sizes": sorted(sizes),
+        "repeats": repeats,
+        "max_latency_ms": max_latency_ms,
+        "backend_pid": backend_pid,
+        "rows": rows,
+        "limits": usable_limits(rows, endpoint_names),
+    }
+
+
+def usable_limits(rows: List[dict], endpoint_names: List[str]) -> Dict[str, dict]:
+    """Largest usable and first unusable size per endpoint"""
+    limits = {}
+    for endpoint in endpoint_names:
+        mine = [row for row in rows if row["endpoint"] == endpoint]
+        usable = [row["size"] for row in mine if row["usable"]]
+        unusable = [row["size"] for row in mine if not row["usable"]]
+        limits[endpoint] = {
+            "largest_usable": max(usable) if usable else None,
+            "first_unusable": min(unusable) if unusable else None,
+        }
+    return limits
+
+
+def format_row(row: dict) -> str:
+    status = "ok" if row["usable"] else ("failed: " + ", ".join(row["errors"]) if row["errors"] else "too slow")
+    size = f"{row['response_bytes'] / 1e6:.1f} MB" if row["response_bytes"] is not None else "-"
+    growth = f"+{row['rss_growth_mb']} MB RSS" if row["rss_growth_mb"] is not None else ""
+    p50 = f"{row['p50_ms']:.0f} ms" if row["p50_ms"] is not None else "-"
+    return f"  {row['endpoint']:<14}{format_number(row['size']):>6}  p50 {p50:>9}  {size:>10}  {growth:<16}{status}"
+
+
+def format_limits(result: dict) -> str:
+    lines = [f"Usable at p50 <= {result['max_latency_ms']:.0f} ms:"]
+    for endpoint, limit in result["limits"].items():
+        largest = format_number(limit["largest_usable"]) if limit["largest_usable"] else "none"
+        first_bad = format_number(limit["first_unusable"]) if limit["first_unusable"] else "not reached"
+        lines.append(f"  {endpoint:<14} largest usable {largest:>6}   unusable from {first_bad}")
+    return "\n".join(lines)
+
+
+def render_html(result: dict) -> str:
+    rows = result["rows"]
+    endpoints = list(result["limits"])
+
+    def series(field: str, scale: float = 1.0):
+        return {
+            endpoint: [(row["size"], row[field] / scale) for row in rows
+                       if row["endpoint"] == endpoint and row[field] is not None]
+            for endpoint in endpoints
+        }
+
+    charts = [
+        line_chart("Median latency", series("p50_ms"), "documents", "ms", log_x=True, log_y=True,
+                   threshold=result["max_latency_ms"]),
+        line_chart("Response size", series("response_bytes", 1e6), "documents", "MB", log_x=True, log_y=True),
+        line_chart("Backend RSS growth during the call", series("rss_growth_mb"), "documents", "MB", log_x=True),
+    ]
+    table = html_table(
+        ["Endpoint", "Documents", "Calls", "p50 ms", "max ms", "Response MB", "RSS growth MB", "Status"],
+        [
+            [row["endpoint"], f"{row['documents'] or row['size']:,}", row["calls"], row["p50_ms"] or "-",
+             row["max_ms"] or "-",
+             f"{row['response_bytes'] / 1e6:.2f}" if row["response_bytes"] is not None else "-",
+             row["rss_growth_mb"] if row["rss_growth_mb"] is not None else "-",
+             "ok" if row["usable"] else (", ".join(row["errors"]) or "too slow")]
+            for row in rows
+        ],
+        bad_rows=[not row["usable"] for row in rows],
+    )
+    summary = "<pre>" + format_limits(result) + "</pre>"
+    return html_page(f"Whole-collection admin endpoints ({result['generated_at'][:10]})", [summary, *charts, table])
@@ -0,0 +1,256 @@
+"""
+Soak test: run flows at a modest, steady concurrency for hours and watch
+the backend for slow resource growth.
+
+Every sample interval the harness records the backend process's resident
+memory, open file descriptors and thread count from /proc, the number of
+connections Mongo reports in serverStatus, and the latency of a GET
+/api/health probe on its own connection. Node runs every request on one
+event loop, so a rising probe latency at constant load is the visible
+symptom of event-loop lag. The samples are written to a CSV timeline as
+they are taken, and the run ends with a leak verdict per series. A virtual
+user that crashes is counted in the timeline and the report; the others
+keep running, so one bad flow doesn't throw away hours of samples.
+"""
+
+import asyncio
+import csv
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+import pymongo
+
+from loadtest.closed_model import virtual_user
+from loadtest.stats import LoadStats
+
+CSV_FIELDS = [
+    "timestamp", "elapsed_s", "rss_mb", "open_fds", "threads", "mongo_connections",
+    "health_probe_ms", "requests", "errors", "failed_users",
+]
+
+# Series checked for leaks: (minimum absolute growth, minimum relative growth)
+LEAK_THRESHOLDS = {
+    "rss_mb": (20.0, 0.10),
+    "open_fds": (10, 0.20),
+    "threads": (4, 0.20),
+    "mongo_connections": (5, 0.20),
+    "health_probe_ms": (50.0, 0.50),
+}
+
+
+def find_backend_pid(match: str) -> Optional[int]:
+    """First process (other than this one) whose command line contains `match`"""
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit() or int(entry) == os.getpid():
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode(errors='replace')
+        except OSError:
+            continue
+        if match in cmdline:
+            return int(entry)
+    return None
+
+
+class ProcessSampler:
+    """Reads RSS, descriptor and thread counts for one pid from /proc"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def rss_mb(self) -> Optional[float]:
+        return self.sample()["rss_mb"]
+
+    def cpu_seconds(self) -> Optional[float]:
+        """User plus system CPU time the process has used so far"""
+        try:
+            with open(f'/proc/{self.pid}/stat') as f:
+                # The command name may contain spaces; fields resume after its ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            return None
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def sample(self) -> Dict[str, Optional[float]]:
+        values: Dict[str, Optional[float]] = {"rss_mb": None, "open_fds": None, "threads": None}
+        try:
+            with open(f'/proc/{self.pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        values["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                    elif line.startswith('Threads:'):
+                        values["threads"] = int(line.split()[1])
+            values["open_fds"] = len(os.listdir(f'/proc/{self.pid}/fd'))
+        except OSError:
+            # Process exited or belongs to another user; leave the gaps empty
+            pass
+        return values
+
+
+class MongoSampler:
+    """Current connection count from serverStatus"""
+
+    def __init__(self, mongo_url: str):
+        self.client = pymongo.MongoClient(mongo_url, serverSelectionTimeoutMS=5000, maxPoolSize=1)
+
+    def sample(self) -> Optional[int]:
+        try:
+            return self.client.admin.command('serverStatus')['connections']['current']
+        except Exception:
+            return None
+
+    def close(self):
+        self.client.close()
+
+
+def sample_row(started: float, process: Optional[ProcessSampler], mongo_connections: Optional[int]) -> dict:
+    row = {"timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'), "elapsed_s": round(time.monotonic() - started, 1)}
+    row.update(process.sample() if process else {"rss_mb": None, "open_fds": None, "threads": None})
+    row["mongo_connections"] = mongo_connections
+    return row
+
+
+async def guarded_user(failures: Counter, *args, **kwargs):
+    """Run one virtual user, counting a crash by exception type instead of raising it"""
+    try:
+        await virtual_user(*args, **kwargs)
+    except Exception as exc:
+        failures[type(exc).__name__] += 1
+
+
+async def probe_health(http: httpx.AsyncClient) -> Optional[float]:
+    started = time.perf_counter()
+    try:
+        await http.get("/api/health")
+    except httpx.HTTPError:
+        return None
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def least_squares_slope(points: List[tuple]) -> float:
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def leak_verdict(samples: List[dict], warmup_s: float = 0.0) -> Dict[str, dict]:
+    """
+    For each series, compare the median of the first and last quarter of the
+    post-warmup samples and fit a linear trend. A series is flagged when it
+    grows by more than both its absolute and relative threshold and the trend
+    is still rising.
+    """
+    verdict = {}
+    for field, (min_absolute, min_relative) in LEAK_THRESHOLDS.items():
+        points = [
+            (sample["elapsed_s"], sample[field]) for sample in samples
+            if sample["elapsed_s"] >= warmup_s and sample[field] is not None
+        ]
+        if len(points) < 8:
+            verdict[field] = {"status": "insufficient data", "samples": len(points)}
+            continue
+        quarter = len(points) // 4
+        start = median([y for _, y in points[:quarter]])
+        end = median([y for _, y in points[-quarter:]])
+        slope_per_hour = least_squares_slope(points) * 3600
+        growth = end - start
+        relative = growth / start if start else 0.0
+        leaking = growth > min_absolute and relative > min_relative and slope_per_hour > 0
+        verdict[field] = {
+            "status": "leak suspected" if leaking else "stable",
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "growth": round(growth, 2),
+            "relative_growth": round(relative, 3),
+            "slope_per_hour": round(slope_per_hour, 2),
+        }
+    return verdict
+
+
+async def run_soak(
+    base_url: str,
+    users: int,
+    duration: float,
+    interval: float,
+    flow_names: List[str],
+    csv_path: str,
+    backend_pid: Optional[int] = None,
+    mongo_url: Optional[str] = None,
+    warmup: float = 300.0,
+    timeout: float = 15.0,
+) -> dict:
+    """
+    Run `users` virtual users for `duration` seconds, sampling the backend
+    every `interval` seconds into csv_path. Samples taken during the first
+    `warmup` seconds are written but left out of the verdict, since pools,
+    caches and the JIT are still filling then.
+    """
+    stats = LoadStats()
+    process = ProcessSampler(backend_pid) if backend_pid else None
+    mongo = MongoSampler(mongo_url) if mongo_url else None
+    samples: List[dict] = []
+    failures: Counter = Counter()
+
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as http, \
+            httpx.AsyncClient(base_url=base_url, timeout=timeout) as probe:
+        with open(csv_path, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            started = time.monotonic()
+            stop_at = started + duration
+            users_done = asyncio.gather(*(
+                guarded_user(
+                    failures, index, http, stats, flow_names,
+                    start_delay=min(warmup, 30.0) * index / users, stop_at=stop_at,
+                )
+                for index in range(users)
+            ))
+
+            next_sample = started
+            while time.monotonic() < stop_at:
+                next_sample += interval
+                mongo_connections = await asyncio.to_thread(mongo.sample) if mongo else None
+                row = sample_row(started, process, mongo_connections)
+                row["health_probe_ms"] = await probe_health(probe)
+                row["requests"] = sum(e.histogram.total_count for e in stats.endpoints.values())
+                row["errors"] = sum(e.errors for e in stats.endpoints.values())
+                row["failed_users"] = sum(failures.values())
+                samples.append(row)
+                writer.writerow(row)
+                csv_file.flush()
+                await asyncio.sleep(max(0.0, min(next_sample, stop_at) - time.monotonic()))
+
+        await users_done
+        elapsed = time.monotonic() - started
+
+    if mongo:
+        mongo.close()
+
+    return {
+        "mode": "soak",
+        "base_url": base_url,
+        "users": users,
+        "duration_s": round(elapsed, 2),
+        "flows": flow_names,
+        "backend_pid": backend_pid,
+        "timeline_csv": csv_path,
+        "samples": len(samples),
+        "failed_users": dict(failures),
+        "verdict": leak_verdict(samples, warmup),
+        "endpoints": stats.report(elapsed),
+    }
@@ -0,0 +1,103 @@
+"""
+Per-endpoint latency and throughput accounting
+"""
+
+from typing import Dict
+
+from loadtest.histogram import LatencyHistogram
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.payload_bytes = 0
+        self.status_codes: Dict[str, int] = {}
+
+    def record(self, latency_ms: float, status: str, ok: bool, payload_bytes: int = 0):
+        self.histogram.record(latency_ms * 1000)
+        self.payload_bytes += payload_bytes
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other: 'EndpointStats'):
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        self.payload_bytes += other.payload_bytes
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+
+    def summary(self, duration_s: float) -> dict:
+        histogram = self.histogram
+        count = histogram.total_count
+
+        def ms(value_us):
+            return round(value_us / 1000, 2)
+
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "throughput_rps": round(count / duration_s, 2) if duration_s else 0.0,
+            "mean_ms": ms(histogram.mean),
+            "p50_ms": ms(histogram.value_at_percentile(50)),
+            "p95_ms": ms(histogram.value_at_percentile(95)),
+            "p99_ms": ms(histogram.value_at_percentile(99)),
+            "max_ms": ms(histogram.max_value),
+            "payload_bytes": self.payload_bytes,
+            "mean_payload_bytes": round(self.payload_bytes / count) if count else 0,
+            "status_codes": dict(sorted(self.status_codes.items())),
+            "histogram": histogram.to_dict(),
+        }
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> 'EndpointStats':
+        stats = cls()
+        stats.histogram = LatencyHistogram.from_dict(summary["histogram"])
+        stats.errors = summary["errors"]
+        stats.payload_bytes = summary.get("payload_bytes", 0)
+        stats.status_codes = dict(summary["status_codes"])
+        return stats
+
+
+class LoadStats:
+    """Collects EndpointStats keyed by a label such as 'POST /api/contact'"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def record(self, endpoint: str, latency_ms: float, status: str, ok: bool, payload_bytes: int = 0):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        stats.record(latency_ms, status, ok, payload_bytes)
+
+    def merge(self, other: 'LoadStats'):
+        for endpoint, stats in other.endpoints.items():
+            if endpoint in self.endpoints:
+                self.endpoints[endpoint].merge(stats)
+            else:
+                self.endpoints[endpoint] = stats
+
+    def report(self, duration_s: float) -> Dict[str, dict]:
+        return {name: stats.summary(duration_s) for name, stats in sorted(self.endpoints.items())}
+
+    @classmethod
+    def from_report(cls, report: Dict[str, dict]) -> 'LoadStats':
+        """Rebuild stats from the 'endpoints' section of a saved JSON report"""
+        stats = cls()
+        for endpoint, summary in report.items():
+            stats.endpoints[endpoint] = EndpointStats.from_summary(summary)
+        return stats
+
+
+def format_report(report: Dict[str, dict]) -> str:
+    header = f"{'Endpoint':<48} {'Reqs':>7} {'Errs':>6} {'RPS':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    lines = [header, "-" * len(header)]
+    for endpoint, row in report.items():
+        lines.append(
+            f"{endpoint:<48} {row['requests']:>7} {row['errors']:>6} {row['throughput_rps']:>8} "
+            f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}"
+        )
+    lines.append("(latencies in ms)")
+    return "\n".join(lines)
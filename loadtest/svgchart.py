@@ -0,0 +1,150 @@
+"""
+Dependency-free SVG line charts for the HTML reports.
+
+Only what the reports need: several series on shared axes, optional log
+scales, and a dashed horizontal threshold line.
+"""
+
+import html
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+COLORS = ['#1f77b4', '#d62728', '#2ca02c', '#9467bd', '#ff7f0e', '#17becf', '#8c564b', '#e377c2']
+MARGIN = {'left': 70, 'right': 150, 'top': 30, 'bottom': 45}
+
+
+def format_number(value: float) -> str:
+    for limit, suffix in ((1e9, 'G'), (1e6, 'M'), (1e3, 'k')):
+        if abs(value) >= limit:
+            return f"{value / limit:g}{suffix}"
+    return f"{value:g}"
+
+
+def _scale(values: Sequence[float], log: bool):
+    low, high = min(values), max(values)
+    if log:
+        low, high = math.log10(low), math.log10(high)
+    if high == low:
+        low, high = low - 1, high + 1
+    return low, high
+
+
+def _ticks(low: float, high: float, log: bool) -> List[float]:
+    if log:
+        return [10.0 ** exponent for exponent in range(math.floor(low), math.ceil(high) + 1)]
+    step = 10 ** math.floor(math.log10((high - low) / 4 or 1))
+    for multiple in (1, 2, 5, 10):
+        if (high - low) / (step * multiple) <= 6:
+            step *= multiple
+            break
+    first = math.floor(low / step) * step
+    return [first + step * i for i in range(int((high - first) / step) + 2)]
+
+
+def _visible_ticks(low: float, high: float, log: bool) -> List[float]:
+    def position(tick: float) -> float:
+        return math.log10(tick) if log else tick
+    return [tick for tick in _ticks(low, high, log) if low - 1e-9 <= position(tick) <= high + 1e-9]
+
+
+def line_chart(
+    title: str,
+    series: Dict[str, List[Point]],
+    x_label: str,
+    y_label: str,
+    log_x: bool = False,
+    log_y: bool = False,
+    threshold: Optional[float] = None,
+    width: int = 640,
+    height: int = 320,
+) -> str:
+    """An <svg> element; points with non-positive values are dropped on log axes"""
+    def usable(point: Point) -> bool:
+        x, y = point
+        return y is not None and (not log_x or x > 0) and (not log_y or y > 0)
+
+    series = {name: [p for p in points if usable(p)] for name, points in series.items()}
+    xs = [x for points in series.values() for x, _ in points]
+    ys = [y for points in series.values() for _, y in points]
+    if threshold is not None and (not log_y or threshold > 0):
+        ys.append(threshold)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'font-family="sans-serif" font-size="11">',
+             f'<text x="{width / 2}" y="16" text-anchor="middle" font-size="13">{html.escape(title)}</text>']
+    if not xs or not ys:
+        parts.append(f'<text x="{width / 2}" y="{height / 2}" text-anchor="middle">No data</text></svg>')
+        return ''.join(parts)
+
+    x_low, x_high = _scale(xs, log_x)
+    y_low, y_high = _scale(ys, log_y)
+    if not log_y:
+        y_low = min(y_low, 0.0)
+    plot_w = width - MARGIN['left'] - MARGIN['right']
+    plot_h = height - MARGIN['top'] - MARGIN['bottom']
+
+    def px(x: float) -> float:
+        value = math.log10(x) if log_x else x
+        return MARGIN['left'] + (value - x_low) / (x_high - x_low) * plot_w
+
+    def py(y: float) -> float:
+        value = math.log10(y) if log_y else y
+        return MARGIN['top'] + plot_h - (value - y_low) / (y_high - y_low) * plot_h
+
+    bottom = MARGIN['top'] + plot_h
+    parts.append(f'<rect x="{MARGIN["left"]}" y="{MARGIN["top"]}" width="{plot_w}" height="{plot_h}" '
+                 f'fill="none" stroke="#999"/>')
+    for tick in _visible_ticks(x_low, x_high, log_x):
+        x = px(tick)
+        parts.append(f'<line x1="{x:.1f}" y1="{MARGIN["top"]}" x2="{x:.1f}" y2="{bottom}" stroke="#eee"/>')
+        parts.append(f'<text x="{x:.1f}" y="{bottom + 14}" text-anchor="middle">{format_number(tick)}</text>')
+    for tick in _visible_ticks(y_low, y_high, log_y):
+        y = py(tick)
+        parts.append(f'<line x1="{MARGIN["left"]}" y1="{y:.1f}" x2="{MARGIN["left"] + plot_w}" y2="{y:.1f}" '
+                     f'stroke="#eee"/>')
+        parts.append(f'<text x="{MARGIN["left"] - 6}" y="{y + 4:.1f}" text-anchor="end">{format_number(tick)}</text>')
+    parts.append(f'<text x="{MARGIN["left"] + plot_w / 2}" y="{height - 8}" text-anchor="middle">'
+                 f'{html.escape(x_label)}</text>')
+    parts.append(f'<text transform="translate(14 {MARGIN["top"] + plot_h / 2}) rotate(-90)" '
+                 f'text-anchor="middle">{html.escape(y_label)}</text>')
+
+    if threshold is not None and (not log_y or threshold > 0):
+        y = py(threshold)
+        parts.append(f'<line x1="{MARGIN["left"]}" y1="{y:.1f}" x2="{MARGIN["left"] + plot_w}" y2="{y:.1f}" '
+                     f'stroke="#d62728" stroke-dasharray="6 4"/>')
+
+    for index, (name, points) in enumerate(series.items()):
+        color = COLORS[index % len(COLORS)]
+        points = sorted(points)
+        if points:
+            path = ' '.join(f"{px(x):.1f},{py(y):.1f}" for x, y in points)
+            parts.append(f'<polyline points="{path}" fill="none" stroke="{color}" stroke-width="2"/>')
+            parts.extend(f'<circle cx="{px(x):.1f}" cy="{py(y):.1f}" r="3" fill="{color}"/>' for x, y in points)
+        legend_y = MARGIN['top'] + 14 * index + 8
+        legend_x = MARGIN['left'] + plot_w + 12
+        parts.append(f'<rect x="{legend_x}" y="{legend_y - 8}" width="10" height="10" fill="{color}"/>')
+        parts.append(f'<text x="{legend_x + 14}" y="{legend_y + 1}">{html.escape(name)}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def html_page(title: str, sections: List[str]) -> str:
+    body = '\n'.join(sections)
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f'<title>{html.escape(title)}</title>'
+        '<style>body{font-family:sans-serif;margin:24px}table{border-collapse:collapse;font-size:13px}'
+        'th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}th{background:#f4f4f4}'
+        'td:first-child,th:first-child{text-align:left}.bad{background:#fdd}</style></head>'
+        f'<body><h1>{html.escape(title)}</h1>\n{body}\n</body></html>\n'
+    )
+
+
+def html_table(headers: Sequence[str], rows: Sequence[Sequence[str]], bad_rows: Sequence[bool] = ()) -> str:
+    head = ''.join(f'<th>{html.escape(h)}</th>' for h in headers)
+    lines = []
+    for index, row in enumerate(rows):
+        css = ' class="bad"' if index < len(bad_rows) and bad_rows[index] else ''
+        lines.append(f'<tr{css}>' + ''.join(f'<td>{html.escape(str(cell))}</td>' for cell in row) + '</tr>')
+    return f'<table><tr>{head}</tr>{"".join(lines)}</table>'
@@ -0,0 +1,10 @@
+"""
+Synthetic, production-scale data for the backend's Mongo collections.
+
+Generates realistic documents for clients, client_users, mailing_list,
+contacts, tdee_results, the blog collections and the four policy
+collections, so endpoints that load whole collections can be benchmarked at
+representative volumes:
+
+    python -m seeddata --total 1M --seed 42
+"""
@@ -0,0 +1,95 @@
+"""
+Command line entry point: python -m seeddata [options]
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+from seeddata.generators import GENERATORS, SeedContext, default_until
+from seeddata.seeder import (
+    clear_seeded, default_workers, format_summary, parse_count, parse_size, plan_counts, run_seed,
+)
+
+
+def collection_list(value):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in GENERATORS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"Unknown collections: {', '.join(unknown)} (choose from {', '.join(GENERATORS)})"
+        )
+    return names
+
+
+def collection_count(value):
+    try:
+        return parse_count(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def day(value):
+    return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m seeddata', description=__doc__)
+    parser.add_argument('--mongo-url', default=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'),
+                        help='Mongo to seed (default: MONGO_URL)')
+    parser.add_argument('--db-name', default=os.environ.get('DB_NAME', 'simonprice_pt_db'),
+                        help='Database name (default: DB_NAME)')
+    parser.add_argument('--total', type=parse_size, default=parse_size('100k'),
+                        help='Approximate number of documents across all collections, e.g. 1k, 250k, 10M')
+    parser.add_argument('--count', type=collection_count, action='append', default=[], metavar='COLLECTION=N',
+                        help='Override one collection size (repeatable), e.g. --count clients=1M')
+    parser.add_argument('--collections', type=collection_list, default=list(GENERATORS),
+                        help='Comma separated collections to seed (default: all)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same documents')
+    parser.add_argument('--until', type=day, help='Latest created_at date, YYYY-MM-DD (default: today)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Documents per insert_many (default: 1000)')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='Parallel insert processes (default: CPU count, at most 8)')
+    parser.add_argument('--clear', action='store_true',
+                        help='First delete previously seeded documents from the selected collections')
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without connecting')
+    parser.add_argument('--output', help='Write the JSON summary to this file')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    try:
+        counts = plan_counts(args.total, dict(args.count))
+    except ValueError as e:
+        parser.error(str(e))
+    until = args.until or default_until()
+    ctx = SeedContext(seed=args.seed, until=until, counts=counts)
+
+    print(f"🌱 Seeding {args.db_name} at {args.mongo_url} (seed {args.seed}, until {until.date()})")
+    for name in args.collections:
+        print(f"  {name:<22}{counts[name]:>12,}")
+    if args.dry_run:
+        return
+
+    if args.clear:
+        for name, deleted in clear_seeded(args.mongo_url, args.db_name, args.collections).items():
+            print(f"🧹 Removed {deleted:,} seeded documents from {name}")
+
+    summary = run_seed(
+        args.mongo_url, args.db_name, ctx, args.collections,
+        batch_size=args.batch_size, workers=args.workers,
+    )
+    print(format_summary(summary))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
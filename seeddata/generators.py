@@ -0,0 +1,390 @@
+"""
+Document generators, one per seeded collection.
+
+Documents have the shapes the controllers write (PublicController,
+AdminController, BlogController). Every document is a pure function of
+(seed, collection, index): a batch can be generated by any worker in any
+order and the result is identical, and re-seeding skips existing documents
+because the _id is derived the same way.
+"""
+
+import hashlib
+import random
+import struct
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from bson import ObjectId
+
+# Known password of every seeded client user with a password set
+SEED_PASSWORD = 'SeedPassword1!'
+# bcrypt, cost 10 as in AuthService, of SEED_PASSWORD
+SEED_PASSWORD_HASH = '$2b$10$abcdefghijklmnopqrstuuyS4Ff3h0f2.kys0rMpvk3M7TVXnhKzK'
+# bcrypt of a discarded random password, so seeded admin users cannot log in
+LOCKED_PASSWORD_HASH = '$2b$10$E642bR64Pr76665auyT50u3Cfa1ANkKLIus81Yn2zUUb56IFp2g5O'
+
+# Created dates are spread over this many days before SeedContext.until
+HISTORY_DAYS = 3 * 365
+# Timestamp part of the index-th seeded _id is ID_EPOCH + index (2020-01-01)
+ID_EPOCH = 1_577_836_800
+
+FIRST_NAMES = [
+    'Oliver', 'Amelia', 'George', 'Isla', 'Harry', 'Ava', 'Noah', 'Mia', 'Jack', 'Ivy',
+    'Leo', 'Lily', 'Arthur', 'Freya', 'Muhammad', 'Florence', 'Oscar', 'Willow', 'Charlie', 'Grace',
+    'Henry', 'Sophia', 'Theo', 'Rosie', 'Alfie', 'Ella', 'Thomas', 'Evie', 'James', 'Poppy',
+]
+LAST_NAMES = [
+    'Smith', 'Jones', 'Taylor', 'Brown', 'Williams', 'Wilson', 'Johnson', 'Davies', 'Patel', 'Robinson',
+    'Wright', 'Thompson', 'Evans', 'Walker', 'White', 'Roberts', 'Green', 'Hall', 'Thomas', 'Clarke',
+    'Jackson', 'Wood', 'Harris', 'Edwards', 'Turner', 'Martin', 'Cooper', 'Hill', 'Ward', 'Hughes',
+]
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net', 'mail.example.co.uk']
+CITIES = [
+    ('London', 'SW1A'), ('Manchester', 'M1'), ('Birmingham', 'B1'), ('Leeds', 'LS1'), ('Bristol', 'BS1'),
+    ('Liverpool', 'L1'), ('Sheffield', 'S1'), ('Edinburgh', 'EH1'), ('Cardiff', 'CF10'), ('Brighton', 'BN1'),
+]
+STREETS = ['High Street', 'Station Road', 'Church Lane', 'Park Avenue', 'Victoria Road', 'Mill Lane']
+
+GOALS = ['weight-loss', 'muscle-gain', 'strength', 'endurance', 'general', 'other']
+EXPERIENCE = ['beginner', 'intermediate', 'advanced']
+ACTIVITY_LEVELS = ['1.2', '1.375', '1.55', '1.725', '1.9']
+TDEE_GOALS = {'lose': -500, 'maintain': 0, 'gain': 300}
+PACKAGES = [('nutrition-only', 'Nutrition Only', 75), ('pt-with-nutrition', 'Personal Training with Nutrition', 125)]
+WORDS = (
+    'strength training nutrition protein recovery mobility cardio habits sleep progress '
+    'programme squat deadlift press calories hydration routine consistency motivation '
+    'technique warm-up conditioning flexibility balance endurance results coaching plan'
+).split()
+POLICY_COLLECTIONS = ['cancellation_policy', 'terms_of_service', 'privacy_policy', 'cookie_policy']
+
+
+@dataclass
+class SeedContext:
+    seed: int
+    until: datetime
+    # Sizes of the collections other documents refer to (categories, tags)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def rng(self, collection: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}/{collection}/{index}")
+
+    def created_at(self, rng: random.Random) -> datetime:
+        # Weighted towards recent dates, as a growing business accumulates them
+        age = HISTORY_DAYS * rng.random() ** 1.5
+        return self.until - timedelta(days=age)
+
+    def object_id(self, collection: str, index: int) -> ObjectId:
+        # Independent of until, so re-seeding on a later day finds the same documents
+        digest = hashlib.blake2b(f"{self.seed}/{collection}/{index}".encode(), digest_size=8).digest()
+        return ObjectId(struct.pack('>I', ID_EPOCH + index) + digest)
+
+
+def default_until() -> datetime:
+    """Midnight UTC today, the latest created_at when no date is given"""
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def person(ctx: SeedContext, kind: str, index: int):
+    """Name and email for the index-th person of a kind; unique per (kind, index)"""
+    offset = ctx.seed * 7
+    first = FIRST_NAMES[(index + offset) % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES) + offset) % len(LAST_NAMES)]
+    domain = EMAIL_DOMAINS[index % len(EMAIL_DOMAINS)]
+    return f"{first} {last}", f"{first}.{last}.{kind}{index}@{domain}".lower()
+
+
+def phone(rng: random.Random) -> str:
+    return f"+447{rng.randrange(100000000, 999999999)}"
+
+
+def address(rng: random.Random) -> dict:
+    city, district = rng.choice(CITIES)
+    return {
+        'line1': f"{rng.randint(1, 250)} {rng.choice(STREETS)}",
+        'line2': '',
+        'city': city,
+        'postcode': f"{district} {rng.randint(1, 9)}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}{rng.choice('ABDEFGHJLNPQRSTUWXYZ')}",
+        'country': 'GB',
+    }
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = ' '.join(rng.choices(WORDS, k=words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def category_slug(index: int) -> str:
+    return f"category-{index}"
+
+
+def tag_slug(index: int) -> str:
+    return f"tag-{index}"
+
+
+def admin_user(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('users', index)
+    created = ctx.created_at(rng)
+    name, email = person(ctx, 'admin', index)
+    return {
+        '_id': ctx.object_id('users', index),
+        'email': email,
+        'password': LOCKED_PASSWORD_HASH,
+        'name': name,
+        'role': 'admin',
+        'created_at': created,
+        'created_by': 'admin@example.com',
+        'last_login': None,
+        'seeded': True,
+    }
+
+
+def client(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('clients', index)
+    created = ctx.created_at(rng)
+    name, email = person(ctx, 'client', index)
+    customer_id = f"cus_seed{ctx.seed}x{index}"
+    doc = {
+        '_id': ctx.object_id('clients', index),
+        'name': name,
+        'email': email,
+        'phone': phone(rng),
+        'customer_id': customer_id,
+        'stripe_customer_id': customer_id,
+        'billing_day': rng.randint(1, 28),
+        'created_at': created,
+        'seeded': True,
+    }
+    source = rng.random()
+    if source < 0.6:
+        package_id, package_name, price = rng.choice(PACKAGES)
+        status = rng.choices(['active', 'cancelled', 'past_due'], weights=[85, 10, 5])[0]
+        doc.update({
+            'age': rng.randint(18, 70),
+            'address': address(rng),
+            'goals': rng.sample(GOALS, rng.randint(1, 3)),
+            'package_id': package_id,
+            'package_name': package_name,
+            'monthly_price': price,
+            'subscription_id': f"sub_seed{ctx.seed}x{index}",
+            'subscription_status': {'cancelled': 'canceled'}.get(status, status),
+            'status': status,
+            'source': 'landing_page',
+            'parq_responses': [{'questionId': f"parq-{q}", 'answer': 'no'} for q in range(1, 8)],
+            'health_responses': [],
+            'has_doctor_approval': rng.random() < 0.1,
+            'onboarded_at': created,
+            'updated_at': created + timedelta(days=rng.randint(0, 60)),
+        })
+    elif source < 0.85:
+        status = rng.choice(['pending_payment', 'active'])
+        doc.update({
+            'address': address(rng) if rng.random() < 0.5 else None,
+            'status': status,
+            'subscription_status': 'pending' if status == 'pending_payment' else 'active',
+            'monthly_price': rng.choice([75, 100, 125, 150]),
+            'payment_link_sent_at': created,
+            'created_by': 'admin@example.com',
+        })
+    else:
+        status = rng.choice(['active', 'pending'])
+        doc.update({
+            'address': None,
+            'status': status,
+            'subscription_status': status,
+            'imported_at': created,
+            'imported_by': 'admin@example.com',
+        })
+    return doc
+
+
+def client_user(ctx: SeedContext, index: int) -> dict:
+    # The index-th client user belongs to the index-th client
+    rng = ctx.rng('client_users', index)
+    created = ctx.created_at(rng)
+    _, email = person(ctx, 'client', index)
+    has_password = rng.random() < 0.7
+    return {
+        '_id': ctx.object_id('client_users', index),
+        'email': email,
+        'password': SEED_PASSWORD_HASH if has_password else None,
+        'status': 'active' if has_password else 'pending_password',
+        'created_at': created,
+        'seeded': True,
+    }
+
+
+def subscriber(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('mailing_list', index)
+    created = ctx.created_at(rng)
+    name, email = person(ctx, 'subscriber', index)
+    source = rng.choices(['newsletter_form', 'contact_form', 'tdee_calculator'], weights=[60, 15, 25])[0]
+    doc = {
+        '_id': ctx.object_id('mailing_list', index),
+        'email': email,
+        'name': name if rng.random() < 0.6 else None,
+        'opted_in': True,
+        'subscribed_at': created,
+        'status': 'active' if rng.random() < 0.92 else 'unsubscribed',
+        'source': source,
+        'seeded': True,
+    }
+    if source == 'tdee_calculator':
+        doc.update({'age': rng.randint(18, 70), 'gender': rng.choice(['male', 'female']),
+                    'goal': rng.choice(list(TDEE_GOALS))})
+    return doc
+
+
+def contact(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('contacts', index)
+    created = ctx.created_at(rng)
+    name, email = person(ctx, 'contact', index)
+    return {
+        '_id': ctx.object_id('contacts', index),
+        'name': name,
+        'email': email,
+        'phone': phone(rng) if rng.random() < 0.7 else None,
+        'message': ' '.join(sentence(rng, rng.randint(6, 16)) for _ in range(rng.randint(1, 5))),
+        'goals': rng.choice(GOALS),
+        'experience': rng.choice(EXPERIENCE),
+        'source': rng.choices(['website', 'client_contact'], weights=[85, 15])[0],
+        'created_at': created,
+        'status': rng.choices(['new', 'contacted', 'closed'], weights=[30, 50, 20])[0],
+        'seeded': True,
+    }
+
+
+def tdee_result(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('tdee_results', index)
+    created = ctx.created_at(rng)
+    name, email = person(ctx, 'tdee', index)
+    gender = rng.choice(['male', 'female'])
+    age = rng.randint(18, 70)
+    weight = round(rng.uniform(50, 120), 1)
+    height = rng.randint(150, 200)
+    activity = rng.choice(ACTIVITY_LEVELS)
+    goal = rng.choice(list(TDEE_GOALS))
+    # Mifflin-St Jeor, as TDEECalculator.jsx
+    bmr = 10 * weight + 6.25 * height - 5 * age + (5 if gender == 'male' else -161)
+    tdee = round(bmr * float(activity))
+    goal_calories = tdee + TDEE_GOALS[goal]
+    return {
+        '_id': ctx.object_id('tdee_results', index),
+        'email': email,
+        'name': name if rng.random() < 0.4 else None,
+        'age': age,
+        'gender': gender,
+        'weight': f"{weight}kg",
+        'height': f"{height}cm",
+        'activityLevel': activity,
+        'goal': goal,
+        'tdee': tdee,
+        'goalCalories': goal_calories,
+        'macros': {
+            'protein': round(goal_calories * 0.3 / 4),
+            'carbs': round(goal_calories * 0.4 / 4),
+            'fat': round(goal_calories * 0.3 / 9),
+        },
+        'created_at': created,
+        'seeded': True,
+    }
+
+
+def blog_post(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('blog_posts', index)
+    created = ctx.created_at(rng)
+    title = sentence(rng, rng.randint(4, 9)).rstrip('.')
+    status = rng.choices(['published', 'draft', 'scheduled'], weights=[80, 15, 5])[0]
+    paragraphs = rng.randint(4, 14)
+    content = ''.join(f"<p>{' '.join(sentence(rng, rng.randint(8, 20)) for _ in range(4))}</p>"
+                      for _ in range(paragraphs))
+    categories = max(ctx.counts.get('blog_categories', 1), 1)
+    tags = max(ctx.counts.get('blog_tags', 1), 1)
+    return {
+        '_id': ctx.object_id('blog_posts', index),
+        'title': title,
+        'slug': f"{title.lower().replace(' ', '-')}-{index}",
+        'content': content,
+        'header_image': f"/uploads/blog/seed-{index % 50}.jpg",
+        'category_slug': category_slug(rng.randrange(categories)),
+        'tags': [tag_slug(rng.randrange(tags)) for _ in range(rng.randint(0, 5))],
+        'author': 'Simon Price',
+        'status': status,
+        'publish_date': created if status == 'published' else None,
+        'scheduled_date': ctx.until + timedelta(days=rng.randint(1, 30)) if status == 'scheduled' else None,
+        'seo_title': title,
+        'seo_description': sentence(rng, 15),
+        'created_at': created,
+        'updated_at': created,
+        'created_by': 'admin@example.com',
+        'seeded': True,
+    }
+
+
+def blog_category(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('blog_categories', index)
+    created = ctx.created_at(rng)
+    return {
+        '_id': ctx.object_id('blog_categories', index),
+        'name': f"{rng.choice(WORDS).title()} {index}",
+        'slug': category_slug(index),
+        'created_at': created,
+        'seeded': True,
+    }
+
+
+def blog_tag(ctx: SeedContext, index: int) -> dict:
+    rng = ctx.rng('blog_tags', index)
+    created = ctx.created_at(rng)
+    return {
+        '_id': ctx.object_id('blog_tags', index),
+        'name': f"{rng.choice(WORDS)} {index}",
+        'slug': tag_slug(index),
+        'created_at': created,
+        'seeded': True,
+    }
+
+
+def policy_section(collection: str) -> Callable[[SeedContext, int], dict]:
+    def generate(ctx: SeedContext, index: int) -> dict:
+        rng = ctx.rng(collection, index)
+        created = ctx.created_at(rng)
+        items: List[dict] = [
+            {
+                'id': f"item-seed-{index}-{item}",
+                'text': ' '.join(sentence(rng, rng.randint(10, 25)) for _ in range(rng.randint(1, 3))),
+                'order': item + 1,
+                'created_at': created,
+            }
+            for item in range(rng.randint(2, 8))
+        ]
+        return {
+            '_id': ctx.object_id(collection, index),
+            'id': f"section-seed-{index}",
+            'title': sentence(rng, rng.randint(2, 5)).rstrip('.'),
+            # After any sections that already exist
+            'order': 1000 + index,
+            'items': items,
+            'created_at': created,
+            'seeded': True,
+        }
+    return generate
+
+
+GENERATORS: Dict[str, Callable[[SeedContext, int], dict]] = {
+    'users': admin_user,
+    'clients': client,
+    'client_users': client_user,
+    'mailing_list': subscriber,
+    'contacts': contact,
+    'tdee_results': tdee_result,
+    'blog_posts': blog_post,
+    'blog_categories': blog_category,
+    'blog_tags': blog_tag,
+    **{name: policy_section(name) for name in POLICY_COLLECTIONS},
+}
+
+
+def generate_batch(ctx: SeedContext, collection: str, start: int, count: int) -> List[dict]:
+    generate = GENERATORS[collection]
+    return [generate(ctx, index) for index in range(start, start + count)]
@@ -0,0 +1,171 @@
+"""
+Sizing plans and parallel bulk insertion.
+
+A plan maps each collection to a document count. Its batches are generated
+and inserted with unordered insert_many by a pool of worker processes,
+each holding its own MongoClient. Documents whose _id already exists are
+counted as skipped, so an interrupted seed can simply be run again.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from seeddata.generators import GENERATORS, POLICY_COLLECTIONS, SeedContext, generate_batch
+
+# Share of the requested total for each collection that grows with traffic
+WEIGHTS = {
+    'clients': 0.12,
+    'client_users': 0.12,
+    'mailing_list': 0.25,
+    'contacts': 0.20,
+    'tdee_results': 0.25,
+    'blog_posts': 0.06,
+}
+POLICY_SECTIONS = 12
+DUPLICATE_KEY = 11000
+
+Batch = Tuple[str, int, int]
+
+
+def parse_size(value: str) -> int:
+    """'5000', '250k' or '10M'"""
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    value = value.strip().lower().replace('_', '')
+    if value and value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
+def parse_count(value: str) -> Tuple[str, int]:
+    """'clients=5k', a --count override"""
+    name, _, size = value.partition('=')
+    if name not in GENERATORS or not size:
+        raise ValueError(f"Expected COLLECTION=N with one of {', '.join(GENERATORS)}")
+    return name, parse_size(size)
+
+
+def plan_counts(total: int, overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Document count per collection for roughly `total` documents"""
+    counts = {name: int(total * weight) for name, weight in WEIGHTS.items()}
+    # Reference collections grow much more slowly than the traffic-driven ones
+    counts['blog_categories'] = min(max(total // 10_000, 8), 100)
+    counts['blog_tags'] = min(max(total // 1_000, 30), 2_000)
+    counts.update({name: POLICY_SECTIONS for name in POLICY_COLLECTIONS})
+    # Admin accounts are only seeded when asked for with an override
+    counts['users'] = 0
+    overrides = dict(overrides or {})
+    # Every client has a client user unless told otherwise
+    if 'clients' in overrides and 'client_users' not in overrides:
+        overrides['client_users'] = overrides['clients']
+    unknown = set(overrides) - set(GENERATORS)
+    if unknown:
+        raise ValueError(f"Unknown collections: {', '.join(sorted(unknown))}")
+    counts.update(overrides)
+    return counts
+
+
+def batches(counts: Dict[str, int], batch_size: int, collections: Iterable[str]) -> List[Batch]:
+    return [
+        (name, start, min(batch_size, counts[name] - start))
+        for name in collections
+        for start in range(0, counts[name], batch_size)
+    ]
+
+
+_db = None
+
+
+def _connect(mongo_url: str, db_name: str):
+    global _db
+    import pymongo
+
+    _db = pymongo.MongoClient(mongo_url)[db_name]
+
+
+def insert_batch(ctx: SeedContext, batch: Batch) -> Tuple[str, int, int]:
+    """Insert one batch; returns (collection, inserted, skipped as already present)"""
+    from pymongo.errors import BulkWriteError
+
+    collection, start, count = batch
+    documents = generate_batch(ctx, collection, start, count)
+    try:
+        result = _db[collection].insert_many(documents, ordered=False)
+        return collection, len(result.inserted_ids), 0
+    except BulkWriteError as error:
+        write_errors = error.details.get('writeErrors', [])
+        duplicates = sum(1 for write_error in write_errors if write_error.get('code') == DUPLICATE_KEY)
+        if duplicates < len(write_errors):
+            raise
+        return collection, error.details.get('nInserted', 0), duplicates
+
+
+def clear_seeded(mongo_url: str, db_name: str, collections: Iterable[str]) -> Dict[str, int]:
+    """Remove previously seeded documents, leaving everything else alone"""
+    _connect(mongo_url, db_name)
+    return {name: _db[name].delete_many({'seeded': True}).deleted_count for name in collections}
+
+
+def run_seed(
+    mongo_url: str,
+    db_name: str,
+    ctx: SeedContext,
+    collections: List[str],
+    batch_size: int = 1000,
+    workers: int = 1,
+    progress_interval: float = 5.0,
+) -> dict:
+    planned = {name: ctx.counts[name] for name in collections}
+    work = batches(ctx.counts, batch_size, collections)
+    totals = {name: {'planned': planned[name], 'inserted': 0, 'skipped': 0} for name in collections}
+    total = sum(planned.values())
+    done = 0
+    started = last_report = time.monotonic()
+
+    def record(result: Tuple[str, int, int]):
+        nonlocal done, last_report
+        collection, inserted, skipped = result
+        totals[collection]['inserted'] += inserted
+        totals[collection]['skipped'] += skipped
+        done += inserted + skipped
+        now = time.monotonic()
+        if now - last_report >= progress_interval:
+            last_report = now
+            print(f"  {done:,}/{total:,} documents ({done / (now - started):,.0f}/s)")
+
+    if workers <= 1:
+        _connect(mongo_url, db_name)
+        for batch in work:
+            record(insert_batch(ctx, batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_connect, initargs=(mongo_url, db_name)) as pool:
+            for future in as_completed([pool.submit(insert_batch, ctx, batch) for batch in work]):
+                record(future.result())
+
+    elapsed = time.monotonic() - started
+    return {
+        'seed': ctx.seed,
+        'until': ctx.until.isoformat(),
+        'collections': totals,
+        'documents': done,
+        'elapsed_s': round(elapsed, 2),
+        'documents_per_s': round(done / elapsed, 1) if elapsed else 0.0,
+        'workers': workers,
+        'batch_size': batch_size,
+    }
+
+
+def default_workers() -> int:
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"{'Collection':<22}{'Planned':>12}{'Inserted':>12}{'Skipped':>12}"]
+    for name, row in summary['collections'].items():
+        lines.append(f"{name:<22}{row['planned']:>12,}{row['inserted']:>12,}{row['skipped']:>12,}")
+    lines.append(
+        f"{summary['documents']:,} documents in {summary['elapsed_s']}s "
+        f"({summary['documents_per_s']:,.0f}/s, {summary['workers']} workers, seed {summary['seed']})"
+    )
+    return '\n'.join(lines)
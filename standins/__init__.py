@@ -0,0 +1,16 @@
+"""
+Local stand-ins for the third-party APIs the backend calls.
+
+Each stand-in is a small FastAPI app that keeps its state in memory and can
+add latency, jitter and injected failures to every call, so the purchase,
+onboarding and email paths can be load-tested and benchmarked on a machine with
+no network access. Run one with:
+
+    python -m standins stripe --port 12111 --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+    python -m standins graph --latency-ms 250 --error-rate 0.02 --error-status 429 --mail-dir /tmp/mail
+
+The TCP fault proxy (standins.tcpproxy) degrades the hops between our own
+services, such as backend to MongoDB, in the same way:
+
+    python -m standins proxy --port 27018 --upstream 127.0.0.1:27017 --latency-ms 20 --reset-rate 0.05
+"""
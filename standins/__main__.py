@@ -0,0 +1,86 @@
+"""
+Command line entry point: python -m standins <service> [options]
+"""
+
+import argparse
+import asyncio
+
+import uvicorn
+
+from standins.faults import FaultConfig
+from standins.tcpproxy import FaultProxy, ProxyConfig, parse_address, serve
+
+# service -> (module, default port, service-specific options passed to create_app)
+SERVICES = {
+    "stripe": ("standins.stripe_api", 12111, ()),
+    "graph": ("standins.graph_api", 12112, ("mail_dir",)),
+}
+# The TCP proxy is not an API stand-in; it listens here and takes settings on the control port
+PROXY_PORT = 12113
+PROXY_CONTROL_PORT = 12114
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m standins', description=__doc__)
+    parser.add_argument('service', choices=sorted([*SERVICES, 'proxy']),
+                        help='API to stand in for, or proxy for the TCP fault proxy')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, help='Port to listen on (default depends on the service)')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Fixed delay added to every API call (proxy: to every chunk, each way)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help='Extra delay drawn uniformly from [0, jitter] per call (proxy: per chunk)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API calls that fail (0-1)')
+    parser.add_argument('--error-status', type=int, default=500, help='HTTP status of injected failures')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Retry-After seconds sent with injected 429 responses (default: 1)')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible jitter and failures')
+    parser.add_argument('--mail-dir', help='graph: write every sent message to this directory as JSON')
+    parser.add_argument('--upstream', type=parse_address, help='proxy: HOST:PORT to forward connections to')
+    parser.add_argument('--control-port', type=int, default=PROXY_CONTROL_PORT,
+                        help=f'proxy: port of the /_standin control routes (default: {PROXY_CONTROL_PORT})')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0.0,
+                        help='proxy: cap each direction of each connection to this many kbit/s')
+    parser.add_argument('--reset-rate', type=float, default=0.0,
+                        help='proxy: fraction of new connections reset with a TCP RST (0-1)')
+    parser.add_argument('--reset-after-bytes', type=int, default=0,
+                        help='proxy: bytes a doomed connection forwards before it is reset (default: 0)')
+    parser.add_argument('--blackhole-rate', type=float, default=0.0,
+                        help='proxy: fraction of new connections held open with no traffic passed (0-1)')
+    parser.add_argument('--blackhole', action='store_true', help='proxy: start partitioned, holding back all traffic')
+    return parser
+
+
+def run_proxy(parser, args):
+    if args.upstream is None:
+        parser.error('proxy needs --upstream HOST:PORT')
+    config = ProxyConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, bandwidth_kbps=args.bandwidth_kbps,
+        reset_rate=args.reset_rate, reset_after_bytes=args.reset_after_bytes,
+        blackhole_rate=args.blackhole_rate, blackhole=args.blackhole, seed=args.seed,
+    )
+    try:
+        config.validate()
+    except ValueError as e:
+        parser.error(str(e))
+    asyncio.run(serve(FaultProxy(args.upstream, config), args.host, args.port or PROXY_PORT, args.control_port))
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.service == 'proxy':
+        return run_proxy(parser, args)
+    module_name, default_port, option_names = SERVICES[args.service]
+    config = FaultConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        error_status=args.error_status, retry_after_s=args.retry_after, seed=args.seed,
+    )
+    options = {name: getattr(args, name) for name in option_names}
+    module = __import__(module_name, fromlist=['create_app'])
+    app = module.create_app(config, **options)
+    uvicorn.run(app, host=args.host, port=args.port or default_port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Latency, jitter and error injection shared by the stand-ins.
+
+Settings can be given on the command line, and changed while a test is
+running through the control endpoints every stand-in exposes:
+
+    GET  /_standin/faults       current settings
+    POST /_standin/faults       {"latency_ms": 150, "error_rate": 0.05}
+    GET  /_standin/stats        calls and injected failures per route
+    POST /_standin/reset        drop all stored objects and counters
+"""
+
+import asyncio
+import random
+import re
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    # Extra delay drawn uniformly from [0, jitter_ms] per call
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    # Sent as Retry-After on injected 429 responses
+    retry_after_s: int = 1
+    seed: Optional[int] = None
+
+    def validate(self):
+        if not 0.0 <= self.error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        if self.latency_ms < 0 or self.jitter_ms < 0:
+            raise ValueError("latency_ms and jitter_ms must not be negative")
+        if self.retry_after_s < 0:
+            raise ValueError("retry_after_s must not be negative")
+
+    def update(self, changes: Dict[str, Any]):
+        known = {field.name for field in fields(self)}
+        unknown = set(changes) - known
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        replace(self, **changes).validate()
+        for name, value in changes.items():
+            setattr(self, name, value)
+
+
+class FaultInjector:
+    def __init__(self, config: FaultConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.calls: Dict[str, int] = {}
+        self.injected: Dict[str, int] = {}
+
+    def delay_s(self) -> float:
+        jitter = self.random.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return (self.config.latency_ms + jitter) / 1000
+
+    def should_fail(self) -> bool:
+        return self.config.error_rate > 0 and self.random.random() < self.config.error_rate
+
+    def failure_headers(self) -> Dict[str, str]:
+        if self.config.error_status == 429:
+            return {"Retry-After": str(self.config.retry_after_s)}
+        return {}
+
+    def count(self, counters: Dict[str, int], route: str):
+        counters[route] = counters.get(route, 0) + 1
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.injected.clear()
+
+
+def install_fault_injection(
+    app: FastAPI,
+    config: FaultConfig,
+    error_body: Callable[[int], dict],
+    api_prefix: Union[str, Tuple[str, ...]],
+    on_reset: Callable[[], None],
+    id_pattern: str,
+) -> FaultInjector:
+    """
+    Delay and possibly fail every request under api_prefix (one prefix or a
+    tuple of them), and add the /_standin control routes. error_body(status)
+    builds the failure payload in the format of the API being imitated; path
+    segments matching id_pattern are collapsed to {id} in the per-route
+    counters.
+    """
+    object_id = re.compile(id_pattern)
+    injector = FaultInjector(config)
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if not request.url.path.startswith(api_prefix):
+            return await call_next(request)
+        route = f"{request.method} {route_template(request.url.path, object_id)}"
+        injector.count(injector.calls, route)
+        delay = injector.delay_s()
+        if delay:
+            await asyncio.sleep(delay)
+        if injector.should_fail():
+            injector.count(injector.injected, route)
+            status = injector.config.error_status
+            return JSONResponse(error_body(status), status_code=status, headers=injector.failure_headers())
+        return await call_next(request)
+
+    @app.get("/_standin/faults")
+    async def get_faults():
+        return asdict(injector.config)
+
+    @app.post("/_standin/faults")
+    async def set_faults(request: Request):
+        try:
+            injector.config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        if injector.config.seed is not None:
+            injector.random.seed(injector.config.seed)
+        return asdict(injector.config)
+
+    @app.get("/_standin/stats")
+    async def get_stats():
+        return {"calls": dict(sorted(injector.calls.items())), "injected_errors": dict(sorted(injector.injected.items()))}
+
+    @app.post("/_standin/reset")
+    async def reset():
+        on_reset()
+        injector.reset_counters()
+        return {"reset": True}
+
+    return injector
+
+
+def route_template(path: str, object_id: re.Pattern) -> str:
+    """/v1/customers/cus_123 -> /v1/customers/{id}"""
+    return '/'.join('{id}' if object_id.fullmatch(part) else part for part in path.split('/'))
@@ -0,0 +1,215 @@
+"""
+In-memory stand-in for Microsoft Graph mail sending and the Microsoft
+identity platform token endpoint.
+
+Point the backend at it with GRAPH_API_BASE=http://localhost:12112 and
+GRAPH_AUTHORITY_BASE=http://localhost:12112/login. Covered calls:
+
+    POST /login/{tenant}/oauth2/v2.0/token      client credentials grant
+    POST /v1.0/users/{sender}/sendMail          202, message recorded
+    POST /v1.0/$batch                           up to 20 sendMail requests
+
+Sent messages are kept in memory (GET /_standin/messages) and, with
+mail_dir, written to disk one JSON file per message. Injected failures also
+hit individual $batch requests, and an injected 429 carries Retry-After as
+Graph's throttling responses do.
+"""
+
+import asyncio
+import json
+import re
+import secrets
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from standins.faults import FaultConfig, install_fault_injection, route_template
+
+# Mailbox addresses and tenant ids
+ID_PATTERN = r'[^/@]+@[^/]+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+
+ERROR_CODES = {
+    400: "BadRequest",
+    401: "InvalidAuthenticationToken",
+    404: "ResourceNotFound",
+    429: "TooManyRequests",
+    503: "ServiceNotAvailable",
+}
+
+TOKEN_LIFETIME_S = 3599
+MAX_BATCH_REQUESTS = 20
+# Messages kept in memory for /_standin/messages; the on-disk record is complete
+RECENT_MESSAGES = 1000
+
+
+class GraphError(Exception):
+    def __init__(self, status: int, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+
+
+def error_body(status: int, message: str = "Injected failure from the Graph stand-in",
+               code: Optional[str] = None) -> dict:
+    return {"error": {
+        "code": code or ERROR_CODES.get(status, "generalException"),
+        "message": message,
+        "innerError": {
+            "date": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
+            "request-id": secrets.token_hex(16),
+        },
+    }}
+
+
+class MailState:
+    """Issued tokens and sent messages"""
+
+    def __init__(self, mail_dir: Optional[Path] = None):
+        self.mail_dir = mail_dir
+        if mail_dir:
+            mail_dir.mkdir(parents=True, exist_ok=True)
+        self.reset()
+
+    def reset(self):
+        self.tokens: Dict[str, float] = {}
+        self.messages: deque = deque(maxlen=RECENT_MESSAGES)
+        self.sent = 0
+
+    def issue_token(self) -> str:
+        token = secrets.token_urlsafe(32)
+        self.tokens[token] = time.time() + TOKEN_LIFETIME_S
+        return token
+
+    def check_token(self, authorization: Optional[str]):
+        scheme, _, token = (authorization or '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            raise GraphError(401, "Access token is empty.")
+        expires_at = self.tokens.get(token)
+        if expires_at is None or expires_at < time.time():
+            raise GraphError(401, "Access token has expired or is not yet valid.")
+
+    async def send_mail(self, sender: str, payload: Any) -> dict:
+        message = payload.get("message") if isinstance(payload, dict) else None
+        if not isinstance(message, dict):
+            raise GraphError(400, "Empty Payload. JSON content expected.", code="ErrorInvalidRequest")
+        if not message.get("toRecipients"):
+            raise GraphError(400, "At least one recipient is required.", code="ErrorInvalidRecipients")
+        self.sent += 1
+        record = {
+            "id": f"{self.sent:06d}-{secrets.token_hex(4)}",
+            "sent_at": time.time(),
+            "sender": sender,
+            "save_to_sent_items": payload.get("saveToSentItems", True),
+            "message": message,
+        }
+        self.messages.append(record)
+        if self.mail_dir:
+            # Off the event loop, so a slow disk does not stall every other request
+            path = self.mail_dir / f"{record['id']}.json"
+            await asyncio.to_thread(path.write_text, json.dumps(record, indent=2))
+        return record
+
+
+def sendmail_sender(path: str) -> Optional[str]:
+    """/users/{sender}/sendMail -> sender"""
+    parts = path.strip('/').split('/')
+    if len(parts) == 3 and parts[0].lower() == 'users' and parts[2].lower() == 'sendmail':
+        return parts[1]
+    return None
+
+
+def create_app(config: Optional[FaultConfig] = None, mail_dir: Optional[str] = None) -> FastAPI:
+    config = config or FaultConfig()
+    config.validate()
+    state = MailState(Path(mail_dir) if mail_dir else None)
+    app = FastAPI(title="Microsoft Graph stand-in")
+    app.state.graph = state
+    injector = install_fault_injection(
+        app, config, error_body, api_prefix=("/v1.0/", "/login/"), on_reset=state.reset, id_pattern=ID_PATTERN,
+    )
+    object_id = re.compile(ID_PATTERN)
+
+    @app.exception_handler(GraphError)
+    async def graph_error_handler(request: Request, error: GraphError):
+        return JSONResponse(error_body(error.status, error.message, error.code), status_code=error.status)
+
+    async def json_of(request: Request) -> Any:
+        try:
+            return await request.json()
+        except ValueError:
+            raise GraphError(400, "Unable to read JSON request payload.")
+
+    @app.post("/login/{tenant}/oauth2/v2.0/token")
+    async def token(tenant: str, request: Request):
+        form = dict(parse_qsl((await request.body()).decode()))
+        if form.get("grant_type") != "client_credentials":
+            return JSONResponse({
+                "error": "unsupported_grant_type",
+                "error_description": "The stand-in only implements the client credentials grant.",
+            }, status_code=400)
+        if not form.get("client_id") or not form.get("client_secret"):
+            return JSONResponse({
+                "error": "invalid_client",
+                "error_description": "client_id and client_secret are required.",
+            }, status_code=401)
+        return {
+            "token_type": "Bearer",
+            "expires_in": TOKEN_LIFETIME_S,
+            "ext_expires_in": TOKEN_LIFETIME_S,
+            "access_token": state.issue_token(),
+        }
+
+    @app.post("/v1.0/users/{sender}/sendMail")
+    async def send_mail(sender: str, request: Request):
+        state.check_token(request.headers.get("authorization"))
+        await state.send_mail(sender, await json_of(request))
+        return Response(status_code=202)
+
+    async def batch_item(item: dict) -> Tuple[int, Dict[str, str], Any]:
+        method = str(item.get("method", "")).upper()
+        url = str(item.get("url", ""))
+        route = f"$batch {method} {route_template('/' + url.lstrip('/'), object_id)}"
+        injector.count(injector.calls, route)
+        if injector.should_fail():
+            injector.count(injector.injected, route)
+            status = injector.config.error_status
+            return status, injector.failure_headers(), error_body(status)
+        sender = sendmail_sender(url)
+        if method != "POST" or sender is None:
+            return 404, {}, error_body(404, f"Resource not found for the segment '{url}'.")
+        try:
+            await state.send_mail(sender, item.get("body"))
+        except GraphError as error:
+            return error.status, {}, error_body(error.status, error.message, error.code)
+        return 202, {}, None
+
+    @app.post("/v1.0/$batch")
+    async def batch(request: Request):
+        state.check_token(request.headers.get("authorization"))
+        payload = await json_of(request)
+        items = payload.get("requests") if isinstance(payload, dict) else None
+        if not isinstance(items, list) or not items:
+            raise GraphError(400, "Invalid batch payload.")
+        if len(items) > MAX_BATCH_REQUESTS:
+            raise GraphError(400, f"The number of batch requests exceeds {MAX_BATCH_REQUESTS}.")
+        if not all(isinstance(item, dict) for item in items):
+            raise GraphError(400, "Each batch request must be an object.")
+        responses = []
+        for item in items:
+            status, headers, body = await batch_item(item)
+            responses.append({"id": str(item.get("id", "")), "status": status, "headers": headers, "body": body})
+        return {"responses": responses}
+
+    @app.get("/_standin/messages")
+    async def messages(limit: int = 50):
+        recent = list(state.messages)[-limit:] if limit > 0 else []
+        return {"sent": state.sent, "messages": recent}
+
+    return app
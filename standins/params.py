@@ -0,0 +1,55 @@
+"""
+Decoding of Stripe-style bracketed form parameters.
+
+stripe-node sends nested objects as form fields such as
+`items[0][price]=price_123`, `metadata[source]=landing_page_purchase` and
+`expand[0]=latest_invoice.payment_intent`, in request bodies and in the
+query string of list calls alike.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Tuple
+
+_KEY_PART = re.compile(r'\[([^\]]*)\]')
+
+
+def split_key(key: str):
+    head, _, rest = key.partition('[')
+    return [head] + (_KEY_PART.findall('[' + rest) if rest else [])
+
+
+def decode_params(pairs: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    """Turn form pairs into nested dicts; dicts keyed only by integers become lists"""
+    root: Dict[str, Any] = {}
+    for key, value in pairs:
+        parts = split_key(key)
+        node = root
+        for index, part in enumerate(parts):
+            # `expand[]=a&expand[]=b` appends
+            if part == '':
+                part = str(len(node))
+            if index == len(parts) - 1:
+                node[part] = value
+            else:
+                node = node.setdefault(part, {})
+    return _listify(root)
+
+
+def _listify(node: Any) -> Any:
+    if not isinstance(node, dict):
+        return node
+    converted = {key: _listify(value) for key, value in node.items()}
+    if converted and all(key.isdigit() for key in converted):
+        return [converted[key] for key in sorted(converted, key=int)]
+    return converted
+
+
+def to_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def to_bool(value: Any) -> bool:
+    return value in (True, 'true', 'True', '1')
@@ -0,0 +1,470 @@
+"""
+In-memory stand-in for the parts of the Stripe API the backend uses.
+
+Point the backend at it with STRIPE_API_BASE=http://localhost:12111 and any
+sk_test_ key. Covered calls (stripe-node names):
+
+    customers.create / retrieve / update / list (expand: subscriptions)
+    paymentMethods.attach / list
+    products.create / retrieve / list / search
+    prices.create / retrieve / list
+    subscriptions.create / retrieve / update / list / cancel
+        (expand: latest_invoice.payment_intent)
+    setupIntents.create
+    billingPortal.sessions.create
+
+Payment methods are created on first attach, like Stripe's test tokens
+(pm_card_visa). Any payment method id containing "declined" fails with a
+card_error. A subscription whose customer has no payment method starts as
+'incomplete'.
+"""
+
+import re
+import secrets
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from standins.faults import FaultConfig, install_fault_injection
+from standins.params import decode_params, to_bool, to_int
+
+ID_PATTERN = r'(cus|pm|prod|price|sub|si|seti|bps|in|pi)_[A-Za-z0-9_]+'
+
+ERROR_TYPES = {
+    400: "invalid_request_error",
+    402: "card_error",
+    404: "invalid_request_error",
+    429: "rate_limit_error",
+}
+
+MONTH_S = 30 * 24 * 3600
+
+
+class StripeError(Exception):
+    def __init__(self, status: int, message: str, code: Optional[str] = None, param: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+        self.param = param
+
+
+def error_body(status: int, message: str = "Injected failure from the Stripe stand-in",
+               code: Optional[str] = None, param: Optional[str] = None) -> dict:
+    error = {"type": ERROR_TYPES.get(status, "api_error"), "message": message}
+    if code:
+        error["code"] = code
+    if param:
+        error["param"] = param
+    return {"error": error}
+
+
+def new_id(prefix: str) -> str:
+    return f"{prefix}_{secrets.token_hex(12)}"
+
+
+class StripeState:
+    """
+    Every object the stand-in has created, keyed by kind and id, and for
+    objects that belong to a customer also by kind and customer, so
+    per-customer lookups do not scan every object of the kind.
+    """
+
+    KINDS = ("customer", "payment_method", "product", "price", "subscription", "invoice", "setup_intent")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.objects: Dict[str, Dict[str, dict]] = {kind: {} for kind in self.KINDS}
+        self.by_customer: Dict[str, Dict[str, Dict[str, dict]]] = {kind: {} for kind in self.KINDS}
+
+    def add(self, obj: dict) -> dict:
+        self.objects[obj["object"]][obj["id"]] = obj
+        if obj.get("customer"):
+            self.by_customer[obj["object"]].setdefault(obj["customer"], {})[obj["id"]] = obj
+        return obj
+
+    def set_customer(self, obj: dict, customer_id: str):
+        """Move obj to another customer, keeping the index in step"""
+        index = self.by_customer[obj["object"]]
+        if obj.get("customer"):
+            index.get(obj["customer"], {}).pop(obj["id"], None)
+        obj["customer"] = customer_id
+        index.setdefault(customer_id, {})[obj["id"]] = obj
+
+    def get(self, kind: str, object_id: str) -> dict:
+        obj = self.objects[kind].get(object_id)
+        if obj is None:
+            raise StripeError(404, f"No such {kind}: '{object_id}'", code="resource_missing", param="id")
+        return obj
+
+    def all(self, kind: str, customer: Optional[str] = None) -> Iterator[dict]:
+        """Newest first, as Stripe lists them; lazily, so a page only reads what it returns"""
+        objects = self.objects[kind] if customer is None else self.by_customer[kind].get(customer, {})
+        return reversed(objects.values())
+
+    def has(self, kind: str, customer: str) -> bool:
+        return bool(self.by_customer[kind].get(customer))
+
+
+def paginate(items: Iterable[dict], params: Dict[str, Any], url: str) -> dict:
+    limit = max(1, min(to_int(params.get("limit"), 10), 100))
+    items = iter(items)
+    starting_after = params.get("starting_after")
+    if starting_after:
+        # Skip past the cursor; an unknown cursor consumes everything and gives an empty page
+        for item in items:
+            if item["id"] == starting_after:
+                break
+    page = list(islice(items, limit + 1))
+    return {"object": "list", "data": page[:limit], "has_more": len(page) > limit, "url": url}
+
+
+def where(items: Iterable[dict], matches) -> Iterator[dict]:
+    """Lazy filter. It runs after the loop that built it, so predicates bind loop values as defaults."""
+    return (item for item in items if matches(item))
+
+
+def merge_update(target: dict, changes: Dict[str, Any]):
+    """Apply form updates; an empty string unsets a field as in the real API"""
+    for key, value in changes.items():
+        if value == '':
+            target[key] = None
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_update(target[key], value)
+        else:
+            target[key] = value
+
+
+def create_app(config: Optional[FaultConfig] = None) -> FastAPI:
+    config = config or FaultConfig()
+    config.validate()
+    state = StripeState()
+    app = FastAPI(title="Stripe stand-in")
+    app.state.stripe = state
+    install_fault_injection(app, config, error_body, api_prefix="/v1/", on_reset=state.reset, id_pattern=ID_PATTERN)
+
+    @app.exception_handler(StripeError)
+    async def stripe_error_handler(request: Request, error: StripeError):
+        return JSONResponse(error_body(error.status, error.message, error.code, error.param), status_code=error.status)
+
+    async def params_of(request: Request) -> Dict[str, Any]:
+        pairs = list(request.query_params.multi_items())
+        if request.method == "POST":
+            pairs += parse_qsl((await request.body()).decode(), keep_blank_values=True)
+        return decode_params(pairs)
+
+    def require(params: Dict[str, Any], name: str):
+        if not params.get(name):
+            raise StripeError(400, f"Missing required param: {name}.", code="parameter_missing", param=name)
+        return params[name]
+
+    # ------------------------------------------------------------------
+    # Customers
+    # ------------------------------------------------------------------
+
+    def expand_customer(customer: dict, expand: List[str]) -> dict:
+        if "subscriptions" not in expand:
+            return customer
+        subscriptions = state.all("subscription", customer["id"])
+        return {**customer, "subscriptions": paginate(subscriptions, {"limit": 100}, "/v1/subscriptions")}
+
+    @app.post("/v1/customers")
+    async def create_customer(request: Request):
+        params = await params_of(request)
+        return state.add({
+            "id": new_id("cus"),
+            "object": "customer",
+            "created": int(time.time()),
+            "email": params.get("email"),
+            "name": params.get("name"),
+            "phone": params.get("phone"),
+            "address": params.get("address"),
+            "description": params.get("description"),
+            "metadata": params.get("metadata", {}),
+            "invoice_settings": {"default_payment_method": None, **params.get("invoice_settings", {})},
+            "livemode": False,
+        })
+
+    @app.get("/v1/customers")
+    async def list_customers(request: Request):
+        params = await params_of(request)
+        customers = state.all("customer")
+        if params.get("email"):
+            customers = (c for c in customers if c["email"] == params["email"])
+        return paginate(customers, params, "/v1/customers")
+
+    @app.get("/v1/customers/{customer_id}")
+    async def retrieve_customer(customer_id: str, request: Request):
+        params = await params_of(request)
+        return expand_customer(state.get("customer", customer_id), params.get("expand", []))
+
+    @app.post("/v1/customers/{customer_id}")
+    async def update_customer(customer_id: str, request: Request):
+        params = await params_of(request)
+        customer = state.get("customer", customer_id)
+        expand = params.pop("expand", [])
+        merge_update(customer, params)
+        return expand_customer(customer, expand)
+
+    # ------------------------------------------------------------------
+    # Payment methods
+    # ------------------------------------------------------------------
+
+    @app.post("/v1/payment_methods/{payment_method_id}/attach")
+    async def attach_payment_method(payment_method_id: str, request: Request):
+        params = await params_of(request)
+        customer = state.get("customer", require(params, "customer"))
+        if "declined" in payment_method_id.lower():
+            raise StripeError(402, "Your card was declined.", code="card_declined")
+        payment_method = state.objects["payment_method"].get(payment_method_id) or state.add({
+            "id": payment_method_id,
+            "object": "payment_method",
+            "created": int(time.time()),
+            "type": "card",
+            "card": {"brand": "visa", "last4": "4242", "exp_month": 12, "exp_year": 2034, "funding": "credit"},
+            "billing_details": {"email": customer["email"], "name": customer["name"]},
+            "customer": None,
+            "livemode": False,
+        })
+        state.set_customer(payment_method, customer["id"])
+        return payment_method
+
+    @app.get("/v1/payment_methods")
+    async def list_payment_methods(request: Request):
+        params = await params_of(request)
+        methods = state.all("payment_method", params.get("customer") or None)
+        if params.get("type"):
+            methods = (m for m in methods if m["type"] == params["type"])
+        return paginate(methods, params, "/v1/payment_methods")
+
+    # ------------------------------------------------------------------
+    # Products and prices
+    # ------------------------------------------------------------------
+
+    @app.post("/v1/products")
+    async def create_product(request: Request):
+        params = await params_of(request)
+        return state.add({
+            "id": new_id("prod"),
+            "object": "product",
+            "created": int(time.time()),
+            "name": require(params, "name"),
+            "description": params.get("description"),
+            "active": to_bool(params.get("active", True)),
+            "metadata": params.get("metadata", {}),
+            "type": params.get("type", "service"),
+            "livemode": False,
+        })
+
+    @app.get("/v1/products")
+    async def list_products(request: Request):
+        params = await params_of(request)
+        products = state.all("product")
+        if "active" in params:
+            products = (p for p in products if p["active"] == to_bool(params["active"]))
+        return paginate(products, params, "/v1/products")
+
+    @app.get("/v1/products/search")
+    async def search_products(request: Request):
+        params = await params_of(request)
+        # Supports the field:'value' clauses joined with AND that the backend uses
+        clauses = re.findall(r"(\w+)(?:\['(\w+)'\])?:'([^']*)'", require(params, "query"))
+        products = state.all("product")
+        for field, key, value in clauses:
+            if key:
+                products = where(products, lambda p, key=key, value=value: p.get("metadata", {}).get(key) == value)
+            else:
+                products = where(products, lambda p, field=field, value=value: str(p.get(field)).lower() == value.lower())
+        limit = max(1, min(to_int(params.get("limit"), 10), 100))
+        products = list(islice(products, limit + 1))
+        return {"object": "search_result", "data": products[:limit], "has_more": len(products) > limit,
+                "next_page": None, "url": "/v1/products/search"}
+
+    @app.get("/v1/products/{product_id}")
+    async def retrieve_product(product_id: str):
+        return state.get("product", product_id)
+
+    @app.post("/v1/prices")
+    async def create_price(request: Request):
+        params = await params_of(request)
+        product = state.get("product", require(params, "product"))
+        recurring = params.get("recurring")
+        return state.add({
+            "id": new_id("price"),
+            "object": "price",
+            "created": int(time.time()),
+            "product": product["id"],
+            "currency": require(params, "currency"),
+            "unit_amount": to_int(require(params, "unit_amount")),
+            "recurring": {"interval": recurring.get("interval", "month"), "interval_count": 1} if recurring else None,
+            "type": "recurring" if recurring else "one_time",
+            "active": True,
+            "metadata": params.get("metadata", {}),
+            "livemode": False,
+        })
+
+    @app.get("/v1/prices")
+    async def list_prices(request: Request):
+        params = await params_of(request)
+        prices = state.all("price")
+        for field in ("product", "type", "currency"):
+            if params.get(field):
+                prices = where(prices, lambda p, field=field: p[field] == params[field])
+        if "active" in params:
+            prices = (p for p in prices if p["active"] == to_bool(params["active"]))
+        return paginate(prices, params, "/v1/prices")
+
+    @app.get("/v1/prices/{price_id}")
+    async def retrieve_price(price_id: str):
+        return state.get("price", price_id)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscription_items(subscription_id: str, items: List[dict]) -> dict:
+        data = [
+            {"id": item.get("id") or new_id("si"), "object": "subscription_item",
+             "price": state.get("price", item["price"]), "quantity": to_int(item.get("quantity"), 1),
+             "subscription": subscription_id}
+            for item in items
+        ]
+        return {"object": "list", "data": data, "has_more": False, "url": f"/v1/subscription_items?subscription={subscription_id}"}
+
+    def expand_subscription(subscription: dict, expand: List[str]) -> dict:
+        if not any(path.startswith("latest_invoice") for path in expand) or not subscription["latest_invoice"]:
+            return subscription
+        invoice = dict(state.get("invoice", subscription["latest_invoice"]))
+        if "latest_invoice.payment_intent" not in expand:
+            invoice["payment_intent"] = invoice["payment_intent"]["id"]
+        return {**subscription, "latest_invoice": invoice}
+
+    @app.post("/v1/subscriptions")
+    async def create_subscription(request: Request):
+        params = await params_of(request)
+        customer = state.get("customer", require(params, "customer"))
+        items = require(params, "items")
+        now = int(time.time())
+        anchor = to_int(params.get("billing_cycle_anchor"), now)
+        payment_method = params.get("default_payment_method") or customer["invoice_settings"].get("default_payment_method")
+        has_payment_method = bool(payment_method) or state.has("payment_method", customer["id"])
+        status = "active" if has_payment_method else "incomplete"
+        subscription_id = new_id("sub")
+        invoice = state.add({
+            "id": new_id("in"),
+            "object": "invoice",
+            "customer": customer["id"],
+            "subscription": subscription_id,
+            "status": "paid" if has_payment_method else "open",
+            "payment_intent": {
+                "id": new_id("pi"),
+                "object": "payment_intent",
+                "status": "succeeded" if has_payment_method else "requires_payment_method",
+                "client_secret": f"{new_id('pi')}_secret_{secrets.token_hex(8)}",
+            },
+        })
+        return expand_subscription(state.add({
+            "id": subscription_id,
+            "object": "subscription",
+            "created": now,
+            "customer": customer["id"],
+            "status": status,
+            "items": subscription_items(subscription_id, items),
+            "default_payment_method": payment_method,
+            "billing_cycle_anchor": anchor,
+            "current_period_start": now,
+            "current_period_end": anchor if anchor > now else now + MONTH_S,
+            "cancel_at_period_end": False,
+            "canceled_at": None,
+            "pause_collection": None,
+            "proration_behavior": params.get("proration_behavior"),
+            "latest_invoice": invoice["id"],
+            "metadata": params.get("metadata", {}),
+            "livemode": False,
+        }), params.get("expand", []))
+
+    @app.get("/v1/subscriptions")
+    async def list_subscriptions(request: Request):
+        params = await params_of(request)
+        subscriptions = state.all("subscription", params.get("customer") or None)
+        status = params.get("status")
+        if status and status != "all":
+            subscriptions = (s for s in subscriptions if s["status"] == status)
+        elif not status:
+            # Stripe leaves canceled subscriptions out unless asked for
+            subscriptions = (s for s in subscriptions if s["status"] != "canceled")
+        return paginate(subscriptions, params, "/v1/subscriptions")
+
+    @app.get("/v1/subscriptions/{subscription_id}")
+    async def retrieve_subscription(subscription_id: str, request: Request):
+        params = await params_of(request)
+        return expand_subscription(state.get("subscription", subscription_id), params.get("expand", []))
+
+    @app.post("/v1/subscriptions/{subscription_id}")
+    async def update_subscription(subscription_id: str, request: Request):
+        params = await params_of(request)
+        subscription = state.get("subscription", subscription_id)
+        if subscription["status"] == "canceled":
+            raise StripeError(400, "A canceled subscription can only update its cancellation_details and metadata.")
+        expand = params.pop("expand", [])
+        if "items" in params:
+            current = {item["id"]: item for item in subscription["items"]["data"]}
+            replaced = [{**current.get(item.get("id"), {}), **item} for item in params.pop("items")]
+            for item in replaced:
+                if isinstance(item.get("price"), dict):
+                    item["price"] = item["price"]["id"]
+            subscription["items"] = subscription_items(subscription_id, replaced)
+        if "cancel_at_period_end" in params:
+            subscription["cancel_at_period_end"] = to_bool(params.pop("cancel_at_period_end"))
+        merge_update(subscription, params)
+        return expand_subscription(subscription, expand)
+
+    @app.delete("/v1/subscriptions/{subscription_id}")
+    async def cancel_subscription(subscription_id: str):
+        subscription = state.get("subscription", subscription_id)
+        subscription["status"] = "canceled"
+        subscription["canceled_at"] = int(time.time())
+        return subscription
+
+    # ------------------------------------------------------------------
+    # Setup intents and billing portal
+    # ------------------------------------------------------------------
+
+    @app.post("/v1/setup_intents")
+    async def create_setup_intent(request: Request):
+        params = await params_of(request)
+        setup_intent_id = new_id("seti")
+        return state.add({
+            "id": setup_intent_id,
+            "object": "setup_intent",
+            "created": int(time.time()),
+            "client_secret": f"{setup_intent_id}_secret_{secrets.token_hex(12)}",
+            "customer": params.get("customer"),
+            "payment_method_types": params.get("payment_method_types", ["card"]),
+            "status": "requires_payment_method",
+            "usage": params.get("usage", "off_session"),
+            "livemode": False,
+        })
+
+    @app.post("/v1/billing_portal/sessions")
+    async def create_billing_portal_session(request: Request):
+        params = await params_of(request)
+        customer = state.get("customer", require(params, "customer"))
+        session_id = new_id("bps")
+        return {
+            "id": session_id,
+            "object": "billing_portal.session",
+            "created": int(time.time()),
+            "customer": customer["id"],
+            "return_url": params.get("return_url"),
+            "url": f"{request.base_url}p/session/{session_id}",
+            "livemode": False,
+        }
+
+    return app
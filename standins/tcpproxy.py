@@ -0,0 +1,278 @@
+"""
+Fault-injecting TCP proxy.
+
+The API stand-ins degrade a third-party HTTP API; the proxy degrades a plain
+TCP hop instead, so it can sit between the backend and MongoDB, or between
+nginx and the backend, and shape whatever protocol runs over it:
+
+    python -m standins proxy --port 27018 --upstream 127.0.0.1:27017 --latency-ms 20 --jitter-ms 10
+
+Each forwarded chunk is delayed by latency + uniform(0, jitter) in its own
+direction, without reordering, and optionally paced to a bandwidth cap. A
+fraction of new connections can be reset (TCP RST) after a number of bytes,
+or blackholed: held open with nothing read or delivered. Setting `blackhole`
+pauses every connection the same way, which looks like a network partition
+to both ends. Nothing is lost: once it is cleared, the data held back on
+either side is delivered in order, as after a partition heals.
+
+Settings are changed while a test is running through the same control
+routes the API stand-ins expose, served on a separate port:
+
+    GET  /_standin/faults       current settings
+    POST /_standin/faults       {"latency_ms": 200, "blackhole": true}
+    GET  /_standin/stats        connections, resets and bytes forwarded
+    POST /_standin/reset        reset every open connection and the counters
+"""
+
+import asyncio
+import random
+import socket
+import struct
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any, Dict, Optional, Set, Tuple
+
+Address = Tuple[str, int]
+
+READ_SIZE = 64 * 1024
+# Chunks waiting for their delivery time, per direction, before reads pause
+QUEUE_CHUNKS = 64
+# Largest write when pacing to a bandwidth cap
+PACE_BYTES = 16 * 1024
+# How often a paused connection checks whether its blackhole was lifted
+BLACKHOLE_POLL_S = 0.02
+COUNTERS = ("connections", "resets", "blackholed", "upstream_failures", "bytes_up", "bytes_down")
+
+
+@dataclass
+class ProxyConfig:
+    latency_ms: float = 0.0
+    # Extra delay drawn uniformly from [0, jitter_ms] per chunk
+    jitter_ms: float = 0.0
+    # Per direction and connection; 0 means unlimited
+    bandwidth_kbps: float = 0.0
+    # Fraction of new connections reset once more than reset_after_bytes have passed through
+    reset_rate: float = 0.0
+    reset_after_bytes: int = 0
+    # Fraction of new connections whose traffic is held back for good
+    blackhole_rate: float = 0.0
+    # Hold back all traffic on every connection, open or new, until cleared
+    blackhole: bool = False
+    connect_timeout_s: float = 5.0
+    seed: Optional[int] = None
+
+    def validate(self):
+        for name in ("reset_rate", "blackhole_rate"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if min(self.latency_ms, self.jitter_ms, self.bandwidth_kbps, self.reset_after_bytes) < 0:
+            raise ValueError("latency_ms, jitter_ms, bandwidth_kbps and reset_after_bytes must not be negative")
+        if self.connect_timeout_s <= 0:
+            raise ValueError("connect_timeout_s must be positive")
+
+    def update(self, changes: Dict[str, Any]):
+        known = {f.name for f in fields(self)}
+        unknown = set(changes) - known
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        replace(self, **changes).validate()
+        for name, value in changes.items():
+            setattr(self, name, value)
+
+
+@dataclass(eq=False)
+class Connection:
+    reset_pending: bool
+    blackholed: bool
+    writers: list = field(default_factory=list)
+    forwarded: int = 0
+    aborted: bool = False
+
+
+def parse_address(value: str) -> Address:
+    """'host:port' or just 'port' (on 127.0.0.1)"""
+    host, _, port = value.rpartition(':')
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+def abort_with_rst(writer: asyncio.StreamWriter):
+    sock = writer.get_extra_info('socket')
+    if sock is not None:
+        try:
+            # Linger 0 makes close() send RST instead of FIN
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        except OSError:
+            pass
+    writer.transport.abort()
+
+
+class FaultProxy:
+    def __init__(self, upstream: Address, config: ProxyConfig):
+        self.upstream = upstream
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.connections: Set[Connection] = set()
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    def chance(self, rate: float) -> bool:
+        return rate > 0 and self.random.random() < rate
+
+    def delay_s(self) -> float:
+        jitter = self.random.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return (self.config.latency_ms + jitter) / 1000
+
+    async def handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        self.counters["connections"] += 1
+        conn = Connection(reset_pending=self.chance(self.config.reset_rate),
+                          blackholed=self.chance(self.config.blackhole_rate))
+        if conn.blackholed:
+            self.counters["blackholed"] += 1
+        try:
+            upstream_reader, upstream_writer = await asyncio.wait_for(
+                asyncio.open_connection(*self.upstream), self.config.connect_timeout_s,
+            )
+        except (OSError, asyncio.TimeoutError):
+            self.counters["upstream_failures"] += 1
+            abort_with_rst(client_writer)
+            return
+        conn.writers = [client_writer, upstream_writer]
+        self.connections.add(conn)
+        try:
+            await asyncio.gather(
+                self.pipe(conn, client_reader, upstream_writer, "bytes_up"),
+                self.pipe(conn, upstream_reader, client_writer, "bytes_down"),
+            )
+        finally:
+            self.connections.discard(conn)
+            for writer in conn.writers:
+                writer.close()
+
+    def abort(self, conn: Connection, injected: bool = True):
+        """RST both ends; only injected resets are counted"""
+        if not conn.aborted:
+            conn.aborted = True
+            if injected:
+                self.counters["resets"] += 1
+            for writer in conn.writers:
+                abort_with_rst(writer)
+
+    async def hold(self, conn: Connection):
+        """Wait while the connection is blackholed, without reading or writing"""
+        while (self.config.blackhole or conn.blackholed) and not conn.aborted:
+            await asyncio.sleep(BLACKHOLE_POLL_S)
+
+    async def pipe(self, conn: Connection, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, counter: str):
+        """Forward one direction: reads queue chunks with their delivery time, deliver() writes them"""
+        queue: asyncio.Queue = asyncio.Queue(QUEUE_CHUNKS)
+        delivery = asyncio.ensure_future(self.deliver(conn, queue, writer, counter))
+        loop = asyncio.get_running_loop()
+        last_due = 0.0
+        try:
+            while not conn.aborted:
+                # Unread data backs up in the socket buffers and then the sender
+                await self.hold(conn)
+                try:
+                    data = await reader.read(READ_SIZE)
+                except (ConnectionError, OSError):
+                    break
+                if not data:
+                    break
+                conn.forwarded += len(data)
+                if conn.reset_pending and conn.forwarded > self.config.reset_after_bytes:
+                    self.abort(conn)
+                    break
+                # Never earlier than the previous chunk, so jitter cannot reorder the stream
+                last_due = max(loop.time() + self.delay_s(), last_due)
+                await queue.put((last_due, data))
+        finally:
+            await queue.put(None)
+            await delivery
+
+    async def deliver(self, conn: Connection, queue: asyncio.Queue, writer: asyncio.StreamWriter, counter: str):
+        loop = asyncio.get_running_loop()
+        free_at = 0.0
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            # After an abort the queue is still emptied, so pipe() never blocks on a full one
+            if conn.aborted:
+                continue
+            due, data = item
+            rate = self.config.bandwidth_kbps * 1000 / 8
+            pieces = [data[i:i + PACE_BYTES] for i in range(0, len(data), PACE_BYTES)] if rate else [data]
+            for piece in pieces:
+                # A piece arrives once it has been fully "transmitted" at the capped rate
+                free_at = max(due, free_at, loop.time()) + (len(piece) / rate if rate else 0)
+                wait = free_at - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self.hold(conn)
+                if conn.aborted:
+                    break
+                writer.write(piece)
+                self.counters[counter] += len(piece)
+            try:
+                await writer.drain()
+            except (ConnectionError, OSError):
+                # The destination is gone; reset the source too rather than leave it sending into a full queue
+                self.abort(conn, injected=False)
+        if not conn.aborted and not writer.is_closing() and writer.can_write_eof():
+            try:
+                writer.write_eof()
+            except OSError:
+                pass
+
+    def reset(self):
+        for conn in list(self.connections):
+            self.abort(conn)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def stats(self) -> dict:
+        return {"active": len(self.connections), **self.counters}
+
+
+def create_control_app(proxy: FaultProxy):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI(title="TCP fault proxy")
+
+    @app.get("/_standin/faults")
+    async def get_faults():
+        return asdict(proxy.config)
+
+    @app.post("/_standin/faults")
+    async def set_faults(request: Request):
+        try:
+            proxy.config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        if proxy.config.seed is not None:
+            proxy.random.seed(proxy.config.seed)
+        return asdict(proxy.config)
+
+    @app.get("/_standin/stats")
+    async def get_stats():
+        return {"upstream": f"{proxy.upstream[0]}:{proxy.upstream[1]}", **proxy.stats()}
+
+    @app.post("/_standin/reset")
+    async def reset():
+        proxy.reset()
+        return {"reset": True}
+
+    return app
+
+
+async def serve(proxy: FaultProxy, host: str, port: int, control_port: int):
+    """Run the proxy until the control server is stopped (Ctrl-C)"""
+    import uvicorn
+
+    server = await proxy.start(host, port)
+    control = uvicorn.Server(uvicorn.Config(create_control_app(proxy), host=host, port=control_port,
+                                            log_level='warning'))
+    print(f"🔌 {host}:{port} -> {proxy.upstream[0]}:{proxy.upstream[1]}, control on {host}:{control_port}")
+    async with server:
+        await control.serve()
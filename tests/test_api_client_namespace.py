@@ -0,0 +1,33 @@
+"""
+Unit tests for per-worker test data namespaces
+"""
+
+from api_client.namespace import TestNamespace
+
+
+class TestTestNamespace:
+    """Tagged identities stay unique per worker and per call"""
+
+    def test_workers_in_one_run_get_distinct_tags(self):
+        gw0 = TestNamespace(run_id="3f2a9c1b77", worker="gw0")
+        gw1 = TestNamespace(run_id="3f2a9c1b77", worker="gw1")
+
+        assert gw0.tag == "tns-3f2a9c1b-gw0"
+        assert gw0.tag != gw1.tag
+        assert gw0.email("test.contact") != gw1.email("test.contact")
+        assert gw0.tag.startswith(gw1.run_tag)
+
+    def test_identities_are_unique_within_a_worker(self):
+        namespace = TestNamespace(run_id="abcdef12", worker="gw3")
+        emails = {namespace.email("test.purchase") for _ in range(50)}
+
+        assert len(emails) == 50
+        assert all(e.endswith("@example.com") and namespace.owns(e) for e in emails)
+
+    def test_slug_and_title(self):
+        namespace = TestNamespace(run_id="abcdef12", worker="gw3")
+
+        assert namespace.slug("My First Post!") == "my-first-post-tns-abcdef12-gw3-1"
+        assert namespace.title("TEST_Privacy Section") == "TEST_Privacy Section [tns-abcdef12-gw3]"
+        assert not namespace.owns("TEST_Privacy Section")
+        assert not namespace.owns(None)
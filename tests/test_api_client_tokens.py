@@ -0,0 +1,151 @@
+"""
+Unit tests for the API client's admin token bookkeeping and renewal
+"""
+
+import base64
+import json
+import time
+
+from api_client.response import AdminTokens, jwt_expiry
+
+
+def make_jwt(payload: dict) -> str:
+    def segment(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    return f"{segment({'alg': 'HS256', 'typ': 'JWT'})}.{segment(payload)}.signature"
+
+
+class TestAdminTokens:
+    """Expiry parsing and early renewal"""
+
+    def test_jwt_expiry_reads_exp_claim(self):
+        assert jwt_expiry(make_jwt({"exp": 1700000000})) == 1700000000.0
+
+    def test_jwt_expiry_tolerates_malformed_tokens(self):
+        assert jwt_expiry(None) is None
+        assert jwt_expiry("not-a-jwt") is None
+        assert jwt_expiry(make_jwt({"sub": "admin"})) is None
+
+    def test_expiring_within_refresh_margin(self):
+        tokens = AdminTokens()
+        tokens.update({"accessToken": make_jwt({"exp": time.time() + 3600}), "refreshToken": "r1"})
+        assert not tokens.expiring
+
+        tokens.update({"accessToken": make_jwt({"exp": time.time() + AdminTokens.REFRESH_MARGIN / 2})})
+        assert tokens.expiring
+        # A refresh response without a new refresh token keeps the old one
+        assert tokens.refresh_token == "r1"
+
+    def test_clear(self):
+        tokens = AdminTokens()
+        tokens.update({"accessToken": make_jwt({"exp": time.time() + 60}), "refreshToken": "r1"})
+        tokens.clear()
+        assert tokens.access_token is None and tokens.refresh_token is None
+        assert not tokens.expiring
+
+
+class FakeBackend:
+    """Admin auth routes plus one protected route; revoke() makes the current token stale"""
+
+    def __init__(self, refresh_works=True):
+        self.refresh_works = refresh_works
+        self.issued = 0
+        self.valid = set()
+        self.calls = []
+
+    def issue(self) -> dict:
+        self.issued += 1
+        token = make_jwt({"exp": time.time() + 3600, "n": self.issued})
+        self.valid.add(token)
+        return {"success": True, "accessToken": token, "refreshToken": f"r{self.issued}"}
+
+    def revoke(self):
+        self.valid.clear()
+
+    def handle(self, method, path, authorization=None):
+        self.calls.append(path)
+        if path == '/api/admin/login':
+            return 200, self.issue()
+        if path == '/api/admin/refresh':
+            return (200, self.issue()) if self.refresh_works else (401, {"detail": "expired"})
+        if authorization and authorization.split(' ', 1)[1] in self.valid:
+            return 200, {"clients": []}
+        return 401, {"detail": "invalid token"}
+
+
+class FakeSession:
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    def request(self, method, url, headers=None, **kwargs):
+        path = url.split('http://api.test', 1)[1]
+        status, body = self.backend.handle(method, path, (headers or {}).get('Authorization'))
+        return type("Response", (), {"status_code": status, "text": json.dumps(body), "headers": {}})()
+
+    def close(self):
+        pass
+
+
+class TestAdminRetryOn401:
+    """A 401 on an admin route renews the token once and repeats the request"""
+
+    def sync_client(self, backend):
+        from api_client import ApiClient
+
+        api = ApiClient("http://api.test")
+        api.session = FakeSession(backend)
+        return api
+
+    def async_client(self, backend):
+        import httpx
+
+        from api_client import AsyncApiClient
+
+        def handler(request):
+            status, body = backend.handle(request.method, request.url.path, request.headers.get('Authorization'))
+            return httpx.Response(status, json=body)
+
+        api = AsyncApiClient("http://api.test")
+        api.http = httpx.AsyncClient(base_url="http://api.test", transport=httpx.MockTransport(handler))
+        return api
+
+    def test_sync_refreshes_and_retries(self):
+        backend = FakeBackend()
+        api = self.sync_client(backend)
+        assert api.get_clients().status_code == 200
+        backend.revoke()
+        assert api.get_clients().status_code == 200
+        assert backend.calls == ['/api/admin/login', '/api/admin/clients', '/api/admin/clients',
+                                 '/api/admin/refresh', '/api/admin/clients']
+
+    def test_sync_logs_in_again_when_refresh_fails(self):
+        backend = FakeBackend(refresh_works=False)
+        api = self.sync_client(backend)
+        api.get_clients()
+        backend.revoke()
+        assert api.get_clients().status_code == 200
+        assert backend.calls[-3:] == ['/api/admin/refresh', '/api/admin/login', '/api/admin/clients']
+
+    def test_async_concurrent_401s_share_one_refresh(self):
+        import asyncio
+
+        backend = FakeBackend()
+
+        async def main():
+            async with self.async_client(backend) as api:
+                await api.get_clients()
+                backend.revoke()
+                return await asyncio.gather(*(api.get_clients() for _ in range(3)))
+
+        assert [response.status_code for response in asyncio.run(main())] == [200] * 3
+        assert backend.calls.count('/api/admin/refresh') == 1
+        assert backend.calls.count('/api/admin/login') == 1
+
+
+def test_routes_need_a_transport():
+    import pytest
+
+    from api_client.routes import ApiRoutes
+
+    with pytest.raises(TypeError):
+        ApiRoutes("admin@example.com", "secret")
@@ -0,0 +1,97 @@
+"""
+Unit tests for the integrity checks and the server-side scanner pipelines
+"""
+
+from integrity.__main__ import check_list
+from integrity.checks import CHECKS, CHECKS_BY_NAME, by_collection, filter_fields
+from integrity.scanner import facet_pipeline, failures, format_report, merge, partition_ranges, scan
+
+CLIENT_CHECKS = by_collection(CHECKS)['clients']
+
+
+def test_filter_fields_walks_logical_operators():
+    query = {'a.b': 1, '$or': [{'c': None}, {'$and': [{'d': {'$exists': True}}]}], '$expr': {'$eq': ['$e', 1]}}
+    assert filter_fields(query) == {'a', 'c', 'd'}
+
+
+def test_client_checks_cover_the_comprehensive_test_mappings():
+    names = {check.name for check in CLIENT_CHECKS}
+    assert names == {'null_subscription_status', 'phone_without_telephone',
+                     'monthly_price_without_price', 'billing_date_without_billing_day'}
+
+
+def test_facet_pipeline_projects_only_checked_fields_and_counts_each_check():
+    pipeline = facet_pipeline(CLIENT_CHECKS, samples=3)
+    project, facet = pipeline[0]['$project'], pipeline[1]['$facet']
+    assert set(project) == {'subscription_status', 'phone', 'telephone', 'monthlyPrice', 'price',
+                            'billingDate', 'billingDay'}
+    check = CHECKS_BY_NAME['phone_without_telephone']
+    assert facet[check.name] == [{'$match': check.filter}, {'$count': 'count'}]
+    assert facet[f'{check.name}__samples'][1] == {'$limit': 3}
+    assert facet['_documents'] == [{'$count': 'count'}]
+
+
+def test_facet_pipeline_restricts_to_id_range_and_skips_samples():
+    pipeline = facet_pipeline(CLIENT_CHECKS, samples=0, id_range=(10, None))
+    assert pipeline[0] == {'$match': {'_id': {'$gte': 10}}}
+    assert not [name for name in pipeline[-1]['$facet'] if name.endswith('__samples')]
+
+
+def test_partition_ranges_cover_the_whole_key_space():
+    ranges = partition_ranges(list(range(100)), 4)
+    assert ranges == [(None, 25), (25, 50), (50, 75), (75, None)]
+    assert partition_ranges(list(range(3)), 4) == [(None, None)]
+    assert partition_ranges([1, 'a', 2, 'b'], 2) == [(None, None)]
+
+
+def test_merge_sums_counts_and_keeps_first_samples():
+    check = CHECKS_BY_NAME['null_subscription_status']
+    facets = [
+        {'_documents': [{'count': 10}], check.name: [{'count': 2}], f'{check.name}__samples': [{'_id': 1}, {'_id': 2}]},
+        {'_documents': [{'count': 5}], check.name: [], f'{check.name}__samples': []},
+        {'_documents': [{'count': 7}], check.name: [{'count': 1}], f'{check.name}__samples': [{'_id': 9}]},
+    ]
+    documents, merged = merge([check], facets, samples=2)
+    assert documents == 22
+    assert merged[check.name] == {'count': 3, 'sample_ids': ['1', '2']}
+
+
+class FakeCollection:
+    def __init__(self, facet):
+        self.facet = facet
+        self.pipelines = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        if '$sample' in pipeline[0]:
+            return iter([{'_id': i} for i in range(40)])
+        return iter([self.facet])
+
+
+class FakeDatabase(dict):
+    name = 'test_db'
+
+    def __missing__(self, key):
+        return self.setdefault(key, FakeCollection({'_documents': [{'count': 4}]}))
+
+
+def test_scan_partitions_each_collection_and_reports_failures():
+    db = FakeDatabase()
+    db['clients'] = FakeCollection({
+        '_documents': [{'count': 4}],
+        'phone_without_telephone': [{'count': 1}],
+        'phone_without_telephone__samples': [{'_id': 'abc'}],
+    })
+    result = scan(db, CHECKS, workers=2, samples=5)
+
+    assert result['collections']['clients'] == {'documents': 8, 'partitions': 2}
+    scans = [p for p in db['clients'].pipelines if '$facet' in p[-1]]
+    assert [p[0]['$match']['_id'] for p in scans] == [{'$lt': 20}, {'$gte': 20}]
+    assert [check['name'] for check in failures(result)] == ['phone_without_telephone']
+    assert failures(result)[0]['sample_ids'] == ['abc', 'abc']
+    assert 'phone_without_telephone' in format_report(result)
+
+
+def test_check_list_accepts_checks_and_collections():
+    checks = check_list('blog_posts,missing_email')
+    assert {check.collection for check in checks} == {'blog_posts', 'mailing_list'}
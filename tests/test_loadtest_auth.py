@@ -0,0 +1,68 @@
+"""
+Unit tests for the login CPU-cost benchmark
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("bson")
+
+from loadtest.authbench import (  # noqa: E402
+    HEALTH,
+    capacity,
+    login_request,
+    render_html,
+    seeded_client_logins,
+    summarize_level,
+)
+from loadtest.soak import ProcessSampler  # noqa: E402
+from seeddata.generators import SEED_PASSWORD  # noqa: E402
+
+
+def endpoint(requests, errors=0, p50=10.0, p95=20.0, p99=30.0):
+    return {"requests": requests, "errors": errors, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+
+def test_seeded_client_logins_have_passwords():
+    emails = seeded_client_logins(42, 100)
+    assert 50 < len(emails) < 90
+    assert emails == seeded_client_logins(42, 100)
+    assert all(".client" in email for email in emails)
+    assert login_request("client", 3, emails) == {"email": emails[3], "password": SEED_PASSWORD}
+    assert login_request("client_wrong_password", 3, emails)["password"] != SEED_PASSWORD
+
+
+def test_summarize_level_and_capacity():
+    baseline = summarize_level(0, 10.0, {HEALTH: endpoint(200, p95=2.0)}, cpu_seconds=0.1)
+    assert baseline["logins"] == 0 and baseline["health_slowdown"] is None
+
+    levels = [baseline]
+    for concurrency, health_p95 in ((1, 5.0), (4, 60.0), (16, 400.0)):
+        report = {
+            "POST /api/admin/login": endpoint(100 * concurrency, errors=concurrency, p95=50.0 * concurrency),
+            "POST /api/client/login": endpoint(100 * concurrency),
+            HEALTH: endpoint(150, p95=health_p95),
+        }
+        levels.append(summarize_level(concurrency, 10.0, report, min(concurrency, 1) * 10.0,
+                                      {"p95_ms": 2.0}))
+    one = levels[1]
+    assert one["logins"] == 199 and one["login_errors"] == 1
+    assert one["logins_per_s"] == 19.9 and one["cores_used"] == 1.0
+    assert one["logins_per_core_s"] == 19.9 and one["health_slowdown"] == 2.5
+
+    cap = capacity(levels, max_health_ms=100.0)
+    assert cap["peak_logins_per_s"] == levels[3]["logins_per_s"]
+    assert cap["sustainable_concurrency"] == 4
+    assert cap["cpu_ms_per_login"] == round(1000 / levels[3]["logins_per_core_s"], 2)
+
+    page = render_html({"generated_at": "2026-01-01T00:00:00", "levels": levels, "capacity": cap})
+    assert page.count("<svg") == 3 and 'class="bad"' in page
+
+
+def test_cpu_seconds_of_this_process():
+    sampler = ProcessSampler(os.getpid())
+    before = sampler.cpu_seconds()
+    sum(range(2_000_000))
+    assert sampler.cpu_seconds() >= before > 0
+    assert ProcessSampler(2 ** 22 + 7).cpu_seconds() is None
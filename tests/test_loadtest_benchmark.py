@@ -0,0 +1,92 @@
+"""
+Unit tests for benchmark results and the baseline comparison
+"""
+
+from loadtest.benchmark import SCHEMA_VERSION, benchmark_result, compare, format_comparison, save_result
+
+
+def make_report(p95_ms, rps, requests=100, errors=0):
+    return {
+        "mode": "open",
+        "base_url": "http://localhost:8001",
+        "target_rate_rps": 50,
+        "targets": ["packages"],
+        "duration_s": 10.0,
+        "endpoints": {
+            "GET /api/public/packages": {
+                "requests": requests, "errors": errors, "throughput_rps": rps, "mean_ms": 10.0,
+                "p50_ms": 9.0, "p95_ms": p95_ms, "p99_ms": p95_ms * 1.2, "max_ms": p95_ms * 2,
+                "payload_bytes": 5000, "mean_payload_bytes": 50, "status_codes": {"200": requests},
+                "histogram": {},
+            },
+        },
+    }
+
+
+class TestBenchmarkResult:
+    """Schema conversion and regression detection"""
+
+    def test_schema(self):
+        result = benchmark_result(make_report(20.0, 50.0), "public-reads")
+
+        assert result["schema_version"] == SCHEMA_VERSION
+        assert result["run"]["mode"] == "open"
+        assert result["environment"]["base_url"] == "http://localhost:8001"
+        row = result["endpoints"]["GET /api/public/packages"]
+        assert row["p95_ms"] == 20.0 and row["mean_payload_bytes"] == 50
+        assert "histogram" not in row
+
+    def test_within_threshold_passes(self):
+        baseline = benchmark_result(make_report(20.0, 50.0), "public-reads")
+        current = benchmark_result(make_report(23.0, 45.0), "public-reads")
+
+        comparison = compare(baseline, current, max_p95_increase=0.2, max_throughput_drop=0.2)
+        assert comparison["regressions"] == []
+        assert len(comparison["rows"]) == 1
+
+    def test_p95_and_throughput_regressions(self):
+        baseline = benchmark_result(make_report(20.0, 50.0), "public-reads")
+        current = benchmark_result(make_report(30.0, 35.0), "public-reads")
+
+        comparison = compare(baseline, current, max_p95_increase=0.2, max_throughput_drop=0.2)
+        assert comparison["regressions"][0]["failed"] == ["p95", "throughput"]
+
+    def test_small_samples_are_skipped(self):
+        baseline = benchmark_result(make_report(20.0, 50.0, requests=5), "public-reads")
+        current = benchmark_result(make_report(60.0, 10.0, requests=5), "public-reads")
+
+        comparison = compare(baseline, current, min_requests=20)
+        assert comparison["rows"] == [] and comparison["regressions"] == []
+
+    def test_run_setting_mismatch_warns(self):
+        baseline = benchmark_result(make_report(20.0, 50.0), "public-reads")
+        other = make_report(20.0, 50.0)
+        other["target_rate_rps"] = 100
+        current = benchmark_result(other, "public-reads")
+
+        assert any("target_rate_rps" in w for w in compare(baseline, current)["warnings"])
+
+    def test_missing_endpoint_and_sample_collapse_fail(self):
+        baseline = benchmark_result(make_report(20.0, 50.0), "public-reads")
+        collapsed = benchmark_result(make_report(20.0, 50.0, requests=3), "public-reads")
+        missing = benchmark_result(make_report(20.0, 50.0), "public-reads")
+        missing["endpoints"] = {}
+
+        assert compare(baseline, collapsed)["regressions"][0]["failed"] == ["samples"]
+        comparison = compare(baseline, missing)
+        assert comparison["regressions"][0]["failed"][0] == "missing"
+        assert "GET /api/public/packages" in format_comparison(comparison)
+
+    def test_error_rate_rise_fails(self):
+        baseline = benchmark_result(make_report(20.0, 50.0, errors=1), "public-reads")
+        current = benchmark_result(make_report(20.0, 50.0, errors=5), "public-reads")
+
+        assert compare(baseline, current)["regressions"][0]["failed"] == ["errors"]
+        assert compare(baseline, current, max_error_rate_increase=0.05)["regressions"] == []
+
+    def test_results_saved_in_the_same_second_are_kept(self, tmp_path):
+        result = benchmark_result(make_report(20.0, 50.0), "public-reads")
+
+        paths = [save_result(result, str(tmp_path)) for _ in range(3)]
+        assert len(set(paths)) == 3
+        assert paths[1].endswith("-1.json")
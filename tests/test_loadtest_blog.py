@@ -0,0 +1,79 @@
+"""
+Unit tests for the blog listing and search benchmark
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("bson")
+
+from loadtest.blogbench import (  # noqa: E402
+    SHAPES,
+    blog_query,
+    explain_summary,
+    plan_stages,
+    render_html,
+    resolve_params,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def shape(name):
+    return next(s for s in SHAPES if s.name == name)
+
+
+def test_public_query_matches_controller():
+    query, sort, skip, limit = blog_query(False, {"search": "protein", "category": "category-0", "page": "3"}, NOW)
+    assert query["status"] == "published"
+    assert {"scheduled_date": {"$lte": NOW}} in query["$or"]
+    assert query["category_slug"] == "category-0"
+    assert query["title"] == {"$regex": "protein", "$options": "i"}
+    assert sort == {"publish_date": -1}
+    assert (skip, limit) == (24, 12)
+
+
+def test_admin_query_matches_controller():
+    assert blog_query(True, {}, NOW) == ({}, {"created_at": -1}, 0, 20)
+    query, _, skip, _ = blog_query(True, {"status": "all", "page": "2"}, NOW)
+    assert query == {} and skip == 20
+    assert blog_query(True, {"status": "draft"}, NOW)[0] == {"status": "draft"}
+
+
+def test_resolve_last_page():
+    assert resolve_params(shape("public_page_last"), 417) == {"page": "417"}
+    assert resolve_params(shape("public_category_last"), 0) == {"category": "category-0", "page": "1"}
+    assert resolve_params(shape("public_search_hit"), 9) == {"search": "protein"}
+
+
+def test_plan_stages_classic_and_sbe():
+    classic = {"stage": "LIMIT", "inputStage": {"stage": "SKIP", "inputStage": {
+        "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status_1_publish_date_-1"}}}}
+    assert plan_stages(classic) == "LIMIT <- SKIP <- FETCH <- IXSCAN(status_1_publish_date_-1)"
+
+    sbe = {"queryPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}, "slotBasedPlan": {}}
+    assert plan_stages(sbe) == "SORT <- COLLSCAN"
+    assert plan_stages({"stage": "OR", "inputStages": [{"stage": "IXSCAN", "indexName": "tags_1"}]}) == \
+        "OR <- IXSCAN(tags_1)"
+
+
+def test_explain_summary_and_report():
+    explained = {
+        "queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+        "executionStats": {"totalDocsExamined": 5000, "totalKeysExamined": 0, "nReturned": 12,
+                           "executionTimeMillis": 7},
+    }
+    summary = explain_summary(explained)
+    assert summary == {"docs_examined": 5000, "keys_examined": 0, "returned": 12, "mongo_ms": 7,
+                       "plan": "COLLSCAN"}
+
+    rows = [
+        {"shape": "public_search_hit", "size": size, "documents": size, "params": {"search": "protein"},
+         "matched": size // 10, "calls": 3, "errors": [], "p50_ms": size / 100, "p95_ms": size / 80,
+         "explain": {"find": summary, "count": summary}}
+        for size in (1000, 10_000)
+    ]
+    page = render_html({"generated_at": "2026-01-01T00:00:00", "rows": rows})
+    assert page.count("<svg") == 3
+    assert "search=protein" in page and "COLLSCAN" in page
@@ -0,0 +1,41 @@
+"""
+Unit tests for the async request flows the load generators run
+"""
+
+import asyncio
+
+import httpx
+
+from loadtest.flows import Session, admin_auth_flow, payment_link_flow
+from loadtest.stats import LoadStats
+
+
+def run_flow(flow, handler):
+    async def main():
+        stats = LoadStats()
+        async with httpx.AsyncClient(base_url="http://backend.test", transport=httpx.MockTransport(handler)) as http:
+            await flow(Session(http, stats))
+        return stats.report(1.0)
+    return asyncio.run(main())
+
+
+def test_non_json_login_reply_counts_as_an_error():
+    def handler(request):
+        return httpx.Response(200, text="<html>502 Bad Gateway</html>")
+
+    report = run_flow(admin_auth_flow, handler)
+    login = report["POST /api/admin/login"]
+    assert (login["requests"], login["errors"], login["status_codes"]) == (1, 1, {"invalid_json": 1})
+    assert "POST /api/admin/refresh" not in report
+
+
+def test_non_json_payment_link_reply_ends_the_flow():
+    def handler(request):
+        if request.url.path == "/api/admin/login":
+            return httpx.Response(200, json={"accessToken": "a", "refreshToken": "r"})
+        return httpx.Response(200, content=b"")
+
+    report = run_flow(payment_link_flow, handler)
+    assert report["POST /api/admin/login"]["errors"] == 0
+    assert report["POST /api/admin/create-payment-link"]["errors"] == 1
+    assert "POST /api/client/validate-token" not in report
@@ -0,0 +1,74 @@
+"""
+Unit tests for the load harness latency histogram
+"""
+
+import json
+import random
+
+from loadtest.histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Recording, percentiles and merging"""
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 101):
+            histogram.record(value)
+
+        assert histogram.total_count == 100
+        assert histogram.value_at_percentile(50) == 50
+        assert histogram.value_at_percentile(100) == 100
+
+    def test_large_values_within_relative_error(self):
+        histogram = LatencyHistogram(significant_digits=2)
+        values = sorted(random.Random(7).randint(1, 60_000_000) for _ in range(10_000))
+        for value in values:
+            histogram.record(value)
+
+        for pct in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * pct / 100) - 1]
+            assert abs(histogram.value_at_percentile(pct) - exact) / exact < 0.01
+
+    def test_merge_matches_single_histogram(self):
+        combined, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 5000, 3):
+            combined.record(value)
+            (first if value % 2 else second).record(value)
+
+        first.merge(second)
+
+        assert first.counts == combined.counts
+        assert first.max_value == combined.max_value
+        assert first.min_value == combined.min_value
+        assert first.value_at_percentile(95) == combined.value_at_percentile(95)
+
+    def test_round_trips_through_dict(self):
+        histogram = LatencyHistogram()
+        for value in (10, 2500, 987654):
+            histogram.record(value)
+
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+
+        assert restored.counts == histogram.counts
+        assert restored.mean == histogram.mean
+        assert restored.value_at_percentile(99) == histogram.value_at_percentile(99)
+
+
+def test_merged_reports_use_concurrent_wall_time_unless_sequential(tmp_path):
+    from loadtest.__main__ import merge_reports
+    from loadtest.stats import LoadStats
+
+    paths = []
+    for index, duration in enumerate((10.0, 8.0)):
+        stats = LoadStats()
+        for _ in range(100):
+            stats.record("GET /api/health", 5, "200", True)
+        path = tmp_path / f"run{index}.json"
+        path.write_text(json.dumps({"duration_s": duration, "endpoints": stats.report(duration)}))
+        paths.append(str(path))
+
+    concurrent = merge_reports(paths)
+    assert concurrent["duration_s"] == 10.0
+    assert concurrent["endpoints"]["GET /api/health"]["throughput_rps"] == 20.0
+    assert merge_reports(paths, sequential=True)["endpoints"]["GET /api/health"]["throughput_rps"] == round(200 / 18, 2)
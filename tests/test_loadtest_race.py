@@ -0,0 +1,90 @@
+"""
+Unit tests for the duplicate-purchase race benchmark
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from loadtest.racebench import PURCHASE, StripeAudit, classify, extra, render_html, run_burst, slipped, summarize
+from loadtest.stats import LoadStats
+
+
+def test_classify():
+    assert classify(201, "") == "created"
+    assert classify(409, "A client with this email already exists") == "conflict"
+    assert classify(500, "An account with this email already exists.") == "index_rejected"
+    assert classify(500, "E11000 duplicate key error collection: db.clients index: email_1") == "index_rejected"
+    assert classify(500, "Failed to process purchase. Please try again.") == "http_500"
+    assert classify(None, "") == "transport_error"
+
+
+def test_summarize_counts_what_slipped_through():
+    outcomes = [
+        {"label": PURCHASE, "email": "a@example.com", "status": 201, "outcome": "created"},
+        {"label": PURCHASE, "email": "a@example.com", "status": 201, "outcome": "created"},
+        {"label": PURCHASE, "email": "a@example.com", "status": 500, "outcome": "index_rejected"},
+        {"label": PURCHASE, "email": "b@example.com", "status": 409, "outcome": "conflict"},
+    ]
+    per_email = {
+        "a@example.com": {"stripe_customers": 3, "stripe_subscriptions": 3, "clients": 1},
+        "b@example.com": {"stripe_customers": 1, "stripe_subscriptions": 1, "clients": 1},
+    }
+    report = {PURCHASE: {"p95_ms": 120.0}}
+    row = summarize("purchase_same", 4, outcomes, 2.0, per_email, report)
+    assert row["throughput_rps"] == 2.0
+    assert row["outcomes"] == {"conflict": 1, "created": 2, "index_rejected": 1}
+    assert row["duplicate_successes"] == 1
+    assert row["extra_stripe_customers"] == 2 and row["extra_stripe_subscriptions"] == 2
+    assert row["duplicate_clients"] == 0 and row["duplicate_client_users"] is None
+    assert slipped(row) == 4
+    assert extra({"x": {}}, "clients") is None
+
+    page = render_html({"generated_at": "2026-01-01T00:00:00", "rows": [row]})
+    assert page.count("<svg") == 3 and 'class="bad"' in page
+
+
+def test_burst_waits_for_a_connection_per_request():
+    calls = []
+
+    def handler(request):
+        calls.append(f"{request.method} {request.url.path}")
+        if request.url.path == "/api/health":
+            return httpx.Response(200, json={"success": True})
+        return httpx.Response(201, json={"success": True})
+
+    async def run():
+        async with httpx.AsyncClient(base_url="http://backend.test", transport=httpx.MockTransport(handler)) as http:
+            return await run_burst(http, LoadStats(), "purchase_distinct", 5, None, "pm_card_visa")
+
+    outcomes, _ = asyncio.run(run())
+    assert [outcome["outcome"] for outcome in outcomes] == ["created"] * 5
+    assert calls == ["GET /api/health"] * 5 + ["POST /api/public/purchase"] * 5
+
+
+def test_stripe_audit_against_standin():
+    pytest.importorskip("fastapi")
+    from standins.faults import FaultConfig
+    from standins.stripe_api import create_app
+
+    async def run():
+        audit = StripeAudit("http://stripe.test", "sk_test_x")
+        await audit.http.aclose()
+        audit.http = httpx.AsyncClient(base_url="http://stripe.test", transport=httpx.ASGITransport(app=create_app(
+            FaultConfig(seed=1))), headers={"Authorization": "Bearer sk_test_x"})
+        product = (await audit.http.post("/v1/products", data={"name": "PT"})).json()
+        price = (await audit.http.post("/v1/prices", data={
+            "product": product["id"], "currency": "gbp", "unit_amount": "100"})).json()
+        for _ in range(3):
+            customer = (await audit.http.post("/v1/customers", data={"email": "race@example.com"})).json()
+            await audit.http.post("/v1/subscriptions", data={"customer": customer["id"], "items[0][price]": price["id"]})
+        await audit.http.post("/v1/customers", data={"email": "other@example.com"})
+        try:
+            return await audit.counts("race@example.com"), await audit.counts("nobody@example.com")
+        finally:
+            await audit.close()
+
+    race, nobody = asyncio.run(run())
+    assert race == {"stripe_customers": 3, "stripe_subscriptions": 3}
+    assert nobody == {"stripe_customers": 0, "stripe_subscriptions": 0}
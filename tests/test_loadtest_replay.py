@@ -0,0 +1,80 @@
+"""
+Unit tests for access-log capture and trace replay binding
+"""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from loadtest.accesslog import build_trace, parse_line, read_trace, route_label, spread_within_seconds, write_trace
+
+LOG = [
+    '203.0.113.5 - - [10/Oct/2026:13:55:36 +0000] "GET /api/blog/posts?page=2&search=squat HTTP/1.1" 200 5120 '
+    '"https://simonprice-pt.co.uk/blog" "Mozilla/5.0"\n',
+    '203.0.113.5 - - [10/Oct/2026:13:55:36 +0000] "GET /api/blog/posts/my-first-post HTTP/1.1" 200 900 "-" "-"\n',
+    '198.51.100.7 - - [10/Oct/2026:13:55:36 +0000] "POST /api/client/login HTTP/1.1" 200 400 "-" "-"\n',
+    '10.0.0.1 - - [10/Oct/2026:13:55:38 +0000] "GET /api/admin/clients/jane.doe%40example.com HTTP/1.1" 404 - "-" "-"\n',
+    '10.0.0.1 - - [10/Oct/2026:13:55:38 +0000] "PUT /api/admin/policies/privacy/sections/abc123/items/x9 HTTP/1.1" '
+    '200 12 "-" "-"\n',
+    '10.0.0.1 - - [10/Oct/2026:13:55:39 +0000] "GET /static/js/main.js HTTP/1.1" 200 50000 "-" "-"\n',
+    'not an access log line\n',
+    '203.0.113.5 - - [10/Oct/2026:13:55:37 +0000] "GET /api/blog/posts/my-first-post HTTP/1.1" 200 900 "-" "-"\n',
+]
+
+
+def test_parse_line():
+    entry = parse_line(LOG[0])
+    assert entry["method"] == "GET" and entry["status"] == 200 and entry["bytes"] == 5120
+    assert entry["time"] == datetime(2026, 10, 10, 13, 55, 36, tzinfo=timezone.utc)
+    assert parse_line(LOG[3])["bytes"] == 0
+    assert parse_line(LOG[6]) is None
+
+
+def test_spread_within_seconds():
+    assert spread_within_seconds([0.0, 0.0, 0.0, 1.0, 3.0, 3.0]) == [0.0, 1 / 3, 2 / 3, 1.0, 3.0, 3.5]
+
+
+def test_build_trace_anonymises_and_orders(tmp_path):
+    header, records = build_trace(LOG)
+    assert header["requests"] == 6 and header["clients"] == 3 and header["unparsed_lines"] == 1
+    assert [record["t"] for record in records] == [0.0, 0.333, 0.667, 1.0, 2.0, 2.5]
+    assert records[0]["query"] == {"page": "2", "search": "{search:0}"}
+    # The same slug maps to the same placeholder; the later request was sorted into place
+    assert records[1]["path"] == records[3]["path"] == "/api/blog/posts/{blog_slug:0}"
+    assert records[4]["path"] == "/api/admin/clients/{client_email:0}"
+    assert records[5]["path"] == "/api/admin/policies/privacy/sections/{section_id:0}/items/{item_id:0}"
+    assert route_label("PUT", records[5]["path"]) == "PUT /api/admin/policies/privacy/sections/{section_id}/items/{item_id}"
+
+    text = json.dumps(records)
+    for secret in ("squat", "my-first-post", "jane.doe", "203.0.113.5", "Mozilla", "abc123"):
+        assert secret not in text
+
+    path = str(tmp_path / "trace.jsonl")
+    write_trace(path, header, records)
+    assert read_trace(path) == (header, records)
+
+
+def test_binder_uses_seeded_values():
+    pytest.importorskip("bson")
+    from loadtest.replay import Binder, expected_statuses, needs_auth, prepare
+    from seeddata.generators import SEED_PASSWORD, SeedContext, blog_post
+    from seeddata.seeder import plan_counts
+
+    ctx = SeedContext(seed=42, until=datetime(2026, 1, 1, tzinfo=timezone.utc), counts=plan_counts(10_000))
+    binder = Binder(ctx)
+    _, records = build_trace(LOG)
+
+    post = prepare(records[1], binder)
+    assert post["path"] == "/api/blog/posts/" + blog_post(ctx, 0)["slug"]
+    assert post["label"] == "GET /api/blog/posts/{blog_slug}" and "json" not in post
+
+    login = prepare(records[2], binder)
+    assert login["json"]["password"] == SEED_PASSWORD
+    assert login["json"]["email"] in binder.client_logins
+
+    assert prepare(records[5], binder)["path"] == "/api/admin/policies/privacy/sections/section-seed-0/items/item-seed-0-0"
+    assert prepare(records[5], binder)["json"] == {}
+    assert 404 in prepare(records[4], binder)["expect"] and 200 not in expected_statuses(404)
+    assert needs_auth("/api/admin/clients") == "admin" and needs_auth("/api/admin/login") is None
+    assert needs_auth("/api/client/profile") == "client" and needs_auth("/api/blog/posts") is None
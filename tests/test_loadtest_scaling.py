@@ -0,0 +1,99 @@
+"""
+Unit tests for the whole-collection scaling benchmark and its chart output
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("bson")
+
+from api_client.async_client import AsyncApiClient  # noqa: E402
+from loadtest.scaling import render_html, summarize, timed_call, usable_limits  # noqa: E402
+from loadtest.svgchart import format_number, line_chart  # noqa: E402
+
+
+def call(latency_ms, error=None, size=1000, growth=1.0):
+    return {"latency_ms": latency_ms, "bytes": size, "error": error, "rss_before_mb": 100.0, "rss_growth_mb": growth}
+
+
+def test_summarize_marks_slow_and_failing_sizes():
+    fast = summarize("clients", 1000, 1001, [call(20), call(30), call(25)], max_latency_ms=100)
+    assert fast["usable"] and fast["p50_ms"] == 25 and fast["response_bytes"] == 1000
+
+    slow = summarize("clients", 100_000, 100_001, [call(900), call(1200), call(1100)], max_latency_ms=1000)
+    assert not slow["usable"] and slow["errors"] == []
+
+    failing = summarize("clients", 1_000_000, None, [call(50), call(15000, error="ReadTimeout", size=None)], 1000)
+    assert not failing["usable"] and failing["errors"] == ["ReadTimeout"]
+
+
+def test_usable_limits():
+    rows = [
+        {"endpoint": "emails", "size": 1000, "usable": True},
+        {"endpoint": "emails", "size": 10000, "usable": True},
+        {"endpoint": "emails", "size": 100000, "usable": False},
+        {"endpoint": "users", "size": 1000, "usable": True},
+    ]
+    assert usable_limits(rows, ["emails", "users"]) == {
+        "emails": {"largest_usable": 10000, "first_unusable": 100000},
+        "users": {"largest_usable": 1000, "first_unusable": None},
+    }
+
+
+def test_render_html():
+    rows = [
+        summarize("clients", size, size, [call(size / 50, size=size * 500, growth=size / 10000)], 1000)
+        for size in (1000, 10_000, 100_000)
+    ]
+    result = {"generated_at": "2026-01-01T00:00:00", "max_latency_ms": 1000, "rows": rows,
+              "limits": usable_limits(rows, ["clients"])}
+    page = render_html(result)
+    assert page.count("<svg") == 3
+    assert "stroke-dasharray" in page
+    assert 'class="bad"' in page
+
+
+def test_result_modes_share_options_but_not_output_dirs(tmp_path):
+    from loadtest import scaling
+    from loadtest.__main__ import build_parser, write_results
+
+    scale = build_parser().parse_args(['scaling', '--seed', '7', '--backend-pid', '123'])
+    race = build_parser().parse_args(['race', '--output-dir', str(tmp_path)])
+    assert (scale.seed, scale.backend_pid, scale.output_dir) == (7, 123, None)
+    assert race.output_dir == str(tmp_path)
+
+    rows = [summarize("clients", 1000, 1000, [call(10)], 1000)]
+    result = {"generated_at": "2026-01-01T00:00:00", "max_latency_ms": 1000, "rows": rows,
+              "limits": usable_limits(rows, ["clients"])}
+    write_results(str(tmp_path), 'scaling', result, scaling)
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.html', '.json']
+
+
+def test_line_chart_edge_cases():
+    assert "No data" in line_chart("Empty", {"a": []}, "x", "y")
+    # A single point and zero values on a log axis do not break the scale
+    svg = line_chart("One", {"a": [(1000, 5.0), (10, 0.0)]}, "x", "y", log_x=True, log_y=True)
+    assert svg.count("<circle") == 1
+    assert format_number(2_500_000) == "2.5M"
+
+
+def test_timed_call_against_mock_backend():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/admin/login":
+            return httpx.Response(200, json={"accessToken": "a", "refreshToken": "r"})
+        assert request.headers["Authorization"] == "Bearer a"
+        return httpx.Response(200, json={"clients": [{"email": "x@example.com"}] * 10})
+
+    async def run():
+        client = AsyncApiClient("http://backend.test")
+        await client.http.aclose()
+        client.http = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        async with client:
+            return await timed_call(client, "/api/admin/clients", None)
+
+    result = asyncio.run(run())
+    assert result["error"] is None
+    assert result["bytes"] > 200
+    assert result["rss_growth_mb"] is None
@@ -0,0 +1,84 @@
+"""
+Unit tests for the soak test leak verdict
+"""
+
+import os
+
+from loadtest.soak import ProcessSampler, leak_verdict
+
+
+def timeline(rss, fds=None, warmup_rows=0):
+    rows = []
+    for index, value in enumerate(rss):
+        rows.append({
+            "elapsed_s": index * 60.0,
+            "rss_mb": value,
+            "open_fds": fds[index] if fds else 40,
+            "threads": 11,
+            "mongo_connections": None,
+            "health_probe_ms": 5.0,
+        })
+    return rows
+
+
+class TestLeakVerdict:
+    """Growth beyond both thresholds with a rising trend is flagged"""
+
+    def test_flat_memory_is_stable(self):
+        verdict = leak_verdict(timeline([120.0 + (i % 3) for i in range(60)]))
+        assert verdict["rss_mb"]["status"] == "stable"
+        assert verdict["open_fds"]["status"] == "stable"
+
+    def test_steady_growth_is_a_leak(self):
+        verdict = leak_verdict(timeline([120.0 + i for i in range(60)], fds=[40 + i for i in range(60)]))
+        assert verdict["rss_mb"]["status"] == "leak suspected"
+        assert verdict["open_fds"]["status"] == "leak suspected"
+        assert verdict["rss_mb"]["slope_per_hour"] > 0
+
+    def test_warmup_growth_is_ignored(self):
+        # Fast growth while caches fill, flat afterwards
+        rss = [50.0 + 10 * i for i in range(10)] + [150.0] * 50
+        assert leak_verdict(timeline(rss), warmup_s=600)["rss_mb"]["status"] == "stable"
+        assert leak_verdict(timeline(rss))["rss_mb"]["status"] == "leak suspected"
+
+    def test_missing_series_needs_more_data(self):
+        verdict = leak_verdict(timeline([100.0] * 20))
+        assert verdict["mongo_connections"]["status"] == "insufficient data"
+
+
+def test_process_sampler_reads_own_process():
+    values = ProcessSampler(os.getpid()).sample()
+    assert values["rss_mb"] > 0 and values["open_fds"] > 0 and values["threads"] >= 1
+
+
+def test_process_sampler_rss_matches_sample():
+    sampler = ProcessSampler(os.getpid())
+    assert sampler.rss_mb() > 0
+    assert ProcessSampler(0).rss_mb() is None
+
+
+def test_crashed_user_is_counted_and_samples_are_kept(tmp_path, monkeypatch):
+    import asyncio
+    import csv
+    import time
+
+    from loadtest import soak
+
+    async def fake_user(index, http, stats, flow_names, start_delay, stop_at):
+        if index == 0:
+            raise ValueError("bad reply")
+        await asyncio.sleep(max(0.0, stop_at - time.monotonic()))
+
+    monkeypatch.setattr(soak, "virtual_user", fake_user)
+    csv_path = str(tmp_path / "timeline.csv")
+    result = asyncio.run(soak.run_soak(
+        "http://127.0.0.1:9", users=3, duration=0.3, interval=0.1, flow_names=["health"],
+        csv_path=csv_path, warmup=0.0, timeout=0.5,
+    ))
+
+    assert result["failed_users"] == {"ValueError": 1}
+    assert result["samples"] >= 2
+    with open(csv_path) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == result["samples"]
+    assert rows[-1]["failed_users"] == "1"
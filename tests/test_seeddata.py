@@ -0,0 +1,91 @@
+"""
+Unit tests for the synthetic data generators and seeding plans
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("bson")
+
+from seeddata.generators import GENERATORS, SeedContext, generate_batch  # noqa: E402
+from seeddata.seeder import batches, parse_count, parse_size, plan_counts  # noqa: E402
+
+UNTIL = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def ctx():
+    return SeedContext(seed=7, until=UNTIL, counts=plan_counts(10_000))
+
+
+def test_parse_size():
+    assert parse_size('1k') == 1_000
+    assert parse_size('2.5M') == 2_500_000
+    assert parse_size('10_000') == 10_000
+    assert parse_count('clients=5k') == ('clients', 5_000)
+    with pytest.raises(ValueError):
+        parse_count('nope=5')
+
+
+def test_plan_counts():
+    counts = plan_counts(1_000)
+    assert set(counts) == set(GENERATORS)
+    assert counts['clients'] == counts['client_users'] == 120
+    assert counts['blog_categories'] == 8
+
+    overridden = plan_counts(1_000, {'clients': 5})
+    assert overridden['client_users'] == 5
+    with pytest.raises(ValueError):
+        plan_counts(1_000, {'nope': 1})
+
+
+def test_batches_cover_every_document():
+    counts = {'clients': 2_500, 'contacts': 1_000}
+    work = batches(counts, 1_000, ['clients', 'contacts'])
+    assert work == [('clients', 0, 1000), ('clients', 1000, 1000), ('clients', 2000, 500), ('contacts', 0, 1000)]
+
+
+def test_documents_are_deterministic(ctx):
+    for name in GENERATORS:
+        first = generate_batch(ctx, name, 100, 5)
+        # Batches are independent of how the range was split across workers
+        assert first == generate_batch(ctx, name, 100, 2) + generate_batch(ctx, name, 102, 3)
+    other_seed = SeedContext(seed=8, until=UNTIL, counts=ctx.counts)
+    assert generate_batch(ctx, 'contacts', 0, 3) != generate_batch(other_seed, 'contacts', 0, 3)
+
+
+def test_unique_keys(ctx):
+    for name, key in [('clients', 'email'), ('client_users', 'email'), ('mailing_list', 'email'),
+                      ('blog_posts', 'slug'), ('blog_tags', 'slug')]:
+        documents = generate_batch(ctx, name, 0, 2_000 if name != 'blog_posts' else 300)
+        assert len({doc[key] for doc in documents}) == len(documents)
+        assert len({doc['_id'] for doc in documents}) == len(documents)
+
+
+def test_references(ctx):
+    clients = generate_batch(ctx, 'clients', 0, 50)
+    users = generate_batch(ctx, 'client_users', 0, 50)
+    assert [c['email'] for c in clients] == [u['email'] for u in users]
+
+    categories = {doc['slug'] for doc in generate_batch(ctx, 'blog_categories', 0, ctx.counts['blog_categories'])}
+    tags = {doc['slug'] for doc in generate_batch(ctx, 'blog_tags', 0, ctx.counts['blog_tags'])}
+    for post in generate_batch(ctx, 'blog_posts', 0, 100):
+        assert post['category_slug'] in categories
+        assert set(post['tags']) <= tags
+        assert (post['publish_date'] is not None) == (post['status'] == 'published')
+
+
+def test_created_dates_within_history(ctx):
+    for doc in generate_batch(ctx, 'tdee_results', 0, 500):
+        assert doc['created_at'] <= UNTIL
+        assert (UNTIL - doc['created_at']).days <= 3 * 365
+
+
+def test_ids_do_not_depend_on_until(ctx):
+    later = SeedContext(seed=ctx.seed, until=UNTIL + timedelta(days=1, hours=5), counts=ctx.counts)
+    for name in GENERATORS:
+        ids = [doc['_id'] for doc in generate_batch(ctx, name, 0, 20)]
+        assert ids == [doc['_id'] for doc in generate_batch(later, name, 0, 20)]
+        # Timestamps grow with the index, so _id order is insertion-like
+        assert ids == sorted(ids)
@@ -0,0 +1,125 @@
+"""
+Unit tests for the local Microsoft Graph stand-in
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from standins.faults import FaultConfig  # noqa: E402
+from standins.graph_api import create_app, sendmail_sender  # noqa: E402
+
+TENANT = "00000000-0000-0000-0000-000000000001"
+SENDER = "noreply@example.com"
+
+
+def message(to="client@example.com"):
+    return {"message": {
+        "subject": "Welcome",
+        "body": {"contentType": "HTML", "content": "<p>Hi</p>"},
+        "toRecipients": [{"emailAddress": {"address": to}}],
+    }}
+
+
+def login(graph):
+    response = graph.post(f"/login/{TENANT}/oauth2/v2.0/token", data={
+        "grant_type": "client_credentials", "client_id": "id", "client_secret": "secret",
+        "scope": "https://graph.microsoft.com/.default",
+    })
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def graph(tmp_path):
+    return TestClient(create_app(FaultConfig(seed=1), mail_dir=str(tmp_path / "mail")))
+
+
+def test_sendmail_sender():
+    assert sendmail_sender(f"/users/{SENDER}/sendMail") == SENDER
+    assert sendmail_sender(f"users/{SENDER}/messages") is None
+
+
+class TestGraphStandIn:
+    def test_send_mail_is_recorded(self, graph, tmp_path):
+        headers = login(graph)
+        response = graph.post(f"/v1.0/users/{SENDER}/sendMail", json=message(), headers=headers)
+        assert response.status_code == 202
+        assert response.content == b""
+
+        sent = graph.get("/_standin/messages").json()
+        assert sent["sent"] == 1
+        assert sent["messages"][0]["sender"] == SENDER
+        files = list((tmp_path / "mail").glob("*.json"))
+        assert len(files) == 1
+        assert json.loads(files[0].read_text())["message"]["subject"] == "Welcome"
+
+    def test_token_required(self, graph):
+        response = graph.post(f"/v1.0/users/{SENDER}/sendMail", json=message())
+        assert response.status_code == 401
+        assert response.json()["error"]["code"] == "InvalidAuthenticationToken"
+
+        bad_grant = graph.post(f"/login/{TENANT}/oauth2/v2.0/token", data={"grant_type": "password"})
+        assert bad_grant.json()["error"] == "unsupported_grant_type"
+
+    def test_missing_recipients(self, graph):
+        payload = {"message": {"subject": "No one", "toRecipients": []}}
+        response = graph.post(f"/v1.0/users/{SENDER}/sendMail", json=payload, headers=login(graph))
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == "ErrorInvalidRecipients"
+
+    def test_batch(self, graph):
+        headers = login(graph)
+        response = graph.post("/v1.0/$batch", headers=headers, json={"requests": [
+            {"id": "1", "method": "POST", "url": f"/users/{SENDER}/sendMail", "body": message("a@example.com")},
+            {"id": "2", "method": "GET", "url": "/me/messages"},
+        ]})
+        assert response.status_code == 200
+        statuses = {item["id"]: item["status"] for item in response.json()["responses"]}
+        assert statuses == {"1": 202, "2": 404}
+        assert graph.get("/_standin/messages").json()["sent"] == 1
+
+        too_many = graph.post("/v1.0/$batch", headers=headers, json={"requests": [
+            {"id": str(i), "method": "POST", "url": f"/users/{SENDER}/sendMail", "body": message()}
+            for i in range(21)
+        ]})
+        assert too_many.status_code == 400
+
+    def test_throttling_sets_retry_after(self, graph):
+        headers = login(graph)
+        graph.post("/_standin/faults", json={"error_rate": 1.0, "error_status": 429, "retry_after_s": 7})
+
+        response = graph.post(f"/v1.0/users/{SENDER}/sendMail", json=message(), headers=headers)
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "7"
+        assert response.json()["error"]["code"] == "TooManyRequests"
+
+        stats = graph.get("/_standin/stats").json()
+        assert stats["injected_errors"] == {"POST /v1.0/users/{id}/sendMail": 1}
+
+    def test_batch_requests_throttled_individually(self, graph):
+        headers = login(graph)
+        graph.post("/_standin/faults", json={"error_rate": 0.5, "error_status": 429, "seed": 3})
+        statuses = []
+        for _ in range(10):
+            response = graph.post("/v1.0/$batch", headers=headers, json={"requests": [
+                {"id": "1", "method": "POST", "url": f"/users/{SENDER}/sendMail", "body": message()},
+            ]})
+            if response.status_code == 200:
+                item = response.json()["responses"][0]
+                statuses.append(item["status"])
+                if item["status"] == 429:
+                    assert item["headers"] == {"Retry-After": "1"}
+        assert 429 in statuses and 202 in statuses
+
+    def test_reset(self, graph):
+        headers = login(graph)
+        graph.post(f"/v1.0/users/{SENDER}/sendMail", json=message(), headers=headers)
+        graph.post("/_standin/reset")
+        assert graph.get("/_standin/messages").json() == {"sent": 0, "messages": []}
+        # Tokens are dropped with the rest of the state
+        assert graph.post(f"/v1.0/users/{SENDER}/sendMail", json=message(), headers=headers).status_code == 401
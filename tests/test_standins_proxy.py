@@ -0,0 +1,179 @@
+"""
+Unit tests for the fault-injecting TCP proxy
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from standins.tcpproxy import QUEUE_CHUNKS, FaultProxy, ProxyConfig, abort_with_rst, parse_address
+
+
+async def echo(reader, writer):
+    while data := await reader.read(65536):
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+async def proxied(config: ProxyConfig):
+    upstream = await asyncio.start_server(echo, '127.0.0.1', 0)
+    proxy = FaultProxy(upstream.sockets[0].getsockname()[:2], config)
+    server = await proxy.start('127.0.0.1', 0)
+    return upstream, server, proxy, server.sockets[0].getsockname()[1]
+
+
+def run(config: ProxyConfig, client):
+    async def main():
+        upstream, server, proxy, port = await proxied(config)
+        try:
+            result = await client(proxy, port)
+            # Let the proxy see both ends close before the loop goes away
+            for _ in range(100):
+                if not proxy.connections:
+                    break
+                await asyncio.sleep(0.01)
+            return result, proxy
+        finally:
+            server.close()
+            upstream.close()
+    return asyncio.run(main())
+
+
+async def round_trip(port, payload=b'ping', timeout=2.0):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(payload)
+        await writer.drain()
+        return await asyncio.wait_for(reader.readexactly(len(payload)), timeout)
+    finally:
+        writer.close()
+
+
+def test_forwards_both_directions_and_counts_bytes():
+    async def client(proxy, port):
+        return await round_trip(port, b'hello' * 1000)
+
+    reply, proxy = run(ProxyConfig(), client)
+    assert reply == b'hello' * 1000
+    assert proxy.counters['connections'] == 1
+    assert proxy.counters['bytes_up'] == proxy.counters['bytes_down'] == 5000
+
+
+def test_latency_applies_in_each_direction():
+    async def client(proxy, port):
+        started = time.monotonic()
+        await round_trip(port)
+        return time.monotonic() - started
+
+    elapsed, _ = run(ProxyConfig(latency_ms=100), client)
+    assert 0.2 <= elapsed < 1.0
+
+
+def test_bandwidth_cap_paces_writes():
+    async def client(proxy, port):
+        started = time.monotonic()
+        await round_trip(port, b'x' * 32 * 1024, timeout=5)
+        return time.monotonic() - started
+
+    # 32 KiB each way at 1024 kbit/s (128 KB/s) takes about half a second
+    elapsed, _ = run(ProxyConfig(bandwidth_kbps=1024), client)
+    assert elapsed >= 0.3
+
+
+def test_reset_after_bytes_sends_rst():
+    async def client(proxy, port):
+        with pytest.raises((ConnectionResetError, asyncio.IncompleteReadError)):
+            await round_trip(port, b'x' * 100)
+
+    _, proxy = run(ProxyConfig(reset_rate=1.0, reset_after_bytes=10), client)
+    assert proxy.counters['resets'] == 1
+    assert proxy.counters['bytes_down'] == 0
+
+
+def test_blackhole_holds_traffic_until_lifted():
+    async def client(proxy, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(b'ping')
+            await writer.drain()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(reader.readexactly(4), 0.3)
+            proxy.config.update({'blackhole': False})
+            # Held back during the partition, then delivered on the same connection
+            return await asyncio.wait_for(reader.readexactly(4), 2.0)
+        finally:
+            writer.close()
+
+    reply, proxy = run(ProxyConfig(blackhole=True), client)
+    assert reply == b'ping'
+    assert proxy.counters['bytes_up'] == proxy.counters['bytes_down'] == 4
+
+
+def test_failed_delivery_closes_the_connection():
+    async def reset_at_once(reader, writer):
+        abort_with_rst(writer)
+
+    async def main():
+        upstream = await asyncio.start_server(reset_at_once, '127.0.0.1', 0)
+        proxy = FaultProxy(upstream.sockets[0].getsockname()[:2], ProxyConfig())
+        server = await proxy.start('127.0.0.1', 0)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+            # Far more than the delivery queue holds, so reading on would block once it is full
+            with pytest.raises((ConnectionError, asyncio.TimeoutError)):
+                for _ in range(QUEUE_CHUNKS * 8):
+                    writer.write(b'x' * 65536)
+                    await asyncio.wait_for(writer.drain(), 2.0)
+            writer.close()
+            for _ in range(200):
+                if not proxy.connections:
+                    break
+                await asyncio.sleep(0.01)
+            return proxy
+        finally:
+            server.close()
+            upstream.close()
+
+    proxy = asyncio.run(main())
+    assert not proxy.connections
+    assert proxy.counters['resets'] == 0
+
+
+def test_unreachable_upstream_resets_client():
+    async def main():
+        server = await FaultProxy(('127.0.0.1', 1), ProxyConfig(connect_timeout_s=1)).start('127.0.0.1', 0)
+        try:
+            with pytest.raises((ConnectionResetError, asyncio.IncompleteReadError)):
+                await round_trip(server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+    asyncio.run(main())
+
+
+def test_config_update_validates():
+    config = ProxyConfig()
+    with pytest.raises(ValueError):
+        config.update({'reset_rate': 2})
+    with pytest.raises(ValueError):
+        config.update({'packet_loss': 0.1})
+    config.update({'latency_ms': 5, 'blackhole': True})
+    assert (config.latency_ms, config.blackhole) == (5, True)
+    assert parse_address('27017') == ('127.0.0.1', 27017)
+    assert parse_address('mongo:27017') == ('mongo', 27017)
+
+
+def test_control_routes():
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from standins.tcpproxy import create_control_app
+
+    proxy = FaultProxy(('127.0.0.1', 27017), ProxyConfig())
+    control = TestClient(create_control_app(proxy))
+    assert control.post('/_standin/faults', json={'latency_ms': 50}).json()['latency_ms'] == 50
+    assert control.post('/_standin/faults', json={'blackhole_rate': -1}).status_code == 400
+    assert control.get('/_standin/stats').json() == {'upstream': '127.0.0.1:27017', 'active': 0,
+                                                     **dict.fromkeys(proxy.counters, 0)}
+    assert control.post('/_standin/reset').json() == {'reset': True}
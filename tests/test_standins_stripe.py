@@ -0,0 +1,130 @@
+"""
+Unit tests for the local Stripe stand-in
+"""
+
+import pytest
+
+from standins.params import decode_params
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from standins.faults import FaultConfig  # noqa: E402
+from standins.stripe_api import create_app  # noqa: E402
+
+
+def test_decode_bracketed_params():
+    params = decode_params([
+        ("customer", "cus_1"),
+        ("items[0][price]", "price_1"),
+        ("items[1][price]", "price_2"),
+        ("metadata[source]", "landing_page_purchase"),
+        ("expand[]", "latest_invoice.payment_intent"),
+        ("pause_collection", ""),
+    ])
+    assert params == {
+        "customer": "cus_1",
+        "items": [{"price": "price_1"}, {"price": "price_2"}],
+        "metadata": {"source": "landing_page_purchase"},
+        "expand": ["latest_invoice.payment_intent"],
+        "pause_collection": "",
+    }
+
+
+@pytest.fixture
+def stripe():
+    return TestClient(create_app(FaultConfig(seed=1)))
+
+
+class TestStripeStandIn:
+    """The call sequence of PublicController.handlePurchase"""
+
+    def test_purchase_flow(self, stripe):
+        customer = stripe.post("/v1/customers", data={"email": "a@example.com", "metadata[package]": "PT"}).json()
+        assert customer["metadata"] == {"package": "PT"}
+
+        attached = stripe.post("/v1/payment_methods/pm_card_visa/attach", data={"customer": customer["id"]})
+        assert attached.json()["customer"] == customer["id"]
+        stripe.post(f"/v1/customers/{customer['id']}", data={"invoice_settings[default_payment_method]": "pm_card_visa"})
+
+        assert stripe.get("/v1/products", params={"limit": 1}).json()["data"] == []
+        product = stripe.post("/v1/products", data={"name": "Personal Training Subscription"}).json()
+        price = stripe.post("/v1/prices", data={
+            "product": product["id"], "currency": "gbp", "unit_amount": "12500", "recurring[interval]": "month",
+        }).json()
+        listed = stripe.get("/v1/prices", params={"product": product["id"], "type": "recurring"}).json()
+        assert [p["id"] for p in listed["data"]] == [price["id"]]
+
+        subscription = stripe.post("/v1/subscriptions", data={
+            "customer": customer["id"],
+            "items[0][price]": price["id"],
+            "default_payment_method": "pm_card_visa",
+            "expand[0]": "latest_invoice.payment_intent",
+        }).json()
+        assert subscription["status"] == "active"
+        assert subscription["latest_invoice"]["payment_intent"]["status"] == "succeeded"
+        assert subscription["items"]["data"][0]["price"]["unit_amount"] == 12500
+
+    def test_subscription_update_and_cancel(self, stripe):
+        customer = stripe.post("/v1/customers", data={"email": "b@example.com"}).json()
+        product = stripe.post("/v1/products", data={"name": "PT"}).json()
+        price = stripe.post("/v1/prices", data={"product": product["id"], "currency": "gbp", "unit_amount": "100"}).json()
+        subscription = stripe.post("/v1/subscriptions", data={
+            "customer": customer["id"], "items[0][price]": price["id"],
+        }).json()
+        assert subscription["status"] == "incomplete"
+
+        paused = stripe.post(f"/v1/subscriptions/{subscription['id']}",
+                             data={"pause_collection[behavior]": "mark_uncollectible"}).json()
+        assert paused["pause_collection"] == {"behavior": "mark_uncollectible"}
+        resumed = stripe.post(f"/v1/subscriptions/{subscription['id']}", data={"pause_collection": ""}).json()
+        assert resumed["pause_collection"] is None
+
+        assert stripe.delete(f"/v1/subscriptions/{subscription['id']}").json()["status"] == "canceled"
+        assert stripe.get("/v1/subscriptions", params={"customer": customer["id"]}).json()["data"] == []
+
+    def test_customer_listings_use_the_index_and_paginate(self, stripe):
+        first, second = (stripe.post("/v1/customers", data={"email": f"{n}@example.com"}).json() for n in "de")
+        product = stripe.post("/v1/products", data={"name": "PT"}).json()
+        price = stripe.post("/v1/prices", data={"product": product["id"], "currency": "gbp", "unit_amount": "100"}).json()
+        created = [
+            stripe.post("/v1/subscriptions", data={"customer": customer["id"], "items[0][price]": price["id"]}).json()["id"]
+            for customer in (first, second, first, first)
+        ]
+
+        page = stripe.get("/v1/subscriptions", params={"customer": first["id"], "limit": 2}).json()
+        assert [s["id"] for s in page["data"]] == [created[3], created[2]] and page["has_more"]
+        rest = stripe.get("/v1/subscriptions", params={
+            "customer": first["id"], "limit": 2, "starting_after": created[2],
+        }).json()
+        assert [s["id"] for s in rest["data"]] == [created[0]] and not rest["has_more"]
+
+        # Re-attaching moves the payment method to the new customer's index
+        stripe.post("/v1/payment_methods/pm_card_visa/attach", data={"customer": first["id"]})
+        stripe.post("/v1/payment_methods/pm_card_visa/attach", data={"customer": second["id"]})
+        assert stripe.get("/v1/payment_methods", params={"customer": first["id"]}).json()["data"] == []
+        assert len(stripe.get("/v1/payment_methods", params={"customer": second["id"]}).json()["data"]) == 1
+        status = stripe.post("/v1/subscriptions", data={"customer": second["id"], "items[0][price]": price["id"]})
+        assert status.json()["status"] == "active"
+
+    def test_errors_use_stripe_format(self, stripe):
+        missing = stripe.get("/v1/customers/cus_missing")
+        assert missing.status_code == 404
+        assert missing.json()["error"]["code"] == "resource_missing"
+
+        customer = stripe.post("/v1/customers", data={"email": "c@example.com"}).json()
+        declined = stripe.post("/v1/payment_methods/pm_card_chargeDeclined/attach", data={"customer": customer["id"]})
+        assert declined.status_code == 402
+        assert declined.json()["error"]["type"] == "card_error"
+
+    def test_fault_injection_can_be_changed_at_runtime(self, stripe):
+        assert stripe.post("/_standin/faults", json={"error_rate": 1.0, "error_status": 429}).status_code == 200
+        response = stripe.get("/v1/products")
+        assert response.status_code == 429
+        assert response.json()["error"]["type"] == "rate_limit_error"
+        assert stripe.get("/_standin/stats").json()["injected_errors"] == {"GET /v1/products": 1}
+
+        assert stripe.post("/_standin/faults", json={"error_rate": 2}).status_code == 400
+        assert stripe.post("/_standin/reset").json() == {"reset": True}
+        assert stripe.get("/_standin/stats").json()["calls"] == {}
@@ -0,0 +1,169 @@
+"""
+Unit tests for the status API client in backend/status_client.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from status_client import StatusClient, StatusClientError  # noqa: E402
+
+
+def status_client(handler, **kwargs) -> StatusClient:
+    client = StatusClient("http://status.test", backoff_base=0, **kwargs)
+    client._http = httpx.AsyncClient(base_url="http://status.test", transport=httpx.MockTransport(handler))
+    return client
+
+
+def bulk_result(batch, rejected=()):
+    return {"received": len(batch), "inserted": len(batch) - len(rejected), "duplicates": 0,
+            "rejected": list(rejected)}
+
+
+def test_retries_keep_the_same_idempotency_key():
+    keys = []
+
+    def handler(request):
+        keys.append(request.headers["Idempotency-Key"])
+        if len(keys) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"client_name": "a"})
+
+    async def main():
+        client = status_client(handler)
+        try:
+            return await client.send("a")
+        finally:
+            await client.close()
+
+    assert asyncio.run(main()) == {"client_name": "a"}
+    assert len(keys) == 3 and len(set(keys)) == 1
+
+
+def test_gives_up_after_max_retries():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(429, headers={"Retry-After": "0"})
+
+    async def main():
+        client = status_client(handler, max_retries=2)
+        try:
+            with pytest.raises(StatusClientError):
+                await client.send("a")
+        finally:
+            await client._http.aclose()
+
+    asyncio.run(main())
+    assert len(attempts) == 3
+
+
+def test_batches_that_fail_every_retry_are_counted():
+    def handler(request):
+        return httpx.Response(503)
+
+    async def main():
+        client = status_client(handler, max_retries=1)
+        for name in ("a", "b"):
+            await client.report(name)
+        with pytest.raises(StatusClientError):
+            await client.flush()
+        await client._http.aclose()
+        return client.dropped
+
+    assert asyncio.run(main()) == 2
+
+
+def test_background_flusher_survives_a_refused_batch():
+    batches = []
+
+    def handler(request):
+        batch = json.loads(request.content)
+        batches.append(batch)
+        if len(batches) == 1:
+            return httpx.Response(422, json={"detail": "bad"})
+        return httpx.Response(200, json=bulk_result(batch))
+
+    async def main():
+        client = status_client(handler, flush_interval=0.01)
+        client.start()
+        await client.report("a")
+        await asyncio.sleep(0.05)
+        await client.report("b")
+        await asyncio.sleep(0.05)
+        await client.close()
+
+    asyncio.run(main())
+    assert batches == [[{"client_name": "a"}], [{"client_name": "b"}]]
+
+
+def test_background_flusher_survives_an_unreadable_reply():
+    batches = []
+
+    def handler(request):
+        batches.append(json.loads(request.content))
+        if len(batches) == 1:
+            return httpx.Response(200, text="<html>proxy error</html>")
+        return httpx.Response(200, json=bulk_result(batches[-1]))
+
+    async def main():
+        client = status_client(handler, flush_interval=0.01)
+        client.start()
+        await client.report("a")
+        await asyncio.sleep(0.05)
+        await client.report("b")
+        await asyncio.sleep(0.05)
+        await client.close()
+        return client.dropped
+
+    assert asyncio.run(main()) == 1
+    assert len(batches) == 2
+
+
+def test_rate_limited_items_are_queued_again():
+    batches = []
+
+    def handler(request):
+        batch = json.loads(request.content)
+        batches.append([item["client_name"] for item in batch])
+        return httpx.Response(200, json=bulk_result(batch, rejected=[1] if len(batches) == 1 else []))
+
+    async def main():
+        client = status_client(handler, batch_size=2)
+        for name in ("a", "b", "c"):
+            await client._pending.put({"client_name": name})
+        await client.flush()
+        assert client._pending.qsize() == 2
+        await client.close()
+
+    asyncio.run(main())
+    assert batches == [["a", "b"], ["c", "b"]]
+
+
+def test_iterates_pages_by_next_cursor():
+    cursors = []
+
+    def handler(request):
+        cursor = request.url.params.get("cursor")
+        cursors.append(cursor)
+        if cursor is None:
+            return httpx.Response(200, json=[{"id": 1}, {"id": 2}], headers={"X-Next-Cursor": "p2"})
+        return httpx.Response(200, json=[{"id": 3}])
+
+    async def main():
+        client = status_client(handler)
+        try:
+            return [check["id"] async for check in client.iter_status_checks(page_size=2)]
+        finally:
+            await client.close()
+
+    assert asyncio.run(main()) == [1, 2, 3]
+    assert cursors == [None, "p2"]
@@ -0,0 +1,548 @@
+"""
+Unit tests for the in-memory status machinery in backend/server.py
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("dotenv")
+
+# Importing the app only builds a lazy Mongo client; nothing connects
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:1")
+os.environ.setdefault("DB_NAME", "status_unit_tests")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import server  # noqa: E402
+
+
+class AsyncRows:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.rows:
+            raise StopAsyncIteration
+        return self.rows.pop(0)
+
+
+class FakeCollection:
+    def __init__(self, rows=()):
+        self.rows = rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return AsyncRows(self.rows)
+
+
+class FakeDatabase:
+    def __init__(self, **collections):
+        self.__dict__.update(collections)
+
+
+class TestStaleClientTracker:
+    def test_client_goes_stale_after_grace_and_recovers(self):
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=2)
+        tracker.record("a", 100)
+        assert tracker.sweep(119) == []
+        assert tracker.sweep(120) == ["a"]
+        assert [c.client_name for c in tracker.stale_clients(125)] == ["a"]
+        assert tracker.record("a", 130) is True
+        assert tracker.stale_clients(131) == []
+
+    def test_superseded_deadlines_are_skipped(self):
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=2)
+        tracker.record("a", 100)
+        tracker.record("a", 110)
+        assert tracker.sweep(125) == []
+        assert tracker.sweep(200) == ["a"]
+
+    def test_interval_is_learned_from_gaps(self):
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=2)
+        tracker.record("a", 0)
+        tracker.record("a", 60)
+        assert tracker.expected_interval("a") == 60
+        tracker.record("a", 80)
+        assert tracker.expected_interval("a") == pytest.approx(0.8 * 60 + 0.2 * 20)
+
+    def test_batched_heartbeats_do_not_shrink_the_interval(self):
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=2)
+        # One bulk post or WebSocket batch: 100 heartbeats 0.1 ms apart
+        for i in range(100):
+            tracker.record("a", 100 + i * 0.0001)
+        assert tracker.expected_interval("a") == 10
+        assert tracker.sweep(111) == []
+        assert tracker.sweep(121) == ["a"]
+
+    def test_out_of_order_heartbeat_is_ignored(self):
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=2)
+        tracker.record("a", 100)
+        assert tracker.record("a", 50) is False
+        assert tracker.sweep(119) == []
+
+    def test_long_stale_clients_are_evicted(self):
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=1)
+        tracker.record("old", 0)
+        tracker.record("recent", 100)
+        tracker.sweep(200)
+        assert tracker.evict(now=200, max_stale_seconds=150) == ["old"]
+        assert [c.client_name for c in tracker.stale_clients(200)] == ["recent"]
+        assert "old" not in tracker._last_seen and "old" not in tracker._intervals
+
+    def test_startup_load_is_windowed_and_marks_overdue_clients_silently(self, monkeypatch):
+        now = datetime.utcnow()
+        collection = FakeCollection([
+            {"_id": "overdue", "last_seen": datetime.utcfromtimestamp(server._epoch(now) - 3600)},
+            {"_id": "alive", "last_seen": now},
+        ])
+        tracker = server.StaleClientTracker(default_interval=60, grace_factor=2)
+        monkeypatch.setattr(server, "db", FakeDatabase(status_checks=collection))
+        monkeypatch.setattr(server, "stale_tracker", tracker)
+
+        asyncio.run(server.load_last_heartbeats())
+
+        assert "$gte" in collection.pipelines[0][0]["$match"]["timestamp"]
+        assert [c.client_name for c in tracker.stale_clients(server._epoch(now))] == ["overdue"]
+        # Already stale, so the sweeper has nothing new to announce
+        assert tracker.sweep(server._epoch(now)) == []
+
+
+class TestStaleNotifications:
+    def test_transitions_are_queued_not_awaited(self, monkeypatch):
+        notifications = asyncio.Queue()
+        monkeypatch.setattr(server, "stale_notifications", notifications)
+        monkeypatch.setattr(server, "STALE_WEBHOOK_URL", "http://hooks.test/stale")
+        tracker = server.StaleClientTracker(default_interval=10, grace_factor=2)
+        monkeypatch.setattr(server, "stale_tracker", tracker)
+        tracker.record("a", 0)
+        tracker.sweep(100)
+
+        status = server.StatusCheck(client_name="a")
+        asyncio.run(server.record_heartbeat(status))
+
+        payload = notifications.get_nowait()
+        assert (payload["client_name"], payload["state"]) == ("a", "recovered")
+
+    def test_worker_posts_in_order_and_survives_failures(self, monkeypatch):
+        httpx = pytest.importorskip("httpx")
+        posted = []
+
+        def handler(request):
+            posted.append(request.read())
+            if len(posted) == 1:
+                raise httpx.ConnectError("webhook down")
+            return httpx.Response(204)
+
+        async def main():
+            notifications = asyncio.Queue()
+            monkeypatch.setattr(server, "stale_notifications", notifications)
+            monkeypatch.setattr(server, "STALE_WEBHOOK_URL", "http://hooks.test/stale")
+            for state in ("stale", "recovered"):
+                server.notify_stale_transition("a", state)
+            http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            worker = asyncio.create_task(server.deliver_stale_notifications(http))
+            await asyncio.wait_for(notifications.join(), 1)
+            worker.cancel()
+
+        asyncio.run(main())
+        assert [b'"stale"' in body for body in posted] == [True, False]
+        assert b'"recovered"' in posted[1]
+
+
+class SketchStore:
+    """The subset of an async Mongo collection DistinctClientSketches uses"""
+
+    def __init__(self):
+        self.docs = {}
+        self.conflicts = 0
+
+    async def find_one(self, query):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise server.DuplicateKeyError("duplicate")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+
+        class Result:
+            modified_count = 0
+        if self.conflicts:
+            self.conflicts -= 1
+            doc["version"] += 1  # another worker got there first
+        elif doc and doc["version"] == query["version"]:
+            doc.update(update["$set"])
+            doc["version"] += update["$inc"]["version"]
+            Result.modified_count = 1
+        return Result()
+
+    def find(self, query, projection):
+        low, high = query["_id"]["$gte"], query["_id"]["$lt"]
+        return AsyncRows(doc for key, doc in sorted(self.docs.items()) if low <= key < high)
+
+
+class TestHyperLogLog:
+    def test_estimate_is_within_a_few_percent(self):
+        sketch = server.HyperLogLog()
+        for i in range(20000):
+            sketch.add(f"client-{i}")
+        assert abs(sketch.estimate() - 20000) / 20000 < 0.05
+
+    def test_duplicates_do_not_count_and_small_sets_are_exact_enough(self):
+        sketch = server.HyperLogLog()
+        for _ in range(3):
+            for i in range(50):
+                sketch.add(f"client-{i}")
+        assert 48 <= sketch.estimate() <= 52
+
+    def test_merge_is_the_union(self):
+        left, right, both = server.HyperLogLog(), server.HyperLogLog(), server.HyperLogLog()
+        for i in range(3000):
+            (left if i % 2 else right).add(f"c{i}")
+            both.add(f"c{i}")
+        left.merge(right)
+        assert left.registers == both.registers
+
+    def test_rejects_mismatched_sketches(self):
+        with pytest.raises(ValueError):
+            server.HyperLogLog(registers=b"\0" * 10)
+        with pytest.raises(ValueError):
+            server.HyperLogLog(12).merge(server.HyperLogLog(10))
+
+
+class TestDistinctClientSketches:
+    def test_flush_merges_into_store_and_estimate_spans_buckets(self):
+        store = SketchStore()
+        sketches = server.DistinctClientSketches(store, bucket_seconds=3600)
+        for i in range(100):
+            sketches.record(f"c{i}", 3600 * 10 + i)
+        asyncio.run(sketches.flush())
+        for i in range(50, 150):
+            sketches.record(f"c{i}", 3600 * 10 + i)
+        sketches.record("next-hour", 3600 * 11)
+        store.conflicts = 1  # the first optimistic update loses a race
+        asyncio.run(sketches.flush())
+        sketches.record("pending-only", 3600 * 12)
+
+        # Created, bumped by the competing writer, then merged on the retry
+        assert store.docs[36000]["version"] == 3
+        result = asyncio.run(sketches.estimate(3600 * 10 + 5, 3600 * 13))
+        assert result.buckets == 3
+        assert 146 <= result.estimate <= 158
+
+    def test_failed_merge_is_requeued(self, monkeypatch):
+        sketches = server.DistinctClientSketches(SketchStore(), bucket_seconds=60)
+        sketches.record("a", 0)
+
+        async def never(bucket, sketch):
+            return False
+        monkeypatch.setattr(sketches, "_merge_into_store", never)
+        asyncio.run(sketches.flush())
+        assert list(sketches._pending) == [0]
+
+    def test_store_errors_keep_every_pending_bucket(self):
+        store = SketchStore()
+        sketches = server.DistinctClientSketches(store, bucket_seconds=60)
+        for bucket in range(3):
+            sketches.record(f"c{bucket}", bucket * 60)
+
+        async def unreachable(query):
+            if query["_id"] != 60:
+                raise OSError("connection refused")
+            return None
+        store.find_one = unreachable
+        asyncio.run(sketches.flush())
+
+        # The reachable bucket was stored; the others wait for the next flush
+        assert list(store.docs) == [60]
+        assert sorted(sketches._pending) == [0, 120]
+        del store.find_one
+        asyncio.run(sketches.flush())
+        assert sorted(store.docs) == [0, 60, 120] and not sketches._pending
+
+
+class TestTokenBucketLimiter:
+    def test_burst_then_refill(self):
+        limiter = server.TokenBucketLimiter(rate=2, burst=3, overrides={})
+        assert [limiter.acquire("a", 0) for _ in range(3)] == [0, 0, 0]
+        assert limiter.acquire("a", 0) == pytest.approx(0.5)
+        assert limiter.acquire("a", 0.5) == 0
+
+    def test_overrides_apply_per_client(self):
+        limiter = server.TokenBucketLimiter(rate=1, burst=1, overrides={"edge": {"rate": 10, "burst": 5}})
+        assert [limiter.acquire("edge", 0) for _ in range(5)] == [0] * 5
+        assert limiter.acquire("other", 0) == 0
+        assert limiter.acquire("other", 0) > 0
+
+    def test_bucket_count_is_bounded_least_recently_used_first(self):
+        limiter = server.TokenBucketLimiter(rate=1, burst=1, overrides={}, max_buckets=3)
+        for name in ("a", "b", "c"):
+            limiter.acquire(name, 0)
+        limiter.acquire("a", 0)  # rejected, but touches "a"
+        limiter.acquire("d", 0)
+        assert list(limiter._buckets) == ["c", "a", "d"]
+
+    def test_metric_keys_do_not_grow_with_client_names(self, monkeypatch):
+        monkeypatch.setattr(server, "metrics", server.Counter())
+        monkeypatch.setattr(server, "RATE_LIMIT_OVERRIDES", {"edge": {}})
+        for name in ("edge", "random-1", "random-2"):
+            server.count_rate_limited(name)
+        assert dict(server.metrics) == {
+            "status_rate_limited_total": 3, "status_rate_limited:edge": 1, "status_rate_limited:other": 2,
+        }
+
+    def test_acquire_up_to_grants_what_the_bucket_holds(self):
+        limiter = server.TokenBucketLimiter(rate=2, burst=3, overrides={})
+        assert limiter.acquire_up_to("a", 5, 0) == (3, pytest.approx(0.5))
+        limiter.refund("a", 2, 0)
+        assert limiter.acquire_up_to("a", 2, 0) == (2, 0.0)
+
+    def test_shared_quota_is_checked_after_the_local_bucket(self, monkeypatch):
+        calls = []
+
+        async def shared(client_name, now, count):
+            calls.append((client_name, count))
+            return 0, 4.0
+        monkeypatch.setattr(server, "RATE_LIMIT_SHARED", True)
+        monkeypatch.setattr(server, "acquire_shared_quota", shared)
+        monkeypatch.setattr(server, "status_limiter", server.TokenBucketLimiter(1, 1, {}))
+        assert asyncio.run(server.status_rate_limit_delay("a")) == 4.0
+        # The shared refusal gave the local token back
+        assert asyncio.run(server.status_rate_limit_delay("a")) == 4.0
+        assert calls == [("a", 1), ("a", 1)]
+
+    def test_shared_quota_spends_a_batch_in_one_update(self, monkeypatch):
+        class Counters:
+            def __init__(self):
+                self.counts = {}
+                self.updates = 0
+
+            async def find_one_and_update(self, query, update, **kwargs):
+                self.updates += 1
+                self.counts[query["_id"]] = self.counts.get(query["_id"], 0) + update["$inc"]["count"]
+                return {"count": self.counts[query["_id"]]}
+
+            async def update_one(self, query, update):
+                self.counts[query["_id"]] += update["$inc"]["count"]
+
+        counters = Counters()
+        monkeypatch.setattr(server, "db", FakeDatabase(status_rate_limits=counters))
+        monkeypatch.setattr(server, "status_limiter", server.TokenBucketLimiter(1, 2, {}))
+        monkeypatch.setattr(server, "RATE_LIMIT_SHARED_WINDOW", 10)
+        # Limit is 1/s * 10s + 2 = 12 per window
+        assert asyncio.run(server.acquire_shared_quota("a", 3, 8)) == (8, 0.0)
+        assert asyncio.run(server.acquire_shared_quota("a", 4, 8)) == (4, 6)
+        assert asyncio.run(server.acquire_shared_quota("a", 5, 1)) == (0, 5)
+        assert counters.counts == {"a:0": 12}
+        assert counters.updates == 3
+
+
+class TestBulkIngest:
+    @pytest.fixture
+    def bulk(self, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        written = []
+
+        async def persist(batch):
+            written.append([(check.id, check.client_name) for check in batch])
+            return len(batch)
+        monkeypatch.setattr(server, "persist_status_batch", persist)
+        monkeypatch.setattr(server, "RATE_LIMIT_SHARED", False)
+        monkeypatch.setattr(server, "status_limiter", server.TokenBucketLimiter(1, 2, {}))
+        monkeypatch.setattr(server, "metrics", server.Counter())
+        return TestClient(server.app), written
+
+    def test_items_over_a_clients_limit_are_rejected_individually(self, bulk):
+        client, written = bulk
+        items = [{"client_name": name} for name in ("a", "b", "a", "a", "b")]
+        response = client.post("/api/status/bulk", json=items, headers={"Idempotency-Key": "k"})
+        assert response.status_code == 200
+        assert response.json() == {"received": 5, "inserted": 4, "duplicates": 0, "rejected": [3]}
+        assert response.headers["Retry-After"] == "1"
+        ids = [status_id for status_id, _ in written[0]]
+        assert ids == [server.idempotent_id("k", index) for index in (0, 1, 2, 4)]
+        assert server.metrics["status_rate_limited_total"] == 1
+
+    def test_batch_with_nothing_admitted_is_refused(self, bulk):
+        client, written = bulk
+        client.post("/api/status/bulk", json=[{"client_name": "a"}] * 2)
+        response = client.post("/api/status/bulk", json=[{"client_name": "a"}] * 3)
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+        assert len(written) == 1
+
+
+class TestCursorPagination:
+    def test_cursor_round_trips_to_a_keyset_filter(self):
+        check = server.StatusCheck(client_name="a", timestamp=datetime(2026, 1, 2, 3, 4, 5))
+        query = server.decode_cursor(server.encode_cursor(check))
+        assert query == {"$or": [
+            {"timestamp": {"$gt": check.timestamp}},
+            {"timestamp": check.timestamp, "id": {"$gt": check.id}},
+        ]}
+
+    @pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24=", "WyJ4IiwgImlkIl0="])
+    def test_invalid_cursor_is_a_400(self, cursor):
+        with pytest.raises(server.HTTPException) as error:
+            server.decode_cursor(cursor)
+        assert error.value.status_code == 400
+
+    def test_next_cursor_is_set_only_for_a_full_page(self, monkeypatch):
+        from fastapi import Response
+
+        rows = [server.StatusCheck(client_name=f"c{i}").dict() for i in range(3)]
+
+        class Cursor:
+            def __init__(self, query):
+                self.query = query
+
+            def sort(self, keys):
+                return self
+
+            async def to_list(self, limit):
+                return rows[:limit]
+
+        class Collection:
+            def find(self, query):
+                return Cursor(query)
+        monkeypatch.setattr(server, "db", FakeDatabase(status_checks=Collection()))
+
+        response = Response()
+        page = asyncio.run(server.get_status_checks(response, None, 2))
+        assert response.headers["X-Next-Cursor"] == server.encode_cursor(page[-1])
+        response = Response()
+        asyncio.run(server.get_status_checks(response, None, 5))
+        assert "X-Next-Cursor" not in response.headers
+
+
+class TestWebSocketIngest:
+    @pytest.fixture
+    def ingest(self, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        written = []
+
+        async def persist(batch):
+            if written and written[-1] == "fail":
+                raise RuntimeError("mongo down")
+            written.append([check.client_name for check in batch])
+            return len(batch)
+
+        async def no_limit(client_name):
+            return 0.0
+        monkeypatch.setattr(server, "persist_status_batch", persist)
+        monkeypatch.setattr(server, "status_rate_limit_delay", no_limit)
+        monkeypatch.setattr(server, "WS_BATCH_SIZE", 3)
+        monkeypatch.setattr(server, "WS_FLUSH_SECONDS", 0.05)
+        # No context manager, so the Mongo startup hooks do not run
+        return TestClient(server.app), written
+
+    def test_large_frame_is_split_into_bounded_batches(self, ingest):
+        client, written = ingest
+        with client.websocket_connect("/api/status/ws") as ws:
+            ws.send_json([{"client_name": f"c{i}"} for i in range(7)])
+            assert ws.receive_json() == {"ack": 3}
+            assert ws.receive_json() == {"ack": 6}
+            assert ws.receive_json() == {"ack": 7}  # the remainder, after WS_FLUSH_SECONDS
+        assert [len(batch) for batch in written] == [3, 3, 1]
+
+    def test_rejections_are_reported_and_acknowledged(self, ingest):
+        client, written = ingest
+        with client.websocket_connect("/api/status/ws") as ws:
+            ws.send_text("not json")
+            assert ws.receive_json() == {"rejected": 1, "reason": "invalid"}
+            assert ws.receive_json() == {"ack": 1}
+
+    def test_failed_write_closes_without_acknowledging(self, ingest):
+        from starlette.websockets import WebSocketDisconnect
+
+        client, written = ingest
+        written.append("fail")
+        with client.websocket_connect("/api/status/ws") as ws:
+            ws.send_json([{"client_name": f"c{i}"} for i in range(3)])
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 1011
+
+    def test_binary_frame_closes_without_storing_unacknowledged_messages(self, ingest):
+        from starlette.websockets import WebSocketDisconnect
+
+        client, written = ingest
+        with client.websocket_connect("/api/status/ws") as ws:
+            ws.send_json({"client_name": "a"})
+            ws.send_bytes(b"\x00")
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 1003
+        assert written == []
+
+    def test_disconnect_drops_the_unacknowledged_batch(self, ingest):
+        client, written = ingest
+        with client.websocket_connect("/api/status/ws") as ws:
+            ws.send_json([{"client_name": "a"}, {"client_name": "b"}])
+        # Resent by the client after it reconnects, so storing it here would duplicate it
+        assert written == []
+
+
+class TestWarmUp:
+    @pytest.fixture
+    def failing_warm_up(self, monkeypatch):
+        state = {"failures": 0}
+        calls = []
+        sleeps = []
+
+        async def warm_up():
+            calls.append(len(calls) + 1)
+            if len(calls) <= state["failures"]:
+                raise ConnectionError("no mongo yet")
+
+        async def sleep(delay):
+            sleeps.append(delay)
+        monkeypatch.setattr(server, "warm_up", warm_up)
+        monkeypatch.setattr(server.asyncio, "sleep", sleep)
+        return state, calls, sleeps
+
+    def test_gives_up_after_last_attempt_without_sleeping(self, failing_warm_up):
+        state, calls, sleeps = failing_warm_up
+        state["failures"] = 10
+        assert asyncio.run(server.retry_warm_up(last_attempt=3)) is False
+        assert calls == [1, 2, 3]
+        assert sleeps == [1, 2]
+
+    def test_background_retry_continues_with_capped_backoff(self, failing_warm_up, monkeypatch):
+        state, calls, sleeps = failing_warm_up
+        state["failures"] = 8
+        monkeypatch.setattr(server, "WARMUP_RETRY_CAP_SECONDS", 10)
+        assert asyncio.run(server.retry_warm_up(first_attempt=4)) is True
+        assert len(calls) == 9
+        assert sleeps == [8, 10, 10, 10, 10, 10, 10, 10]
+
+    def test_warm_up_pings_the_pool_and_marks_ready(self, monkeypatch):
+        pings = []
+
+        class Admin:
+            async def command(self, name):
+                pings.append(name)
+
+        class Collection:
+            async def find_one(self, *args):
+                return None
+        monkeypatch.setattr(server, "client", type("Client", (), {"admin": Admin()})())
+        monkeypatch.setattr(server, "db", FakeDatabase(status_checks=Collection()))
+        monkeypatch.setattr(server, "warmup_state", {"ready": False, "duration_ms": None})
+        monkeypatch.setattr(server, "MONGO_MIN_POOL_SIZE", 4)
+        asyncio.run(server.warm_up())
+        assert pings == ["ping"] * 4
+        assert server.warmup_state["ready"] is True
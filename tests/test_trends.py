@@ -0,0 +1,116 @@
+"""
+Unit tests for the trends store and dashboard
+"""
+
+import json
+
+import pytest
+
+from trends.__main__ import main
+from trends.dashboard import benchmark_runs, drifted_runs, iteration_rows, mark_drift, render_html, suite_rows
+from trends.store import connect, ingest, parse_iteration, parse_junit, parse_rate
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?><testsuites name="pytest tests">
+<testsuite name="pytest" errors="0" failures="1" skipped="0" tests="2" time="1.500" timestamp="2026-01-25T17:03:03">
+<testcase classname="backend.tests.test_policy.TestPolicy" name="test_ok" time="0.25" />
+<testcase classname="backend.tests.test_policy.TestPolicy" name="test_bad" time="1.1"><failure message="x"/></testcase>
+</testsuite></testsuites>"""
+
+
+def iteration(backend, links=(), critical=()):
+    return {
+        "success_rate": {"backend": backend, "frontend": "100%"},
+        "backend_issues": {"critical": list(critical), "minor": []},
+        "frontend_issues": {"ui_bugs": [], "integration_issues": []},
+        "minor_issues": [{"issue": "button label"}],
+        "test_report_links": list(links),
+        "api_endpoints_tested": {"public": ["GET /api/health - 200 OK"], "admin": ["GET /api/admin/clients - 200 OK"]},
+    }
+
+
+def benchmark(created_at, revision, p95):
+    return {
+        "schema_version": 1, "name": "smoke", "created_at": created_at,
+        "environment": {"git_revision": revision},
+        "endpoints": {
+            "GET /api/health": {"requests": 100, "errors": 0, "throughput_rps": 50, "p50_ms": 2, "p95_ms": 5, "p99_ms": 9},
+            "GET /api/admin/clients": {"requests": 100, "errors": 4, "throughput_rps": 20, "p50_ms": 40,
+                                       "p95_ms": p95, "p99_ms": p95 * 2},
+        },
+    }
+
+
+@pytest.fixture
+def reports(tmp_path):
+    (tmp_path / "pytest").mkdir()
+    (tmp_path / "pytest" / "policy_tests.xml").write_text(JUNIT)
+    (tmp_path / "iteration_1.json").write_text(json.dumps(iteration("N/A - frontend only")))
+    (tmp_path / "iteration_2.json").write_text(json.dumps(
+        iteration("50% (1/2 tests passed)", ["/app/test_reports/pytest/policy_tests.xml"], critical=["login"])
+    ))
+    runs = tmp_path / "benchmarks" / "smoke"
+    runs.mkdir(parents=True)
+    for stamp, revision, p95 in (("20260101T000000", "aaa", 100), ("20260102T000000", "bbb", 150)):
+        created = f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:8]}T00:00:00+00:00"
+        (runs / f"{stamp}.json").write_text(json.dumps(benchmark(created, revision, p95)))
+    (runs / "baseline.json").write_text(json.dumps(benchmark("2026-01-01T00:00:00+00:00", "aaa", 100)))
+    return tmp_path
+
+
+def test_parse_rate_and_iteration():
+    assert parse_rate("100% (20/20 tests passed)") == (100.0, 20, 20)
+    assert parse_rate("N/A (frontend only test)") == (None, None, None)
+    parsed = parse_iteration(iteration("50% (1/2 tests passed)", critical=["login"]))
+    assert parsed["backend_total"] == 2
+    assert parsed["critical_issues"] == 1
+    assert parsed["issues"] == 2
+    assert parsed["endpoints_tested"] == 2
+
+
+def test_parse_junit_counts_cases_and_outcomes():
+    totals, cases, timestamp = parse_junit(JUNIT)
+    assert totals == {"tests": 2, "failures": 1, "errors": 0, "skipped": 0, "duration_s": 1.5}
+    assert [case["outcome"] for case in cases] == ["passed", "failure"]
+    assert timestamp == "2026-01-25T17:03:03"
+
+
+def test_ingest_is_idempotent_and_links_suites_to_iterations(reports, tmp_path):
+    db = connect(str(tmp_path / "trends.sqlite"))
+    assert ingest(db, str(reports)) == {"iteration": 2, "pytest": 1, "benchmark": 2}
+    assert ingest(db, str(reports)) == {"iteration": 0, "pytest": 0, "benchmark": 0}
+
+    rows = iteration_rows(db)
+    assert [row["iteration"] for row in rows] == [1, 2]
+    assert rows[1]["suite_duration_s"] == 1.5
+    assert suite_rows(db)[0]["slowest_case_s"] == 1.1
+
+    (reports / "iteration_1.json").write_text(json.dumps(iteration("100% (3/3 tests passed)")))
+    assert ingest(db, str(reports))["iteration"] == 1
+    assert iteration_rows(db)[0]["backend_passed"] == 3
+    assert db.execute("SELECT COUNT(*) FROM iterations").fetchone()[0] == 2
+
+
+def test_mark_drift_flags_p95_rise_over_previous_run(reports, tmp_path):
+    db = connect(str(tmp_path / "trends.sqlite"))
+    ingest(db, str(reports))
+    runs = mark_drift(benchmark_runs(db, "smoke"), max_p95_increase=0.2)
+    assert [run["git_revision"] for run in runs] == ["aaa", "bbb"]
+    assert runs[0]["p95_change"] is None
+    assert runs[1]["p95_change"] == pytest.approx(0.5)
+    assert runs[1]["drifted"] == ["GET /api/admin/clients"]
+    assert not mark_drift(benchmark_runs(db, "smoke"), max_p95_increase=0.6)[1]["drifted"]
+    assert not mark_drift(benchmark_runs(db, "smoke"), min_requests=500)[1]["drifted"]
+    assert list(drifted_runs(db)) == ["smoke"]
+
+    page = render_html(db)
+    assert "Benchmark: smoke" in page
+    assert page.count("<svg") == 5
+
+
+def test_cli_writes_dashboard_and_fails_on_drift(reports, tmp_path, capsys):
+    args = ["--reports-dir", str(reports), "--db", str(tmp_path / "t.sqlite"), "--html", str(tmp_path / "t.html")]
+    main(args)
+    assert (tmp_path / "t.html").read_text().startswith("<!DOCTYPE html>")
+    with pytest.raises(SystemExit):
+        main(args + ["--fail-on-drift", "--no-ingest"])
+    assert "p95 up 50%" in capsys.readouterr().out
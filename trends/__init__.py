@@ -0,0 +1,5 @@
+"""
+Trend store and dashboard over the reports in test_reports/:
+
+    python -m trends
+"""
@@ -0,0 +1,51 @@
+"""
+Command line entry point: python -m trends [options]
+"""
+
+import argparse
+import os
+
+from trends.dashboard import drifted_runs, render_html
+from trends.store import DB_PATH, REPORTS_DIR, connect, ingest
+
+HTML_PATH = os.path.join(REPORTS_DIR, "trends.html")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m trends', description=__doc__)
+    parser.add_argument('--reports-dir', default=REPORTS_DIR, help=f'Reports to ingest (default: {REPORTS_DIR})')
+    parser.add_argument('--db', default=DB_PATH, help=f'SQLite store (default: {DB_PATH})')
+    parser.add_argument('--html', default=HTML_PATH, help=f'Dashboard to write (default: {HTML_PATH})')
+    parser.add_argument('--no-ingest', action='store_true', help='Render from the store without reading reports')
+    parser.add_argument('--max-p95-increase', type=float, default=0.2,
+                        help='Flag benchmark runs whose p95 rose more than this fraction run over run')
+    parser.add_argument('--min-requests', type=int, default=20,
+                        help='Ignore endpoints with fewer samples than this when flagging drift')
+    parser.add_argument('--fail-on-drift', action='store_true',
+                        help="Exit 1 when any benchmark's latest run is flagged")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db = connect(args.db)
+    try:
+        if not args.no_ingest:
+            stored = ingest(db, args.reports_dir)
+            print(f"📥 Stored {stored['iteration']} iteration, {stored['pytest']} pytest and "
+                  f"{stored['benchmark']} benchmark reports in {args.db}")
+        with open(args.html, 'w') as f:
+            f.write(render_html(db, args.max_p95_increase, args.min_requests))
+        print(f"📈 Dashboard written to {args.html}")
+        drifted = drifted_runs(db, args.max_p95_increase, args.min_requests)
+    finally:
+        db.close()
+    for name, run in drifted.items():
+        print(f"❌ {name} run {run['index']} ({run['git_revision'] or 'unknown revision'}): "
+              f"p95 up {run['p95_change']:.0%} on {', '.join(run['drifted'])}")
+    if drifted and args.fail_on_drift:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Static HTML dashboard over the trends store.
+
+Iterations are plotted by number, pytest suites in timestamp order and
+benchmark runs in creation order, each against its own run index, since the
+iteration summaries carry no timestamps. A benchmark run is flagged when an
+endpoint's p95 rose by more than the allowed fraction over the previous run
+that measured it, the same rule `python -m loadtest compare` applies to a
+baseline.
+"""
+
+import sqlite3
+from typing import Dict, List
+
+from loadtest.benchmark import relative_change
+from loadtest.svgchart import COLORS, html_page, html_table, line_chart
+
+
+def iteration_rows(db: sqlite3.Connection) -> List[dict]:
+    return [dict(row) for row in db.execute(
+        """
+        SELECT r.iteration, i.*,
+               (SELECT SUM(s.tests) FROM runs p JOIN suites s ON s.run_id = p.id
+                WHERE p.kind = 'pytest' AND p.iteration = r.iteration) AS suite_tests,
+               (SELECT SUM(s.duration_s) FROM runs p JOIN suites s ON s.run_id = p.id
+                WHERE p.kind = 'pytest' AND p.iteration = r.iteration) AS suite_duration_s
+        FROM runs r JOIN iterations i ON i.run_id = r.id
+        ORDER BY r.iteration
+        """
+    )]
+
+
+def suite_rows(db: sqlite3.Connection) -> List[dict]:
+    return [dict(row) for row in db.execute(
+        """
+        SELECT r.name, r.iteration, r.recorded_at, s.*,
+               (SELECT MAX(c.duration_s) FROM cases c WHERE c.run_id = r.id) AS slowest_case_s
+        FROM runs r JOIN suites s ON s.run_id = r.id
+        ORDER BY r.recorded_at, r.source
+        """
+    )]
+
+
+def slowest_cases(db: sqlite3.Connection, limit: int = 10) -> List[dict]:
+    return [dict(row) for row in db.execute(
+        """
+        SELECT r.name AS suite, c.classname, c.name, c.duration_s, c.outcome
+        FROM cases c JOIN runs r ON r.id = c.run_id
+        ORDER BY c.duration_s DESC LIMIT ?
+        """,
+        (limit,),
+    )]
+
+
+def benchmark_runs(db: sqlite3.Connection, name: str) -> List[dict]:
+    runs = [dict(row) for row in db.execute(
+        "SELECT id, recorded_at, git_revision FROM runs WHERE kind = 'benchmark' AND name = ? "
+        "ORDER BY recorded_at, source",
+        (name,),
+    )]
+    for index, run in enumerate(runs, 1):
+        run["index"] = index
+        run["endpoints"] = {
+            row["endpoint"]: dict(row)
+            for row in db.execute("SELECT * FROM endpoints WHERE run_id = ?", (run["id"],))
+        }
+    return runs
+
+
+def mark_drift(runs: List[dict], max_p95_increase: float = 0.2, min_requests: int = 20) -> List[dict]:
+    """Annotate each run with its largest p95 change and the endpoints over the limit"""
+    previous: Dict[str, dict] = {}
+    for run in runs:
+        changes = {}
+        for endpoint, row in run["endpoints"].items():
+            before = previous.get(endpoint)
+            if before and min(before["requests"], row["requests"]) >= min_requests:
+                changes[endpoint] = relative_change(before["p95_ms"] or 0, row["p95_ms"] or 0)
+            previous[endpoint] = row
+        run["p95_change"] = max(changes.values()) if changes else None
+        run["drifted"] = sorted(endpoint for endpoint, change in changes.items() if change > max_p95_increase)
+    return runs
+
+
+def error_rate(row: dict) -> float:
+    return round(100 * row["errors"] / row["requests"], 2) if row["requests"] else 0.0
+
+
+def iteration_section(rows: List[dict]) -> List[str]:
+    if not rows:
+        return ["<h2>Test iterations</h2><p>No iteration reports.</p>"]
+
+    def series(field):
+        return [(row["iteration"], row[field]) for row in rows if row[field] is not None]
+
+    return [
+        "<h2>Test iterations</h2>",
+        line_chart("Pass rate", {"backend %": series("backend_rate"), "frontend %": series("frontend_rate")},
+                   "iteration", "%"),
+        line_chart("Issues reported", {"all": series("issues"), "critical": series("critical_issues")},
+                   "iteration", "issues"),
+        html_table(
+            ["Iteration", "Backend", "Frontend", "Backend tests", "Issues", "Critical", "Endpoints tested",
+             "Suite s"],
+            [
+                [row["iteration"],
+                 f"{row['backend_rate']:g}%" if row["backend_rate"] is not None else "-",
+                 f"{row['frontend_rate']:g}%" if row["frontend_rate"] is not None else "-",
+                 f"{row['backend_passed']}/{row['backend_total']}" if row["backend_total"] else "-",
+                 row["issues"], row["critical_issues"], row["endpoints_tested"] or "-",
+                 row["suite_duration_s"] if row["suite_duration_s"] is not None else "-"]
+                for row in rows
+            ],
+            bad_rows=[bool(row["critical_issues"]) or (row["backend_rate"] or 100) < 100 for row in rows],
+        ),
+    ]
+
+
+def suite_section(rows: List[dict], cases: List[dict]) -> List[str]:
+    if not rows:
+        return ["<h2>Pytest suites</h2><p>No JUnit XML reports.</p>"]
+    indexed = list(enumerate(rows, 1))
+    return [
+        "<h2>Pytest suites</h2>",
+        line_chart("Suite duration",
+                   {"suite s": [(i, row["duration_s"]) for i, row in indexed],
+                    "slowest test s": [(i, row["slowest_case_s"]) for i, row in indexed]},
+                   "suite run", "s"),
+        html_table(
+            ["Run", "Suite", "Iteration", "Timestamp", "Tests", "Failures", "Errors", "Skipped", "Duration s",
+             "Mean test ms"],
+            [
+                [i, row["name"], row["iteration"] or "-", (row["recorded_at"] or "-")[:19], row["tests"],
+                 row["failures"], row["errors"], row["skipped"], row["duration_s"],
+                 round(1000 * row["duration_s"] / row["tests"], 1) if row["tests"] else "-"]
+                for i, row in indexed
+            ],
+            bad_rows=[bool(row["failures"] or row["errors"]) for _, row in indexed],
+        ),
+        "<h3>Slowest tests</h3>",
+        html_table(
+            ["Test", "Suite", "Seconds", "Outcome"],
+            [[f"{case['classname'].rsplit('.', 1)[-1]}::{case['name']}", case["suite"], case["duration_s"],
+              case["outcome"]] for case in cases],
+            bad_rows=[case["outcome"] in ("failure", "error") for case in cases],
+        ),
+    ]
+
+
+def benchmark_section(name: str, runs: List[dict], max_p95_increase: float) -> List[str]:
+    latest = runs[-1]["endpoints"]
+    # The slowest endpoints of the latest run, as many as there are distinct colours
+    shown = sorted(latest, key=lambda endpoint: -(latest[endpoint]["p95_ms"] or 0))[:len(COLORS)]
+
+    def series(field):
+        return {
+            endpoint: [(run["index"], field(run["endpoints"][endpoint]))
+                       for run in runs if endpoint in run["endpoints"]]
+            for endpoint in shown
+        }
+
+    return [
+        f"<h2>Benchmark: {name}</h2>",
+        line_chart("p95 latency", series(lambda row: row["p95_ms"]), "run", "ms", log_y=True),
+        line_chart("Error rate", series(error_rate), "run", "% of requests"),
+        html_table(
+            ["Run", "Created", "Revision", "Endpoints", "Requests", "Error %", "Slowest p95 ms",
+             "Max Δp95", "Over limit"],
+            [
+                [run["index"], (run["recorded_at"] or "-")[:19], run["git_revision"] or "-",
+                 len(run["endpoints"]),
+                 sum(row["requests"] for row in run["endpoints"].values()),
+                 error_rate({"requests": sum(row["requests"] for row in run["endpoints"].values()),
+                             "errors": sum(row["errors"] for row in run["endpoints"].values())}),
+                 max((row["p95_ms"] or 0 for row in run["endpoints"].values()), default="-"),
+                 f"{run['p95_change']:+.0%}" if run["p95_change"] is not None else "-",
+                 ", ".join(run["drifted"]) or "-"]
+                for run in runs
+            ],
+            bad_rows=[bool(run["drifted"]) for run in runs],
+        ),
+        f"<p>Rows are flagged when an endpoint's p95 rose more than {max_p95_increase:.0%} "
+        "over the previous run that measured it.</p>",
+    ]
+
+
+def benchmark_names(db: sqlite3.Connection) -> List[str]:
+    return [row[0] for row in db.execute("SELECT DISTINCT name FROM runs WHERE kind = 'benchmark' ORDER BY name")]
+
+
+def render_html(db: sqlite3.Connection, max_p95_increase: float = 0.2, min_requests: int = 20) -> str:
+    sections = [*iteration_section(iteration_rows(db)), *suite_section(suite_rows(db), slowest_cases(db))]
+    names = benchmark_names(db)
+    for name in names:
+        runs = mark_drift(benchmark_runs(db, name), max_p95_increase, min_requests)
+        sections.extend(benchmark_section(name, runs, max_p95_increase))
+    if not names:
+        sections.append("<h2>Benchmarks</h2><p>No saved benchmark results; run "
+                        "<code>python -m loadtest --save-benchmark NAME</code>.</p>")
+    return html_page("Performance trends", sections)
+
+
+def drifted_runs(db: sqlite3.Connection, max_p95_increase: float = 0.2, min_requests: int = 20) -> Dict[str, dict]:
+    """The latest run of each benchmark, for those whose latest run drifted"""
+    latest = {}
+    for name in benchmark_names(db):
+        runs = mark_drift(benchmark_runs(db, name), max_p95_increase, min_requests)
+        if runs and runs[-1]["drifted"]:
+            latest[name] = runs[-1]
+    return latest
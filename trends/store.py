@@ -0,0 +1,252 @@
+"""
+SQLite store of every functional and performance report under test_reports/.
+
+Three kinds of source are ingested:
+
+    test_reports/iteration_<n>.json              testing-agent iteration summaries
+    test_reports/pytest/*.xml                    pytest JUnit XML suites
+    test_reports/benchmarks/<name>/<stamp>.json  results saved by `python -m loadtest --save-benchmark`
+
+Each file becomes one row in `runs`, keyed by its path relative to the
+reports directory. A file is ingested again only when its content changes,
+so ingest() can run after every test session.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+from loadtest.config import REPORTS_ROOT
+
+REPORTS_DIR = REPORTS_ROOT
+DB_PATH = os.path.join(REPORTS_DIR, "trends.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    digest TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    iteration INTEGER,
+    recorded_at TEXT,
+    git_revision TEXT
+);
+CREATE TABLE IF NOT EXISTS iterations (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    backend_rate REAL,
+    backend_passed INTEGER,
+    backend_total INTEGER,
+    frontend_rate REAL,
+    critical_issues INTEGER NOT NULL,
+    issues INTEGER NOT NULL,
+    endpoints_tested INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suites (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    tests INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    duration_s REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cases (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    classname TEXT NOT NULL,
+    name TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS endpoints (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    throughput_rps REAL,
+    p50_ms REAL,
+    p95_ms REAL,
+    p99_ms REAL
+);
+CREATE INDEX IF NOT EXISTS endpoints_run ON endpoints(run_id);
+CREATE INDEX IF NOT EXISTS cases_run ON cases(run_id);
+"""
+
+RATE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+PASSED = re.compile(r"\((\d+)\s*/\s*(\d+)")
+ITERATION_FILE = re.compile(r"iteration_(\d+)\.json$")
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def parse_rate(text) -> Tuple[Optional[float], Optional[int], Optional[int]]:
+    """'100% (20/20 tests passed)' -> (100.0, 20, 20); 'N/A ...' -> (None, None, None)"""
+    rate = RATE.search(str(text or ""))
+    passed = PASSED.search(str(text or ""))
+    return (
+        float(rate.group(1)) if rate else None,
+        int(passed.group(1)) if passed else None,
+        int(passed.group(2)) if passed else None,
+    )
+
+
+def count_items(value) -> int:
+    """Issues are lists, or dicts of lists, depending on the iteration"""
+    if isinstance(value, dict):
+        return sum(count_items(item) for item in value.values())
+    if isinstance(value, list):
+        return len(value)
+    return 0
+
+
+def parse_iteration(report: dict) -> dict:
+    rates = report.get("success_rate") or {}
+    backend_rate, backend_passed, backend_total = parse_rate(rates.get("backend"))
+    backend_issues = report.get("backend_issues") or {}
+    return {
+        "backend_rate": backend_rate,
+        "backend_passed": backend_passed,
+        "backend_total": backend_total,
+        "frontend_rate": parse_rate(rates.get("frontend"))[0],
+        "critical_issues": count_items(backend_issues.get("critical")) if isinstance(backend_issues, dict) else 0,
+        "issues": sum(count_items(report.get(key)) for key in ("backend_issues", "frontend_issues", "minor_issues")),
+        "endpoints_tested": count_items(report.get("api_endpoints_tested")),
+    }
+
+
+def parse_junit(text: str) -> Tuple[dict, List[dict], Optional[str]]:
+    """Totals over every <testsuite>, the test cases, and the first suite's timestamp"""
+    root = ET.fromstring(text)
+    suites = [root] if root.tag == "testsuite" else root.findall("testsuite")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "duration_s": 0.0}
+    cases = []
+    for suite in suites:
+        for field in ("tests", "failures", "errors", "skipped"):
+            totals[field] += int(suite.get(field, 0))
+        totals["duration_s"] += float(suite.get("time", 0))
+        for case in suite.iter("testcase"):
+            outcome = next((tag for tag in ("failure", "error", "skipped") if case.find(tag) is not None), "passed")
+            cases.append({
+                "classname": case.get("classname", ""),
+                "name": case.get("name", ""),
+                "duration_s": float(case.get("time", 0)),
+                "outcome": outcome,
+            })
+    totals["duration_s"] = round(totals["duration_s"], 3)
+    return totals, cases, suites[0].get("timestamp") if suites else None
+
+
+def digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def insert_run(db: sqlite3.Connection, source: str, text: str, **run) -> Optional[int]:
+    """A fresh run id, or None when the source is already stored with this content"""
+    row = db.execute("SELECT id, digest FROM runs WHERE source = ?", (source,)).fetchone()
+    if row is not None:
+        if row["digest"] == digest(text):
+            return None
+        db.execute("DELETE FROM runs WHERE id = ?", (row["id"],))
+    columns = ["source", "digest", *run]
+    cursor = db.execute(
+        f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        (source, digest(text), *run.values()),
+    )
+    return cursor.lastrowid
+
+
+def insert_row(db: sqlite3.Connection, table: str, row: dict):
+    db.execute(f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+
+
+def ingest_iterations(db: sqlite3.Connection, reports_dir: str) -> Tuple[int, Dict[str, int]]:
+    """Stored count, and the iteration each linked pytest XML (by file name) belongs to"""
+    stored, linked = 0, {}
+    for path in sorted(glob.glob(os.path.join(reports_dir, "iteration_*.json"))):
+        number = int(ITERATION_FILE.search(path).group(1))
+        with open(path) as f:
+            text = f.read()
+        report = json.loads(text)
+        for link in report.get("test_report_links") or []:
+            if link.endswith(".xml"):
+                linked[os.path.basename(link)] = number
+        run_id = insert_run(db, os.path.relpath(path, reports_dir), text, kind="iteration",
+                            name="iteration", iteration=number)
+        if run_id is not None:
+            insert_row(db, "iterations", {"run_id": run_id, **parse_iteration(report)})
+            stored += 1
+    return stored, linked
+
+
+def ingest_pytest(db: sqlite3.Connection, reports_dir: str, linked: Dict[str, int]) -> int:
+    stored = 0
+    for path in sorted(glob.glob(os.path.join(reports_dir, "pytest", "*.xml"))):
+        with open(path) as f:
+            text = f.read()
+        totals, cases, timestamp = parse_junit(text)
+        name = os.path.splitext(os.path.basename(path))[0]
+        run_id = insert_run(db, os.path.relpath(path, reports_dir), text, kind="pytest", name=name,
+                            iteration=linked.get(os.path.basename(path)), recorded_at=timestamp)
+        if run_id is not None:
+            insert_row(db, "suites", {"run_id": run_id, **totals})
+            db.executemany(
+                "INSERT INTO cases (run_id, classname, name, duration_s, outcome) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, c["classname"], c["name"], c["duration_s"], c["outcome"]) for c in cases],
+            )
+            stored += 1
+        else:
+            # A later iteration may link a suite that was ingested unlinked
+            db.execute("UPDATE runs SET iteration = ? WHERE source = ?",
+                       (linked.get(os.path.basename(path)), os.path.relpath(path, reports_dir)))
+    return stored
+
+
+def ingest_benchmarks(db: sqlite3.Connection, reports_dir: str) -> int:
+    stored = 0
+    for path in sorted(glob.glob(os.path.join(reports_dir, "benchmarks", "*", "*.json"))):
+        if os.path.basename(path) == "baseline.json":
+            continue  # a copy of a saved run
+        with open(path) as f:
+            text = f.read()
+        result = json.loads(text)
+        if "endpoints" not in result:
+            continue
+        run_id = insert_run(db, os.path.relpath(path, reports_dir), text, kind="benchmark", name=result["name"],
+                            recorded_at=result.get("created_at"),
+                            git_revision=(result.get("environment") or {}).get("git_revision"))
+        if run_id is not None:
+            db.executemany(
+                "INSERT INTO endpoints (run_id, endpoint, requests, errors, throughput_rps, p50_ms, p95_ms, p99_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, endpoint, row.get("requests", 0), row.get("errors", 0), row.get("throughput_rps"),
+                     row.get("p50_ms"), row.get("p95_ms"), row.get("p99_ms"))
+                    for endpoint, row in sorted(result["endpoints"].items())
+                ],
+            )
+            stored += 1
+    return stored
+
+
+def ingest(db: sqlite3.Connection, reports_dir: str = REPORTS_DIR) -> Dict[str, int]:
+    """Store new or changed reports; returns how many of each kind were stored"""
+    with db:
+        iterations, linked = ingest_iterations(db, reports_dir)
+        return {
+            "iteration": iterations,
+            "pytest": ingest_pytest(db, reports_dir, linked),
+            "benchmark": ingest_benchmarks(db, reports_dir),
+        }